@@ -2,12 +2,13 @@
 ClipGenius - API Routes
 """
 import json
-import subprocess
+import time
 import uuid
 import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pathlib import Path
@@ -23,8 +24,7 @@ from config import (
     ALLOWED_VIDEO_EXTENSIONS,
     ALLOWED_MIME_TYPES,
     ENABLE_AI_REFRAME,
-    REFRAME_SAMPLE_INTERVAL,
-    REFRAME_DYNAMIC_MODE,
+    RENDER_DB_BATCH_SIZE,
     NUM_CLIPS_TO_GENERATE,
     OUTPUT_FORMATS,
     DEFAULT_OUTPUT_FORMAT,
@@ -33,26 +33,51 @@ from config import (
     CLIP_MAX_DURATION,
     SENTENCE_DETECTION_ENABLED,
     SENTENCE_MIN_PAUSE,
-    SENTENCE_MAX_EXTENSION
+    SENTENCE_MAX_EXTENSION,
+    LLM_CACHE_ENABLED,
+    ANALYSIS_STREAMING_ENABLED,
+    PIPELINE_ENABLED,
+    FACE_TRACK_ENABLED
 )
 from logging_config import get_api_logger, get_background_logger
 
 logger = get_api_logger()
 bg_logger = get_background_logger()
 
-from models import get_db, Project, Clip, get_background_session, db_lock
+from models import get_db, Project, Clip, JobStage, get_background_session, db_lock
 from models.project import ProjectStatus
+from models.job import STAGE_ORDER
 from services import (
     YouTubeDownloader,
-    ClipAnalyzer,
     VideoCutter,
-    AIReframer,
     # V2 - Versões melhoradas com timestamps precisos
     TranscriberV2,
-    SubtitleGeneratorV2,
     # Sentence Boundary Detection
-    SentenceBoundaryDetector
+    SentenceBoundaryDetector,
+    WordTimeline,
+    # Persistent job queue (worker processes)
+    job_queue,
+    # Parallel clip rendering (cut + reframe + subtitles)
+    clip_render_pool,
+    # Transcription sidecar files
+    transcript_store,
+    # LLM response cache (analysis)
+    LLMResponseCache,
+    # Shared analyzers with cached provider health checks
+    provider_registry,
+    # Pipelined processing (stages run concurrently)
+    StageCounters,
+    ProgressReporter,
+    run_streaming,
+    # Whole-video face tracks shared by all clips
+    face_track_store,
+    # Resident transcription models (model server shared by the workers)
+    model_pool,
+    model_server_client
 )
+from services.metrics import instrumented_run, span
+from services.model_server import ModelServerUnavailable
+from services.pipeline import RUNNING, SKIPPED
 from .schemas import (
     ProjectCreate,
     ProjectResponse,
@@ -73,13 +98,12 @@ router = APIRouter()
 downloader = YouTubeDownloader()
 transcriber = TranscriberV2(backend="auto")  # V2: auto seleciona melhor backend
 cutter = VideoCutter()
-subtitler = SubtitleGeneratorV2()  # V2: tamanho consistente e melhor sincronização
-reframer = AIReframer()
+# Cut/reframe/subtitle services of the cut stage live in the render pool processes
 
 
 def get_analyzer():
-    """Lazy load analyzer (requires API key)"""
-    return ClipAnalyzer()
+    """Shared analyzer (provider verified once, health cached by the registry)"""
+    return provider_registry.get_analyzer()
 
 
 # Progress tracking weights for each step (must sum to 100)
@@ -135,270 +159,695 @@ def update_progress(
         raise
 
 
-def cut_clip_with_optional_reframe(
-    video_path: str,
-    start_time: float,
-    end_time: float,
-    output_name: str,
-    enable_reframe: bool = ENABLE_AI_REFRAME
-) -> dict:
-    """
-    Cut a clip with optional AI reframing (face tracking).
-    Falls back to center crop if reframe is disabled or fails.
-    """
-    if enable_reframe:
-        try:
-            if REFRAME_DYNAMIC_MODE:
-                # Frame-by-frame tracking (slower but smoother)
-                return reframer.cut_clip_with_dynamic_tracking(
-                    video_path=video_path,
-                    start_time=start_time,
-                    end_time=end_time,
-                    output_name=output_name,
-                    sample_interval=REFRAME_SAMPLE_INTERVAL
-                )
-            else:
-                # Static tracking (faster, uses average face position)
-                return reframer.cut_clip_with_tracking(
-                    video_path=video_path,
-                    start_time=start_time,
-                    end_time=end_time,
-                    output_name=output_name,
-                    enable_tracking=True,
-                    sample_interval=REFRAME_SAMPLE_INTERVAL
-                )
-        except Exception as e:
-            bg_logger.warning("AI Reframe failed, falling back to center crop", error=str(e))
-            print(f"AI Reframe failed, falling back to center crop: {e}")
-
-    # Fallback to simple center crop
-    return cutter.cut_clip(
-        video_path=video_path,
-        start_time=start_time,
-        end_time=end_time,
-        output_name=output_name,
-        convert_to_vertical=True
-    )
-
-
 # ============ Background Processing ============
+#
+# Processing is split into stages (download, transcribe, analyze, cut) that run
+# in worker processes (see worker.py) through the persistent job queue.
+# Each stage reads its inputs from the project row / job checkpoint, so a job
+# interrupted by a crash resumes from the last finished stage.
+
+def _friendly_error_message(error_str: str) -> str:
+    """Create user-friendly error message from an exception string"""
+    if "ConnectionError" in error_str or "ConnectError" in error_str:
+        return "Erro de conexão. Verifique se o Ollama está rodando ou se a API Groq está acessível."
+    elif "ffmpeg" in error_str.lower() or "ffprobe" in error_str.lower():
+        return "Erro no processamento de vídeo. Verifique se o FFmpeg está instalado."
+    elif "whisper" in error_str.lower():
+        return "Erro na transcrição de áudio. Verifique a instalação do Whisper."
+    elif "Private video" in error_str or "video unavailable" in error_str.lower():
+        return "Vídeo indisponível ou privado no YouTube."
+    elif "copyright" in error_str.lower():
+        return "Vídeo bloqueado por direitos autorais."
+    return f"Erro no processamento: {error_str[:200]}"
+
+
+def _load_transcription(project: Project) -> dict:
+    """Load the transcription saved by the transcribe stage"""
+    if project.transcription_path and Path(project.transcription_path).exists():
+        return transcript_store.load(project.transcription_path)
+    # Legacy rows: JSON stored in the projects table
+    if not project.transcription:
+        raise ValueError(f"Project {project.id} has no transcription checkpoint")
+    return json.loads(project.transcription)
+
+
+def _stage_download(db: Session, project: Project, language: str, checkpoint: dict) -> dict:
+    """Step 1: Download (0-15%)"""
+    if project.video_path and Path(project.video_path).exists():
+        bg_logger.info("Video already exists, skipping download", project_id=project.id, video_path=project.video_path)
+        print(f"Video already exists, skipping download: {project.video_path}")
+        update_progress(db, project, ProjectStatus.DOWNLOADING.value, 15,
+                       "Vídeo já existe, pulando download...")
+        return {}
 
-def process_video(project_id: int, language: str = None):
-    """
-    Background task to process video with progress tracking:
-    1. Download video (0-15%)
-    2. Transcribe audio (15-40%)
-    3. Analyze with AI (40-60%)
-    4. Cut clips + subtitles (60-100%)
+    update_progress(db, project, ProjectStatus.DOWNLOADING.value, 0,
+                   "Iniciando download do YouTube...")
 
-    Uses thread-safe database session and processing lock to prevent race conditions.
+    # Download with progress simulation (yt-dlp doesn't give easy progress)
+    update_progress(db, project, ProjectStatus.DOWNLOADING.value, 5,
+                   "Conectando ao YouTube...")
 
-    Args:
-        project_id: Project ID to process
-        language: Language code for transcription (pt, en, es, auto). Default from config.
-    """
-    db = get_background_session()
-    project = None
+    video_info = downloader.download(project.youtube_url, project.youtube_id)
+    _apply_video_info(project, video_info)
 
-    try:
-        # Acquire lock and fetch project atomically
-        with db_lock:
-            project = db.query(Project).filter(Project.id == project_id).first()
-            if not project:
-                bg_logger.warning("Project not found", project_id=project_id)
-                print(f"Project {project_id} not found")
-                return
+    update_progress(db, project, ProjectStatus.DOWNLOADING.value, 15,
+                   "Download concluído!")
+    return {}
 
-            # Try to acquire processing lock
-            if not project.acquire_processing_lock():
-                bg_logger.warning("Project already being processed", project_id=project_id)
-                print(f"Project {project_id} is already being processed")
-                db.rollback()
-                return
 
-            # Initialize progress tracking
-            project.progress_started_at = datetime.utcnow()
-            db.commit()
+def _apply_video_info(project: Project, video_info: dict) -> None:
+    """Store the metadata (and file path) returned by the downloader"""
+    project.title = video_info['title']
+    project.duration = video_info['duration']
+    project.thumbnail_url = video_info['thumbnail']
+    if video_info.get('video_path'):
+        project.video_path = video_info['video_path']
 
-        bg_logger.info("Starting video processing", project_id=project_id, language=language)
 
-        # ========== Step 1: Download (0-15%) ==========
-        if project.video_path and Path(project.video_path).exists():
-            bg_logger.info("Video already exists, skipping download", project_id=project_id, video_path=project.video_path)
-            print(f"Video already exists, skipping download: {project.video_path}")
-            update_progress(db, project, ProjectStatus.DOWNLOADING.value, 15,
-                           "Vídeo já existe, pulando download...")
-        else:
-            update_progress(db, project, ProjectStatus.DOWNLOADING.value, 0,
-                           "Iniciando download do YouTube...")
+def _stage_transcribe(db: Session, project: Project, language: str, checkpoint: dict) -> dict:
+    """Step 2: Transcribe (15-40%)"""
+    update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 16,
+                   "Extraindo áudio do vídeo...")
 
-            # Download with progress simulation (yt-dlp doesn't give easy progress)
-            update_progress(db, project, ProjectStatus.DOWNLOADING.value, 5,
-                           "Conectando ao YouTube...")
+    # Determine language for transcription
+    transcription_language = language or DEFAULT_LANGUAGE
+    lang_name = SUPPORTED_LANGUAGES.get(transcription_language, transcription_language)
+    lang_msg = f" ({lang_name})" if transcription_language != "auto" else " (auto-detect)"
 
-            video_info = downloader.download(project.youtube_url, project.youtube_id)
-            project.title = video_info['title']
-            project.duration = video_info['duration']
-            project.thumbnail_url = video_info['thumbnail']
-            project.video_path = video_info['video_path']
+    update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 20,
+                   f"Transcrevendo com Whisper AI{lang_msg}...")
 
-            update_progress(db, project, ProjectStatus.DOWNLOADING.value, 15,
-                           "Download concluído!")
+    transcription = transcriber.transcribe_video(project.video_path, language=transcription_language)
+    project.audio_path = transcription.get('audio_path')
+    project.transcription_path = transcript_store.save(transcription, f"project_{project.id}")
+    project.transcription = None
 
-        # ========== Step 2: Transcribe (15-40%) ==========
-        update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 16,
-                       "Extraindo áudio do vídeo...")
+    update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 40,
+                   "Transcrição concluída!")
+    return {}
 
-        # Determine language for transcription
-        transcription_language = language or DEFAULT_LANGUAGE
-        lang_name = SUPPORTED_LANGUAGES.get(transcription_language, transcription_language)
-        lang_msg = f" ({lang_name})" if transcription_language != "auto" else " (auto-detect)"
 
-        update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 20,
-                       f"Transcrevendo com Whisper AI{lang_msg}...")
+def _stage_analyze(db: Session, project: Project, language: str, checkpoint: dict) -> dict:
+    """Step 3: Analyze with AI (40-60%)"""
+    transcription = _load_transcription(project)
 
-        transcription = transcriber.transcribe_video(project.video_path, language=transcription_language)
-        project.audio_path = transcription.get('audio_path')
-        project.transcription = json.dumps(transcription)
+    update_progress(db, project, ProjectStatus.ANALYZING.value, 41,
+                   "Enviando para análise de IA...")
 
-        update_progress(db, project, ProjectStatus.TRANSCRIBING.value, 40,
-                       "Transcrição concluída!")
+    update_progress(db, project, ProjectStatus.ANALYZING.value, 45,
+                   "IA identificando momentos virais...")
 
-        # ========== Step 3: Analyze with AI (40-60%) ==========
-        update_progress(db, project, ProjectStatus.ANALYZING.value, 41,
-                       "Enviando para análise de IA...")
+    analyzer = get_analyzer()
 
-        update_progress(db, project, ProjectStatus.ANALYZING.value, 45,
-                       "IA identificando momentos virais...")
+    # Ajustar timestamps para limites de sentença (se habilitado)
+    detector = None
+    if SENTENCE_DETECTION_ENABLED:
+        detector = SentenceBoundaryDetector(config={
+            'min_pause': SENTENCE_MIN_PAUSE,
+            'max_extension': SENTENCE_MAX_EXTENSION
+        })
+    # Índice das palavras construído uma vez para todos os clips
+    all_words = WordTimeline(transcription.get('words', []))
 
-        analyzer = get_analyzer()
+    if ANALYSIS_STREAMING_ENABLED:
+        clip_suggestions = _analyze_and_render_streaming(
+            db, project, analyzer, transcription, detector, all_words
+        )
+    else:
         clip_suggestions = analyzer.analyze(transcription)
+        if detector is not None:
+            for suggestion in clip_suggestions:
+                _adjust_to_sentence_boundary(detector, all_words, suggestion)
+
+    update_progress(db, project, ProjectStatus.ANALYZING.value, 60,
+                   f"IA encontrou {len(clip_suggestions)} momentos virais!")
+
+    # Suggestions are checkpointed in the job so the cut stage can resume
+    return {'clip_suggestions': clip_suggestions}
+
+
+def _adjust_to_sentence_boundary(
+    detector: SentenceBoundaryDetector,
+    all_words: WordTimeline,
+    suggestion: dict
+) -> None:
+    """Move the end of a clip suggestion to the next sentence boundary (in place)"""
+    adjusted_end, reason = detector.adjust_clip_end(
+        words=all_words,
+        start_time=suggestion['start_time'],
+        suggested_end=suggestion['end_time'],
+        max_duration=CLIP_MAX_DURATION
+    )
 
-        # Ajustar timestamps para limites de sentença (se habilitado)
-        if SENTENCE_DETECTION_ENABLED:
-            detector = SentenceBoundaryDetector(config={
-                'min_pause': SENTENCE_MIN_PAUSE,
-                'max_extension': SENTENCE_MAX_EXTENSION
-            })
-            all_words = transcription.get('words', [])
+    # Validar completude
+    validation = detector.validate_clip_completeness(
+        all_words, suggestion['start_time'], adjusted_end
+    )
 
-            adjusted_suggestions = []
-            for suggestion in clip_suggestions:
-                adjusted_end, reason = detector.adjust_clip_end(
-                    words=all_words,
-                    start_time=suggestion['start_time'],
-                    suggested_end=suggestion['end_time'],
-                    max_duration=CLIP_MAX_DURATION
-                )
-
-                # Validar completude
-                validation = detector.validate_clip_completeness(
-                    all_words, suggestion['start_time'], adjusted_end
-                )
-
-                # Log do ajuste
-                if adjusted_end != suggestion['end_time']:
-                    bg_logger.info(
-                        "Clip boundary adjusted",
-                        clip_title=suggestion.get('title', 'unknown'),
-                        original_end=suggestion['end_time'],
-                        new_end=adjusted_end,
-                        reason=reason,
-                        is_complete=validation['is_complete']
-                    )
+    # Log do ajuste
+    if adjusted_end != suggestion['end_time']:
+        bg_logger.info(
+            "Clip boundary adjusted",
+            clip_title=suggestion.get('title', 'unknown'),
+            original_end=suggestion['end_time'],
+            new_end=adjusted_end,
+            reason=reason,
+            is_complete=validation['is_complete']
+        )
+
+    # Atualizar suggestion
+    suggestion['end_time'] = adjusted_end
+    suggestion['duration'] = adjusted_end - suggestion['start_time']
+    suggestion['boundary_adjustment'] = reason
+    suggestion['is_complete'] = validation['is_complete']
+
+
+def _analyze_and_render_streaming(
+    db: Session,
+    project: Project,
+    analyzer,
+    transcription: dict,
+    detector: Optional[SentenceBoundaryDetector],
+    all_words: WordTimeline
+) -> List[dict]:
+    """
+    Stream clip suggestions from the LLM and render each one as soon as it is
+    accepted, so rendering of the first clips overlaps generation of the next.
+
+    Returns:
+        The clip suggestions, in the order they were generated (and rendered)
+    """
+    clip_suggestions = []
+    segments = {}
+    timeline = WordTimeline.from_segments(transcription.get('segments', []))
+    existing_clips = _existing_clip_keys(db, project)
+    # Read in the feeder thread of the render pool: no ORM access there
+    project_id, youtube_id, video_path = project.id, project.youtube_id, project.video_path
+
+    def render_tasks():
+        for suggestion in analyzer.analyze_stream(transcription):
+            if detector is not None:
+                _adjust_to_sentence_boundary(detector, all_words, suggestion)
+            index = len(clip_suggestions)
+            clip_suggestions.append(suggestion)
+
+            task, segments[index] = _render_task(
+                youtube_id, video_path, index, suggestion, transcription, timeline
+            )
+            if (task['output_name'], suggestion['start_time']) in existing_clips:
+                bg_logger.info("Clip already generated, skipping", project_id=project_id, clip_num=index + 1)
+                continue
+            yield task
+
+    rendered = 0
+    pending_clips = []
+    for result in clip_render_pool.render_stream(render_tasks()):
+        suggestion = clip_suggestions[result['index']]
+        pending_clips.append(_clip_record(project, suggestion, result, segments[result['index']]))
+        rendered += 1
+
+        if len(pending_clips) >= RENDER_DB_BATCH_SIZE:
+            db.add_all(pending_clips)
+            pending_clips = []
+            update_progress(db, project, ProjectStatus.ANALYZING.value, 50,
+                           f"IA analisando... {rendered} cortes já prontos",
+                           f"{rendered}/{len(clip_suggestions)}")
+
+    if pending_clips:
+        db.add_all(pending_clips)
+        db.commit()
 
-                # Atualizar suggestion
-                suggestion['end_time'] = adjusted_end
-                suggestion['duration'] = adjusted_end - suggestion['start_time']
-                suggestion['boundary_adjustment'] = reason
-                suggestion['is_complete'] = validation['is_complete']
+    bg_logger.info(
+        "Streamed analysis finished",
+        project_id=project.id,
+        suggestions=len(clip_suggestions),
+        rendered=rendered
+    )
+    return clip_suggestions
 
-                adjusted_suggestions.append(suggestion)
 
-            clip_suggestions = adjusted_suggestions
+def _existing_clip_keys(db: Session, project: Project) -> set:
+    """(output name, start time) of the clips already created for a project"""
+    return {
+        (Path(c.video_path).stem, c.start_time)
+        for c in db.query(Clip).filter(Clip.project_id == project.id).all()
+        if c.video_path
+    }
 
-        update_progress(db, project, ProjectStatus.ANALYZING.value, 60,
-                       f"IA encontrou {len(clip_suggestions)} momentos virais!")
 
-        # ========== Step 4 & 5: Cut clips + subtitles (60-100%) ==========
-        total_clips = len(clip_suggestions)
-        clip_progress_weight = 40  # 40% do progresso total (60-100)
+def _render_task(
+    youtube_id: str,
+    video_path: str,
+    index: int,
+    suggestion: dict,
+    transcription: dict,
+    timeline: WordTimeline
+) -> tuple:
+    """
+    Render pool task of a clip suggestion.
+
+    Returns:
+        Tuple of (task, transcription segment of the clip)
+    """
+    # Get transcription segment for this clip (the render processes only need its words)
+    segment = transcriber.get_text_for_timerange(
+        transcription,
+        suggestion['start_time'],
+        suggestion['end_time'],
+        timeline=timeline
+    )
+    task = {
+        'index': index,
+        'video_path': video_path,
+        'start_time': suggestion['start_time'],
+        'end_time': suggestion['end_time'],
+        'output_name': f"{youtube_id}_clip_{index + 1:02d}",
+        'words': segment.get('words', []),
+        'enable_reframe': ENABLE_AI_REFRAME
+    }
+    return task, segment
+
+
+def _clip_record(project: Project, suggestion: dict, result: dict, segment: dict) -> Clip:
+    """Clip row of a rendered clip"""
+    clip_result = result['clip_result']
+    subtitle_result = result['subtitle_result']
+    return Clip(
+        project_id=project.id,
+        start_time=suggestion['start_time'],
+        end_time=suggestion['end_time'],
+        duration=suggestion['duration'],
+        title=suggestion['title'],
+        viral_score=suggestion['viral_score'],
+        score_justification=suggestion['justification'],
+        video_path=clip_result['video_path'],
+        video_path_with_subtitles=subtitle_result.get('video_path_with_subtitles'),
+        subtitle_path=subtitle_result.get('subtitle_path'),
+        subtitle_data=subtitle_result.get('subtitle_data'),
+        subtitle_file=subtitle_result.get('subtitle_file'),
+        has_burned_subtitles=subtitle_result.get('has_burned_subtitles', False),
+        transcription_segment=json.dumps({
+            'start_time': suggestion['start_time'],
+            'end_time': suggestion['end_time'],
+            'text': segment['text']
+        }),
+        categoria=suggestion.get('category', 'insight')
+    )
+
+
+def _stage_cut(db: Session, project: Project, language: str, checkpoint: dict) -> dict:
+    """Step 4 & 5: Cut clips + subtitles (60-100%), rendered in parallel processes"""
+    transcription = _load_transcription(project)
+    clip_suggestions = checkpoint.get('clip_suggestions') or []
+
+    total_clips = len(clip_suggestions)
+    clip_progress_weight = 40  # 40% do progresso total (60-100)
+
+    # Clips already created by a previous (interrupted) attempt of this stage,
+    # or rendered during a streamed analysis
+    existing_clips = _existing_clip_keys(db, project)
+
+    tasks = []
+    segments = {}
+    timeline = WordTimeline.from_segments(transcription.get('segments', []))
+    for i, suggestion in enumerate(clip_suggestions):
+        clip_num = i + 1
+        clip_name = f"{project.youtube_id}_clip_{clip_num:02d}"
+
+        if (clip_name, suggestion['start_time']) in existing_clips:
+            bg_logger.info("Clip already generated, skipping", project_id=project.id, clip_num=clip_num)
+            continue
+
+        task, segments[i] = _render_task(
+            project.youtube_id, project.video_path, i, suggestion, transcription, timeline
+        )
+        tasks.append(task)
 
-        for i, suggestion in enumerate(clip_suggestions):
-            clip_num = i + 1
+    done_clips = total_clips - len(tasks)
+    reframe_text = " com AI Reframe" if ENABLE_AI_REFRAME else ""
+    if tasks:
+        update_progress(
+            db, project,
+            ProjectStatus.CUTTING.value,
+            int(60 + clip_progress_weight * done_clips / total_clips),
+            f"Gerando {len(tasks)} cortes em paralelo{reframe_text}...",
+            f"{done_clips}/{total_clips}"
+        )
 
-            # Calculate progress within cutting phase
-            clip_progress = int(60 + (clip_progress_weight * clip_num / total_clips))
+    pending_clips = []
+    for result in clip_render_pool.render(tasks):
+        suggestion = clip_suggestions[result['index']]
+        pending_clips.append(_clip_record(project, suggestion, result, segments[result['index']]))
+        done_clips += 1
 
-            reframe_text = " com AI Reframe" if ENABLE_AI_REFRAME else ""
+        # Insert clip records in batches: the progress update commits them together
+        if len(pending_clips) >= RENDER_DB_BATCH_SIZE:
+            db.add_all(pending_clips)
+            pending_clips = []
             update_progress(
                 db, project,
                 ProjectStatus.CUTTING.value,
-                clip_progress - 2,  # Slightly before completion
-                f"Gerando corte {clip_num}/{total_clips}{reframe_text}...",
-                f"{clip_num}/{total_clips}"
+                int(60 + clip_progress_weight * done_clips / total_clips),
+                f"Gerando cortes {done_clips}/{total_clips}{reframe_text}...",
+                f"{done_clips}/{total_clips}"
             )
 
-            # Cut the clip with AI reframe (face tracking)
-            clip_name = f"{project.youtube_id}_clip_{clip_num:02d}"
+    # Remaining clips are committed with the final progress update
+    if pending_clips:
+        db.add_all(pending_clips)
+
+    # Done!
+    update_progress(
+        db, project,
+        ProjectStatus.COMPLETED.value,
+        100,
+        f"Concluído! {total_clips} cortes gerados com sucesso.",
+        f"{total_clips}/{total_clips}"
+    )
+    return {}
+
+
+# ============ Pipelined Processing ============
+#
+# With PIPELINE_ENABLED a job has a single "pipeline" stage that runs the four
+# stages above at once: the audio track is downloaded alongside the video and
+# transcribed while it is decoded, transcribed segments feed the windowed
+# analysis and each accepted clip goes straight to the render pool - the first
+# clip is ready long before the whole video has been processed.
+# Progress is reported as per-stage counters (projects.stage_progress).
+
+# Counter unit of each pipelined stage
+PIPELINE_COUNTER_UNITS = {
+    'download': 'files',
+    'transcribe': 'seconds',
+    'analyze': 'seconds',
+    'render': 'clips',
+}
 
-            clip_result = cut_clip_with_optional_reframe(
-                video_path=project.video_path,
-                start_time=suggestion['start_time'],
-                end_time=suggestion['end_time'],
-                output_name=clip_name,
-                enable_reframe=ENABLE_AI_REFRAME
-            )
+# Project status while a pipelined stage is the earliest one still running
+PIPELINE_STAGE_STATUS = {
+    'download': ProjectStatus.DOWNLOADING.value,
+    'transcribe': ProjectStatus.TRANSCRIBING.value,
+    'analyze': ProjectStatus.ANALYZING.value,
+    'render': ProjectStatus.CUTTING.value,
+}
 
-            # Get transcription segment for this clip
-            segment = transcriber.get_text_for_timerange(
-                transcription,
-                suggestion['start_time'],
-                suggestion['end_time']
-            )
 
-            # Generate subtitles (without burning - for layer system)
-            words = segment.get('words', [])
-            if words:
-                subtitle_result = subtitler.create_subtitled_clip(
-                    video_path=clip_result['video_path'],
-                    words=words,
-                    clip_start_time=suggestion['start_time'],
-                    output_name=clip_name,
-                    burn_subtitles=False  # Don't burn - use layer system
-                )
-            else:
-                subtitle_result = {}
-
-            # Create clip record with atomic transaction
-            clip = Clip(
+def _format_clock(seconds: float) -> str:
+    seconds = int(seconds or 0)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _pipeline_message(stages: dict) -> str:
+    """Human-readable summary of the stage counters"""
+    parts = []
+    if stages['download']['state'] == RUNNING:
+        parts.append("Baixando vídeo")
+    for stage, label in (('transcribe', "Transcrição"), ('analyze', "Análise")):
+        counter = stages[stage]
+        if counter['state'] == RUNNING:
+            total = f" de {_format_clock(counter['total'])}" if counter['total'] else ""
+            parts.append(f"{label} {_format_clock(counter['done'])}{total}")
+    if stages['render']['done']:
+        parts.append(f"{stages['render']['done']} cortes prontos")
+    return " · ".join(parts) or "Processando..."
+
+
+def _pipeline_columns(stages: dict) -> dict:
+    """Project columns derived from the stage counters (written by the progress reporter)"""
+    weights = {stage: STEP_WEIGHTS[status] for stage, status in PIPELINE_STAGE_STATUS.items()}
+    render = stages['render']
+    values = {
+        Project.progress: StageCounters.overall_progress(stages, weights),
+        Project.progress_step: f"{render['done']}/{render['total'] if render['total'] is not None else '?'}"
+    }
+    running = [stage for stage, counter in stages.items() if counter['state'] == RUNNING]
+    if running:
+        values[Project.status] = PIPELINE_STAGE_STATUS[running[0]]
+        values[Project.progress_message] = _pipeline_message(stages)
+    return values
+
+
+def _start_pipeline_downloads(
+    db: Session,
+    project: Project,
+    counters: StageCounters,
+    downloads: ThreadPoolExecutor
+) -> tuple:
+    """
+    Start the video download and return the media to transcribe.
+
+    The audio track (a few MB) is downloaded alongside the video, so the
+    transcription starts long before the video download has finished.
+
+    Returns:
+        Tuple of (future of the video info, path of the media to transcribe)
+    """
+    video_future = Future()
+    if project.video_path and Path(project.video_path).exists():
+        bg_logger.info("Video already exists, skipping download", project_id=project.id, video_path=project.video_path)
+        counters.finish('download', SKIPPED)
+        video_future.set_result({'video_path': project.video_path})
+        return video_future, project.video_path
+
+    counters.start('download', total=2)
+    # Read here: `download` runs in the download threads, no ORM access there
+    project_id, url, youtube_id = project.id, project.youtube_url, project.youtube_id
+
+    def download(fetch):
+        with span("download", project_id=project_id):
+            info = fetch(url, youtube_id)
+        counters.advance('download')
+        return info
+
+    video_future = downloads.submit(download, downloader.download)
+    audio_future = downloads.submit(download, downloader.download_audio)
+    try:
+        audio_info = audio_future.result()
+        _apply_video_info(project, audio_info)
+        media_path = audio_info['audio_path']
+    except Exception as e:
+        bg_logger.warning("Audio track download failed, transcribing from the video", project_id=project.id, error=str(e))
+        counters.set_total('download', 1)
+        video_info = video_future.result()
+        _apply_video_info(project, video_info)
+        media_path = video_info['video_path']
+    db.commit()
+
+    video_future.add_done_callback(lambda f: None if f.exception() else counters.finish('download'))
+    return video_future, media_path
+
+
+def _run_pipeline(
+    db: Session,
+    project: Project,
+    language: str,
+    counters: StageCounters,
+    downloads: ThreadPoolExecutor
+) -> List[dict]:
+    """
+    Download, transcription, analysis and rendering of a project, overlapped.
+
+    Threads: downloads (video + audio track) -> transcription (segments per audio
+    chunk) -> analysis + task building (render pool feeder) -> render processes;
+    this thread inserts the Clip rows as renders finish.
+
+    Returns:
+        The clip suggestions, in the order they were accepted
+    """
+    started = time.time()
+    video_future, media_path = _start_pipeline_downloads(db, project, counters, downloads)
+    if ENABLE_AI_REFRAME and FACE_TRACK_ENABLED:
+        # Faces are detected over the whole video while it is being transcribed
+        video_future.add_done_callback(
+            lambda f: None if f.exception() else clip_render_pool.prepare_face_track(f.result()['video_path'])
+        )
+    # The closures below run in other threads: no ORM access there
+    project_id, duration = project.id, project.duration or None
+    transcription_language = language or DEFAULT_LANGUAGE
+
+    def transcribe(emit):
+        def on_segments(segments):
+            if segments:
+                counters.set_done('transcribe', segments[-1]['end'])
+            emit(segments)
+
+        with span("transcribe", project_id=project_id):
+            result = transcriber.transcribe_video(media_path, language=transcription_language, on_segments=on_segments)
+        counters.finish('transcribe')
+        return result
+
+    counters.start('transcribe', total=duration)
+    segment_batches, transcription_future = run_streaming(transcribe, name="pipeline-transcribe")
+
+    analyzer = get_analyzer()
+    detector = None
+    if SENTENCE_DETECTION_ENABLED:
+        detector = SentenceBoundaryDetector(config={
+            'min_pause': SENTENCE_MIN_PAUSE,
+            'max_extension': SENTENCE_MAX_EXTENSION
+        })
+
+    # Everything below `render_tasks` runs in the feeder thread of the render
+    # pool: no ORM access there
+    partial = {'segments': []}
+    clip_suggestions = []
+    segments = {}
+    existing_clips = _existing_clip_keys(db, project)
+    youtube_id = project.youtube_id
+
+    def tracked_batches():
+        for batch in segment_batches:
+            partial['segments'].extend(batch)
+            yield batch
+
+    # Word index of the segments transcribed so far, rebuilt only after new ones arrived
+    indexed = {'segments': None, 'timeline': None}
+
+    def current_timeline():
+        count = len(partial['segments'])
+        if count != indexed['segments']:
+            indexed['timeline'] = WordTimeline.from_segments(partial['segments'][:count])
+            indexed['segments'] = count
+        return indexed['timeline']
+
+    def render_tasks():
+        video_path = None
+        try:
+            with span("analyze", project_id=project_id):
+                for suggestion in analyzer.analyze_segment_stream(
+                    tracked_batches(),
+                    total_duration=duration,
+                    on_progress=lambda analyzed: counters.set_done('analyze', analyzed)
+                ):
+                    # Words transcribed so far (the analysis is behind the transcription)
+                    timeline = current_timeline()
+                    if detector is not None:
+                        _adjust_to_sentence_boundary(detector, timeline, suggestion)
+                    index = len(clip_suggestions)
+                    clip_suggestions.append(suggestion)
+
+                    if video_path is None:
+                        video_path = video_future.result()['video_path']
+                    task, segments[index] = _render_task(
+                        youtube_id, video_path, index, suggestion, partial, timeline
+                    )
+                    if (task['output_name'], suggestion['start_time']) in existing_clips:
+                        counters.advance('render')
+                        continue
+                    yield task
+        finally:
+            segment_batches.close()
+        counters.finish('analyze')
+        counters.set_total('render', len(clip_suggestions))
+
+    counters.start('analyze', total=duration)
+    counters.start('render')
+    rendered = 0
+    pending_clips = []
+    for result in clip_render_pool.render_stream(render_tasks()):
+        index = result['index']
+        pending_clips.append(_clip_record(project, clip_suggestions[index], result, segments[index]))
+        counters.advance('render')
+        rendered += 1
+        if rendered == 1:
+            bg_logger.info(
+                "First clip rendered",
                 project_id=project.id,
-                start_time=suggestion['start_time'],
-                end_time=suggestion['end_time'],
-                duration=suggestion['duration'],
-                title=suggestion['title'],
-                viral_score=suggestion['viral_score'],
-                score_justification=suggestion['justification'],
-                video_path=clip_result['video_path'],
-                video_path_with_subtitles=subtitle_result.get('video_path_with_subtitles'),
-                subtitle_path=subtitle_result.get('subtitle_path'),
-                subtitle_data=subtitle_result.get('subtitle_data'),
-                subtitle_file=subtitle_result.get('subtitle_file'),
-                has_burned_subtitles=subtitle_result.get('has_burned_subtitles', False),
-                transcription_segment=json.dumps(segment),
-                categoria=suggestion.get('category', 'insight')
+                seconds_since_start=round(time.time() - started, 2)
             )
-            db.add(clip)
+
+        # Clips become visible in batches while the rest of the video is processed
+        if len(pending_clips) >= RENDER_DB_BATCH_SIZE:
+            db.add_all(pending_clips)
             db.commit()
+            pending_clips = []
+
+    if pending_clips:
+        db.add_all(pending_clips)
+    counters.finish('render')
+
+    transcription = transcription_future.result()
+    project.audio_path = transcription.get('audio_path') or (media_path if media_path != project.video_path else None)
+    project.transcription_path = transcript_store.save(transcription, f"project_{project.id}")
+    project.transcription = None
+    video_info = video_future.result()
+    if 'title' in video_info:
+        _apply_video_info(project, video_info)
+    db.commit()
+    return clip_suggestions
+
+
+def _stage_pipeline(db: Session, project: Project, language: str, checkpoint: dict) -> dict:
+    """All stages at once, on partial results (PIPELINE_ENABLED)"""
+    counters = StageCounters(PIPELINE_COUNTER_UNITS)
+    project.stage_progress = counters.snapshot()
+    update_progress(db, project, ProjectStatus.DOWNLOADING.value, 0,
+                   "Iniciando processamento...")
+
+    downloads = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline-download")
+    try:
+        with ProgressReporter(project.id, counters, columns=_pipeline_columns):
+            try:
+                clip_suggestions = _run_pipeline(db, project, language, counters, downloads)
+            except Exception:
+                counters.fail_running()
+                raise
+    finally:
+        downloads.shutdown(wait=False, cancel_futures=True)
+
+    # The reporter has stopped: the final status cannot be overwritten
+    db.refresh(project)
+    update_progress(
+        db, project,
+        ProjectStatus.COMPLETED.value,
+        100,
+        f"Concluído! {len(clip_suggestions)} cortes gerados com sucesso.",
+        f"{len(clip_suggestions)}/{len(clip_suggestions)}"
+    )
+    return {'clip_suggestions': clip_suggestions}
+
+
+PIPELINE_STAGES = {
+    JobStage.DOWNLOAD.value: _stage_download,
+    JobStage.TRANSCRIBE.value: _stage_transcribe,
+    JobStage.ANALYZE.value: _stage_analyze,
+    JobStage.CUT.value: _stage_cut,
+    JobStage.PIPELINE.value: _stage_pipeline,
+}
 
-        # Done!
-        update_progress(
-            db, project,
-            ProjectStatus.COMPLETED.value,
-            100,
-            f"Concluído! {total_clips} cortes gerados com sucesso.",
-            f"{total_clips}/{total_clips}"
-        )
+
+def run_pipeline_stage(project_id: int, stage: str, language: str = None, checkpoint: dict = None) -> dict:
+    """
+    Run a single processing stage for a project (called by queue workers).
+
+    Args:
+        project_id: Project ID to process
+        stage: Stage name (download, transcribe, analyze, cut)
+        language: Language code for transcription (pt, en, es, auto). Default from config.
+        checkpoint: Data checkpointed by previous stages of the same job
+
+    Returns:
+        Dict of checkpoint updates produced by the stage
+
+    Raises:
+        Exception from the stage, after the project was marked as error
+    """
+    db = get_background_session()
+    project = None
+
+    try:
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError(f"Project {project_id} not found")
+
+        if project.progress_started_at is None:
+            project.progress_started_at = datetime.utcnow()
+            db.commit()
+
+        bg_logger.info("Running pipeline stage", project_id=project_id, stage=stage, language=language)
+        with span(stage, project_id=project_id):
+            return PIPELINE_STAGES[stage](db, project, language, checkpoint or {})
 
     except Exception as e:
         import traceback
@@ -406,43 +855,77 @@ def process_video(project_id: int, language: str = None):
         bg_logger.error(
             "Error processing project",
             project_id=project_id,
+            stage=stage,
             error=str(e),
             traceback=error_trace
         )
-        print(f"Error processing project {project_id}: {e}")
+        print(f"Error processing project {project_id} ({stage}): {e}")
         print(f"   Traceback: {error_trace}")
         db.rollback()  # Rollback any pending changes
 
-        # Create user-friendly error message
-        error_str = str(e)
-        if "ConnectionError" in error_str or "ConnectError" in error_str:
-            user_message = "Erro de conexão. Verifique se o Ollama está rodando ou se a API Groq está acessível."
-        elif "ffmpeg" in error_str.lower() or "ffprobe" in error_str.lower():
-            user_message = "Erro no processamento de vídeo. Verifique se o FFmpeg está instalado."
-        elif "whisper" in error_str.lower():
-            user_message = "Erro na transcrição de áudio. Verifique a instalação do Whisper."
-        elif "Private video" in error_str or "video unavailable" in error_str.lower():
-            user_message = "Vídeo indisponível ou privado no YouTube."
-        elif "copyright" in error_str.lower():
-            user_message = "Vídeo bloqueado por direitos autorais."
-        else:
-            user_message = f"Erro no processamento: {error_str[:200]}"
-
         # Update project status to error
+        error_str = str(e)
         try:
             if project:
                 project.status = ProjectStatus.ERROR.value
                 project.error_message = error_str[:500]  # Limit error message length
-                project.progress_message = user_message
+                project.progress_message = _friendly_error_message(error_str)
                 db.commit()
         except Exception as commit_error:
             bg_logger.error("Failed to update error status", project_id=project_id, error=str(commit_error))
             print(f"Failed to update error status: {commit_error}")
             db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+def process_video(project_id: int, language: str = None):
+    """
+    Process a video in the current process, running every stage in order:
+    1. Download video (0-15%)
+    2. Transcribe audio (15-40%)
+    3. Analyze with AI (40-60%)
+    4. Cut clips + subtitles (60-100%)
+    (or all of them at once with PIPELINE_ENABLED, see _stage_pipeline)
+
+    The API enqueues projects in the job queue instead (see enqueue_processing);
+    this is kept for scripts and single-process setups.
+
+    Args:
+        project_id: Project ID to process
+        language: Language code for transcription (pt, en, es, auto). Default from config.
+    """
+    db = get_background_session()
+    try:
+        with db_lock:
+            project = db.query(Project).filter(Project.id == project_id).first()
+            if not project:
+                bg_logger.warning("Project not found", project_id=project_id)
+                print(f"Project {project_id} not found")
+                return
+
+            if not project.acquire_processing_lock():
+                bg_logger.warning("Project already being processed", project_id=project_id)
+                print(f"Project {project_id} is already being processed")
+                db.rollback()
+                return
+
+            project.progress_started_at = datetime.utcnow()
+            db.commit()
+
+        checkpoint = {}
+        stages = [JobStage.PIPELINE] if PIPELINE_ENABLED else STAGE_ORDER
+        try:
+            for stage in stages:
+                checkpoint.update(run_pipeline_stage(project_id, stage.value, language, checkpoint))
+        except Exception:
+            pass  # Already logged and saved as project error by run_pipeline_stage
 
     finally:
-        # Always release processing lock and close session
         try:
+            project = db.query(Project).filter(Project.id == project_id).first()
             if project:
                 project.release_processing_lock()
                 db.commit()
@@ -452,6 +935,17 @@ def process_video(project_id: int, language: str = None):
             db.close()
 
 
+def enqueue_processing(project_id: int, language: str = None):
+    """Queue a project in the persistent job queue (processed by worker processes)"""
+    job = job_queue.enqueue(project_id, language)
+    if job is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Project is already queued or being processed."
+        )
+    return job
+
+
 # ============ Project Endpoints ============
 
 @router.post("/projects", response_model=ProjectResponse)
@@ -459,7 +953,6 @@ def process_video(project_id: int, language: str = None):
 async def create_project(
     request: Request,
     project_data: ProjectCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Create a new project from YouTube URL"""
@@ -517,8 +1010,8 @@ async def create_project(
             detail=f"Unsupported language: {language}. Supported: {', '.join(SUPPORTED_LANGUAGES.keys())}"
         )
 
-    # Start background processing with language
-    background_tasks.add_task(process_video, project.id, language)
+    # Queue processing with language (runs in worker processes)
+    enqueue_processing(project.id, language)
 
     logger.info("Project created successfully", project_id=project.id, youtube_id=video_id, language=language)
 
@@ -541,7 +1034,6 @@ async def create_project(
 @limiter.limit("3/minute")
 async def upload_video(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     language: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -604,7 +1096,7 @@ async def upload_video(
     # Get video duration using ffprobe
     duration = None
     try:
-        result = subprocess.run(
+        result = instrumented_run(
             ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
              '-of', 'default=noprint_wrappers=1:nokey=1', str(output_path)],
             capture_output=True, text=True
@@ -635,8 +1127,8 @@ async def upload_video(
             detail=f"Unsupported language: {language}. Supported: {', '.join(SUPPORTED_LANGUAGES.keys())}"
         )
 
-    # Start background processing (will skip download since video_path exists)
-    background_tasks.add_task(process_video, project.id, language)
+    # Queue processing (will skip download since video_path exists)
+    enqueue_processing(project.id, language)
 
     logger.info("Video uploaded successfully", project_id=project.id, file_id=file_id, size_mb=total_size/(1024*1024))
 
@@ -739,8 +1231,11 @@ async def delete_project(project_id: int, db: Session = Depends(get_db)):
     # Video and audio files
     if project.video_path:
         files_to_delete.append(project.video_path)
+        face_track_store.delete(project.video_path)
     if project.audio_path:
         files_to_delete.append(project.audio_path)
+    if project.transcription_path:
+        files_to_delete.append(project.transcription_path)
 
     # Clip files
     for clip in project.clips:
@@ -811,6 +1306,7 @@ async def get_project_status(request: Request, project_id: int, db: Session = De
         progress=project.progress or 0,
         current_step=project.status,
         step_progress=project.progress_step,
+        stages=project.stage_progress,
         eta_seconds=eta_seconds,
         message=message
     )
@@ -819,7 +1315,6 @@ async def get_project_status(request: Request, project_id: int, db: Session = De
 @router.post("/projects/{project_id}/reprocess", response_model=ProjectResponse)
 async def reprocess_project(
     project_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -844,8 +1339,9 @@ async def reprocess_project(
             detail=f"Cannot reprocess project with status '{project.status}'. Only 'error' or 'completed' projects can be reprocessed."
         )
 
-    # Delete existing clips if reprocessing completed project
-    if project.status == ProjectStatus.COMPLETED.value:
+    # Delete existing clips (completed project, or partial clips of a failed run -
+    # otherwise the cut stage would treat them as already generated)
+    if project.clips:
         for clip in project.clips:
             # Delete clip files
             for path in [clip.video_path, clip.video_path_with_subtitles, clip.subtitle_path]:
@@ -861,6 +1357,7 @@ async def reprocess_project(
     # Reset project status
     project.status = ProjectStatus.PENDING.value
     project.error_message = None
+    project.stage_progress = None
     project.updated_at = datetime.utcnow()
 
     # If video was already downloaded, start from transcription
@@ -870,8 +1367,8 @@ async def reprocess_project(
     db.commit()
     db.refresh(project)
 
-    # Start background processing
-    background_tasks.add_task(process_video, project.id)
+    # Queue processing
+    enqueue_processing(project.id)
 
     return ProjectResponse(
         id=project.id,
@@ -1030,6 +1527,39 @@ async def list_supported_languages(request: Request):
     }
 
 
+# ============ Cache Endpoints ============
+
+@router.get("/cache/transcriptions")
+@limiter.limit("60/minute")
+async def get_transcription_cache_stats(request: Request):
+    """Transcription cache hit/miss metrics and disk usage"""
+    cache = transcriber.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/cache/models")
+@limiter.limit("60/minute")
+async def get_model_pool_stats(request: Request):
+    """Resident transcription models (model server when running, else this process)"""
+    if model_server_client.enabled:
+        try:
+            return {"model_server": True, **model_server_client.stats()}
+        except ModelServerUnavailable as e:
+            return {"model_server": True, "available": False, "error": str(e)}
+    return {"model_server": False, **model_pool.stats()}
+
+
+@router.get("/cache/llm")
+@limiter.limit("60/minute")
+async def get_llm_cache_stats(request: Request):
+    """LLM response cache hit/miss metrics"""
+    if not LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **LLMResponseCache().stats()}
+
+
 @router.post("/clips/{clip_id}/export")
 async def export_clip_format(
     clip_id: int,
@@ -2,7 +2,7 @@
 ClipGenius - Pydantic Schemas
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field, HttpUrl
 
 
@@ -75,6 +75,9 @@ class ProcessingStatus(BaseModel):
     progress: int = 0  # 0-100%
     current_step: str = ""
     step_progress: Optional[str] = None  # e.g., "8/15"
+    # Per-stage counters of the pipelined processing (stages overlap), e.g.
+    # {"render": {"state": "running", "done": 3, "total": null, "unit": "clips"}}
+    stages: Optional[Dict[str, Dict[str, Any]]] = None
     eta_seconds: Optional[int] = None  # Estimated time remaining
     message: str = ""
 
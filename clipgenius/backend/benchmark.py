@@ -0,0 +1,622 @@
+"""
+ClipGenius - Pipeline Benchmark
+Times every stage of process_video on synthetic videos and writes the results
+as JSON, so runs on different commits can be compared.
+
+Fixtures are generated once with FFmpeg and reused:
+- testsrc: FFmpeg test pattern with a sine tone
+- face: rendered talking-face placeholder (a head drifting across the frame,
+  mouth moving with syllable-like audio bursts)
+
+The transcription and LLM providers are stubbed (Groq request answered from
+the chunk duration, local Ollama stand-in returning evenly spaced clips), so
+the timings measure ClipGenius itself: the chunking, VAD, post-processing,
+parsing and FFmpeg work around the provider calls. Stages run one after the
+other in this process (no worker or render pool), each on the previous
+stage's output:
+
+    extract -> transcribe -> analyze -> reframe, cut -> subtitle
+
+Usage:
+    python benchmark.py                                 # testsrc + face, 120 s each
+    python benchmark.py --durations 60 600 --repeat 3   # median of 3 runs
+    python benchmark.py --compare ../data/benchmarks/abc1234.json
+
+Results go to data/benchmarks/<commit>.json unless --output is given. With
+--compare, stages more than --threshold times slower than the baseline are
+listed and the exit code is 1.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Version of the results format (bump when the layout changes)
+RESULTS_VERSION = 1
+
+STAGES = ("extract", "transcribe", "analyze", "reframe", "cut", "subtitle")
+
+FIXTURE_KINDS = ("testsrc", "face")
+FIXTURE_SIZE = (1280, 720)
+FIXTURE_FPS = 25
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "data" / "benchmarks"
+DEFAULT_FIXTURES_DIR = Path(tempfile.gettempdir()) / "clipgenius-benchmark-fixtures"
+
+# Synthetic speech of the transcription stub: one word every WORD_SECONDS
+WORD_SECONDS = 0.4
+SENTENCE_WORDS = 12
+VOCABULARY = (
+    "hoje", "vamos", "falar", "sobre", "como", "criar", "conteúdo", "que",
+    "prende", "atenção", "do", "público", "desde", "primeiro", "segundo",
+    "isso", "muda", "tudo", "quando", "você", "entende", "o", "motivo", "real"
+)
+
+# Clips returned by the LLM stub
+STUB_CLIP_SECONDS = 30
+STUB_CLIP_STEP = 40
+
+
+# ============ Fixtures ============
+
+def _run_ffmpeg(cmd: List[str], stdin=None) -> subprocess.Popen:
+    return subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def _wait_ffmpeg(process: subprocess.Popen, path: Path):
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        path.unlink(missing_ok=True)
+        raise RuntimeError(f"FFmpeg failed generating {path.name}: {stderr.decode(errors='replace')[-500:]}")
+
+
+def _encode_args(path: Path) -> List[str]:
+    return [
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '128k', '-shortest', '-movflags', '+faststart',
+        str(path)
+    ]
+
+
+def generate_testsrc(path: Path, duration: float):
+    """FFmpeg test pattern with a sine tone"""
+    width, height = FIXTURE_SIZE
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f"testsrc=size={width}x{height}:rate={FIXTURE_FPS}:duration={duration}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:sample_rate=44100:duration={duration}",
+    ] + _encode_args(path)
+    _wait_ffmpeg(_run_ffmpeg(cmd), path)
+
+
+def _syllable_envelope(t: float) -> float:
+    """Amplitude of the talking-face audio: ~4 syllables/s, a pause every 6 s"""
+    if t % 6.0 > 5.2:
+        return 0.0
+    return abs(math.sin(2 * math.pi * 2.0 * t))
+
+
+def render_face_frame(t: float, width: int, height: int):
+    """Frame of the talking-face placeholder at time t (RGB uint8)"""
+    import cv2
+    import numpy as np
+
+    frame = np.full((height, width, 3), (70, 90, 110), dtype=np.uint8)
+    # Head drifts across the middle third of the frame (the reframer has to follow it)
+    cx = int(width / 2 + width / 6 * math.sin(2 * math.pi * t / 20))
+    cy = int(height * 0.45)
+    rx, ry = int(height * 0.16), int(height * 0.22)
+    cv2.rectangle(frame, (cx - rx - 20, cy + ry - 10), (cx + rx + 20, height), (40, 60, 120), -1)
+    cv2.ellipse(frame, (cx, cy), (rx, ry), 0, 0, 360, (224, 180, 150), -1)
+    eye_y = cy - ry // 4
+    for dx in (-int(rx / 2.5), int(rx / 2.5)):
+        cv2.ellipse(frame, (cx + dx, eye_y), (rx // 7, ry // 12), 0, 0, 360, (40, 30, 30), -1)
+    mouth_open = max(2, int(ry * 0.12 * _syllable_envelope(t)))
+    cv2.ellipse(frame, (cx, cy + ry // 2), (rx // 3, mouth_open), 0, 0, 360, (120, 40, 50), -1)
+    return frame
+
+
+def generate_face(path: Path, duration: float):
+    """Talking-face placeholder: frames rendered here, piped to FFmpeg"""
+    width, height = FIXTURE_SIZE
+    speech = "0.6*sin(2*PI*180*t)*abs(sin(2*PI*2*t))*lt(mod(t,6),5.2)"
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', str(FIXTURE_FPS), '-i', 'pipe:0',
+        '-f', 'lavfi', '-i', f"aevalsrc={speech}:s=44100:d={duration}",
+    ] + _encode_args(path)
+    process = _run_ffmpeg(cmd, stdin=subprocess.PIPE)
+    try:
+        for i in range(int(duration * FIXTURE_FPS)):
+            process.stdin.write(render_face_frame(i / FIXTURE_FPS, width, height).tobytes())
+    except BrokenPipeError:
+        pass  # FFmpeg exited: its error is reported below
+    finally:
+        process.stdin.close()
+    _wait_ffmpeg(process, path)
+
+
+FIXTURE_GENERATORS: Dict[str, Callable[[Path, float], None]] = {
+    "testsrc": generate_testsrc,
+    "face": generate_face,
+}
+
+
+def ensure_fixture(fixtures_dir: Path, kind: str, duration: float) -> Path:
+    """Path of a fixture video, generated on first use"""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    path = fixtures_dir / f"{kind}_{int(duration)}s_{FIXTURE_SIZE[0]}x{FIXTURE_SIZE[1]}.mp4"
+    if not path.exists():
+        print(f"Generating fixture {path.name}...")
+        tmp_path = path.with_name(f"{path.stem}.tmp.mp4")
+        FIXTURE_GENERATORS[kind](tmp_path, duration)
+        os.replace(tmp_path, path)
+    return path
+
+
+# ============ Provider stubs ============
+
+def synthetic_words(duration: float) -> List[Dict[str, Any]]:
+    """Words of the transcription stub: one every WORD_SECONDS, sentences of SENTENCE_WORDS"""
+    words = []
+    for i in range(int(duration / WORD_SECONDS)):
+        text = VOCABULARY[i % len(VOCABULARY)]
+        if i % SENTENCE_WORDS == SENTENCE_WORDS - 1:
+            text += "."
+        start = i * WORD_SECONDS
+        words.append({'word': text, 'start': round(start, 3), 'end': round(start + WORD_SECONDS * 0.8, 3)})
+    return words
+
+
+class StubTranscriptionProvider:
+    """
+    Stands in for the Groq request of TranscriberV2 (_groq_request_raw):
+    answers with synthetic words for the chunk's duration after
+    latency + duration * real_time_factor seconds.
+    """
+
+    def __init__(self, latency: float = 0.0, real_time_factor: float = 0.0):
+        self.latency = latency
+        self.real_time_factor = real_time_factor
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, audio_path: str, language: str = None) -> Dict[str, Any]:
+        from services.remote_transcription import probe_duration
+
+        duration = probe_duration(audio_path) or 0.0
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency + duration * self.real_time_factor)
+        words = synthetic_words(duration)
+        return {
+            'text': ' '.join(word['word'] for word in words),
+            'language': language or 'pt',
+            'duration': duration,
+            'words': words,
+            'segments': []
+        }
+
+
+def stub_clips(prompt: str) -> Dict[str, Any]:
+    """
+    Clips answered by the LLM stub: STUB_CLIP_SECONDS long, every
+    STUB_CLIP_STEP seconds of the transcript window in the prompt.
+    """
+    times = [int(m) * 60 + int(s) for m, s in re.findall(r'^\[(\d+):(\d{2})\]', prompt, re.MULTILINE)]
+    count = re.search(r'EXATAMENTE (\d+)', prompt)
+    count = int(count.group(1)) if count else 15
+    clips = []
+    if times:
+        start = min(times)
+        while start + STUB_CLIP_SECONDS <= max(times) and len(clips) < count:
+            end = start + STUB_CLIP_SECONDS
+            clips.append({
+                'timestamp_inicio': f"{start // 60:02d}:{start % 60:02d}",
+                'timestamp_fim': f"{end // 60:02d}:{end % 60:02d}",
+                'titulo': f"Benchmark {start}s",
+                'nota_viral': 9 - len(clips) % 5,
+                'justificativa': "stub",
+                'categoria': 'insight',
+                'conteudo_completo': True
+            })
+            start += STUB_CLIP_STEP
+    return {'clips': clips}
+
+
+class StubLLMServer:
+    """Local Ollama stand-in (/api/tags, /api/generate with and without streaming)"""
+
+    def __init__(self, model: str, latency: float = 0.0):
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send_json({'models': [{'name': f"{model}:latest"}]})
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                stub.requests += 1
+                time.sleep(latency)
+                text = json.dumps(stub_clips(request.get('prompt', '')), ensure_ascii=False)
+                if not request.get('stream'):
+                    self._send_json({'response': text, 'done': True})
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.end_headers()
+                for i in range(0, len(text), 64):
+                    self.wfile.write((json.dumps({'response': text[i:i + 64], 'done': False}) + "\n").encode())
+                self.wfile.write((json.dumps({'response': '', 'done': True}) + "\n").encode())
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ============ Stages ============
+
+def _measure(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """Run fn; wall and CPU seconds (this process + finished subprocesses such as FFmpeg)"""
+    before = os.times()
+    started = time.perf_counter()
+    try:
+        value, error = fn(), None
+    except Exception as e:
+        value, error = None, f"{type(e).__name__}: {e}"
+    after = os.times()
+    cpu = sum(after[:4]) - sum(before[:4])
+    return {
+        'value': value,
+        'error': error,
+        'seconds': round(time.perf_counter() - started, 4),
+        'cpu_seconds': round(cpu, 4)
+    }
+
+
+class PipelineBenchmark:
+    """The services of process_video's stages, with the providers stubbed"""
+
+    def __init__(self, llm_base_url: str, transcription: StubTranscriptionProvider, num_clips: int, language: str = "pt"):
+        from services.analyzer import ClipAnalyzer
+        from services.cutter import VideoCutter
+        from services.reframer import AIReframer
+        from services.subtitler_v2 import SubtitleGeneratorV2
+        from services.transcriber_v2 import TranscriberV2
+
+        self.transcriber = TranscriberV2(backend="groq", use_cache=False, streaming=False, model_server=False)
+        self.transcriber._groq_request_raw = transcription
+        self.analyzer = ClipAnalyzer(provider="ollama", base_url=llm_base_url, use_cache=False)
+        self.cutter = VideoCutter()
+        self.reframer = AIReframer()
+        self.subtitler = SubtitleGeneratorV2()
+        self.num_clips = num_clips
+        self.language = language
+
+    @property
+    def face_detection(self) -> bool:
+        """False when MediaPipe is missing: the reframe stage is then a center crop"""
+        return self.reframer.face_detector is not None
+
+    def extract(self, video_path: str, name: str) -> str:
+        return self.transcriber.extract_audio(video_path, str(self.transcriber.audio_dir / f"{name}.wav"))
+
+    def transcribe(self, audio_path: str, name: str) -> Dict[str, Any]:
+        from services.transcript_store import transcript_store
+
+        transcription = self.transcriber.transcribe(audio_path, language=self.language)
+        transcript_store.save(transcription, f"benchmark_{name}")
+        return transcription
+
+    def analyze(self, transcription: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.analyzer.analyze(transcription, num_clips=self.num_clips)
+
+    def reframe(self, video_path: str, suggestions: List[Dict[str, Any]], name: str) -> List[Dict[str, Any]]:
+        from config import REFRAME_DYNAMIC_MODE, REFRAME_SAMPLE_INTERVAL
+
+        cut = self.reframer.cut_clip_with_dynamic_tracking if REFRAME_DYNAMIC_MODE else self.reframer.cut_clip_with_tracking
+        return [
+            cut(
+                video_path=video_path,
+                start_time=suggestion['start_time'],
+                end_time=suggestion['end_time'],
+                output_name=f"{name}_reframe_{i + 1:02d}",
+                sample_interval=REFRAME_SAMPLE_INTERVAL
+            )
+            for i, suggestion in enumerate(suggestions)
+        ]
+
+    def cut(self, video_path: str, suggestions: List[Dict[str, Any]], name: str) -> List[Dict[str, Any]]:
+        return [
+            self.cutter.cut_clip(
+                video_path=video_path,
+                start_time=suggestion['start_time'],
+                end_time=suggestion['end_time'],
+                output_name=f"{name}_clip_{i + 1:02d}",
+                convert_to_vertical=True
+            )
+            for i, suggestion in enumerate(suggestions)
+        ]
+
+    def subtitle(
+        self,
+        transcription: Dict[str, Any],
+        suggestions: List[Dict[str, Any]],
+        clips: List[Dict[str, Any]],
+        name: str,
+        burn: bool
+    ) -> List[Dict[str, Any]]:
+        results = []
+        for i, (suggestion, clip) in enumerate(zip(suggestions, clips)):
+            segment = self.transcriber.get_text_for_timerange(
+                transcription, suggestion['start_time'], suggestion['end_time']
+            )
+            results.append(self.subtitler.create_subtitled_clip(
+                video_path=clip['video_path'],
+                words=segment.get('words', []),
+                clip_start_time=suggestion['start_time'],
+                output_name=f"{name}_clip_{i + 1:02d}",
+                burn_subtitles=burn
+            ))
+        return results
+
+    def run(self, video_path: str, name: str, burn_subtitles: bool = False) -> Dict[str, Dict[str, Any]]:
+        """One pass over every stage; a failed stage skips the stages that need its output"""
+        timings: Dict[str, Dict[str, Any]] = {}
+        outputs: Dict[str, Any] = {}
+
+        steps = {
+            'extract': (lambda: self.extract(video_path, name), ()),
+            'transcribe': (lambda: self.transcribe(outputs['extract'], name), ('extract',)),
+            'analyze': (lambda: self.analyze(outputs['transcribe']), ('transcribe',)),
+            'reframe': (lambda: self.reframe(video_path, outputs['analyze'], name), ('analyze',)),
+            'cut': (lambda: self.cut(video_path, outputs['analyze'], name), ('analyze',)),
+            'subtitle': (
+                lambda: self.subtitle(outputs['transcribe'], outputs['analyze'], outputs['cut'], name, burn_subtitles),
+                ('cut',)
+            ),
+        }
+        for stage in STAGES:
+            fn, needs = steps[stage]
+            missing = [need for need in needs if need not in outputs]
+            if missing:
+                timings[stage] = {'error': f"skipped: {', '.join(missing)} failed", 'seconds': None, 'cpu_seconds': None}
+                continue
+            measured = _measure(fn)
+            value = measured.pop('value')
+            if measured['error'] is None:
+                outputs[stage] = value
+                if isinstance(value, list):
+                    measured['items'] = len(value)
+            timings[stage] = measured
+        return timings
+
+
+# ============ Results ============
+
+def summarize_runs(runs: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Per-stage median of several runs (stages that failed in any run keep the error)"""
+    summary = {}
+    for stage in STAGES:
+        stage_runs = [run[stage] for run in runs if stage in run]
+        errors = [r['error'] for r in stage_runs if r.get('error')]
+        if errors or not stage_runs:
+            summary[stage] = {'error': errors[0] if errors else "not run", 'seconds': None, 'runs': []}
+            continue
+        summary[stage] = {
+            'seconds': round(statistics.median(r['seconds'] for r in stage_runs), 4),
+            'cpu_seconds': round(statistics.median(r['cpu_seconds'] for r in stage_runs), 4),
+            'runs': [r['seconds'] for r in stage_runs],
+        }
+        if 'items' in stage_runs[0]:
+            summary[stage]['items'] = stage_runs[0]['items']
+    timed = [summary[stage]['seconds'] for stage in STAGES if summary[stage]['seconds'] is not None]
+    summary['total'] = {'seconds': round(sum(timed), 4)}
+    return summary
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 1.2,
+    min_seconds: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Stage timings of two results files side by side.
+
+    A stage is a regression when it is more than `threshold` times slower and
+    at least `min_seconds` slower (noise on very short stages is ignored).
+    """
+    rows = []
+    for fixture, stages in current.get('stages', {}).items():
+        before_stages = baseline.get('stages', {}).get(fixture)
+        if before_stages is None:
+            continue
+        for stage, timing in stages.items():
+            before = (before_stages.get(stage) or {}).get('seconds')
+            after = timing.get('seconds')
+            if before is None or after is None:
+                continue
+            ratio = after / before if before > 0 else float('inf') if after > 0 else 1.0
+            rows.append({
+                'fixture': fixture,
+                'stage': stage,
+                'before': before,
+                'after': after,
+                'ratio': round(ratio, 3),
+                'regression': ratio > threshold and after - before >= min_seconds
+            })
+    return rows
+
+
+def _git_commit() -> Optional[Dict[str, Any]]:
+    try:
+        sha = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {'sha': sha, 'dirty': dirty}
+
+
+def print_summary(results: Dict[str, Any]):
+    print(f"\n{'fixture':<22}" + "".join(f"{stage:>12}" for stage in STAGES + ('total',)))
+    for fixture, stages in results['stages'].items():
+        cells = []
+        for stage in STAGES + ('total',):
+            seconds = stages[stage].get('seconds')
+            cells.append(f"{seconds:>11.2f}s" if seconds is not None else f"{'error':>12}")
+        print(f"{fixture:<22}" + "".join(cells))
+    for fixture, stages in results['stages'].items():
+        for stage in STAGES:
+            if stages[stage].get('error'):
+                print(f"  {fixture} {stage}: {stages[stage]['error']}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> bool:
+    """Print the comparison; True if any stage regressed"""
+    print(f"\n{'fixture':<22}{'stage':<12}{'before':>10}{'after':>10}{'ratio':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['fixture']:<22}{row['stage']:<12}{row['before']:>9.2f}s{row['after']:>9.2f}s{row['ratio']:>8.2f}{flag}")
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) more than {threshold}x slower than the baseline")
+    return bool(regressions)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the processing stages on synthetic videos")
+    parser.add_argument("--kinds", nargs="+", choices=FIXTURE_KINDS, default=list(FIXTURE_KINDS), help="Fixture videos")
+    parser.add_argument("--durations", nargs="+", type=float, default=[120], help="Fixture durations in seconds (default: 120)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per fixture; the median is reported (default: 1)")
+    parser.add_argument("--clips", type=int, default=3, help="Clips requested from the LLM stub (default: 3)")
+    parser.add_argument("--burn-subtitles", action="store_true", help="Burn subtitles into the clips (off in the pipeline)")
+    parser.add_argument("--transcription-latency", type=float, default=0.0, help="Seconds per transcription request of the stub")
+    parser.add_argument("--transcription-rtf", type=float, default=0.0, help="Stub seconds per second of audio")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per LLM request of the stub")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR, help="Generated videos (reused between runs)")
+    parser.add_argument("--work-dir", type=Path, help="DATA_DIR of the run (default: a temporary directory)")
+    parser.add_argument("--output", type=Path, help="Results file (default: data/benchmarks/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Baseline results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression (default: 1.2)")
+    args = parser.parse_args()
+
+    # Outputs of the run stay out of the real data directory; set before config is imported
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="clipgenius-benchmark-"))
+    os.environ["DATA_DIR"] = str(work_dir)
+    os.environ["CLIPGENIUS_PRINT_CONFIG"] = "false"
+    # The Groq backend is selected but its requests are answered by the stub
+    os.environ.setdefault("GROQ_API_KEY", "benchmark-stub")
+
+    from config import OLLAMA_MODEL, FFMPEG_THREADS, REFRAME_DYNAMIC_MODE
+    from logging_config import configure_logging
+
+    configure_logging()
+
+    fixtures = {}
+    for kind in args.kinds:
+        for duration in args.durations:
+            fixtures[f"{kind}_{int(duration)}s"] = {
+                'kind': kind,
+                'duration': duration,
+                'path': str(ensure_fixture(args.fixtures_dir, kind, duration))
+            }
+
+    transcription = StubTranscriptionProvider(args.transcription_latency, args.transcription_rtf)
+    with StubLLMServer(OLLAMA_MODEL, args.llm_latency) as llm:
+        benchmark = PipelineBenchmark(llm.base_url, transcription, args.clips)
+        stages = {}
+        for name, fixture in fixtures.items():
+            runs = []
+            for i in range(args.repeat):
+                print(f"\n=== {name} (run {i + 1}/{args.repeat}) ===")
+                runs.append(benchmark.run(fixture['path'], name, burn_subtitles=args.burn_subtitles))
+            stages[name] = summarize_runs(runs)
+
+    commit = _git_commit()
+    results = {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'created_at': datetime.utcnow().isoformat() + "Z",
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'settings': {
+            'repeat': args.repeat,
+            'clips': args.clips,
+            'burn_subtitles': args.burn_subtitles,
+            'transcription_latency': args.transcription_latency,
+            'transcription_rtf': args.transcription_rtf,
+            'llm_latency': args.llm_latency,
+            'ffmpeg_threads': FFMPEG_THREADS,
+            'reframe_dynamic': REFRAME_DYNAMIC_MODE,
+            'face_detection': benchmark.face_detection,
+            'fixture_size': list(FIXTURE_SIZE),
+        },
+        'fixtures': fixtures,
+        'stages': stages,
+    }
+
+    output = args.output
+    if output is None:
+        label = f"{commit['sha']}{'-dirty' if commit['dirty'] else ''}" if commit else datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = DEFAULT_OUTPUT_DIR / f"{label}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print_summary(results)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get('settings', {}).get('face_detection') != results['settings']['face_detection']:
+            print("Warning: face detection availability differs from the baseline (reframe timings not comparable)")
+        if print_comparison(compare_results(baseline, results, args.threshold), args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+ClipGenius - Transcription Calibration
+Benchmarks the local transcription backends on a reference clip and saves the
+fastest accurate settings as the transcription profile (TRANSCRIPTION_PROFILE_PATH).
+
+Every available local backend (whisperx, stable-ts, faster-whisper) is run with
+each compute type, thread count and beam size. Results are compared with the
+most precise combination (float32, largest beam) or with --reference, and the
+fastest one within CALIBRATION_MIN_WORD_MATCH / CALIBRATION_MAX_WORD_DRIFT wins.
+
+Usage:
+    python calibrate.py clip.mp4                              # default grid, WHISPER_MODEL
+    python calibrate.py clip.mp4 --threads 4 8 --beam-sizes 1 5
+    python calibrate.py clip.mp4 --reference transcript.json  # known-good transcription
+    python calibrate.py clip.mp4 --dry-run                    # only print the results
+
+Restart the workers afterwards: transcribers read the profile when created.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config import WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_BEAM_SIZE, WHISPER_BEST_OF
+from logging_config import configure_logging
+
+
+def load_reference_audio(path: str, max_seconds: float) -> np.ndarray:
+    """First max_seconds of the clip's audio as 16 kHz float32 samples"""
+    from services.audio_stream import PCMAudioStream, SAMPLE_RATE
+
+    parts = []
+    total = 0
+    for chunk in PCMAudioStream(path, chunk_seconds=min(max_seconds, 120)):
+        parts.append(chunk.samples)
+        total += len(chunk.samples)
+        if total >= max_seconds * SAMPLE_RATE:
+            break
+    if not parts:
+        raise ValueError(f"No audio in {path}")
+    return np.concatenate(parts)[:int(max_seconds * SAMPLE_RATE)]
+
+
+def load_reference_words(path: str, max_seconds: float) -> List[Dict[str, Any]]:
+    """Words of a transcription JSON (transcribe_video output) within the calibrated span"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    words = data.get("words") or [word for segment in data.get("segments", []) for word in segment.get("words", [])]
+    return [word for word in words if word["start"] < max_seconds]
+
+
+def print_result(result: Dict[str, Any]):
+    if result["error"] is not None:
+        status = f"failed: {result['error']}"
+    else:
+        status = (
+            f"RTF {result['real_time_factor']:.3f}  "
+            f"match {result['word_match']:.1%}  drift {result['word_drift'] * 1000:.0f} ms"
+        )
+    print(
+        f"  {result['backend']:<15} {result['compute_type']:<13} "
+        f"threads={result['cpu_threads']:<3} beam={result['beam_size']:<2} {status}"
+    )
+
+
+def main() -> int:
+    from services.transcriber_v2 import STREAMING_BACKENDS, TranscriberV2
+    from services.transcription_profile import (
+        TranscriptionProfile,
+        calibration_candidates,
+        choose_profile,
+        run_calibration
+    )
+
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Calibrate local transcription settings")
+    parser.add_argument("clip", help="Reference video or audio file")
+    parser.add_argument("--duration", type=float, default=120, help="Seconds of the clip to transcribe (default: 120)")
+    parser.add_argument("--model", default=WHISPER_MODEL, help=f"Model size (default: {WHISPER_MODEL})")
+    parser.add_argument("--language", default=WHISPER_LANGUAGE, help=f"Language (default: {WHISPER_LANGUAGE})")
+    parser.add_argument("--device", default="auto", help="cpu, cuda or auto")
+    parser.add_argument("--backends", nargs="+", choices=STREAMING_BACKENDS, help="Backends (default: all available)")
+    parser.add_argument("--compute-types", nargs="+", help="Compute types (default: per backend and device)")
+    parser.add_argument(
+        "--threads", nargs="+", type=int,
+        default=sorted({cpu_count, max(1, cpu_count // 2)}, reverse=True),
+        help="CPU thread counts (default: all cores and half of them)"
+    )
+    parser.add_argument(
+        "--beam-sizes", nargs="+", type=int,
+        default=sorted({1, 5, WHISPER_BEAM_SIZE}),
+        help="Beam sizes (default: 1 and 5)"
+    )
+    parser.add_argument("--reference", help="Known-good transcription JSON to compare with")
+    parser.add_argument("--dry-run", action="store_true", help="Print the results without saving the profile")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    backends = [b for b in (args.backends or STREAMING_BACKENDS) if TranscriberV2._check_backend_available(b)]
+    if not backends:
+        print("No local transcription backend installed (whisperx, stable-ts or faster-whisper)")
+        return 1
+
+    language = None if args.language == "auto" else args.language
+    samples = load_reference_audio(args.clip, args.duration)
+    reference_words = load_reference_words(args.reference, args.duration) if args.reference else None
+
+    transcribers: Dict[tuple, TranscriberV2] = {}
+
+    def make_transcriber(candidate) -> TranscriberV2:
+        backend, compute_type, cpu_threads, beam_size, best_of = candidate
+        if candidate not in transcribers:
+            # Only the candidate being measured stays loaded
+            for previous in transcribers.values():
+                previous.unload_model()
+            transcribers.clear()
+            transcribers[candidate] = TranscriberV2(
+                backend=backend,
+                model_size=args.model,
+                device=args.device,
+                compute_type=compute_type,
+                use_cache=False,
+                streaming=False,
+                model_server=False,
+                cpu_threads=cpu_threads,
+                beam_size=beam_size,
+                best_of=best_of
+            )
+        return transcribers[candidate]
+
+    def transcribe(candidate, audio):
+        return make_transcriber(candidate)._transcribe_in_process(audio, language)
+
+    device = make_transcriber((backends[0], "float32", 0, 1, WHISPER_BEST_OF))._get_device()
+    candidates = calibration_candidates(
+        backends, device, args.threads, args.beam_sizes, WHISPER_BEST_OF, args.compute_types
+    )
+    print(f"\nCalibrating {len(candidates)} combination(s) of model '{args.model}' on {device}, "
+          f"{len(samples) / 16000:.0f}s of {args.clip}")
+    print(f"Reference: {args.reference or 'first (most precise) combination'}\n")
+
+    results = run_calibration(samples, candidates, transcribe, reference_words, on_result=print_result)
+    for transcriber in transcribers.values():
+        transcriber.unload_model()
+
+    best = choose_profile(results)
+    if best is None:
+        print("\nNo combination within the accuracy thresholds "
+              "(CALIBRATION_MIN_WORD_MATCH / CALIBRATION_MAX_WORD_DRIFT); profile not changed")
+        return 1
+
+    print("\nFastest accurate combination:")
+    print_result(best)
+    profile = TranscriptionProfile(
+        backend=best["backend"],
+        model_size=args.model,
+        device=device,
+        compute_type=best["compute_type"],
+        cpu_threads=best["cpu_threads"],
+        beam_size=best["beam_size"],
+        best_of=best["best_of"],
+        real_time_factor=best["real_time_factor"],
+        word_match=best["word_match"],
+        word_drift=best["word_drift"],
+        reference=args.reference or "most precise combination",
+        results=results
+    )
+    if args.dry_run:
+        print("\nDry run: profile not saved")
+        return 0
+
+    path = profile.save()
+    print(f"\nProfile saved to {path} - restart the workers to use it")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,9 +43,11 @@ DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data")).resolve()
 VIDEOS_DIR = (DATA_DIR / "videos").resolve()
 CLIPS_DIR = (DATA_DIR / "clips").resolve()
 AUDIO_DIR = (DATA_DIR / "audio").resolve()
+CACHE_DIR = (DATA_DIR / "cache").resolve()
+TRANSCRIPTS_DIR = (DATA_DIR / "transcripts").resolve()  # Binary transcription sidecars
 
 # Create directories if they don't exist
-for dir_path in [VIDEOS_DIR, CLIPS_DIR, AUDIO_DIR]:
+for dir_path in [VIDEOS_DIR, CLIPS_DIR, AUDIO_DIR, CACHE_DIR, TRANSCRIPTS_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 # Database
@@ -75,6 +77,22 @@ if AI_PROVIDER not in VALID_AI_PROVIDERS:
     print(f"⚠️  AI_PROVIDER inválido: '{AI_PROVIDER}', usando 'auto'")
     AI_PROVIDER = "auto"
 
+# Provider HTTP clients - one pooled keep-alive client per provider origin (Groq, Deepgram,
+# AssemblyAI, Minimax, Ollama), shared by the analyzer, transcriber and health checks
+# PROVIDER_HTTP_MAX_RETRIES = retries (exponential backoff) on 429/5xx and network errors
+PROVIDER_HTTP_MAX_CONNECTIONS = max(1, _safe_int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "20"), 20, "PROVIDER_HTTP_MAX_CONNECTIONS"))
+PROVIDER_HTTP_MAX_KEEPALIVE = _safe_int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE", "10"), 10, "PROVIDER_HTTP_MAX_KEEPALIVE")
+PROVIDER_HTTP_KEEPALIVE_EXPIRY = _safe_float(os.getenv("PROVIDER_HTTP_KEEPALIVE_EXPIRY", "60"), 60.0, "PROVIDER_HTTP_KEEPALIVE_EXPIRY", 1, 600)
+PROVIDER_HTTP_CONNECT_TIMEOUT = _safe_float(os.getenv("PROVIDER_HTTP_CONNECT_TIMEOUT", "10"), 10.0, "PROVIDER_HTTP_CONNECT_TIMEOUT", 1, 120)
+PROVIDER_HTTP_MAX_RETRIES = _safe_int(os.getenv("PROVIDER_HTTP_MAX_RETRIES", "2"), 2, "PROVIDER_HTTP_MAX_RETRIES")
+PROVIDER_HTTP2_ENABLED = os.getenv("PROVIDER_HTTP2_ENABLED", "true").lower() == "true"
+
+# Provider health checks - each AI provider is verified once per process and the result
+# cached; a healthy result older than the TTL is refreshed in the background (the analyzer
+# keeps being used meanwhile), a failed check is retried after the failure TTL
+PROVIDER_HEALTH_TTL_SECONDS = _safe_float(os.getenv("PROVIDER_HEALTH_TTL_SECONDS", "300"), 300.0, "PROVIDER_HEALTH_TTL_SECONDS", 10, 86400)
+PROVIDER_HEALTH_FAILURE_TTL_SECONDS = _safe_float(os.getenv("PROVIDER_HEALTH_FAILURE_TTL_SECONDS", "30"), 30.0, "PROVIDER_HEALTH_FAILURE_TTL_SECONDS", 0, 3600)
+
 # Whisper settings - OPTIMIZED for better quality
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "pt")  # Portuguese by default
@@ -108,6 +126,15 @@ DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "pt")
 WHISPER_TEMPERATURE = _safe_float(os.getenv("WHISPER_TEMPERATURE", "0.0"), 0.0, "WHISPER_TEMPERATURE", 0.0, 1.0)
 WHISPER_BEAM_SIZE = _safe_int(os.getenv("WHISPER_BEAM_SIZE", "1"), 1, "WHISPER_BEAM_SIZE")
 WHISPER_BEST_OF = _safe_int(os.getenv("WHISPER_BEST_OF", "1"), 1, "WHISPER_BEST_OF")
+WHISPER_CPU_THREADS = _safe_int(os.getenv("WHISPER_CPU_THREADS", "0"), 0, "WHISPER_CPU_THREADS")  # 0 = backend default
+
+# Calibrated local inference profile (python calibrate.py <reference clip>) - backend="auto"
+# prefers the profiled local backend, and its compute type, threads and beam size replace the
+# defaults above. A combination is accepted when it finds CALIBRATION_MIN_WORD_MATCH of the
+# reference words with at most CALIBRATION_MAX_WORD_DRIFT seconds of mean word-start drift
+TRANSCRIPTION_PROFILE_PATH = Path(os.getenv("TRANSCRIPTION_PROFILE_PATH", DATA_DIR / "transcription_profile.json")).resolve()
+CALIBRATION_MIN_WORD_MATCH = _safe_float(os.getenv("CALIBRATION_MIN_WORD_MATCH", "0.9"), 0.9, "CALIBRATION_MIN_WORD_MATCH", 0, 1)
+CALIBRATION_MAX_WORD_DRIFT = _safe_float(os.getenv("CALIBRATION_MAX_WORD_DRIFT", "0.15"), 0.15, "CALIBRATION_MAX_WORD_DRIFT", 0, 10)
 
 # Validate Whisper model
 VALID_WHISPER_MODELS = ["tiny", "base", "small", "medium", "large"]
@@ -115,10 +142,128 @@ if WHISPER_MODEL not in VALID_WHISPER_MODELS:
     print(f"⚠️  WHISPER_MODEL inválido: '{WHISPER_MODEL}', usando 'base'")
     WHISPER_MODEL = "base"
 
+# Transcription cache - reprocessing / duplicate videos skip transcription
+# Keyed by (audio content hash, backend, model size, language, enhance flag); LRU eviction on disk
+TRANSCRIPTION_CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPTION_CACHE_DIR = Path(os.getenv("TRANSCRIPTION_CACHE_DIR", CACHE_DIR / "transcriptions")).resolve()
+TRANSCRIPTION_CACHE_MAX_MB = _safe_int(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "500"), 500, "TRANSCRIPTION_CACHE_MAX_MB")
+
+# Streaming audio extraction - local backends (whisperx, stable-ts, faster-whisper) transcribe
+# PCM chunks read from an FFmpeg pipe while the video is still being decoded
+# AUDIO_KEEP_WAV = also write the 16 kHz WAV to AUDIO_DIR (from the same stream)
+AUDIO_STREAMING_ENABLED = os.getenv("AUDIO_STREAMING_ENABLED", "true").lower() == "true"
+AUDIO_STREAM_CHUNK_SECONDS = _safe_float(os.getenv("AUDIO_STREAM_CHUNK_SECONDS", "120"), 120, "AUDIO_STREAM_CHUNK_SECONDS", 30, 1800)
+AUDIO_KEEP_WAV = os.getenv("AUDIO_KEEP_WAV", "false").lower() == "true"
+
+# Remote transcription (Groq, Deepgram, AssemblyAI) - long audio is split into overlapping
+# chunks transcribed in parallel; each request is retried with exponential backoff
+REMOTE_TRANSCRIPTION_CHUNK_SECONDS = _safe_float(os.getenv("REMOTE_TRANSCRIPTION_CHUNK_SECONDS", "600"), 600, "REMOTE_TRANSCRIPTION_CHUNK_SECONDS", 30, 3600)
+REMOTE_TRANSCRIPTION_OVERLAP_SECONDS = _safe_float(os.getenv("REMOTE_TRANSCRIPTION_OVERLAP_SECONDS", "4"), 4, "REMOTE_TRANSCRIPTION_OVERLAP_SECONDS", 0, 30)
+REMOTE_TRANSCRIPTION_CONCURRENCY = max(1, _safe_int(os.getenv("REMOTE_TRANSCRIPTION_CONCURRENCY", "3"), 3, "REMOTE_TRANSCRIPTION_CONCURRENCY"))
+REMOTE_TRANSCRIPTION_MAX_RETRIES = _safe_int(os.getenv("REMOTE_TRANSCRIPTION_MAX_RETRIES", "3"), 3, "REMOTE_TRANSCRIPTION_MAX_RETRIES")
+REMOTE_TRANSCRIPTION_RETRY_BASE_DELAY = _safe_float(os.getenv("REMOTE_TRANSCRIPTION_RETRY_BASE_DELAY", "1"), 1.0, "REMOTE_TRANSCRIPTION_RETRY_BASE_DELAY", 0, 60)
+
+# Voice activity detection - transcription chunks contain only speech and are cut at silences
+# (local streaming and remote chunking); long pauses are never sent to the model
+# VAD_THRESHOLD_DB = minimum loudness gap between silence and speech; below it all audio is speech
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = int(_safe_float(os.getenv("VAD_FRAME_MS", "30"), 30, "VAD_FRAME_MS", 10, 100))
+VAD_THRESHOLD_DB = _safe_float(os.getenv("VAD_THRESHOLD_DB", "12"), 12.0, "VAD_THRESHOLD_DB", 3, 60)
+VAD_MIN_SILENCE_SECONDS = _safe_float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.6"), 0.6, "VAD_MIN_SILENCE_SECONDS", 0.1, 10)
+VAD_MIN_SPEECH_SECONDS = _safe_float(os.getenv("VAD_MIN_SPEECH_SECONDS", "0.25"), 0.25, "VAD_MIN_SPEECH_SECONDS", 0, 5)
+VAD_SPEECH_PAD_SECONDS = _safe_float(os.getenv("VAD_SPEECH_PAD_SECONDS", "0.2"), 0.2, "VAD_SPEECH_PAD_SECONDS", 0, 2)
+
+# Resident model pool - local Whisper models (whisperx, stable-ts, faster-whisper and the
+# whisperx align models) stay loaded between jobs; least recently used models are unloaded
+# when loading another one would exceed MODEL_POOL_MAX_MB (default: half of the RAM)
+# MODEL_PRELOAD = models loaded at startup, comma-separated backend[:model_size]
+#                 (e.g. "faster-whisper:small,whisperx"); "auto" = TRANSCRIPTION_BACKEND with
+#                 WHISPER_MODEL; empty = load on first use
+# MODEL_SERVER_ENABLED = worker processes share one inference process (each model loaded once
+#                        per machine) instead of loading models themselves
+def _default_model_pool_mb() -> int:
+    try:
+        return max(1024, os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (2 * 1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+_MODEL_POOL_DEFAULT_MB = _default_model_pool_mb()
+MODEL_POOL_MAX_MB = max(1, _safe_int(os.getenv("MODEL_POOL_MAX_MB", str(_MODEL_POOL_DEFAULT_MB)), _MODEL_POOL_DEFAULT_MB, "MODEL_POOL_MAX_MB"))
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "auto")
+MODEL_SERVER_ENABLED = os.getenv("MODEL_SERVER_ENABLED", "true").lower() == "true"
+
+# Cross-job batched inference (model server) - speech chunks of jobs transcribing at the same
+# time with the same model and language run as one batched model call
+# MODEL_BATCH_SIZE = speech segments per decoder batch (whisperx, faster-whisper batched pipeline)
+# MODEL_BATCH_MAX_STREAMS = max chunks (one per job) merged into a batch
+# MODEL_BATCH_MAX_WAIT = max seconds a chunk waits for the other active jobs' chunks
+# Raise JOB_CONCURRENCY_TRANSCRIBE / JOB_CONCURRENCY_PIPELINE so several jobs transcribe at once
+MODEL_BATCH_SIZE = max(1, _safe_int(os.getenv("MODEL_BATCH_SIZE", "16"), 16, "MODEL_BATCH_SIZE"))
+MODEL_BATCH_MAX_STREAMS = max(1, _safe_int(os.getenv("MODEL_BATCH_MAX_STREAMS", "4"), 4, "MODEL_BATCH_MAX_STREAMS"))
+MODEL_BATCH_MAX_WAIT = _safe_float(os.getenv("MODEL_BATCH_MAX_WAIT", "0.5"), 0.5, "MODEL_BATCH_MAX_WAIT", 0, 30)
+# faster-whisper: BatchedInferencePipeline for every call, not only for chunks of several jobs
+# merged by the model server (faster on GPU, slightly different transcripts)
+FASTER_WHISPER_BATCHED = os.getenv("FASTER_WHISPER_BATCHED", "false").lower() == "true"
+
 # Download settings - RETRY mechanism
 DOWNLOAD_MAX_RETRIES = _safe_int(os.getenv("DOWNLOAD_MAX_RETRIES", "3"), 3, "DOWNLOAD_MAX_RETRIES")
 DOWNLOAD_RETRY_DELAY = _safe_int(os.getenv("DOWNLOAD_RETRY_DELAY", "5"), 5, "DOWNLOAD_RETRY_DELAY")
 
+# Job queue settings - processing runs in separate worker processes
+# JOB_WORKER_PROCESSES = number of worker processes (each runs one stage at a time)
+# JOB_WORKER_AUTOSTART = spawn the workers together with the API (set false when running worker.py separately)
+JOB_WORKER_PROCESSES = _safe_int(os.getenv("JOB_WORKER_PROCESSES", str(min(os.cpu_count() or 1, 4))), min(os.cpu_count() or 1, 4), "JOB_WORKER_PROCESSES")
+JOB_WORKER_AUTOSTART = os.getenv("JOB_WORKER_AUTOSTART", "true").lower() == "true"
+JOB_POLL_INTERVAL = _safe_float(os.getenv("JOB_POLL_INTERVAL", "2"), 2, "JOB_POLL_INTERVAL", 0.1, 60)  # Seconds between queue polls
+JOB_HEARTBEAT_INTERVAL = _safe_float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"), 15, "JOB_HEARTBEAT_INTERVAL", 1, 300)
+JOB_HEARTBEAT_TIMEOUT = _safe_float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "120"), 120, "JOB_HEARTBEAT_TIMEOUT", 10, 3600)  # Stale = worker crashed
+JOB_MAX_ATTEMPTS = _safe_int(os.getenv("JOB_MAX_ATTEMPTS", "3"), 3, "JOB_MAX_ATTEMPTS")
+
+# Max jobs running each stage at the same time (across all workers)
+# Transcription is the heaviest (Whisper) - keep it low on CPU-only machines
+JOB_STAGE_CONCURRENCY = {
+    "download": _safe_int(os.getenv("JOB_CONCURRENCY_DOWNLOAD", "2"), 2, "JOB_CONCURRENCY_DOWNLOAD"),
+    "transcribe": _safe_int(os.getenv("JOB_CONCURRENCY_TRANSCRIBE", "1"), 1, "JOB_CONCURRENCY_TRANSCRIBE"),
+    "analyze": _safe_int(os.getenv("JOB_CONCURRENCY_ANALYZE", "4"), 4, "JOB_CONCURRENCY_ANALYZE"),
+    "cut": _safe_int(os.getenv("JOB_CONCURRENCY_CUT", "2"), 2, "JOB_CONCURRENCY_CUT"),
+    "pipeline": _safe_int(os.getenv("JOB_CONCURRENCY_PIPELINE", "2"), 2, "JOB_CONCURRENCY_PIPELINE"),
+}
+
+# Pipelined processing - download, transcription, analysis and rendering of a job run
+# concurrently on partial results (one "pipeline" queue stage instead of four):
+# the audio track is downloaded alongside the video, transcribed segments feed the
+# windowed analysis and accepted clips go straight to the render pool.
+# PIPELINE_ENABLED=false runs the stages one after the other
+PIPELINE_ENABLED = os.getenv("PIPELINE_ENABLED", "true").lower() == "true"
+PIPELINE_QUEUE_SIZE = _safe_int(os.getenv("PIPELINE_QUEUE_SIZE", "64"), 64, "PIPELINE_QUEUE_SIZE")  # Items buffered between stages
+PIPELINE_PROGRESS_INTERVAL = _safe_float(os.getenv("PIPELINE_PROGRESS_INTERVAL", "1"), 1, "PIPELINE_PROGRESS_INTERVAL", 0.1, 60)  # Seconds between stage counter writes
+
+# Stage and subprocess metrics - wall time, CPU time, peak RSS and bytes read/written of
+# every processing stage and FFmpeg/FFprobe subprocess, logged as spans and exported in
+# Prometheus format at GET /metrics. Every process (API, workers, render processes)
+# writes its totals to METRICS_DIR; the endpoint adds them up
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_DIR = Path(os.getenv("METRICS_DIR", DATA_DIR / "metrics")).resolve()
+
+# Clip rendering (cut stage) - clips are cut/reframed/subtitled in parallel processes
+# RENDER_WORKERS = parallel clip renders per job (default: 1 per 4 CPU cores)
+# FFMPEG_THREADS = threads of each ffmpeg encode (default: CPU cores split across RENDER_WORKERS)
+# With JOB_CONCURRENCY_CUT > 1, several jobs render at once - lower RENDER_WORKERS accordingly
+# (streamed analyses render too and count against JOB_CONCURRENCY_CUT, see ANALYSIS_STREAMING_ENABLED)
+_CPU_COUNT = os.cpu_count() or 1
+RENDER_WORKERS = max(1, _safe_int(os.getenv("RENDER_WORKERS", str(max(1, _CPU_COUNT // 4))), max(1, _CPU_COUNT // 4), "RENDER_WORKERS"))
+FFMPEG_THREADS = max(1, _safe_int(os.getenv("FFMPEG_THREADS", str(max(1, _CPU_COUNT // RENDER_WORKERS))), max(1, _CPU_COUNT // RENDER_WORKERS), "FFMPEG_THREADS"))
+RENDER_DB_BATCH_SIZE = max(1, _safe_int(os.getenv("RENDER_DB_BATCH_SIZE", "5"), 5, "RENDER_DB_BATCH_SIZE"))  # Clip rows per INSERT commit
+
+# Batch cut - nearby/overlapping clips are cut from a single decode (split/trim filter graph)
+# BATCH_CUT_MAX_OUTPUTS = max clips per ffmpeg graph (larger groups fall back to smaller batches)
+# BATCH_CUT_MAX_GAP = seconds between clips above which a single decode would waste more
+#                     work than it saves (clips are then cut with separate calls)
+BATCH_CUT_ENABLED = os.getenv("BATCH_CUT_ENABLED", "true").lower() == "true"
+BATCH_CUT_MAX_OUTPUTS = max(1, _safe_int(os.getenv("BATCH_CUT_MAX_OUTPUTS", "6"), 6, "BATCH_CUT_MAX_OUTPUTS"))
+BATCH_CUT_MAX_GAP = _safe_float(os.getenv("BATCH_CUT_MAX_GAP", "30"), 30.0, "BATCH_CUT_MAX_GAP", 0.0, 3600.0)
+
 # Video settings
 MAX_VIDEO_DURATION = 3600 * 3  # 3 hours max
 CLIP_MIN_DURATION = 15  # 15 seconds min (garante conteúdo substancial)
@@ -129,6 +274,30 @@ NUM_CLIPS_TO_GENERATE = 15  # Igual ao Real Oficial
 # IMPORTANTE: É melhor ter um clip de 45s com conteúdo COMPLETO
 # do que um de 25s que corta no meio de uma explicação
 
+# Map-reduce analysis - long transcripts are split into overlapping windows analyzed
+# concurrently (ANALYSIS_CONCURRENCY requests at a time); candidates are merged,
+# de-duplicated and reranked to the top NUM_CLIPS_TO_GENERATE
+ANALYSIS_MAP_REDUCE_ENABLED = os.getenv("ANALYSIS_MAP_REDUCE_ENABLED", "true").lower() == "true"
+ANALYSIS_WINDOW_SECONDS = _safe_float(os.getenv("ANALYSIS_WINDOW_SECONDS", "900"), 900, "ANALYSIS_WINDOW_SECONDS", 120, 7200)
+ANALYSIS_WINDOW_OVERLAP_SECONDS = _safe_float(os.getenv("ANALYSIS_WINDOW_OVERLAP_SECONDS", "90"), 90, "ANALYSIS_WINDOW_OVERLAP_SECONDS", 0, 600)
+ANALYSIS_CONCURRENCY = max(1, _safe_int(os.getenv("ANALYSIS_CONCURRENCY", "3"), 3, "ANALYSIS_CONCURRENCY"))
+if ANALYSIS_WINDOW_OVERLAP_SECONDS >= ANALYSIS_WINDOW_SECONDS / 2:
+    print("⚠️  ANALYSIS_WINDOW_OVERLAP_SECONDS deve ser menor que metade da janela, usando 90")
+    ANALYSIS_WINDOW_OVERLAP_SECONDS = 90.0
+
+# Streaming analysis - the LLM response is streamed and parsed incrementally; each accepted
+# clip is sent to the render pool while the model is still generating the next ones.
+# A streamed analyze stage therefore holds a cut slot: analyze + cut jobs running at
+# once are limited by JOB_CONCURRENCY_CUT (and analyze alone by JOB_CONCURRENCY_ANALYZE)
+ANALYSIS_STREAMING_ENABLED = os.getenv("ANALYSIS_STREAMING_ENABLED", "true").lower() == "true"
+
+# LLM response cache - identical analysis prompts (reprocessing, same video for another user)
+# reuse the stored response; keyed by (provider, model, prompt, temperature), TTL + LRU eviction
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", CACHE_DIR / "llm")).resolve()
+LLM_CACHE_TTL_HOURS = _safe_float(os.getenv("LLM_CACHE_TTL_HOURS", "168"), 168, "LLM_CACHE_TTL_HOURS", 0, 24 * 365)
+LLM_CACHE_MAX_ENTRIES = max(1, _safe_int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"), 2000, "LLM_CACHE_MAX_ENTRIES"))
+
 # Sentence Boundary Detection settings
 # Ajusta timestamps de clips para terminar em finais naturais de sentença
 SENTENCE_DETECTION_ENABLED = os.getenv("SENTENCE_DETECTION_ENABLED", "true").lower() == "true"
@@ -195,6 +364,46 @@ ENABLE_AI_REFRAME = os.getenv("ENABLE_AI_REFRAME", "true").lower() == "true"
 REFRAME_SAMPLE_INTERVAL = _safe_float(os.getenv("REFRAME_SAMPLE_INTERVAL", "0.5"), 0.5, "REFRAME_SAMPLE_INTERVAL", 0.1, 5.0)
 REFRAME_DYNAMIC_MODE = os.getenv("REFRAME_DYNAMIC_MODE", "false").lower() == "true"  # Frame-by-frame (slower)
 
+# Face detection frame sampling
+# REFRAME_FRAME_SAMPLER = how sampled frames are decoded (no per-sample seeks in either mode):
+#   "ffmpeg" = ffmpeg select filter pipes downscaled RGB frames (decodes in its own process)
+#   "opencv" = sequential decode, skipped frames are grabbed but never converted
+#   "auto"   = ffmpeg when installed, opencv otherwise
+# REFRAME_DETECT_WIDTH = frames are downscaled to this width before detection (the face
+#   model runs at 128px, so full-resolution frames only cost conversion time)
+# REFRAME_DETECT_BATCH_SIZE = sampled frames decoded into the buffer before each detection pass
+REFRAME_FRAME_SAMPLER = os.getenv("REFRAME_FRAME_SAMPLER", "auto").lower()
+REFRAME_DETECT_WIDTH = max(64, _safe_int(os.getenv("REFRAME_DETECT_WIDTH", "640"), 640, "REFRAME_DETECT_WIDTH"))
+REFRAME_DETECT_BATCH_SIZE = max(1, _safe_int(os.getenv("REFRAME_DETECT_BATCH_SIZE", "16"), 16, "REFRAME_DETECT_BATCH_SIZE"))
+
+# Camera path of the reframe crop (services/camera_path.py): samples below
+# REFRAME_MIN_CONFIDENCE or further than REFRAME_OUTLIER_THRESHOLD (fraction of
+# the frame) from the rolling median are dropped, the face path is One-Euro
+# filtered (MIN_CUTOFF Hz: lower = steadier when still; BETA: higher = less lag
+# on fast moves), and the dynamic crop only pans once the face leaves
+# REFRAME_DEAD_ZONE, at most REFRAME_MAX_PAN_SPEED (fraction of frame per second)
+REFRAME_MIN_CONFIDENCE = _safe_float(os.getenv("REFRAME_MIN_CONFIDENCE", "0.5"), 0.5, "REFRAME_MIN_CONFIDENCE", 0.0, 1.0)
+REFRAME_OUTLIER_THRESHOLD = _safe_float(os.getenv("REFRAME_OUTLIER_THRESHOLD", "0.15"), 0.15, "REFRAME_OUTLIER_THRESHOLD", 0.01, 1.0)
+REFRAME_ONE_EURO_MIN_CUTOFF = _safe_float(os.getenv("REFRAME_ONE_EURO_MIN_CUTOFF", "0.3"), 0.3, "REFRAME_ONE_EURO_MIN_CUTOFF", 0.01, 10.0)
+REFRAME_ONE_EURO_BETA = _safe_float(os.getenv("REFRAME_ONE_EURO_BETA", "2.0"), 2.0, "REFRAME_ONE_EURO_BETA", 0.0, 100.0)
+REFRAME_DEAD_ZONE = _safe_float(os.getenv("REFRAME_DEAD_ZONE", "0.05"), 0.05, "REFRAME_DEAD_ZONE", 0.0, 0.5)
+REFRAME_MAX_PAN_SPEED = _safe_float(os.getenv("REFRAME_MAX_PAN_SPEED", "0.35"), 0.35, "REFRAME_MAX_PAN_SPEED", 0.01, 10.0)
+
+# Shot boundaries on the face detection samples (services/shot_detector.py): the
+# camera path restarts at each hard cut (REFRAME_SHOT_CUT_THRESHOLD = histogram
+# distance 0-1 between samples), and samples that differ from the last detected
+# one by less than REFRAME_STATIC_THRESHOLD (mean pixel difference 0-1) reuse its
+# detection instead of running the face detector again
+REFRAME_SHOT_DETECTION = os.getenv("REFRAME_SHOT_DETECTION", "true").lower() == "true"
+REFRAME_SHOT_CUT_THRESHOLD = _safe_float(os.getenv("REFRAME_SHOT_CUT_THRESHOLD", "0.4"), 0.4, "REFRAME_SHOT_CUT_THRESHOLD", 0.01, 1.0)
+REFRAME_STATIC_THRESHOLD = _safe_float(os.getenv("REFRAME_STATIC_THRESHOLD", "0.015"), 0.015, "REFRAME_STATIC_THRESHOLD", 0.0, 1.0)
+
+# Whole-video face track: faces are detected once per source video (one decode
+# pass) and stored in FACE_TRACK_DIR; every clip slices its range from it.
+# Disable to detect per clip range (cheaper for a single clip of a long video)
+FACE_TRACK_ENABLED = os.getenv("FACE_TRACK_ENABLED", "true").lower() == "true"
+FACE_TRACK_DIR = Path(os.getenv("FACE_TRACK_DIR", CACHE_DIR / "face_tracks")).resolve()
+
 # Subtitle Style Settings
 # Style types: "default" (simple text), "karaoke" (word highlight), "hormozi" (viral style - RECOMMENDED)
 # hormozi = Alex Hormozi style - UPPERCASE, colorful, impactful
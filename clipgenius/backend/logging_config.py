@@ -6,7 +6,8 @@ import os
 import sys
 import logging
 import structlog
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 
 def get_environment() -> str:
@@ -118,3 +119,22 @@ def get_service_logger(service_name: str) -> structlog.BoundLogger:
 def get_background_logger() -> structlog.BoundLogger:
     """Get logger for background tasks"""
     return get_logger("clipgenius.background", component="background")
+
+
+@contextmanager
+def log_context(**values: Any) -> Iterator[None]:
+    """
+    Bind values to every log line emitted inside the block (current thread/task).
+
+    Example:
+        with log_context(stage="transcribe", project_id=42):
+            logger.info("Chunk transcribed")  # includes stage and project_id
+    """
+    tokens = structlog.contextvars.bind_contextvars(**values)
+    try:
+        yield
+    finally:
+        try:
+            structlog.contextvars.reset_contextvars(**tokens)
+        except ValueError:
+            pass  # Block left from another context (generator closed by another thread)
@@ -6,18 +6,19 @@ import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from contextlib import asynccontextmanager
 from pathlib import Path
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from config import CLIPS_DIR, VIDEOS_DIR
+from config import CLIPS_DIR, VIDEOS_DIR, JOB_WORKER_AUTOSTART, JOB_WORKER_PROCESSES, METRICS_ENABLED
 from models import init_db
 from api.routes import router
 from api.auth_routes import router as auth_router
 from api.editor_routes import router as editor_router
+from services.metrics import metrics_registry
 from logging_config import configure_logging, get_logger
 
 # Configure structured logging on startup
@@ -38,7 +39,7 @@ CORS_ORIGINS = [origin.strip() for origin in CORS_ORIGINS if origin.strip()]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup"""
+    """Initialize database and worker pool on startup"""
     logger.info("Initializing ClipGenius")
     print("Initializing ClipGenius...")
     init_db()
@@ -46,9 +47,25 @@ async def lifespan(app: FastAPI):
     print("Database initialized")
     logger.info("CORS origins configured", cors_origins=CORS_ORIGINS)
     print(f"CORS origins: {CORS_ORIGINS}")
+
+    # Metrics restart with the API (snapshots of previous runs are dropped)
+    metrics_registry.reset()
+
+    # Processing runs in separate worker processes fed by the job queue
+    worker_pool = None
+    if JOB_WORKER_AUTOSTART:
+        from worker import WorkerPool
+        worker_pool = WorkerPool(JOB_WORKER_PROCESSES)
+        worker_pool.start()
+    else:
+        logger.info("Worker autostart disabled, run 'python worker.py' separately")
+        print("Worker autostart disabled - run 'python worker.py' to process projects")
+
     yield
     logger.info("Shutting down ClipGenius")
     print("Shutting down ClipGenius")
+    if worker_pool is not None:
+        worker_pool.stop()
 
 
 app = FastAPI(
@@ -98,6 +115,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+def metrics():
+    """Stage and FFmpeg/FFprobe timings and resource usage (Prometheus text format)"""
+    if not METRICS_ENABLED:
+        return Response(status_code=404)
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
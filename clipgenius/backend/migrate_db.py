@@ -45,6 +45,18 @@ def migrate():
             "ALTER TABLE projects ADD COLUMN user_id INTEGER"
         )
 
+    # Transcription sidecar path (transcriptions are no longer stored as JSON in the row)
+    if "transcription_path" not in projects_columns:
+        migrations.append(
+            "ALTER TABLE projects ADD COLUMN transcription_path VARCHAR(500)"
+        )
+
+    # Per-stage counters of the pipelined processing
+    if "stage_progress" not in projects_columns:
+        migrations.append(
+            "ALTER TABLE projects ADD COLUMN stage_progress JSON"
+        )
+
     # Check existing columns in clips table
     cursor.execute("PRAGMA table_info(clips)")
     clips_columns = {row[1] for row in cursor.fetchall()}
@@ -5,6 +5,7 @@ from .database import Base, engine, get_db, init_db, SessionLocal, get_backgroun
 from .user import User
 from .project import Project
 from .clip import Clip
+from .job import ProcessingJob, JobStatus, JobStage
 from .credit import CreditTransaction, CREDIT_COSTS, CREDIT_BONUSES
 from .subscription import Subscription, PLANS
 from .brand_kit import BrandKit
@@ -14,6 +15,7 @@ __all__ = [
     "Base", "engine", "get_db", "init_db", "SessionLocal",
     "get_background_session", "db_lock",
     "User", "Project", "Clip",
+    "ProcessingJob", "JobStatus", "JobStage",
     "CreditTransaction", "CREDIT_COSTS", "CREDIT_BONUSES",
     "Subscription", "PLANS",
     "BrandKit",
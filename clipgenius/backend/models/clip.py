@@ -3,7 +3,7 @@ ClipGenius - Clip Model
 """
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from .database import Base
 
 
@@ -34,8 +34,9 @@ class Clip(Base):
     subtitle_file = Column(String(500))  # Path to .ass subtitle file
     has_burned_subtitles = Column(Boolean, default=False)  # Whether subtitles are burned into video
 
-    # Transcription segment
-    transcription_segment = Column(Text)  # JSON string
+    # Transcription segment: JSON {start_time, end_time, text}; the words live in the
+    # project's transcription sidecar (deferred: not needed by list queries)
+    transcription_segment = deferred(Column(Text))
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
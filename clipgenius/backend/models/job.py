@@ -0,0 +1,82 @@
+"""
+ClipGenius - Processing Job Model
+Persistent job queue for the video processing pipeline (runs in worker processes)
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+import enum
+from .database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"        # Waiting for a worker (next stage pending)
+    RUNNING = "running"      # A worker is executing the current stage
+    COMPLETED = "completed"  # All stages finished
+    FAILED = "failed"        # Stage raised an error or attempts exhausted
+
+
+class JobStage(str, enum.Enum):
+    DOWNLOAD = "download"
+    TRANSCRIBE = "transcribe"
+    ANALYZE = "analyze"
+    CUT = "cut"
+    # All of the above at once, on partial results (PIPELINE_ENABLED)
+    PIPELINE = "pipeline"
+    DONE = "done"
+
+
+# Pipeline order - a job always resumes from the first stage not yet checkpointed
+STAGE_ORDER = [JobStage.DOWNLOAD, JobStage.TRANSCRIBE, JobStage.ANALYZE, JobStage.CUT]
+
+
+def next_stage(stage: str) -> str:
+    """Return the stage that follows `stage` (DONE after the last one)"""
+    if stage == JobStage.PIPELINE.value:
+        return JobStage.DONE.value
+    values = [s.value for s in STAGE_ORDER]
+    index = values.index(stage)
+    if index + 1 < len(values):
+        return values[index + 1]
+    return JobStage.DONE.value
+
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+
+    # Job parameters
+    language = Column(String(10), nullable=True)
+
+    # Queue state - `stage` is the next stage to run (or the one running)
+    stage = Column(String(20), default=JobStage.DOWNLOAD.value, index=True)
+    status = Column(String(20), default=JobStatus.QUEUED.value, index=True)
+
+    # Checkpoint data produced by finished stages (e.g. clip suggestions from analyze)
+    checkpoint = Column(JSON, default=dict)
+
+    # Worker ownership / crash detection
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)  # Claims of the current stage
+    max_attempts = Column(Integer, default=3)
+
+    error_message = Column(Text)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    # Relationship
+    project = relationship("Project", back_populates="jobs")
+
+    def __repr__(self):
+        return f"<ProcessingJob {self.id}: project={self.project_id} stage={self.stage} status={self.status}>"
+
+    @property
+    def is_active(self) -> bool:
+        """Job still has work queued or running"""
+        return self.status in (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
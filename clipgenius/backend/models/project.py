@@ -2,8 +2,8 @@
 ClipGenius - Project Model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy.orm import relationship, deferred
 import enum
 from .database import Base
 
@@ -33,7 +33,11 @@ class Project(Base):
     thumbnail_url = Column(String(500))
     video_path = Column(String(500))
     audio_path = Column(String(500))
-    transcription = Column(Text)  # JSON string
+    # Transcription sidecar (services/transcript_store.py); loaded only by the pipeline
+    transcription_path = Column(String(500))
+    # Legacy JSON transcription (rows from before the sidecar) - deferred so
+    # list/status queries never load it
+    transcription = deferred(Column(Text))
     status = Column(String(50), default=ProjectStatus.PENDING.value)
     error_message = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -44,6 +48,9 @@ class Project(Base):
     progress_message = Column(String(500))  # Detailed message
     progress_step = Column(String(100))  # e.g., "8/15"
     progress_started_at = Column(DateTime)  # For ETA calculation
+    # Per-stage counters of the pipelined processing, e.g.
+    # {"transcribe": {"done": 310.0, "total": 1800.0, "unit": "seconds", "state": "running"}}
+    stage_progress = Column(JSON)
 
     # Processing lock to prevent concurrent processing
     is_processing = Column(Boolean, default=False)
@@ -52,6 +59,7 @@ class Project(Base):
     # Relationships
     user = relationship("User", back_populates="projects")
     clips = relationship("Clip", back_populates="project", cascade="all, delete-orphan")
+    jobs = relationship("ProcessingJob", back_populates="project", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Project {self.id}: {self.title}>"
@@ -14,8 +14,22 @@ from .analyzer import ClipAnalyzer
 from .cutter import VideoCutter
 from .subtitler import SubtitleGenerator
 from .reframer import AIReframer
+from .frame_sampler import FrameSampler
+from .face_track import FaceTrack, FaceTrackStore, face_track_store
+from .model_pool import ModelPool, model_pool
+from .model_server import ModelServer, ModelServerClient, model_server_client
 from .auth import AuthService
 from .sentence_detector import SentenceBoundaryDetector
+from .word_timeline import WordTimeline
+from .job_queue import JobQueue, job_queue
+from .clip_renderer import ClipRenderPool, clip_render_pool
+from .transcription_cache import TranscriptionCache
+from .transcript_store import TranscriptStore, transcript_store
+from .llm_cache import LLMResponseCache
+from .http_clients import ProviderClients, provider_clients
+from .provider_registry import ProviderRegistry, provider_registry
+from .pipeline import StageCounters, ProgressReporter, run_streaming
+from .metrics import MetricsRegistry, metrics_registry, span
 
 # V2 - Versões melhoradas com timestamps precisos
 from .transcriber_v2 import TranscriberV2, create_transcriber
@@ -38,4 +52,44 @@ __all__ = [
     "create_subtitle_generator",
     # Sentence Boundary Detection
     "SentenceBoundaryDetector",
+    "WordTimeline",
+    # Persistent job queue (worker processes)
+    "JobQueue",
+    "job_queue",
+    # Parallel clip rendering (cut stage)
+    "ClipRenderPool",
+    "clip_render_pool",
+    # Transcription cache
+    "TranscriptionCache",
+    # Transcription sidecar files
+    "TranscriptStore",
+    "transcript_store",
+    # LLM response cache (analysis)
+    "LLMResponseCache",
+    # Pooled provider HTTP clients
+    "ProviderClients",
+    "provider_clients",
+    # Shared analyzers with cached provider health checks
+    "ProviderRegistry",
+    "provider_registry",
+    # Pipelined processing (stages run concurrently)
+    "StageCounters",
+    "ProgressReporter",
+    "run_streaming",
+    # Seek-free frame sampling (face detection)
+    "FrameSampler",
+    # Whole-video face tracks shared by all clips
+    "FaceTrack",
+    "FaceTrackStore",
+    "face_track_store",
+    # Resident transcription models (model server shared by the workers)
+    "ModelPool",
+    "model_pool",
+    "ModelServer",
+    "ModelServerClient",
+    "model_server_client",
+    # Stage/subprocess timing and resource metrics (GET /metrics)
+    "MetricsRegistry",
+    "metrics_registry",
+    "span",
 ]
@@ -3,10 +3,14 @@ ClipGenius - AI Clip Analyzer Service
 Uses Groq (FREE cloud API), Minimax, or Ollama (local) to analyze transcription and suggest viral clips
 Groq is 10x faster with high quality models (70B parameters)
 """
+import asyncio
 import json
+import math
 import re
 import httpx
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from config import (
     NUM_CLIPS_TO_GENERATE,
     CLIP_MIN_DURATION,
@@ -18,9 +22,19 @@ from config import (
     MINIMAX_API_KEY,
     MINIMAX_MODEL,
     MINIMAX_BASE_URL,
-    AI_PROVIDER
+    AI_PROVIDER,
+    ANALYSIS_MAP_REDUCE_ENABLED,
+    ANALYSIS_WINDOW_SECONDS,
+    ANALYSIS_WINDOW_OVERLAP_SECONDS,
+    ANALYSIS_CONCURRENCY,
+    LLM_CACHE_ENABLED,
+    ANALYSIS_STREAMING_ENABLED
 )
 from logging_config import get_service_logger
+from .http_clients import provider_clients
+from .llm_cache import LLMResponseCache
+from .llm_stream import ClipStreamParser, iter_ndjson, iter_sse_json
+from .pipeline import run_streaming
 
 logger = get_service_logger("analyzer")
 
@@ -147,27 +161,45 @@ O corte DEVE começar com:
 🎯 MISSÃO: Retorne EXATAMENTE {num_clips} cortes com conteúdo COMPLETO e satisfatório.
 Cada corte deve entregar o que promete no início - NUNCA deixe o espectador frustrado."""
 
-    def __init__(self, provider: str = None):
+    # Sampling temperature for all providers (part of the LLM cache key)
+    TEMPERATURE = 0.7
+
+    GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+    def __init__(
+        self,
+        provider: str = None,
+        base_url: str = None,
+        use_cache: bool = LLM_CACHE_ENABLED,
+        verify: bool = True
+    ):
         """
         Initialize analyzer with specified provider
 
         Args:
             provider: "groq", "minimax", "ollama", or "auto" (default)
                       auto = use Groq if key exists, otherwise Minimax, otherwise Ollama
+            base_url: Override the provider base URL (e.g. a local stub server)
+            use_cache: Reuse stored responses for identical prompts (LLM response cache)
+            verify: Run the provider health check now (the provider registry
+                    creates analyzers with verify=False and caches the check)
         """
         self.provider = self._determine_provider(provider)
+        self.use_cache = use_cache
+        self._cache: Optional[LLMResponseCache] = None
 
         if self.provider == "groq":
             self.model = GROQ_MODEL
-            self._verify_groq()
+            self.base_url = base_url or self.GROQ_BASE_URL
         elif self.provider == "minimax":
             self.model = MINIMAX_MODEL
-            self.base_url = MINIMAX_BASE_URL
-            self._verify_minimax()
+            self.base_url = base_url or MINIMAX_BASE_URL
         else:
             self.model = OLLAMA_MODEL
-            self.base_url = OLLAMA_BASE_URL
-            self._verify_ollama()
+            self.base_url = base_url or OLLAMA_BASE_URL
+
+        if verify:
+            self.verify()
 
         logger.info("AI provider initialized", provider=self.provider.upper(), model=self.model)
         print(f"AI Provider: {self.provider.upper()} ({self.model})")
@@ -190,6 +222,15 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
 
         return provider
 
+    def verify(self):
+        """Check that the provider is reachable and configured (raises if not)"""
+        if self.provider == "groq":
+            self._verify_groq()
+        elif self.provider == "minimax":
+            self._verify_minimax()
+        else:
+            self._verify_ollama()
+
     def _verify_groq(self):
         """Verify Groq API key is configured"""
         if not GROQ_API_KEY:
@@ -204,10 +245,11 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
 
         # Test connection
         try:
-            response = httpx.get(
-                "https://api.groq.com/openai/v1/models",
+            response = provider_clients.get(
+                f"{self.base_url}/models",
                 headers={"Authorization": f"Bearer {GROQ_API_KEY}"},
-                timeout=10
+                timeout=10,
+                max_retries=0
             )
             if response.status_code != 200:
                 logger.error("Groq API connection failed", status_code=response.status_code)
@@ -232,8 +274,8 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
 
         # Test connection with a simple request
         try:
-            response = httpx.post(
-                f"{MINIMAX_BASE_URL}/v1/messages",
+            response = provider_clients.post(
+                f"{self.base_url}/v1/messages",
                 headers={
                     "x-api-key": MINIMAX_API_KEY,
                     "Content-Type": "application/json",
@@ -244,7 +286,8 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
                     "max_tokens": 10,
                     "messages": [{"role": "user", "content": "test"}]
                 },
-                timeout=30
+                timeout=30,
+                max_retries=0
             )
             # Accept 200 (success) or 400 (bad request but API is reachable)
             if response.status_code not in [200, 400]:
@@ -259,7 +302,7 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
     def _verify_ollama(self):
         """Verify Ollama is running and model is available"""
         try:
-            response = httpx.get(f"{self.base_url}/api/tags", timeout=5)
+            response = provider_clients.get(f"{self.base_url}/api/tags", timeout=5, max_retries=0)
             if response.status_code != 200:
                 raise ConnectionError("Ollama não está respondendo")
 
@@ -322,27 +365,10 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         logger.info("Calling Groq API", model=self.model)
         print(f"Calling Groq ({self.model})...")
 
-        response = httpx.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em análise de conteúdo viral. Sempre responda em JSON válido."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4096,
-            },
+        response = provider_clients.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._groq_headers(),
+            json=self._groq_payload(prompt),
             timeout=httpx.Timeout(120.0, connect=30.0)
         )
 
@@ -353,6 +379,55 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
 
         return response.json()["choices"][0]["message"]["content"]
 
+    def _groq_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+    def _groq_payload(self, prompt: str, stream: bool = False) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Você é um assistente especializado em análise de conteúdo viral. Sempre responda em JSON válido."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": self.TEMPERATURE,
+            "max_tokens": 4096,
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _stream_groq(self, prompt: str) -> Iterator[str]:
+        """Call Groq API with streaming (SSE); yields content deltas"""
+        logger.info("Streaming from Groq API", model=self.model)
+        print(f"Streaming from Groq ({self.model})...")
+
+        with provider_clients.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            headers=self._groq_headers(),
+            json=self._groq_payload(prompt, stream=True),
+            timeout=httpx.Timeout(120.0, connect=30.0)
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                logger.error("Groq API request failed", status_code=response.status_code, error=response.text)
+                raise Exception(f"Groq API error: {response.text}")
+
+            for event in iter_sse_json(response.iter_lines()):
+                choices = event.get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
     def _call_minimax(self, prompt: str) -> str:
         """Call Minimax API (Anthropic-compatible endpoint)"""
         logger.info("Calling Minimax API", model=self.model)
@@ -361,7 +436,7 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         # Build the system prompt and user message
         system_prompt = "Você é um assistente especializado em análise de conteúdo viral. Sempre responda em JSON válido."
 
-        response = httpx.post(
+        response = provider_clients.post(
             f"{self.base_url}/v1/messages",
             headers={
                 "x-api-key": MINIMAX_API_KEY,
@@ -378,7 +453,7 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
                         "content": prompt
                     }
                 ],
-                "temperature": 0.7,
+                "temperature": self.TEMPERATURE,
             },
             timeout=httpx.Timeout(300.0, connect=30.0)  # 5 minutes timeout for long analysis
         )
@@ -403,17 +478,9 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         logger.info("Calling Ollama API", model=self.model)
         print(f"Calling Ollama ({self.model})...")
 
-        response = httpx.post(
+        response = provider_clients.post(
             f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 4096,
-                }
-            },
+            json=self._ollama_payload(prompt, stream=False),
             timeout=httpx.Timeout(600.0, connect=30.0)  # 10 minutes read timeout
         )
 
@@ -423,7 +490,66 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
 
         return response.json().get("response", "")
 
+    def _ollama_payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": self.TEMPERATURE,
+                "num_predict": 4096,
+            }
+        }
+
+    def _stream_ollama(self, prompt: str) -> Iterator[str]:
+        """Call Ollama API with streaming (NDJSON); yields response fragments"""
+        logger.info("Streaming from Ollama API", model=self.model)
+        print(f"Streaming from Ollama ({self.model})...")
+
+        with provider_clients.stream(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=self._ollama_payload(prompt, stream=True),
+            timeout=httpx.Timeout(600.0, connect=30.0)  # 10 minutes read timeout
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                logger.error("Ollama API request failed", status_code=response.status_code, error=response.text)
+                raise Exception(f"Ollama error: {response.text}")
+
+            for event in iter_ndjson(response.iter_lines()):
+                if event.get("error"):
+                    raise Exception(f"Ollama error: {event['error']}")
+                if event.get("response"):
+                    yield event["response"]
+                if event.get("done"):
+                    return
+
+    @property
+    def cache(self) -> Optional[LLMResponseCache]:
+        """LLM response cache (created on demand, None if disabled)"""
+        if self.use_cache and self._cache is None:
+            try:
+                self._cache = LLMResponseCache()
+            except Exception as e:
+                logger.warning("LLM response cache unavailable", error=str(e))
+                self.use_cache = False
+        return self._cache
+
     def _call_ai(self, prompt: str) -> str:
+        """Call the configured AI provider (through the response cache when enabled)"""
+        cache = self.cache
+        if cache is None:
+            return self._call_provider(prompt)
+        return cache.get_or_call(
+            self.provider,
+            self.model,
+            prompt,
+            self.TEMPERATURE,
+            lambda: self._call_provider(prompt)
+        )
+
+    def _call_provider(self, prompt: str) -> str:
         """Call the configured AI provider"""
         if self.provider == "groq":
             return self._call_groq(prompt)
@@ -432,6 +558,28 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         else:
             return self._call_ollama(prompt)
 
+    def _stream_ai(self, prompt: str) -> Iterator[str]:
+        """Stream the response of the configured AI provider (through the response cache when enabled)"""
+        cache = self.cache
+        if cache is None:
+            return self._stream_provider(prompt)
+        return cache.get_or_stream(
+            self.provider,
+            self.model,
+            prompt,
+            self.TEMPERATURE,
+            lambda: self._stream_provider(prompt)
+        )
+
+    def _stream_provider(self, prompt: str) -> Iterator[str]:
+        """Stream the configured AI provider (Minimax is not streamed: one chunk)"""
+        if self.provider == "groq":
+            return self._stream_groq(prompt)
+        elif self.provider == "minimax":
+            return iter([self._call_minimax(prompt)])
+        else:
+            return self._stream_ollama(prompt)
+
     def _try_fix_json(self, text: str) -> Dict:
         """Try to fix common JSON parsing issues from LLM output"""
         # Try to extract just the clips array
@@ -462,59 +610,50 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         print("Could not extract valid JSON from response")
         return {"clips": []}
 
-    def analyze(
-        self,
-        transcription: Dict[str, Any],
-        num_clips: int = None,
-        min_duration: int = None,
-        max_duration: int = None
-    ) -> List[Dict[str, Any]]:
-        """
-        Analyze transcription and return suggested clips
-
-        Args:
-            transcription: Transcription dict with segments
-            num_clips: Number of clips to generate
-            min_duration: Minimum clip duration in seconds
-            max_duration: Maximum clip duration in seconds
-
-        Returns:
-            List of clip suggestions with timestamps and scores
-        """
-        num_clips = num_clips or NUM_CLIPS_TO_GENERATE
-        min_duration = min_duration or CLIP_MIN_DURATION
-        max_duration = max_duration or CLIP_MAX_DURATION
+    def _parse_response(self, response_text: str) -> Dict:
+        """Extract the {"clips": [...]} object from an AI response"""
+        try:
+            # Try to find JSON in the response
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}') + 1
 
-        # Validate transcription format
-        if not transcription or not isinstance(transcription, dict):
-            raise ValueError("Transcrição inválida: deve ser um dicionário")
+            if json_start >= 0 and json_end > json_start:
+                json_str = response_text[json_start:json_end]
+                return json.loads(json_str)
+            raise ValueError("No JSON found in response")
 
-        segments = transcription.get('segments', [])
-        if not segments:
-            raise ValueError("Transcrição inválida: não contém segmentos")
+        except json.JSONDecodeError as e:
+            logger.warning("JSON parse error, attempting recovery", error=str(e))
+            print(f"JSON parse error: {e}")
+            print(f"   Attempting recovery...")
+            return self._try_fix_json(response_text)
 
+    def _build_prompt(
+        self,
+        segments: List[Dict[str, Any]],
+        num_clips: int,
+        min_duration: int,
+        max_duration: int
+    ) -> str:
         # Format transcription for prompt
-        formatted_transcription = self._format_transcription_for_prompt(transcription)
+        formatted_transcription = self._format_transcription_for_prompt({'segments': segments})
 
-        # Build prompt
-        prompt = self.ANALYSIS_PROMPT.format(
+        return self.ANALYSIS_PROMPT.format(
             num_clips=num_clips,
             min_duration=min_duration,
             max_duration=max_duration,
             transcription=formatted_transcription
         )
 
-        provider_names = {"groq": "Groq", "minimax": "Minimax", "ollama": "Ollama"}
-        provider_name = provider_names.get(self.provider, self.provider)
-        logger.info(
-            "Starting transcription analysis",
-            provider=provider_name,
-            num_clips_requested=num_clips,
-            min_duration=min_duration,
-            max_duration=max_duration,
-            segments_count=len(segments)
-        )
-        print(f"Analyzing transcription with {provider_name}... (requesting {num_clips} clips)")
+    def _request_clips(
+        self,
+        segments: List[Dict[str, Any]],
+        num_clips: int,
+        min_duration: int,
+        max_duration: int
+    ) -> List[Dict[str, Any]]:
+        """Ask the AI for clips in the given segments; returns the raw clip objects"""
+        prompt = self._build_prompt(segments, num_clips, min_duration, max_duration)
 
         # Call AI
         response_text = self._call_ai(prompt)
@@ -525,109 +664,107 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
         print(response_text[:500] if len(response_text) > 500 else response_text)
         print("---")
 
-        # Parse JSON from response
-        try:
-            # Try to find JSON in the response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+        return self._parse_response(response_text).get('clips', []) or []
 
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                result = json.loads(json_str)
-            else:
-                raise ValueError("No JSON found in response")
-
-        except json.JSONDecodeError as e:
-            logger.warning("JSON parse error, attempting recovery", error=str(e))
-            print(f"JSON parse error: {e}")
-            print(f"   Attempting recovery...")
-            result = self._try_fix_json(response_text)
-
-        # Process clips
+    def _build_clip(self, clip_data: Dict[str, Any], start_seconds: float, end_seconds: float) -> Dict[str, Any]:
+        """Convert a raw AI clip object into a clip suggestion"""
+        # Safe conversion of viral score
+        try:
+            viral_score = float(clip_data.get('nota_viral', 5))
+            viral_score = max(0, min(10, viral_score))  # Clamp between 0-10
+        except (ValueError, TypeError):
+            viral_score = 5.0
+
+        return {
+            'start_time': start_seconds,
+            'end_time': end_seconds,
+            'duration': end_seconds - start_seconds,
+            'title': clip_data.get('titulo', 'Sem título'),
+            'viral_score': viral_score,
+            'justification': clip_data.get('justificativa', ''),
+            'hook': clip_data.get('gancho', ''),
+            'closing': clip_data.get('fecho', ''),  # New field for the closing phrase
+            'category': clip_data.get('categoria', 'insight'),
+            'is_complete': clip_data.get('conteudo_completo', True)
+        }
+
+    def _validate_clip(
+        self,
+        i: int,
+        clip_data: Dict[str, Any],
+        min_duration: int,
+        max_duration: int
+    ) -> Optional[Dict[str, Any]]:
+        """Clip suggestion from a raw AI clip object, None if its duration is out of limits"""
+        start_seconds = self._parse_timestamp(clip_data.get('timestamp_inicio', '00:00'))
+        end_seconds = self._parse_timestamp(clip_data.get('timestamp_fim', '00:00'))
+        duration = end_seconds - start_seconds
+
+        print(f"   Clip {i+1}: {clip_data.get('timestamp_inicio')} - {clip_data.get('timestamp_fim')} = {duration}s")
+
+        # Validate clip duration using configured minimum
+        if duration < min_duration:
+            logger.debug("Clip rejected: too short", clip_index=i+1, duration=duration, min_duration=min_duration)
+            print(f"   Rejected: duration too short ({duration}s < {min_duration}s)")
+            return None
+
+        # Validate maximum duration
+        if duration > max_duration:
+            logger.debug("Clip rejected: too long", clip_index=i+1, duration=duration, max_duration=max_duration)
+            print(f"   Rejected: duration too long ({duration}s > {max_duration}s)")
+            return None
+
+        clip = self._build_clip(clip_data, start_seconds, end_seconds)
+
+        # Check if content is marked as complete
+        if not clip['is_complete']:
+            logger.warning("Clip marked as incomplete content", clip_index=i+1)
+            print(f"   ⚠️ Warning: Clip {i+1} was marked as incomplete content")
+
+        return clip
+
+    def _process_clips(
+        self,
+        raw_clips: List[Dict[str, Any]],
+        min_duration: int,
+        max_duration: int
+    ) -> List[Dict[str, Any]]:
+        """Validate raw clips (duration limits) and sort by viral score"""
         clips = []
-        raw_clips_count = len(result.get('clips', []))
-        logger.info("Processing clips from AI response", raw_clips_count=raw_clips_count)
-        print(f"Processing {raw_clips_count} clips from response...")
-        for i, clip_data in enumerate(result.get('clips', [])):
-            start_seconds = self._parse_timestamp(clip_data.get('timestamp_inicio', '00:00'))
-            end_seconds = self._parse_timestamp(clip_data.get('timestamp_fim', '00:00'))
-            duration = end_seconds - start_seconds
-
-            print(f"   Clip {i+1}: {clip_data.get('timestamp_inicio')} - {clip_data.get('timestamp_fim')} = {duration}s")
-
-            # Validate clip duration using configured minimum
-            if duration < min_duration:
-                logger.debug("Clip rejected: too short", clip_index=i+1, duration=duration, min_duration=min_duration)
-                print(f"   Rejected: duration too short ({duration}s < {min_duration}s)")
-                continue
-
-            # Validate maximum duration
-            if duration > max_duration:
-                logger.debug("Clip rejected: too long", clip_index=i+1, duration=duration, max_duration=max_duration)
-                print(f"   Rejected: duration too long ({duration}s > {max_duration}s)")
-                continue
-
-            # Safe conversion of viral score
-            try:
-                viral_score = float(clip_data.get('nota_viral', 5))
-                viral_score = max(0, min(10, viral_score))  # Clamp between 0-10
-            except (ValueError, TypeError):
-                viral_score = 5.0
-
-            # Check if content is marked as complete
-            is_complete = clip_data.get('conteudo_completo', True)
-            if not is_complete:
-                logger.warning("Clip marked as incomplete content", clip_index=i+1)
-                print(f"   ⚠️ Warning: Clip {i+1} was marked as incomplete content")
-
-            clips.append({
-                'start_time': start_seconds,
-                'end_time': end_seconds,
-                'duration': duration,
-                'title': clip_data.get('titulo', 'Sem título'),
-                'viral_score': viral_score,
-                'justification': clip_data.get('justificativa', ''),
-                'hook': clip_data.get('gancho', ''),
-                'closing': clip_data.get('fecho', ''),  # New field for the closing phrase
-                'category': clip_data.get('categoria', 'insight'),
-                'is_complete': is_complete
-            })
+        logger.info("Processing clips from AI response", raw_clips_count=len(raw_clips))
+        print(f"Processing {len(raw_clips)} clips from response...")
+        for i, clip_data in enumerate(raw_clips):
+            clip = self._validate_clip(i, clip_data, min_duration, max_duration)
+            if clip is not None:
+                clips.append(clip)
 
         # Sort by viral score (highest first)
         clips.sort(key=lambda x: x['viral_score'], reverse=True)
+        return clips
 
+    def _apply_fallbacks(
+        self,
+        clips: List[Dict[str, Any]],
+        raw_clips: List[Dict[str, Any]],
+        segments: List[Dict[str, Any]],
+        max_duration: int
+    ) -> List[Dict[str, Any]]:
+        """Never return zero clips: relax the minimum duration, then use the first segments"""
         # FALLBACK: Nunca retornar 0 clips
-        if len(clips) == 0 and raw_clips_count > 0:
+        if len(clips) == 0 and raw_clips:
             logger.warning("All clips rejected, applying fallback with relaxed duration")
             print("⚠️ Todos os clips foram rejeitados. Aplicando fallback com duração relaxada...")
 
             # Tentar novamente com duração mínima de 10 segundos (fallback relaxado)
             fallback_min_duration = 10
-            for i, clip_data in enumerate(result.get('clips', [])):
+            for i, clip_data in enumerate(raw_clips):
                 start_seconds = self._parse_timestamp(clip_data.get('timestamp_inicio', '00:00'))
                 end_seconds = self._parse_timestamp(clip_data.get('timestamp_fim', '00:00'))
                 duration = end_seconds - start_seconds
 
                 # Aceitar clips com pelo menos 10 segundos no fallback
                 if duration >= fallback_min_duration and duration <= max_duration:
-                    try:
-                        viral_score = float(clip_data.get('nota_viral', 5))
-                        viral_score = max(0, min(10, viral_score))
-                    except (ValueError, TypeError):
-                        viral_score = 5.0
-
-                    clips.append({
-                        'start_time': start_seconds,
-                        'end_time': end_seconds,
-                        'duration': duration,
-                        'title': clip_data.get('titulo', 'Sem título'),
-                        'viral_score': viral_score,
-                        'justification': clip_data.get('justificativa', ''),
-                        'hook': clip_data.get('gancho', ''),
-                        'closing': clip_data.get('fecho', ''),
-                        'category': clip_data.get('categoria', 'insight'),
-                        'is_complete': clip_data.get('conteudo_completo', True)
-                    })
+                    clips.append(self._build_clip(clip_data, start_seconds, end_seconds))
                     print(f"   ✅ Clip {i+1} aceito via fallback (min {fallback_min_duration}s): {duration}s")
 
             clips.sort(key=lambda x: x['viral_score'], reverse=True)
@@ -637,7 +774,6 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
             logger.warning("No clips found, creating fallback from best segment")
             print("⚠️ Nenhum clip encontrado. Criando clip do melhor segmento disponível...")
 
-            segments = transcription.get('segments', [])
             if segments:
                 # Encontrar sequência de segmentos com boa duração (15-30 segundos ideal)
                 best_start = segments[0].get('start', 0)
@@ -668,15 +804,492 @@ Cada corte deve entregar o que promete no início - NUNCA deixe o espectador fru
                 })
                 print(f"   ✅ Clip fallback criado: {best_start:.0f}s - {best_end:.0f}s ({best_end - best_start:.0f}s)")
 
+        return clips
+
+    # ========== Map-reduce (long transcripts) ==========
+
+    def _plan_windows(
+        self,
+        segments: List[Dict[str, Any]],
+        window_seconds: float = None,
+        overlap_seconds: float = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Split segments into overlapping time windows.
+
+        A window covers [k * step, k * step + window_seconds] with
+        step = window - overlap; a segment belongs to every window its start falls in.
+        """
+        window_seconds = window_seconds or ANALYSIS_WINDOW_SECONDS
+        overlap_seconds = ANALYSIS_WINDOW_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        if not segments:
+            return []
+
+        first = segments[0].get('start', 0)
+        total = segments[-1].get('end', 0) - first
+        if total <= window_seconds + overlap_seconds:
+            return [segments]
+
+        return list(self._windows_from(segments, first, window_seconds, overlap_seconds))
+
+    @staticmethod
+    def _windows_from(
+        segments: List[Dict[str, Any]],
+        window_start: float,
+        window_seconds: float,
+        overlap_seconds: float
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Windows of all segments, the first one starting at window_start"""
+        step = window_seconds - overlap_seconds
+        while True:
+            window_end = window_start + window_seconds
+            # Avoid a tiny last window: extend the current one instead
+            if segments[-1].get('end', 0) - window_end < overlap_seconds:
+                window_end = float('inf')
+            window = [s for s in segments if window_start <= s.get('start', 0) < window_end]
+            if window:
+                yield window
+            if window_end == float('inf'):
+                break
+            window_start += step
+
+    def _stream_windows(
+        self,
+        segment_batches: Iterable[List[Dict[str, Any]]],
+        window_seconds: float = None,
+        overlap_seconds: float = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        _plan_windows over segments that are still being transcribed.
+
+        Segments arrive in batches, in time order. A window is yielded as soon as
+        the transcription has gone `overlap_seconds` past its end: by then all of
+        its segments are known and it can no longer be extended, so the windows
+        are the same _plan_windows would return for the whole transcript.
+        """
+        window_seconds = window_seconds or ANALYSIS_WINDOW_SECONDS
+        overlap_seconds = ANALYSIS_WINDOW_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        step = window_seconds - overlap_seconds
+        segments: List[Dict[str, Any]] = []
+        window_start = None
+        emitted = False
+
+        for batch in segment_batches:
+            segments.extend(batch)
+            if not segments:
+                continue
+            if window_start is None:
+                window_start = segments[0].get('start', 0)
+
+            while segments[-1].get('end', 0) - (window_start + window_seconds) > overlap_seconds:
+                window_end = window_start + window_seconds
+                window = [s for s in segments if window_start <= s.get('start', 0) < window_end]
+                if window:
+                    emitted = True
+                    yield window
+                window_start += step
+
+        if not segments:
+            return
+        if not emitted:
+            yield from self._plan_windows(segments, window_seconds, overlap_seconds)
+        else:
+            yield from self._windows_from(segments, window_start, window_seconds, overlap_seconds)
+
+    @staticmethod
+    def _overlaps(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        return a['start_time'] < b['end_time'] and b['start_time'] < a['end_time']
+
+    @staticmethod
+    def _rank_key(clip: Dict[str, Any]) -> tuple:
+        return (-clip['viral_score'], not clip.get('is_complete', True), clip['start_time'])
+
+    def _merge_candidates(self, candidates: List[Dict[str, Any]], num_clips: int) -> List[Dict[str, Any]]:
+        """
+        Global rerank of the window candidates.
+
+        Highest viral score first (complete content, then earlier start, as tie-breaks);
+        a candidate overlapping an already selected clip is a duplicate of the same
+        moment (typically from two overlapping windows) and is dropped.
+        """
+        ranked = sorted(candidates, key=self._rank_key)
+        selected: List[Dict[str, Any]] = []
+        for candidate in ranked:
+            if any(self._overlaps(candidate, clip) for clip in selected):
+                continue
+            selected.append(candidate)
+            if len(selected) >= num_clips:
+                break
+        return selected
+
+    async def _map_windows(
+        self,
+        windows: List[List[Dict[str, Any]]],
+        clips_per_window: int,
+        min_duration: int,
+        max_duration: int,
+        concurrency: int
+    ) -> List[Any]:
+        """Analyze all windows, at most `concurrency` AI requests at a time"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def analyze_window(index: int, window: List[Dict[str, Any]]):
+            async with semaphore:
+                logger.info(
+                    "Analyzing transcript window",
+                    window=index + 1,
+                    windows=len(windows),
+                    start=window[0].get('start', 0),
+                    end=window[-1].get('end', 0)
+                )
+                return await asyncio.to_thread(
+                    self._request_clips, window, clips_per_window, min_duration, max_duration
+                )
+
+        return await asyncio.gather(
+            *(analyze_window(i, window) for i, window in enumerate(windows)),
+            return_exceptions=True
+        )
+
+    def _analyze_map_reduce(
+        self,
+        windows: List[List[Dict[str, Any]]],
+        num_clips: int,
+        min_duration: int,
+        max_duration: int,
+        concurrency: int = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Map: request clips per window concurrently. Reduce: validate, de-duplicate, rerank.
+
+        Returns:
+            Tuple of (top clips, all raw clips from the windows)
+        """
+        concurrency = concurrency or ANALYSIS_CONCURRENCY
+        # Each window only needs its share of the clips (plus margin for the rerank)
+        clips_per_window = max(2, min(num_clips, math.ceil(2 * num_clips / len(windows))))
+        print(f"Map-reduce analysis: {len(windows)} windows, {clips_per_window} clips each, {concurrency} in parallel")
+
+        results = asyncio.run(self._map_windows(windows, clips_per_window, min_duration, max_duration, concurrency))
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for error in errors:
+            logger.error("Window analysis failed", error=str(error))
+        if len(errors) == len(results):
+            raise errors[0]
+
+        raw_clips = [clip for r in results if not isinstance(r, BaseException) for clip in r]
+        candidates = self._process_clips(raw_clips, min_duration, max_duration)
+        clips = self._merge_candidates(candidates, num_clips)
+
+        logger.info(
+            "Map-reduce analysis merged",
+            windows=len(windows),
+            failed_windows=len(errors),
+            candidates=len(candidates),
+            selected=len(clips)
+        )
+        return clips, raw_clips
+
+    def analyze(
+        self,
+        transcription: Dict[str, Any],
+        num_clips: int = None,
+        min_duration: int = None,
+        max_duration: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze transcription and return suggested clips
+
+        Transcripts longer than one analysis window (ANALYSIS_WINDOW_SECONDS) are
+        analyzed with map-reduce: overlapping windows in parallel, then a global rerank.
+
+        Args:
+            transcription: Transcription dict with segments
+            num_clips: Number of clips to generate
+            min_duration: Minimum clip duration in seconds
+            max_duration: Maximum clip duration in seconds
+
+        Returns:
+            List of clip suggestions with timestamps and scores
+        """
+        num_clips = num_clips or NUM_CLIPS_TO_GENERATE
+        min_duration = min_duration or CLIP_MIN_DURATION
+        max_duration = max_duration or CLIP_MAX_DURATION
+        segments, windows = self._start_analysis(transcription, num_clips, min_duration, max_duration)
+
+        if len(windows) > 1:
+            clips, raw_clips = self._analyze_map_reduce(windows, num_clips, min_duration, max_duration)
+        else:
+            raw_clips = self._request_clips(segments, num_clips, min_duration, max_duration)
+            clips = self._process_clips(raw_clips, min_duration, max_duration)
+
+        clips = self._apply_fallbacks(clips, raw_clips, segments, max_duration)
+
         logger.info(
             "Clip analysis completed",
             clips_generated=len(clips),
-            clips_rejected=raw_clips_count - len(clips),
+            clips_rejected=len(raw_clips) - len(clips),
             provider=self.provider
         )
         print(f"Generated {len(clips)} clip suggestions")
         return clips
 
+    def _start_analysis(
+        self,
+        transcription: Dict[str, Any],
+        num_clips: int,
+        min_duration: int,
+        max_duration: int
+    ) -> Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """Validate the transcription and plan the analysis windows"""
+        # Validate transcription format
+        if not transcription or not isinstance(transcription, dict):
+            raise ValueError("Transcrição inválida: deve ser um dicionário")
+
+        segments = transcription.get('segments', [])
+        if not segments:
+            raise ValueError("Transcrição inválida: não contém segmentos")
+
+        windows = self._plan_windows(segments) if ANALYSIS_MAP_REDUCE_ENABLED else [segments]
+
+        provider_names = {"groq": "Groq", "minimax": "Minimax", "ollama": "Ollama"}
+        provider_name = provider_names.get(self.provider, self.provider)
+        logger.info(
+            "Starting transcription analysis",
+            provider=provider_name,
+            num_clips_requested=num_clips,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            segments_count=len(segments),
+            windows=len(windows)
+        )
+        print(f"Analyzing transcription with {provider_name}... (requesting {num_clips} clips)")
+        return segments, windows
+
+    def analyze_stream(
+        self,
+        transcription: Dict[str, Any],
+        num_clips: int = None,
+        min_duration: int = None,
+        max_duration: int = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze transcription, yielding each clip suggestion as soon as the model
+        has generated it (streamed response parsed incrementally).
+
+        Clips are validated like analyze(); a clip overlapping one already yielded
+        is dropped, and at most num_clips are yielded (in generation order, not by
+        score). Transcripts that need map-reduce cannot be reranked before all
+        windows are done, so their clips are yielded after analyze() returns.
+        """
+        num_clips = num_clips or NUM_CLIPS_TO_GENERATE
+        min_duration = min_duration or CLIP_MIN_DURATION
+        max_duration = max_duration or CLIP_MAX_DURATION
+
+        if not ANALYSIS_STREAMING_ENABLED:
+            yield from self.analyze(transcription, num_clips, min_duration, max_duration)
+            return
+
+        segments, windows = self._start_analysis(transcription, num_clips, min_duration, max_duration)
+        if len(windows) > 1:
+            yield from self.analyze(transcription, num_clips, min_duration, max_duration)
+            return
+
+        prompt = self._build_prompt(segments, num_clips, min_duration, max_duration)
+        parser = ClipStreamParser()
+        emitted: List[Dict[str, Any]] = []
+
+        def accept(clip: Optional[Dict[str, Any]]) -> bool:
+            if clip is None or len(emitted) >= num_clips:
+                return False
+            if any(self._overlaps(clip, other) for other in emitted):
+                return False
+            emitted.append(clip)
+            return True
+
+        for chunk in self._stream_ai(prompt):
+            first_index = len(parser.clips)
+            for i, clip_data in enumerate(parser.feed(chunk), start=first_index):
+                clip = self._validate_clip(i, clip_data, min_duration, max_duration)
+                if accept(clip):
+                    logger.info(
+                        "Clip suggestion streamed",
+                        clip_number=len(emitted),
+                        start_time=clip['start_time'],
+                        viral_score=clip['viral_score']
+                    )
+                    yield clip
+
+        raw_clips = parser.clips
+        if not raw_clips:
+            # Nothing parsed incrementally (e.g. malformed JSON): full-text recovery
+            raw_clips = self._parse_response(parser.text).get('clips', []) or []
+            for clip in self._process_clips(raw_clips, min_duration, max_duration):
+                if accept(clip):
+                    yield clip
+
+        if not emitted:
+            for clip in self._apply_fallbacks([], raw_clips, segments, max_duration):
+                if accept(clip):
+                    yield clip
+
+        logger.info(
+            "Streamed clip analysis completed",
+            clips_generated=len(emitted),
+            clips_rejected=len(raw_clips) - len(emitted),
+            provider=self.provider
+        )
+        print(f"Generated {len(emitted)} clip suggestions (streamed)")
+
+    def analyze_segment_stream(
+        self,
+        segment_batches: Iterable[List[Dict[str, Any]]],
+        total_duration: float = None,
+        num_clips: int = None,
+        min_duration: int = None,
+        max_duration: int = None,
+        on_progress: Callable[[float], None] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze a transcript while it is still being transcribed, yielding clip
+        suggestions window by window.
+
+        Each window (see _stream_windows) is analyzed as soon as it is complete.
+        Later windows are unknown, so there is no global rerank: once the analysis
+        reaches time t, at most ceil(num_clips * t / total_duration) clips have been
+        yielded (best of each window first, overlaps with yielded clips dropped).
+        Candidates held back by that quota are yielded at the end if clips are
+        still missing. A transcript that fits in a single window goes through
+        analyze_stream once it is complete.
+
+        Args:
+            segment_batches: Transcribed segments, in time order, as they are produced
+            total_duration: Duration of the media (None: no quota, first come first served)
+            on_progress: Called with the transcript time analyzed so far
+        """
+        num_clips = num_clips or NUM_CLIPS_TO_GENERATE
+        min_duration = min_duration or CLIP_MIN_DURATION
+        max_duration = max_duration or CLIP_MAX_DURATION
+        all_segments: List[Dict[str, Any]] = []
+        transcribed = []  # Set once segment_batches is exhausted
+
+        def collect():
+            for batch in segment_batches:
+                all_segments.extend(batch)
+                yield batch
+            transcribed.append(True)
+
+        def single_pass(segments: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            yield from self.analyze_stream({'segments': segments}, num_clips, min_duration, max_duration)
+            if on_progress is not None and segments:
+                on_progress(segments[-1].get('end', 0))
+
+        if not ANALYSIS_MAP_REDUCE_ENABLED:
+            yield from single_pass([s for batch in collect() for s in batch])
+            return
+
+        windows = self._stream_windows(collect())
+        first = next(windows, None)
+        # A window yielded before the end of the transcription is never the only one
+        pending = [first]
+        if transcribed:
+            second = next(windows, None) if first is not None else None
+            if second is None:
+                yield from single_pass(first or [])
+                return
+            pending.append(second)
+
+        step = ANALYSIS_WINDOW_SECONDS - ANALYSIS_WINDOW_OVERLAP_SECONDS
+        expected_windows = (
+            max(2, math.ceil((total_duration - ANALYSIS_WINDOW_OVERLAP_SECONDS) / step))
+            if total_duration else 2
+        )
+        clips_per_window = max(2, min(num_clips, math.ceil(2 * num_clips / expected_windows)))
+        logger.info(
+            "Starting streamed transcript analysis",
+            provider=self.provider,
+            num_clips_requested=num_clips,
+            expected_windows=expected_windows,
+            clips_per_window=clips_per_window
+        )
+
+        emitted: List[Dict[str, Any]] = []
+        held: List[Dict[str, Any]] = []
+        raw_clips: List[Dict[str, Any]] = []
+        errors: List[Exception] = []
+        analyzed = 0
+
+        # Windows are requested as soon as they are complete (up to ANALYSIS_CONCURRENCY
+        # at a time, e.g. when a remote backend delivers the whole transcript at once)
+        # and their clips are released in window order
+        pool = ThreadPoolExecutor(max_workers=ANALYSIS_CONCURRENCY, thread_name_prefix="analysis-window")
+
+        def submit_windows(emit):
+            for window in chain(pending, windows):
+                logger.info(
+                    "Analyzing transcript window",
+                    start=window[0].get('start', 0),
+                    end=window[-1].get('end', 0)
+                )
+                emit((window, pool.submit(self._request_clips, window, clips_per_window, min_duration, max_duration)))
+
+        submitted, _ = run_streaming(submit_windows, name="analysis-windows")
+        try:
+            for window, future in submitted:
+                window_end = window[-1].get('end', 0)
+                analyzed += 1
+                try:
+                    window_raw = future.result()
+                except Exception as e:
+                    logger.error("Window analysis failed", window=analyzed, error=str(e))
+                    errors.append(e)
+                    continue
+                raw_clips.extend(window_raw)
+
+                quota = num_clips
+                if total_duration:
+                    quota = min(num_clips, math.ceil(num_clips * window_end / total_duration))
+                for clip in sorted(self._process_clips(window_raw, min_duration, max_duration), key=self._rank_key):
+                    if any(self._overlaps(clip, other) for other in emitted):
+                        continue
+                    if len(emitted) < quota:
+                        emitted.append(clip)
+                        yield clip
+                    else:
+                        held.append(clip)
+
+                if on_progress is not None:
+                    on_progress(window_end)
+        finally:
+            submitted.close()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if len(errors) == analyzed:
+            raise errors[0]
+
+        for clip in sorted(held, key=self._rank_key):
+            if len(emitted) >= num_clips:
+                break
+            if any(self._overlaps(clip, other) for other in emitted):
+                continue
+            emitted.append(clip)
+            yield clip
+
+        if not emitted:
+            for clip in self._apply_fallbacks([], raw_clips, all_segments, max_duration):
+                emitted.append(clip)
+                yield clip
+
+        logger.info(
+            "Streamed transcript analysis completed",
+            windows=analyzed,
+            failed_windows=len(errors),
+            clips_generated=len(emitted),
+            provider=self.provider
+        )
+        print(f"Generated {len(emitted)} clip suggestions ({analyzed} windows, streamed)")
+
 
 # Quick test
 if __name__ == "__main__":
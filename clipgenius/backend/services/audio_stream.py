@@ -0,0 +1,232 @@
+"""
+ClipGenius - Streaming de Áudio
+Extrai o áudio do vídeo via pipe do FFmpeg (PCM 16 kHz mono) em buffers NumPy,
+para que os backends locais transcrevam enquanto o FFmpeg ainda decodifica.
+
+O WAV em disco passa a ser opcional (AUDIO_KEEP_WAV): quando pedido, é escrito
+a partir do próprio stream, sem uma segunda decodificação.
+"""
+import hashlib
+import queue
+import subprocess
+import threading
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from config import AUDIO_STREAM_CHUNK_SECONDS
+from .metrics import InstrumentedPopen
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+
+# Corte dos chunks: procura o trecho mais silencioso nos últimos segundos do
+# buffer, para não cortar palavras no meio
+_SPLIT_SEARCH_SECONDS = 5.0
+_SPLIT_FRAME_SECONDS = 0.1
+
+# Leitura do pipe em blocos de 1 s (buffers prontos ficam na fila)
+_READ_SECONDS = 1.0
+_QUEUE_SECONDS = 60
+
+
+@dataclass
+class AudioChunk:
+    """Trecho de áudio pronto para transcrição"""
+    offset: float        # Início do trecho no áudio completo (segundos)
+    samples: np.ndarray  # float32 mono 16 kHz, valores em [-1, 1]
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+
+class PCMAudioStream:
+    """
+    Áudio do vídeo lido de um pipe do FFmpeg em chunks de tamanho fixo.
+
+    Uma thread lê o pipe continuamente (o FFmpeg nunca espera a transcrição),
+    calcula o hash do PCM e opcionalmente grava o WAV. A iteração devolve
+    chunks de ~chunk_seconds cortados no ponto mais silencioso do final.
+
+    Uso:
+        stream = PCMAudioStream(video_path)
+        for chunk in stream:
+            transcrever(chunk.samples, offset=chunk.offset)
+        stream.audio_hash, stream.duration
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        chunk_seconds: float = None,
+        wav_path: Optional[str] = None
+    ):
+        self.video_path = Path(video_path)
+        self.chunk_seconds = chunk_seconds or AUDIO_STREAM_CHUNK_SECONDS
+        self.wav_path = Path(wav_path) if wav_path else None
+
+        self._hash = hashlib.sha256()
+        self._total_samples = 0
+        self._finished = False
+
+    @property
+    def audio_hash(self) -> Optional[str]:
+        """SHA-256 do PCM decodificado (disponível ao final do stream)"""
+        return self._hash.hexdigest() if self._finished else None
+
+    @property
+    def duration(self) -> float:
+        """Duração lida até agora (total ao final do stream)"""
+        return self._total_samples / SAMPLE_RATE
+
+    def _command(self):
+        return [
+            'ffmpeg',
+            '-v', 'error',
+            '-i', str(self.video_path),
+            '-vn',
+            '-f', 's16le',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(SAMPLE_RATE),
+            '-ac', '1',
+            'pipe:1'
+        ]
+
+    def _reader(self, process: subprocess.Popen, buffers: queue.Queue, errors: list):
+        """Lê o pipe em blocos, atualiza hash/WAV e publica arrays float32"""
+        read_size = int(_READ_SECONDS * SAMPLE_RATE) * BYTES_PER_SAMPLE
+        wav_file = None
+        pending = b''
+        try:
+            if self.wav_path:
+                wav_file = wave.open(str(self.wav_path), 'wb')
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(BYTES_PER_SAMPLE)
+                wav_file.setframerate(SAMPLE_RATE)
+
+            while True:
+                data = process.stdout.read(read_size)
+                if not data:
+                    break
+                self._hash.update(data)
+                if wav_file is not None:
+                    wav_file.writeframes(data)
+
+                # Manter só amostras completas (read pode devolver bytes ímpares)
+                data = pending + data
+                usable = len(data) - (len(data) % BYTES_PER_SAMPLE)
+                pending = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype='<i2').astype(np.float32) / 32768.0
+                self._total_samples += len(samples)
+                buffers.put(samples)
+
+            process.wait()
+            if process.returncode != 0:
+                stderr = process.stderr.read().decode(errors='replace') if process.stderr else ''
+                errors.append(RuntimeError(f"FFmpeg falhou ao extrair áudio: {stderr.strip()}"))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if wav_file is not None:
+                wav_file.close()
+            buffers.put(None)
+
+    def _split_point(self, buffer: np.ndarray) -> int:
+        """Índice do frame mais silencioso nos últimos segundos do buffer"""
+        frame = int(_SPLIT_FRAME_SECONDS * SAMPLE_RATE)
+        search = min(int(_SPLIT_SEARCH_SECONDS * SAMPLE_RATE), len(buffer) // 4)
+        if search < frame * 2:
+            return len(buffer)
+
+        tail = buffer[len(buffer) - search:]
+        frames = tail[:len(tail) - len(tail) % frame].reshape(-1, frame)
+        energy = np.sqrt(np.mean(frames ** 2, axis=1))
+        quietest = int(np.argmin(energy))
+        return len(buffer) - search + quietest * frame + frame // 2
+
+    def __iter__(self) -> Iterator[AudioChunk]:
+        chunk_samples = int(self.chunk_seconds * SAMPLE_RATE)
+        buffers: queue.Queue = queue.Queue(maxsize=max(1, int(_QUEUE_SECONDS / _READ_SECONDS)))
+        errors: list = []
+
+        try:
+            process = InstrumentedPopen(
+                self._command(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError("ffmpeg não encontrado. Instale o FFmpeg.")
+
+        reader = threading.Thread(target=self._reader, args=(process, buffers, errors), daemon=True)
+        reader.start()
+
+        pending = []
+        pending_samples = 0
+        offset_samples = 0
+        completed = False
+
+        try:
+            while True:
+                samples = buffers.get()
+                if samples is None:
+                    break
+                pending.append(samples)
+                pending_samples += len(samples)
+
+                if pending_samples >= chunk_samples:
+                    buffer = np.concatenate(pending)
+                    split = self._split_point(buffer)
+                    yield AudioChunk(offset=offset_samples / SAMPLE_RATE, samples=buffer[:split])
+                    offset_samples += split
+                    pending = [buffer[split:]]
+                    pending_samples = len(buffer) - split
+
+            if errors:
+                raise errors[0]
+
+            if pending_samples:
+                yield AudioChunk(offset=offset_samples / SAMPLE_RATE, samples=np.concatenate(pending))
+            completed = True
+        finally:
+            if not completed:
+                # Consumidor parou antes do fim: encerrar o FFmpeg e liberar a thread
+                process.kill()
+                while reader.is_alive():
+                    try:
+                        buffers.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+            reader.join()
+            self._finished = completed and not errors
+
+
+def hash_pcm(video_path: str) -> str:
+    """
+    SHA-256 do PCM do vídeo (o mesmo de PCMAudioStream.audio_hash), sem transcrever.
+
+    Só decodifica o áudio: bem mais barato que a transcrição, permite consultar
+    o cache pelo conteúdo antes de transcrever em streaming.
+    """
+    digest = hashlib.sha256()
+    read_size = int(_READ_SECONDS * SAMPLE_RATE) * BYTES_PER_SAMPLE
+    try:
+        process = InstrumentedPopen(
+            PCMAudioStream(video_path)._command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg não encontrado. Instale o FFmpeg.")
+
+    # stderr lido só no fim: com -v error, não enche o pipe
+    for data in iter(lambda: process.stdout.read(read_size), b''):
+        digest.update(data)
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg falhou ao extrair áudio: {stderr.decode(errors='replace').strip()}")
+    return digest.hexdigest()
@@ -0,0 +1,248 @@
+"""
+ClipGenius - Camera Path
+Turns a face track into the path of a virtual camera for reframing.
+
+Works on the FaceTrack arrays directly (no per-sample or per-frame Python
+objects) and only produces keyframes at the sample times; the cutter
+interpolates between them (ffmpeg crop expressions), so no per-frame list is
+ever materialized.
+
+Each shot (track.cuts, see services/shot_detector.py) is planned on its own,
+and the camera jumps at the cut: a hard cut between speakers becomes a hard cut
+of the crop instead of a slow pan across the frame.
+
+Steps (per shot):
+1. Outlier rejection (vectorized): samples far from the rolling median of the
+   track or below REFRAME_MIN_CONFIDENCE are dropped (false positives, a second
+   face for a single sample)
+2. One-Euro filter: adaptive low-pass - heavy smoothing while the face is still,
+   little lag when it moves fast
+3. Dead zone with hysteresis: the camera only starts panning once the face
+   leaves REFRAME_DEAD_ZONE, pans at most REFRAME_MAX_PAN_SPEED and stops once
+   the face is re-centered, so small head movements do not move the crop
+
+Steps 2 and 3 are recursive filters: they run one loop over the samples
+(a few hundred per clip), everything else is NumPy.
+"""
+import math
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from config import (
+    REFRAME_MIN_CONFIDENCE,
+    REFRAME_OUTLIER_THRESHOLD,
+    REFRAME_ONE_EURO_MIN_CUTOFF,
+    REFRAME_ONE_EURO_BETA,
+    REFRAME_DEAD_ZONE,
+    REFRAME_MAX_PAN_SPEED
+)
+from .face_track import FaceTrack
+
+# Default camera center when no face is detected (upper-center)
+DEFAULT_CENTER = (0.5, 0.4)
+
+# Rolling median window of the outlier rejection (samples)
+_MEDIAN_WINDOW = 5
+
+# Camera stops panning once the face is within this fraction of the dead zone
+_SETTLE_RATIO = 0.25
+
+# The previous shot's position is held until this long before a cut (seconds)
+_CUT_EPSILON = 0.001
+
+
+@dataclass
+class CameraPath:
+    """Normalized camera center (0-1) at each keyframe time (seconds, ascending)"""
+    times: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def center(self) -> Tuple[float, float]:
+        """Average camera position (static crop)"""
+        if not len(self):
+            return DEFAULT_CENTER
+        return float(self.x.mean()), float(self.y.mean())
+
+    def at(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Camera position at arbitrary times (linear interpolation, held at the ends)"""
+        times = np.asarray(times, dtype=np.float64)
+        if not len(self):
+            return np.full(times.shape, DEFAULT_CENTER[0]), np.full(times.shape, DEFAULT_CENTER[1])
+        return np.interp(times, self.times, self.x), np.interp(times, self.times, self.y)
+
+    def crop_keyframes(
+        self,
+        source_width: int,
+        source_height: int,
+        target_ratio: float = 9/16
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int, int]:
+        """
+        Pixel crop of each keyframe (vectorized AIReframer.calculate_dynamic_crop).
+
+        Returns:
+            Tuple of (times, crop_x, crop_y, crop_width, crop_height)
+        """
+        if source_width / source_height > target_ratio:
+            crop_height = source_height
+            crop_width = int(source_height * target_ratio)
+        else:
+            crop_width = source_width
+            crop_height = int(source_width / target_ratio)
+
+        crop_x = (self.x * source_width).astype(np.int64) - crop_width // 2
+        crop_y = (self.y * source_height).astype(np.int64) - crop_height // 2
+        crop_x = np.clip(crop_x, 0, source_width - crop_width)
+        crop_y = np.clip(crop_y, 0, source_height - crop_height)
+        return self.times, crop_x, crop_y, crop_width, crop_height
+
+
+def _rolling_median(values: np.ndarray, window: int) -> np.ndarray:
+    pad = window // 2
+    padded = np.pad(values, (pad, pad), mode='edge')
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+
+
+def reject_outliers(
+    track: FaceTrack,
+    threshold: float = None,
+    min_confidence: float = None
+) -> np.ndarray:
+    """
+    Mask of the samples to keep: confident and close to the rolling median.
+
+    Keeps every sample when the mask would drop all of them.
+    """
+    threshold = REFRAME_OUTLIER_THRESHOLD if threshold is None else threshold
+    min_confidence = REFRAME_MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+    keep = track.confidence >= min_confidence
+    if len(track) >= 3:
+        window = min(_MEDIAN_WINDOW, len(track) if len(track) % 2 else len(track) - 1)
+        keep &= np.abs(track.center_x - _rolling_median(track.center_x, window)) <= threshold
+        keep &= np.abs(track.center_y - _rolling_median(track.center_y, window)) <= threshold
+    if not keep.any():
+        return np.ones(len(track), dtype=bool)
+    return keep
+
+
+def _smoothing_factor(dt: np.ndarray, cutoff) -> np.ndarray:
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+def one_euro_filter(
+    times: np.ndarray,
+    values: np.ndarray,
+    min_cutoff: float = None,
+    beta: float = None,
+    d_cutoff: float = 1.0
+) -> np.ndarray:
+    """One-Euro filter of irregularly sampled values (Casiez et al., CHI 2012)"""
+    min_cutoff = REFRAME_ONE_EURO_MIN_CUTOFF if min_cutoff is None else min_cutoff
+    beta = REFRAME_ONE_EURO_BETA if beta is None else beta
+
+    values = np.asarray(values, dtype=np.float64)
+    filtered = values.copy()
+    if len(values) < 2:
+        return filtered
+
+    dt = np.maximum(np.diff(times), 1e-6)
+    alpha_d = _smoothing_factor(dt, d_cutoff)
+    derivative = 0.0
+    for i in range(1, len(values)):
+        rate = (values[i] - filtered[i - 1]) / dt[i - 1]
+        derivative = alpha_d[i - 1] * rate + (1 - alpha_d[i - 1]) * derivative
+        alpha = _smoothing_factor(dt[i - 1], min_cutoff + beta * abs(derivative))
+        filtered[i] = alpha * values[i] + (1 - alpha) * filtered[i - 1]
+    return filtered
+
+
+def dead_zone_follow(
+    times: np.ndarray,
+    target: np.ndarray,
+    dead_zone: float = None,
+    max_speed: float = None
+) -> np.ndarray:
+    """
+    Camera position following `target` with a dead zone and hysteresis.
+
+    The camera holds still until the target is more than `dead_zone` away, then
+    pans towards it (at most `max_speed` per second) until it is within
+    _SETTLE_RATIO of the dead zone again.
+    """
+    dead_zone = REFRAME_DEAD_ZONE if dead_zone is None else dead_zone
+    max_speed = REFRAME_MAX_PAN_SPEED if max_speed is None else max_speed
+
+    camera = np.empty(len(target), dtype=np.float64)
+    if not len(target):
+        return camera
+
+    max_steps = np.diff(times, prepend=times[0]) * max_speed
+    position = float(target[0])
+    panning = False
+    for i in range(len(target)):
+        error = target[i] - position
+        if not panning and abs(error) > dead_zone:
+            panning = True
+        if panning:
+            position += max(-max_steps[i], min(max_steps[i], error))
+            if abs(target[i] - position) <= dead_zone * _SETTLE_RATIO:
+                panning = False
+        camera[i] = position
+    return camera
+
+
+def _plan_shot(track: FaceTrack, follow: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    keep = reject_outliers(track)
+    times = track.timestamps[keep]
+    x = one_euro_filter(times, track.center_x[keep])
+    y = one_euro_filter(times, track.center_y[keep])
+    if follow:
+        x = dead_zone_follow(times, x)
+        y = dead_zone_follow(times, y)
+    return times, x, y
+
+
+def plan_camera_path(track: FaceTrack, follow: bool = True) -> CameraPath:
+    """
+    Camera path of a clip's face track (outliers removed, filtered), planned
+    shot by shot with a jump at each cut.
+
+    Args:
+        follow: Apply the dead zone / pan speed camera logic (dynamic crop);
+                False returns the filtered face path itself
+    """
+    if not len(track):
+        return CameraPath(np.empty(0), np.empty(0), np.empty(0))
+
+    # Contiguous sample ranges of each shot
+    shot_ids = track.shot_ids()
+    bounds = [0] + (np.flatnonzero(np.diff(shot_ids)) + 1).tolist() + [len(track)]
+
+    times_parts, x_parts, y_parts = [], [], []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        end = track.timestamps[hi] if hi < len(track) else np.inf
+        times, x, y = _plan_shot(track.between(track.timestamps[lo], end), follow)
+
+        if times_parts:
+            # Hold the previous shot until the cut, then jump to this one
+            cut = track.cuts[shot_ids[lo] - 1]
+            previous_end = times_parts[-1][-1]
+            if cut - _CUT_EPSILON > previous_end:
+                times_parts.append(np.array([cut - _CUT_EPSILON]))
+                x_parts.append(x_parts[-1][-1:])
+                y_parts.append(y_parts[-1][-1:])
+            if cut < times[0]:
+                times, x, y = np.r_[cut, times], np.r_[x[0], x], np.r_[y[0], y]
+
+        times_parts.append(times)
+        x_parts.append(x)
+        y_parts.append(y)
+
+    return CameraPath(np.concatenate(times_parts), np.concatenate(x_parts), np.concatenate(y_parts))
@@ -0,0 +1,372 @@
+"""
+ClipGenius - Parallel Clip Renderer
+Renders the clips of the cut stage (cut + AI reframe + subtitles) in a process pool.
+
+Each clip spawns its own libx264 encode, so clips are rendered in RENDER_WORKERS
+parallel processes with FFMPEG_THREADS threads each instead of one after another.
+With BATCH_CUT_ENABLED, nearby clips are grouped and each group is cut from a
+single decode of the source (VideoCutter.cut_clips_batch).
+
+render_stream() accepts tasks that are still being produced (clips streamed
+by the analyzer), so rendering starts before the full clip list is known.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import (
+    ENABLE_AI_REFRAME,
+    REFRAME_SAMPLE_INTERVAL,
+    REFRAME_DYNAMIC_MODE,
+    RENDER_WORKERS,
+    FFMPEG_THREADS,
+    BATCH_CUT_ENABLED
+)
+from logging_config import get_service_logger
+from .metrics import span
+
+logger = get_service_logger("clip_renderer")
+
+# Service instances of the current process (one set per pool process)
+_services: Dict[str, Any] = {}
+
+
+def _get_services() -> Dict[str, Any]:
+    """Lazily create the cutting services in the current process"""
+    if not _services:
+        from .cutter import VideoCutter
+        from .reframer import AIReframer
+        from .subtitler_v2 import SubtitleGeneratorV2
+
+        _services['cutter'] = VideoCutter()
+        _services['reframer'] = AIReframer()
+        _services['subtitler'] = SubtitleGeneratorV2()
+    return _services
+
+
+def _init_render_process():
+    """Pool process initializer: silence the config summary and warm up services"""
+    os.environ["CLIPGENIUS_PRINT_CONFIG"] = "false"
+    _get_services()
+
+
+def cut_clip_with_optional_reframe(
+    video_path: str,
+    start_time: float,
+    end_time: float,
+    output_name: str,
+    enable_reframe: bool = ENABLE_AI_REFRAME,
+    threads: int = None
+) -> dict:
+    """
+    Cut a clip with optional AI reframing (face tracking).
+    Falls back to center crop if reframe is disabled or fails.
+    """
+    services = _get_services()
+
+    if enable_reframe:
+        try:
+            if REFRAME_DYNAMIC_MODE:
+                # Frame-by-frame tracking (slower but smoother)
+                return services['reframer'].cut_clip_with_dynamic_tracking(
+                    video_path=video_path,
+                    start_time=start_time,
+                    end_time=end_time,
+                    output_name=output_name,
+                    sample_interval=REFRAME_SAMPLE_INTERVAL,
+                    threads=threads
+                )
+            else:
+                # Static tracking (faster, uses average face position)
+                return services['reframer'].cut_clip_with_tracking(
+                    video_path=video_path,
+                    start_time=start_time,
+                    end_time=end_time,
+                    output_name=output_name,
+                    enable_tracking=True,
+                    sample_interval=REFRAME_SAMPLE_INTERVAL,
+                    threads=threads
+                )
+        except Exception as e:
+            logger.warning("AI Reframe failed, falling back to center crop", error=str(e))
+            print(f"AI Reframe failed, falling back to center crop: {e}")
+
+    # Fallback to simple center crop
+    return services['cutter'].cut_clip(
+        video_path=video_path,
+        start_time=start_time,
+        end_time=end_time,
+        output_name=output_name,
+        convert_to_vertical=True,
+        threads=threads
+    )
+
+
+def _subtitle_clip(task: Dict[str, Any], clip_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate subtitles of a rendered clip (without burning - for layer system)"""
+    words = task.get('words') or []
+    if not words:
+        return {}
+    return _get_services()['subtitler'].create_subtitled_clip(
+        video_path=clip_result['video_path'],
+        words=words,
+        clip_start_time=task['start_time'],
+        output_name=task['output_name'],
+        burn_subtitles=False  # Don't burn - use layer system
+    )
+
+
+def render_clip(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render a single clip: cut (with optional reframe) and generate subtitles.
+
+    Args:
+        task: Dict with index, video_path, start_time, end_time, output_name,
+              words (transcription words of the clip), enable_reframe, threads
+
+    Returns:
+        Dict with index, clip_result and subtitle_result
+    """
+    with span("render", clip=task['output_name']):
+        clip_result = cut_clip_with_optional_reframe(
+            video_path=task['video_path'],
+            start_time=task['start_time'],
+            end_time=task['end_time'],
+            output_name=task['output_name'],
+            enable_reframe=task.get('enable_reframe', ENABLE_AI_REFRAME),
+            threads=task.get('threads')
+        )
+
+        return {
+            'index': task['index'],
+            'clip_result': clip_result,
+            'subtitle_result': _subtitle_clip(task, clip_result)
+        }
+
+
+def render_clip_group(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Render a group of nearby clips of the same source from a single decode.
+
+    Static reframe only (crops are computed per clip, then one split/trim
+    filter graph cuts them all); falls back to center crop like
+    cut_clip_with_optional_reframe.
+
+    Returns:
+        List of render_clip results, in the order of `tasks`
+    """
+    if len(tasks) == 1:
+        return [render_clip(tasks[0])]
+
+    with span("render", clips=len(tasks)):
+        services = _get_services()
+        video_path = tasks[0]['video_path']
+        threads = tasks[0].get('threads')
+        clips = [
+            {
+                'start_time': task['start_time'],
+                'end_time': task['end_time'],
+                'output_name': task['output_name']
+            }
+            for task in tasks
+        ]
+
+        clip_results = None
+        if tasks[0].get('enable_reframe', ENABLE_AI_REFRAME):
+            try:
+                clip_results = services['reframer'].cut_clips_with_tracking(
+                    video_path,
+                    clips,
+                    enable_tracking=True,
+                    sample_interval=REFRAME_SAMPLE_INTERVAL,
+                    threads=threads
+                )
+            except Exception as e:
+                logger.warning("AI Reframe failed, falling back to center crop", error=str(e))
+                print(f"AI Reframe failed, falling back to center crop: {e}")
+
+        if clip_results is None:
+            clip_results = services['cutter'].cut_clips_batch(video_path, clips, threads=threads)
+
+        return [
+            {
+                'index': task['index'],
+                'clip_result': clip_result,
+                'subtitle_result': _subtitle_clip(task, clip_result)
+            }
+            for task, clip_result in zip(tasks, clip_results)
+        ]
+
+
+def compute_face_track(video_path: str) -> int:
+    """
+    Detect faces over the whole video and store the shared face track
+    (services/face_track.py), so the clip renders only slice it.
+
+    Returns:
+        Number of samples with a face (0 when face detection is unavailable)
+    """
+    from .face_track import face_track_store
+
+    reframer = _get_services()['reframer']
+    if reframer.face_detector is None:
+        return 0
+    with span("face_track"):
+        track = face_track_store.get_or_compute(video_path, REFRAME_SAMPLE_INTERVAL, reframer.detect_face_track)
+    return len(track)
+
+
+class ClipRenderPool:
+    """
+    Process pool that renders clips in parallel.
+
+    The pool is created on first use and kept alive, so the services
+    (MediaPipe model, etc.) are loaded once per pool process, not per job.
+    """
+
+    def __init__(self, workers: int = None, ffmpeg_threads: int = None):
+        self.workers = max(1, workers or RENDER_WORKERS)
+        self.ffmpeg_threads = ffmpeg_threads or FFMPEG_THREADS
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info("Starting clip render pool", workers=self.workers, ffmpeg_threads=self.ffmpeg_threads)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_process
+            )
+        return self._executor
+
+    def _group_tasks(self, tasks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split tasks into single-decode groups (one group per clip when batching is off)"""
+        batchable = BATCH_CUT_ENABLED and not any(
+            task.get('enable_reframe', ENABLE_AI_REFRAME) and REFRAME_DYNAMIC_MODE
+            for task in tasks
+        )
+        if not batchable or len({task['video_path'] for task in tasks}) > 1:
+            return [[task] for task in tasks]
+
+        from .cutter import VideoCutter
+        groups = VideoCutter().plan_batch_groups(tasks)
+        return [[tasks[i] for i in group] for group in groups]
+
+    def render(self, tasks: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Render clips, yielding each result as soon as it is finished
+        (completion order, not submission order - use result['index']).
+
+        Raises the first render error after cancelling pending clips.
+        """
+        for task in tasks:
+            task.setdefault('threads', self.ffmpeg_threads)
+
+        groups = self._group_tasks(tasks)
+
+        # Single worker: render inline, no pool overhead
+        if self.workers == 1 or len(groups) <= 1:
+            for group in groups:
+                yield from render_clip_group(group)
+            return
+
+        executor = self._get_executor()
+        futures = [executor.submit(render_clip_group, group) for group in groups]
+        try:
+            for future in as_completed(futures):
+                yield from future.result()
+        except BrokenProcessPool:
+            # A pool process died (e.g. OOM) - recreate the pool next time
+            logger.error("Clip render pool broken, it will be recreated")
+            self._executor = None
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def render_stream(self, tasks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Render clips from an iterable that is consumed while rendering
+        (e.g. suggestions streamed by the LLM), yielding results in completion order.
+
+        The iterable is read in a feeder thread; each task is submitted as soon
+        as it is produced (no batch grouping - the following clips are unknown).
+        An error raised by the iterable is re-raised after the clips already
+        submitted are rendered; a render error cancels the pending clips.
+        """
+        executor = self._get_executor()
+        done: "queue.Queue[Any]" = queue.Queue()
+        futures: List[Future] = []
+        stop = threading.Event()
+        feed_end = object()
+        feed_error: List[BaseException] = []
+
+        def feed():
+            try:
+                for task in tasks:
+                    if stop.is_set():
+                        break
+                    task.setdefault('threads', self.ffmpeg_threads)
+                    future = executor.submit(render_clip_group, [task])
+                    futures.append(future)
+                    future.add_done_callback(done.put)
+            except BaseException as e:
+                feed_error.append(e)
+            finally:
+                done.put(feed_end)
+
+        feeder = threading.Thread(target=feed, name="clip-render-feeder", daemon=True)
+        feeder.start()
+
+        finished = 0
+        feeding = True
+        try:
+            while feeding or finished < len(futures):
+                item = done.get()
+                if item is feed_end:
+                    feeding = False
+                    continue
+                finished += 1
+                yield from item.result()
+        except BrokenProcessPool:
+            logger.error("Clip render pool broken, it will be recreated")
+            self._executor = None
+            raise
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+        feeder.join()
+        if feed_error:
+            raise feed_error[0]
+
+    def prepare_face_track(self, video_path: str) -> Future:
+        """
+        Start the whole-video face detection in a pool process, ahead of the
+        renders that need it (they wait for it instead of detecting their range).
+        """
+        future = self._get_executor().submit(compute_face_track, video_path)
+
+        def log_result(done: Future):
+            if done.cancelled():
+                return
+            if done.exception() is not None:
+                logger.warning("Face track precomputation failed", video_path=video_path, error=str(done.exception()))
+
+        future.add_done_callback(log_result)
+        return future
+
+    def shutdown(self):
+        """Stop the pool processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Shared instance (one pool per worker process)
+clip_render_pool = ClipRenderPool()
@@ -5,7 +5,14 @@ Cuts video clips using FFmpeg with multiple output format support
 import subprocess
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
-from config import CLIPS_DIR, OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT
+from config import (
+    CLIPS_DIR,
+    OUTPUT_FORMATS,
+    DEFAULT_OUTPUT_FORMAT,
+    BATCH_CUT_MAX_OUTPUTS,
+    BATCH_CUT_MAX_GAP
+)
+from .metrics import instrumented_run
 
 
 class VideoCutter:
@@ -51,7 +58,7 @@ class VideoCutter:
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
+            result = instrumented_run(cmd, capture_output=True, text=True, check=True, timeout=30)
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if e.stderr else str(e)
             raise RuntimeError(f"Erro ao obter dimensões do vídeo: {error_msg}")
@@ -138,7 +145,8 @@ class VideoCutter:
         output_name: str,
         convert_to_vertical: bool = True,
         target_resolution: Tuple[int, int] = (1080, 1920),
-        output_format: str = None
+        output_format: str = None,
+        threads: int = None
     ) -> Dict[str, Any]:
         """
         Cut a clip from video with configurable output format
@@ -151,6 +159,7 @@ class VideoCutter:
             convert_to_vertical: Convert to target format (legacy param, use output_format instead)
             target_resolution: Target resolution (width, height) - overridden by output_format
             output_format: Format ID ("vertical", "square", "landscape", "portrait")
+            threads: FFmpeg thread count (None = FFmpeg default, all cores)
 
         Returns:
             Dict with clip info and output path
@@ -216,6 +225,10 @@ class VideoCutter:
                 '-c', 'copy',
             ])
 
+        if threads:
+            # Limit threads when several clips are rendered in parallel
+            cmd.extend(['-threads', str(threads)])
+
         cmd.extend([
             '-y',  # Overwrite
             str(output_path)
@@ -224,7 +237,7 @@ class VideoCutter:
         print(f"Cutting clip ({format_name}): {start_time:.1f}s - {end_time:.1f}s -> {output_path}")
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            instrumented_run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             # Clean up partial file on failure
             if output_path.exists():
@@ -320,7 +333,7 @@ class VideoCutter:
         print(f"Fast cutting clip: {start_time:.1f}s - {end_time:.1f}s")
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            instrumented_run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             # Clean up partial file on failure
             if output_path.exists():
@@ -340,6 +353,274 @@ class VideoCutter:
         }
 
 
+    # ========== Batch cut (single decode for several clips) ==========
+
+    def has_audio_stream(self, video_path: str) -> bool:
+        """Check if the video has an audio stream using ffprobe"""
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'a',
+            '-show_entries', 'stream=index',
+            '-of', 'csv=p=0',
+            str(video_path)
+        ]
+        try:
+            result = instrumented_run(cmd, capture_output=True, text=True, check=True, timeout=30)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            return True  # Assume audio, as the per-clip commands do
+        return bool(result.stdout.strip())
+
+    def plan_batch_groups(
+        self,
+        clips: List[Dict[str, Any]],
+        max_outputs: int = None,
+        max_gap: float = None
+    ) -> List[List[int]]:
+        """
+        Group clips that are worth cutting from a single decode.
+
+        Clips are sorted by start time and a new group starts when the next clip
+        begins more than `max_gap` seconds after the end of the group (decoding
+        the gap would cost more than a separate seek) or the group is full.
+
+        Args:
+            clips: List of dicts with start_time and end_time
+            max_outputs: Max clips per group (default: BATCH_CUT_MAX_OUTPUTS)
+            max_gap: Max gap in seconds between clips of a group (default: BATCH_CUT_MAX_GAP)
+
+        Returns:
+            List of groups, each a list of indexes into `clips`
+        """
+        max_outputs = max(1, max_outputs or BATCH_CUT_MAX_OUTPUTS)
+        max_gap = BATCH_CUT_MAX_GAP if max_gap is None else max_gap
+
+        order = sorted(range(len(clips)), key=lambda i: clips[i]['start_time'])
+        groups: List[List[int]] = []
+        group_end = None
+
+        for i in order:
+            clip = clips[i]
+            if (
+                groups
+                and len(groups[-1]) < max_outputs
+                and clip['start_time'] <= group_end + max_gap
+            ):
+                groups[-1].append(i)
+                group_end = max(group_end, clip['end_time'])
+            else:
+                groups.append([i])
+                group_end = clip['end_time']
+
+        return groups
+
+    def build_batch_command(
+        self,
+        video_path: str,
+        clips: List[Dict[str, Any]],
+        target_resolution: Tuple[int, int],
+        has_audio: bool = True,
+        threads: int = None
+    ) -> Tuple[List[str], List[Path]]:
+        """
+        Build one FFmpeg command that cuts all `clips` with a split/trim filter graph.
+
+        The source is seeked once to the first clip and decoded once; every
+        clip gets its own branch (trim -> crop -> scale) and output file.
+
+        Args:
+            video_path: Path to source video
+            clips: List of dicts with start_time, end_time, output_name and
+                   crop (crop_w, crop_h, x_offset, y_offset)
+            target_resolution: Output resolution (width, height)
+            has_audio: Source has an audio stream
+            threads: Thread count of the filter graph and of each output's
+                     encoder (None = FFmpeg default, all cores)
+
+        Returns:
+            Tuple of (command, output paths in the order of `clips`)
+        """
+        base = min(c['start_time'] for c in clips)
+        span = max(c['end_time'] for c in clips) - base
+        count = len(clips)
+        target_w, target_h = target_resolution
+
+        video_labels = ''.join(f"[v{i}]" for i in range(count))
+        graph = [f"[0:v]split={count}{video_labels}"]
+        if has_audio:
+            audio_labels = ''.join(f"[a{i}]" for i in range(count))
+            graph.append(f"[0:a]asplit={count}{audio_labels}")
+
+        for i, clip in enumerate(clips):
+            # Trim times are relative to the input seek point
+            start = clip['start_time'] - base
+            end = clip['end_time'] - base
+            crop_w, crop_h, x_off, y_off = clip['crop']
+            graph.append(
+                f"[v{i}]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS,"
+                f"crop={crop_w}:{crop_h}:{x_off}:{y_off},scale={target_w}:{target_h}[vo{i}]"
+            )
+            if has_audio:
+                graph.append(
+                    f"[a{i}]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[ao{i}]"
+                )
+
+        cmd = ['ffmpeg']
+        if threads:
+            # Global option: threads of the shared split/trim graph
+            cmd.extend(['-filter_complex_threads', str(threads)])
+        cmd.extend([
+            '-ss', str(base),  # Seek once, before input (faster)
+            '-t', str(span),
+            '-i', str(video_path),
+            '-filter_complex', ';'.join(graph),
+        ])
+
+        output_paths = []
+        for i, clip in enumerate(clips):
+            output_path = self.clips_dir / f"{clip['output_name']}.mp4"
+            output_paths.append(output_path)
+            cmd.extend(['-map', f"[vo{i}]"])
+            if has_audio:
+                cmd.extend(['-map', f"[ao{i}]"])
+            cmd.extend([
+                '-c:v', 'libx264',
+                '-preset', 'fast',
+                '-crf', '23',
+            ])
+            if threads:
+                # Output option: applies to this output's encoder only
+                cmd.extend(['-threads', str(threads)])
+            if has_audio:
+                cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+            cmd.extend(['-y', str(output_path)])
+
+        return cmd, output_paths
+
+    def cut_clips_batch(
+        self,
+        video_path: str,
+        clips: List[Dict[str, Any]],
+        target_resolution: Tuple[int, int] = (1080, 1920),
+        output_format: str = None,
+        threads: int = None,
+        max_outputs: int = None,
+        max_gap: float = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Cut several clips from the source with as few decodes as possible
+
+        Nearby/overlapping clips (see plan_batch_groups) are cut by a single
+        FFmpeg invocation; isolated clips, and the clips of a group whose batch
+        command fails, fall back to one call per clip.
+
+        Args:
+            video_path: Path to source video
+            clips: List of dicts with start_time, end_time, output_name and an
+                   optional crop tuple (crop_w, crop_h, x_offset, y_offset);
+                   clips without crop use the center crop of the output format
+            target_resolution: Target resolution (width, height) - overridden by output_format
+            output_format: Format ID ("vertical", "square", "landscape", "portrait")
+            threads: FFmpeg thread count (None = FFmpeg default, all cores)
+            max_outputs: Max clips per FFmpeg invocation (default: BATCH_CUT_MAX_OUTPUTS)
+            max_gap: Max gap in seconds between batched clips (default: BATCH_CUT_MAX_GAP)
+
+        Returns:
+            List of clip info dicts (same format as cut_clip), in the order of `clips`
+        """
+        if not clips:
+            return []
+
+        fmt_config = self.get_format_config(output_format or DEFAULT_OUTPUT_FORMAT)
+        if output_format:
+            target_resolution = fmt_config["resolution"]
+        format_id = output_format or DEFAULT_OUTPUT_FORMAT
+
+        width, height = self.get_video_dimensions(str(video_path))
+        center_crop = self.calculate_crop(width, height, fmt_config["aspect_ratio"])
+        has_audio = self.has_audio_stream(str(video_path))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(clips)
+
+        for group in self.plan_batch_groups(clips, max_outputs, max_gap):
+            group_clips = [
+                {**clips[i], 'crop': tuple(clips[i].get('crop') or center_crop)}
+                for i in group
+            ]
+
+            if len(group_clips) > 1:
+                try:
+                    group_results = self._run_batch(
+                        video_path, group_clips, target_resolution, has_audio, threads, format_id
+                    )
+                    for i, result in zip(group, group_results):
+                        results[i] = result
+                    continue
+                except RuntimeError as e:
+                    print(f"Batch cut failed, falling back to per-clip cuts: {e}")
+
+            # Per-clip calls (isolated clip or failed batch)
+            for i, clip in zip(group, group_clips):
+                results[i] = self._run_batch(
+                    video_path, [clip], target_resolution, has_audio, threads, format_id
+                )[0]
+
+        return results
+
+    def _run_batch(
+        self,
+        video_path: str,
+        clips: List[Dict[str, Any]],
+        target_resolution: Tuple[int, int],
+        has_audio: bool,
+        threads: Optional[int],
+        format_id: str
+    ) -> List[Dict[str, Any]]:
+        """Run a batch command and return the clip infos (cleans up all outputs on failure)"""
+        cmd, output_paths = self.build_batch_command(
+            video_path, clips, target_resolution, has_audio, threads
+        )
+
+        print(
+            f"Batch cutting {len(clips)} clip(s): "
+            f"{min(c['start_time'] for c in clips):.1f}s - {max(c['end_time'] for c in clips):.1f}s"
+        )
+
+        try:
+            instrumented_run(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            for output_path in output_paths:
+                if output_path.exists():
+                    try:
+                        output_path.unlink()
+                    except Exception:
+                        pass
+            error_msg = e.stderr.decode() if e.stderr else str(e)
+            print(f"FFmpeg batch cut error: {error_msg}")
+            raise RuntimeError(f"Failed to cut clips: {error_msg}")
+
+        results = []
+        for clip, output_path in zip(clips, output_paths):
+            if not output_path.exists():
+                raise RuntimeError(f"FFmpeg completed but output file not found: {output_path}")
+            crop_w, crop_h, x_off, y_off = clip['crop']
+            results.append({
+                'video_path': str(output_path),
+                'start_time': clip['start_time'],
+                'end_time': clip['end_time'],
+                'duration': clip['end_time'] - clip['start_time'],
+                'format': format_id,
+                'resolution': target_resolution,
+                'crop_info': {
+                    'x': x_off,
+                    'y': y_off,
+                    'width': crop_w,
+                    'height': crop_h
+                }
+            })
+        return results
+
+
 # Quick test
 if __name__ == "__main__":
     cutter = VideoCutter()
@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any, Callable
 import yt_dlp
 from config import (
     VIDEOS_DIR,
+    AUDIO_DIR,
     MAX_VIDEO_DURATION,
     DOWNLOAD_MAX_RETRIES,
     DOWNLOAD_RETRY_DELAY
@@ -23,6 +24,7 @@ class YouTubeDownloader:
 
     def __init__(self):
         self.videos_dir = VIDEOS_DIR
+        self.audio_dir = AUDIO_DIR
         self.max_retries = DOWNLOAD_MAX_RETRIES
         self.retry_delay = DOWNLOAD_RETRY_DELAY
         self._progress_callback: Optional[Callable[[Dict], None]] = None
@@ -70,13 +72,14 @@ class YouTubeDownloader:
                 else:
                     raise
 
-    def _get_download_options(self, output_path: Path, quality: str = "720") -> Dict[str, Any]:
+    def _get_download_options(self, output_path: Path, quality: str = "720", audio_only: bool = False) -> Dict[str, Any]:
         """
         Build yt-dlp options optimized for reliability and performance
 
         Args:
             output_path: Path to save the video
             quality: Max video height (360, 480, 720, 1080). Default 720p is enough for vertical clips.
+            audio_only: Download only the audio track (kept in its original container)
         """
         # Format selection: limit quality to save time/bandwidth
         # For 9:16 clips at 1080x1920, source 720p is more than enough
@@ -86,12 +89,14 @@ class YouTubeDownloader:
             f'best[height<={quality}]/'
             'best'
         )
+        if audio_only:
+            format_str = 'bestaudio[ext=m4a]/bestaudio/best'
 
         return {
             # Format and output
             'format': format_str,
-            'outtmpl': str(output_path.with_suffix('')),
-            'merge_output_format': 'mp4',
+            'outtmpl': str(output_path.with_suffix('')) + ('.%(ext)s' if audio_only else ''),
+            'merge_output_format': None if audio_only else 'mp4',
 
             # Logging
             'quiet': False,
@@ -166,7 +171,32 @@ class YouTubeDownloader:
 
         output_path = self.videos_dir / f"{video_id}.mp4"
         ydl_opts = self._get_download_options(output_path, quality)
+        return self._download_with_retries(url, ydl_opts, output_path)
 
+    def download_audio(self, url: str, video_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Download only the audio track (a few MB even for long videos).
+
+        Used by the pipelined processing: transcription starts from the audio
+        while the video itself is still downloading.
+
+        Returns:
+            Dict with video info and the audio file path (in 'audio_path')
+        """
+        if not video_id:
+            video_id = self.extract_video_id(url)
+
+        if not video_id:
+            raise ValueError(f"Invalid YouTube URL: {url}")
+
+        output_path = self.audio_dir / f"{video_id}_source.m4a"
+        ydl_opts = self._get_download_options(output_path, audio_only=True)
+        info = self._download_with_retries(url, ydl_opts, output_path)
+        info['audio_path'] = info.pop('video_path')
+        return info
+
+    def _download_with_retries(self, url: str, ydl_opts: Dict[str, Any], output_path: Path) -> Dict[str, Any]:
+        """Run yt-dlp with retry; returns video info and the downloaded file path"""
         last_error = None
 
         for attempt in range(self.max_retries):
@@ -182,7 +212,10 @@ class YouTubeDownloader:
                     actual_path = output_path
                     if not actual_path.exists():
                         # Try finding with yt-dlp naming
-                        possible_paths = list(self.videos_dir.glob(f"{video_id}.*"))
+                        possible_paths = [
+                            p for p in output_path.parent.glob(f"{output_path.stem}.*")
+                            if p.suffix not in ('.part', '.ytdl')
+                        ]
                         mp4_paths = [p for p in possible_paths if p.suffix == '.mp4']
                         if mp4_paths:
                             actual_path = mp4_paths[0]
@@ -2,7 +2,6 @@
 ClipGenius - Video Editor Service
 Provides video editing capabilities: trim, subtitle editing, text overlays, filters
 """
-import subprocess
 import json
 import os
 from pathlib import Path
@@ -10,6 +9,7 @@ from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 
 from config import VIDEOS_DIR, CLIPS_DIR
+from .metrics import instrumented_run
 
 
 @dataclass
@@ -72,7 +72,7 @@ class VideoEditor:
             video_path
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"Failed to get video info: {result.stderr}")
 
@@ -151,7 +151,7 @@ class VideoEditor:
             str(output_path)
         ])
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"FFmpeg trim failed: {result.stderr}")
 
@@ -204,7 +204,7 @@ class VideoEditor:
             str(output_path)
         ])
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"FFmpeg filter failed: {result.stderr}")
 
@@ -278,7 +278,7 @@ class VideoEditor:
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"FFmpeg text overlay failed: {result.stderr}")
 
@@ -335,7 +335,7 @@ class VideoEditor:
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"FFmpeg subtitle burn failed: {result.stderr}")
 
@@ -490,7 +490,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             str(output_path)
         ])
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
 
         # Clean up temp subtitle file
         if temp_subtitle_path and temp_subtitle_path.exists():
@@ -536,7 +536,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             str(output_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise Exception(f"FFmpeg preview failed: {result.stderr}")
 
@@ -0,0 +1,258 @@
+"""
+ClipGenius - Face Track Store
+Whole-video face track computed once per source video and shared by all clips.
+
+Reframing a clip used to re-open the source and detect faces over the clip's
+own range, so overlapping clips had the same frames analyzed again and every
+clip paid for its own decode. The track is now computed in a single pass over
+the whole video (at REFRAME_SAMPLE_INTERVAL) and each clip slices its range.
+
+Tracks are stored as compact NumPy arrays (timestamp, cx, cy, w, h, conf, plus
+the shot cut times) in a sidecar .npz file under FACE_TRACK_DIR, keyed by the video file identity
+(path, size, mtime) and the sampling settings. A lock file makes concurrent
+render processes wait for the pass in progress instead of starting their own.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - no cross-process lock, worst case a duplicated pass
+    fcntl = None
+
+from config import (
+    FACE_TRACK_DIR,
+    REFRAME_DETECT_WIDTH,
+    REFRAME_SHOT_DETECTION,
+    REFRAME_SHOT_CUT_THRESHOLD,
+    REFRAME_STATIC_THRESHOLD
+)
+from logging_config import get_service_logger
+
+logger = get_service_logger("face_track")
+
+# Bump when the detection output changes (invalidates existing sidecars)
+TRACK_VERSION = 2
+
+# Tracks kept in memory per process (each is a few hundred KB at most)
+_MEMORY_TRACKS = 4
+
+
+@dataclass
+class FaceTrack:
+    """Face detections of a whole video, one row per sample with a face"""
+    timestamps: np.ndarray   # float64 seconds, ascending
+    frame_nums: np.ndarray   # int32
+    center_x: np.ndarray     # float32, normalized 0-1
+    center_y: np.ndarray     # float32, normalized 0-1
+    width: np.ndarray        # float32, normalized face width
+    height: np.ndarray       # float32, normalized face height
+    confidence: np.ndarray   # float32
+    sample_interval: float
+    # Start times of the shots after a hard cut (float64 seconds, ascending)
+    cuts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+
+    @classmethod
+    def from_positions(cls, positions: list, sample_interval: float, cuts=()) -> "FaceTrack":
+        """Build a track from FacePosition objects"""
+        return cls(
+            timestamps=np.array([p.timestamp for p in positions], dtype=np.float64),
+            frame_nums=np.array([p.frame_num for p in positions], dtype=np.int32),
+            center_x=np.array([p.center_x for p in positions], dtype=np.float32),
+            center_y=np.array([p.center_y for p in positions], dtype=np.float32),
+            width=np.array([p.width for p in positions], dtype=np.float32),
+            height=np.array([p.height for p in positions], dtype=np.float32),
+            confidence=np.array([p.confidence for p in positions], dtype=np.float32),
+            sample_interval=sample_interval,
+            cuts=np.array(cuts, dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def between(self, start_time: float, end_time: float) -> "FaceTrack":
+        """Samples in [start_time, end_time) as a track (array views, no copies)"""
+        lo, hi = np.searchsorted(self.timestamps, [start_time, end_time], side='left')
+        cut_lo, cut_hi = np.searchsorted(self.cuts, [start_time, end_time], side='left')
+        return FaceTrack(
+            timestamps=self.timestamps[lo:hi],
+            frame_nums=self.frame_nums[lo:hi],
+            center_x=self.center_x[lo:hi],
+            center_y=self.center_y[lo:hi],
+            width=self.width[lo:hi],
+            height=self.height[lo:hi],
+            confidence=self.confidence[lo:hi],
+            sample_interval=self.sample_interval,
+            cuts=self.cuts[cut_lo:cut_hi]
+        )
+
+    def shot_ids(self) -> np.ndarray:
+        """Shot index of each sample (0 before the first cut of the track)"""
+        return np.searchsorted(self.cuts, self.timestamps, side='right')
+
+    def positions(self) -> list:
+        """All samples as FacePosition objects"""
+        return self.slice(-np.inf, np.inf)
+
+    def slice(self, start_time: float, end_time: float) -> list:
+        """FacePosition objects of the samples in [start_time, end_time)"""
+        from .reframer import FacePosition
+
+        clip = self.between(start_time, end_time)
+        return [
+            FacePosition(
+                frame_num=int(clip.frame_nums[i]),
+                timestamp=float(clip.timestamps[i]),
+                center_x=float(clip.center_x[i]),
+                center_y=float(clip.center_y[i]),
+                width=float(clip.width[i]),
+                height=float(clip.height[i]),
+                confidence=float(clip.confidence[i])
+            )
+            for i in range(len(clip))
+        ]
+
+    def save(self, path: Path) -> None:
+        """Write the sidecar atomically (readers never see a partial file)"""
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(
+            tmp_path,
+            timestamps=self.timestamps,
+            frame_nums=self.frame_nums,
+            center_x=self.center_x,
+            center_y=self.center_y,
+            width=self.width,
+            height=self.height,
+            confidence=self.confidence,
+            sample_interval=np.float64(self.sample_interval),
+            cuts=self.cuts
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FaceTrack":
+        with np.load(path) as data:
+            return cls(
+                timestamps=data['timestamps'],
+                frame_nums=data['frame_nums'],
+                center_x=data['center_x'],
+                center_y=data['center_y'],
+                width=data['width'],
+                height=data['height'],
+                confidence=data['confidence'],
+                sample_interval=float(data['sample_interval']),
+                cuts=data['cuts']
+            )
+
+
+class FaceTrackStore:
+    """Sidecar files of whole-video face tracks, with a small in-process cache"""
+
+    def __init__(self, track_dir: Path = None):
+        self.track_dir = Path(track_dir or FACE_TRACK_DIR)
+        self.track_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: "OrderedDict[str, FaceTrack]" = OrderedDict()
+
+    def sidecar_path(self, video_path: str, sample_interval: float) -> Path:
+        """Sidecar of a video file for the given sampling (changes if the file changes)"""
+        stat = os.stat(video_path)
+        identity = json.dumps([
+            str(Path(video_path).resolve()), stat.st_size, stat.st_mtime_ns,
+            round(sample_interval, 6), REFRAME_DETECT_WIDTH, TRACK_VERSION,
+            REFRAME_SHOT_DETECTION, REFRAME_SHOT_CUT_THRESHOLD, REFRAME_STATIC_THRESHOLD
+        ])
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        return self.track_dir / f"{Path(video_path).stem}.{digest}.npz"
+
+    def _remember(self, key: str, track: FaceTrack) -> FaceTrack:
+        self._memory[key] = track
+        self._memory.move_to_end(key)
+        while len(self._memory) > _MEMORY_TRACKS:
+            self._memory.popitem(last=False)
+        return track
+
+    def get(self, video_path: str, sample_interval: float) -> Optional[FaceTrack]:
+        """Stored track of a video, or None if it was not computed yet"""
+        path = self.sidecar_path(video_path, sample_interval)
+        key = str(path)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if not path.exists():
+            return None
+        try:
+            return self._remember(key, FaceTrack.load(path))
+        except Exception as e:
+            logger.warning("Unreadable face track, recomputing", path=key, error=str(e))
+            return None
+
+    def get_or_compute(
+        self,
+        video_path: str,
+        sample_interval: float,
+        detect: Callable[[str, float], FaceTrack]
+    ) -> FaceTrack:
+        """
+        Stored track of a video, computing it first if needed.
+
+        Args:
+            detect: detect(video_path, sample_interval) -> FaceTrack of the whole
+                    video (AIReframer.detect_face_track)
+        """
+        track = self.get(video_path, sample_interval)
+        if track is not None:
+            return track
+
+        path = self.sidecar_path(video_path, sample_interval)
+        lock_path = path.with_suffix(".lock")
+        with open(lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another process may have finished the pass while we waited
+                track = self.get(video_path, sample_interval)
+                if track is not None:
+                    return track
+
+                started = time.time()
+                track = detect(video_path, sample_interval)
+                track.save(path)
+                logger.info(
+                    "Face track computed",
+                    video=Path(video_path).name,
+                    samples_with_face=len(track),
+                    shot_cuts=len(track.cuts),
+                    sample_interval=sample_interval,
+                    duration_seconds=round(time.time() - started, 2)
+                )
+                return self._remember(str(path), track)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def delete(self, video_path: str) -> int:
+        """Remove every sidecar of a video (all sampling settings). Returns files removed."""
+        removed = 0
+        stem = Path(video_path).stem
+        for path in list(self.track_dir.glob(f"{stem}.*.npz")) + list(self.track_dir.glob(f"{stem}.*.lock")):
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        self._memory = OrderedDict(
+            (key, track) for key, track in self._memory.items() if not Path(key).name.startswith(f"{stem}.")
+        )
+        return removed
+
+
+# Shared instance (one per process)
+face_track_store = FaceTrackStore()
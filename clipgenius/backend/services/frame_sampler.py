@@ -0,0 +1,265 @@
+"""
+ClipGenius - Frame Sampler
+Decodes the frames sampled for face detection without seeking between samples.
+
+Seeking to every sample (cap.set(CAP_PROP_POS_FRAMES)) makes the decoder jump
+back to the previous keyframe and decode forward again, which dominates the
+reframe time on 720p+ sources. Here the segment is decoded once, front to back:
+
+- "ffmpeg": ffmpeg selects every Nth frame, downscales it and pipes raw RGB
+  frames straight into a NumPy buffer (decoding runs in its own process while
+  the previous batch is being detected)
+- "opencv": sequential decode; frames between samples are grab()bed but never
+  retrieved or converted
+
+Sampled frames are written into a preallocated ring buffer of
+REFRAME_DETECT_BATCH_SIZE slots and handed to the detector one batch at a time.
+"""
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+from config import REFRAME_FRAME_SAMPLER, REFRAME_DETECT_WIDTH, REFRAME_DETECT_BATCH_SIZE
+from logging_config import get_service_logger
+from .metrics import InstrumentedPopen
+
+logger = get_service_logger("frame_sampler")
+
+SAMPLER_BACKENDS = ("ffmpeg", "opencv")
+
+
+@dataclass
+class FrameBatch:
+    """Sampled frames of one detection pass"""
+    frame_nums: List[int]
+    timestamps: List[float]
+    frames: np.ndarray  # (n, height, width, 3) RGB view of the ring buffer - copy to keep it
+
+
+@dataclass
+class VideoStreamInfo:
+    fps: float
+    total_frames: int
+    width: int
+    height: int
+
+
+class FrameSampler:
+    """Frame-accurate sequential sampler feeding face detection in batches"""
+
+    def __init__(self, backend: str = None, detect_width: int = None, batch_size: int = None):
+        """
+        Args:
+            backend: "ffmpeg", "opencv" or "auto" (default: REFRAME_FRAME_SAMPLER)
+            detect_width: Width frames are downscaled to (never upscaled)
+            batch_size: Frames per batch (ring buffer slots)
+        """
+        backend = (backend or REFRAME_FRAME_SAMPLER).lower()
+        if backend == "auto":
+            backend = "ffmpeg" if shutil.which("ffmpeg") else "opencv"
+        if backend not in SAMPLER_BACKENDS:
+            logger.warning("Unknown frame sampler, using opencv", backend=backend)
+            backend = "opencv"
+        self.backend = backend
+        self.detect_width = detect_width or REFRAME_DETECT_WIDTH
+        self.batch_size = batch_size or REFRAME_DETECT_BATCH_SIZE
+
+    @staticmethod
+    def probe(video_path: str) -> VideoStreamInfo:
+        """Frame rate, frame count and dimensions of the video stream"""
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {video_path}")
+            return VideoStreamInfo(
+                fps=cap.get(cv2.CAP_PROP_FPS),
+                total_frames=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            )
+        finally:
+            cap.release()
+
+    @staticmethod
+    def sample_frames(
+        fps: float,
+        sample_interval: float,
+        start_time: float,
+        end_time: float
+    ) -> Tuple[int, int, int]:
+        """
+        Frame numbers to sample: every `step` frames from `start_frame` up to
+        (excluding) `end_frame`.
+
+        Returns:
+            Tuple of (start_frame, end_frame, step)
+        """
+        start_frame = int(start_time * fps)
+        end_frame = int(end_time * fps)
+        step = max(1, int(sample_interval * fps))
+        return start_frame, end_frame, step
+
+    def detect_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Dimensions of the frames handed to the detector (aspect ratio kept, even height)"""
+        if width <= self.detect_width:
+            return width, height
+        scaled_height = max(2, int(round(height * self.detect_width / width / 2)) * 2)
+        return self.detect_width, scaled_height
+
+    def iter_batches(
+        self,
+        video_path: str,
+        sample_interval: float,
+        start_time: float = 0,
+        end_time: Optional[float] = None,
+        info: VideoStreamInfo = None
+    ) -> Iterator[FrameBatch]:
+        """
+        Decode the sampled frames of [start_time, end_time) in batches.
+
+        The frames of a batch live in the ring buffer and are overwritten by the
+        next batch, so consumers must finish with a batch before asking for the
+        next one.
+        """
+        info = info or self.probe(video_path)
+        if info.fps <= 0:
+            return
+        if end_time is None:
+            end_time = info.total_frames / info.fps
+
+        start_frame, end_frame, step = self.sample_frames(info.fps, sample_interval, start_time, end_time)
+        if end_frame <= start_frame:
+            return
+
+        width, height = self.detect_size(info.width, info.height)
+        ring = np.empty((self.batch_size, height, width, 3), dtype=np.uint8)
+
+        if self.backend == "ffmpeg":
+            frames = self._ffmpeg_frames(video_path, info, start_frame, end_frame, step, ring)
+        else:
+            frames = self._opencv_frames(video_path, start_frame, end_frame, step, ring)
+
+        frame_nums: List[int] = []
+        for frame_num in frames:
+            frame_nums.append(frame_num)
+            if len(frame_nums) == self.batch_size:
+                yield FrameBatch(frame_nums, [n / info.fps for n in frame_nums], ring)
+                frame_nums = []
+        if frame_nums:
+            yield FrameBatch(frame_nums, [n / info.fps for n in frame_nums], ring[:len(frame_nums)])
+
+    def _opencv_frames(
+        self,
+        video_path: str,
+        start_frame: int,
+        end_frame: int,
+        step: int,
+        ring: np.ndarray
+    ) -> Iterator[int]:
+        """Sequential decode with a single seek; yields frame numbers as slots are filled"""
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {video_path}")
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+            height, width = ring.shape[1:3]
+            slot = 0
+            for frame_num in range(start_frame, end_frame):
+                if not cap.grab():
+                    break
+                if (frame_num - start_frame) % step:
+                    continue
+
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                if frame.shape[1] != width or frame.shape[0] != height:
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=ring[slot])
+                yield frame_num
+                slot = (slot + 1) % len(ring)
+        finally:
+            cap.release()
+
+    def _ffmpeg_frames(
+        self,
+        video_path: str,
+        info: VideoStreamInfo,
+        start_frame: int,
+        end_frame: int,
+        step: int,
+        ring: np.ndarray
+    ) -> Iterator[int]:
+        """Pipe every `step`-th frame from ffmpeg into the ring buffer; yields frame numbers"""
+        height, width = ring.shape[1:3]
+        count = (end_frame - start_frame + step - 1) // step
+        # Input seek half a frame early: ffmpeg decodes from the previous keyframe
+        # and drops frames before -ss, so the first output frame is start_frame
+        seek = max(0.0, (start_frame - 0.5) / info.fps)
+
+        cmd = [
+            'ffmpeg',
+            '-v', 'error',
+            '-nostdin',
+            '-ss', f"{seek:.6f}",
+            '-i', str(video_path),
+            '-map', '0:v:0',
+            '-vf', f"select='not(mod(n\\,{step}))',scale={width}:{height}:flags=area",
+            '-vsync', 'passthrough',
+            '-frames:v', str(count),
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-'
+        ]
+        frame_size = width * height * 3
+        try:
+            process = InstrumentedPopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            logger.warning("ffmpeg unavailable, sampling frames with opencv", error=str(e))
+            yield from self._opencv_frames(video_path, start_frame, end_frame, step, ring)
+            return
+
+        sampled = 0
+        error = None
+        try:
+            slot = 0
+            for index in range(count):
+                view = memoryview(ring[slot]).cast('B')
+                read = 0
+                while read < frame_size:
+                    chunk = process.stdout.readinto(view[read:])
+                    if not chunk:
+                        break
+                    read += chunk
+                if read < frame_size:
+                    break
+                yield start_frame + index * step
+                sampled += 1
+                slot = (slot + 1) % len(ring)
+
+            process.stdout.close()
+            if process.wait() != 0:
+                error = process.stderr.read().decode(errors='replace').strip()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stderr.close()
+
+        if error is not None:
+            if sampled:
+                raise RuntimeError(f"ffmpeg frame sampling failed: {error}")
+            # Nothing decoded yet (e.g. unsupported input): the opencv path may still read it
+            logger.warning("ffmpeg frame sampling failed, retrying with opencv", error=error)
+            yield from self._opencv_frames(video_path, start_frame, end_frame, step, ring)
@@ -0,0 +1,223 @@
+"""
+ClipGenius - Provider HTTP Clients
+Shared, pooled httpx clients for all AI provider calls.
+
+The module-level httpx.post/httpx.get open a new connection (TCP + TLS
+handshake) per request. Here each provider origin (scheme://host:port) gets
+one long-lived httpx.Client with keep-alive connections (and HTTP/2 when the
+optional h2 package is installed), shared by every thread of the process:
+the analyzer, the transcriber (including parallel chunk uploads) and the
+provider health checks.
+
+`request()` adds retry with exponential backoff + jitter on transient
+failures (429/5xx, network errors), honoring Retry-After. `stream()` applies
+the same policy until the response headers arrive (a body that is already
+being consumed is never replayed).
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    PROVIDER_HTTP_MAX_CONNECTIONS,
+    PROVIDER_HTTP_MAX_KEEPALIVE,
+    PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+    PROVIDER_HTTP_CONNECT_TIMEOUT,
+    PROVIDER_HTTP_MAX_RETRIES,
+    PROVIDER_HTTP2_ENABLED
+)
+from logging_config import get_service_logger
+
+logger = get_service_logger("http_clients")
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# HTTP status codes worth retrying (rate limit / provider instability)
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Upper bound for a single backoff delay (seconds)
+MAX_RETRY_DELAY = 30.0
+
+
+def backoff_delay(attempt: int, base_delay: float, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with jitter for retry `attempt` (0-based), at least Retry-After"""
+    delay = min(MAX_RETRY_DELAY, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2)
+    if retry_after:
+        delay = max(delay, min(MAX_RETRY_DELAY, retry_after))
+    return delay
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After header in seconds (None if missing or not a number)"""
+    header = response.headers.get("retry-after")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    return None
+
+
+def origin_of(url: str) -> str:
+    """scheme://host:port of a URL (the connection pool key)"""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+class ProviderClients:
+    """One pooled httpx.Client per provider origin"""
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive: int = None,
+        keepalive_expiry: float = None,
+        connect_timeout: float = None,
+        max_retries: int = None,
+        http2: bool = None
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections or PROVIDER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=PROVIDER_HTTP_MAX_KEEPALIVE if max_keepalive is None else max_keepalive,
+            keepalive_expiry=keepalive_expiry or PROVIDER_HTTP_KEEPALIVE_EXPIRY
+        )
+        self.connect_timeout = connect_timeout or PROVIDER_HTTP_CONNECT_TIMEOUT
+        self.max_retries = PROVIDER_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.http2 = (PROVIDER_HTTP2_ENABLED if http2 is None else http2) and HTTP2_AVAILABLE
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def client(self, url: str) -> httpx.Client:
+        """Pooled client for the origin of `url` (created on first use)"""
+        origin = origin_of(url)
+        with self._lock:
+            # Connections must not be shared with a forked worker process
+            if self._pid != os.getpid():
+                self._clients = {}
+                self._pid = os.getpid()
+
+            client = self._clients.get(origin)
+            if client is None or client.is_closed:
+                client = self._clients[origin] = httpx.Client(
+                    limits=self.limits,
+                    timeout=httpx.Timeout(60.0, connect=self.connect_timeout),
+                    http2=self.http2
+                )
+                logger.info("Provider HTTP client created", origin=origin, http2=self.http2)
+        return client
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        max_retries: int = None,
+        retry_base_delay: float = 1.0,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the pooled client, retrying transient failures.
+
+        A retryable status on the last attempt is returned (not raised), so
+        callers keep handling error responses themselves.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        client = self.client(url)
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= max_retries:
+                    raise
+                delay = backoff_delay(attempt, retry_base_delay)
+                logger.warning(
+                    "Provider request failed, retrying",
+                    origin=origin_of(url), error=str(e), attempt=attempt + 1, delay=round(delay, 2)
+                )
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                return response
+
+            delay = backoff_delay(attempt, retry_base_delay, parse_retry_after(response))
+            logger.warning(
+                "Provider returned retryable status, retrying",
+                origin=origin_of(url), status_code=response.status_code,
+                attempt=attempt + 1, delay=round(delay, 2)
+            )
+            response.close()
+            time.sleep(delay)
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        max_retries: int = None,
+        retry_base_delay: float = 1.0,
+        **kwargs
+    ) -> Iterator[httpx.Response]:
+        """
+        Streaming request through the pooled client (response body not read).
+
+        Opening the stream is retried like request(); a retryable status on
+        the last attempt is yielded to the caller.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        client = self.client(url)
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = client.send(client.build_request(method, url, **kwargs), stream=True)
+            except httpx.TransportError as e:
+                if attempt >= max_retries:
+                    raise
+                delay = backoff_delay(attempt, retry_base_delay)
+                logger.warning(
+                    "Provider stream failed to open, retrying",
+                    origin=origin_of(url), error=str(e), attempt=attempt + 1, delay=round(delay, 2)
+                )
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                delay = backoff_delay(attempt, retry_base_delay, parse_retry_after(response))
+                response.close()
+                time.sleep(delay)
+                continue
+            break
+
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+
+# Shared instance
+provider_clients = ProviderClients()
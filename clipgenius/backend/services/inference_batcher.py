@@ -0,0 +1,207 @@
+"""
+ClipGenius - Inference Batcher
+Groups transcription requests of several jobs into shared inference batches.
+
+With the model server (services/model_server.py) every job in the transcribing
+stage sends its speech chunks to the same process, but each chunk still ran as
+its own model call: concurrent jobs were served one file at a time and the
+batched decoders (whisperx, faster-whisper's BatchedInferencePipeline) only
+ever saw the segments of a single file.
+
+Requests for the same model and language are queued here. The first one opens
+a batch; it runs once every recently active stream (job) has a chunk in it,
+the batch holds MODEL_BATCH_MAX_STREAMS chunks, or MODEL_BATCH_MAX_WAIT has
+passed since the first request - so a lone job never waits. The chunks are
+concatenated with silence gaps longer than the 30 s Whisper window (the VAD
+never merges speech of two chunks into one segment), transcribed in one call
+and the result is split back per chunk.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config import MODEL_BATCH_MAX_STREAMS, MODEL_BATCH_MAX_WAIT
+from logging_config import get_service_logger
+
+logger = get_service_logger("inference_batcher")
+
+SAMPLE_RATE = 16000
+
+# Silence between concatenated chunks: longer than a Whisper window (30 s)
+BATCH_GAP_SECONDS = 31.0
+
+
+def concatenate_audio(audios: List[np.ndarray]) -> Tuple[np.ndarray, List[float]]:
+    """
+    Chunks joined with silence gaps.
+
+    Returns:
+        Tuple of (samples, offset in seconds of each chunk)
+    """
+    gap = np.zeros(int(BATCH_GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    parts, offsets = [], []
+    position = 0
+    for i, audio in enumerate(audios):
+        if i:
+            parts.append(gap)
+            position += len(gap)
+        offsets.append(position / SAMPLE_RATE)
+        parts.append(np.asarray(audio, dtype=np.float32))
+        position += len(audio)
+    return np.concatenate(parts), offsets
+
+
+def split_batched_result(result: Dict[str, Any], offsets: List[float]) -> List[Dict[str, Any]]:
+    """
+    Per-chunk results of a transcription of concatenate_audio() output.
+
+    Segments go to the chunk their midpoint falls in; segment and word times
+    are shifted back to the chunk's own time.
+    """
+    # Gaps are silent, so no segment spans two chunks: split in the middle of each gap
+    split_points = [offset - BATCH_GAP_SECONDS / 2 for offset in offsets[1:]] + [float("inf")]
+
+    parts: List[List[Dict[str, Any]]] = [[] for _ in offsets]
+    for segment in result.get("segments", []):
+        midpoint = (segment["start"] + segment["end"]) / 2
+        index = next(i for i, point in enumerate(split_points) if midpoint < point)
+        offset = offsets[index]
+        shifted = dict(segment)
+        shifted["start"] = max(0.0, segment["start"] - offset)
+        shifted["end"] = max(0.0, segment["end"] - offset)
+        shifted["words"] = [
+            {**word, "start": max(0.0, word["start"] - offset), "end": max(0.0, word["end"] - offset)}
+            for word in segment.get("words", [])
+        ]
+        parts[index].append(shifted)
+
+    results = []
+    for segments in parts:
+        for i, segment in enumerate(segments):
+            segment["id"] = i
+        results.append({
+            **{key: value for key, value in result.items() if key not in ("segments", "words", "text", "duration")},
+            "text": " ".join(segment["text"] for segment in segments),
+            "duration": segments[-1]["end"] if segments else 0,
+            "segments": segments,
+            "words": [word for segment in segments for word in segment["words"]]
+        })
+    return results
+
+
+@dataclass
+class _Request:
+    stream_id: Optional[str]
+    item: Any
+    future: Future
+    arrived: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _KeyQueue:
+    pending: List[_Request] = field(default_factory=list)
+    running: bool = False
+    # stream id -> last time it submitted a request
+    streams: Dict[str, float] = field(default_factory=dict)
+    last_batch_seconds: float = 0.0
+
+
+class InferenceBatcher:
+    """Per-key request queues drained by one batch thread each"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, List[Any]], List[Any]],
+        max_streams: int = None,
+        max_wait: float = None
+    ):
+        """
+        Args:
+            run_batch: run_batch(key, items) -> one result per item, in order
+            max_streams: Max requests per batch (default: MODEL_BATCH_MAX_STREAMS)
+            max_wait: Max seconds a request waits for others (default: MODEL_BATCH_MAX_WAIT)
+        """
+        self.run_batch = run_batch
+        self.max_streams = max_streams or MODEL_BATCH_MAX_STREAMS
+        self.max_wait = MODEL_BATCH_MAX_WAIT if max_wait is None else max_wait
+        self._queues: Dict[Hashable, _KeyQueue] = {}
+        self._condition = threading.Condition()
+        self._batches = 0
+        self._batched_requests = 0
+
+    def submit(self, key: Hashable, item: Any, stream_id: str = None) -> Any:
+        """Run `item` in the next batch of `key` and wait for its result"""
+        request = _Request(stream_id, item, Future())
+        with self._condition:
+            queue = self._queues.setdefault(key, _KeyQueue())
+            queue.pending.append(request)
+            if stream_id is not None:
+                queue.streams[stream_id] = request.arrived
+            if not queue.running:
+                queue.running = True
+                threading.Thread(target=self._drain, args=(key, queue), daemon=True).start()
+            self._condition.notify_all()
+        return request.future.result()
+
+    def _active_streams(self, queue: _KeyQueue, now: float) -> set:
+        """Streams expected to submit again soon (seen within one batch + waits)"""
+        window = queue.last_batch_seconds + 2 * self.max_wait + 1.0
+        queue.streams = {s: seen for s, seen in queue.streams.items() if now - seen <= window}
+        return set(queue.streams)
+
+    def _ready(self, queue: _KeyQueue, now: float) -> bool:
+        if len(queue.pending) >= self.max_streams:
+            return True
+        if now >= queue.pending[0].arrived + self.max_wait:
+            return True
+        pending_streams = {request.stream_id for request in queue.pending}
+        return None not in pending_streams and self._active_streams(queue, now) <= pending_streams
+
+    def _drain(self, key: Hashable, queue: _KeyQueue):
+        while True:
+            with self._condition:
+                if not queue.pending:
+                    queue.running = False
+                    return
+                while not self._ready(queue, time.monotonic()):
+                    self._condition.wait(max(0.0, queue.pending[0].arrived + self.max_wait - time.monotonic()))
+                batch = queue.pending[:self.max_streams]
+                del queue.pending[:self.max_streams]
+                self._batches += 1
+                self._batched_requests += len(batch)
+
+            started = time.monotonic()
+            self._run(key, batch)
+            with self._condition:
+                queue.last_batch_seconds = time.monotonic() - started
+
+    def _run(self, key: Hashable, batch: List[_Request]):
+        items = [request.item for request in batch]
+        try:
+            results = self.run_batch(key, items)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # One bad chunk must not fail the other jobs: retry them one by one
+            logger.warning("Batched inference failed, running requests separately", size=len(batch), error=str(e))
+            for request in batch:
+                self._run(key, [request])
+            return
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+        if len(batch) > 1:
+            logger.info("Inference batch", key=repr(key), size=len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "batches": self._batches,
+                "batched_requests": self._batched_requests,
+                "average_batch_size": round(self._batched_requests / self._batches, 2) if self._batches else 0
+            }
@@ -0,0 +1,394 @@
+"""
+ClipGenius - Persistent Job Queue
+SQLite-backed queue for the processing pipeline (download, transcribe, analyze, cut,
+or the single "pipeline" stage that runs them concurrently).
+
+Each stage of a job is claimed separately by a worker process, so:
+- N projects can progress in parallel across worker processes
+- per-stage concurrency is enforced across all workers (JOB_STAGE_CONCURRENCY)
+- stages that render clips share the cut limit: with ANALYSIS_STREAMING_ENABLED
+  the analyze stage renders each clip as soon as it is accepted, so a streamed
+  analysis holds a cut slot
+- a crashed worker only loses its current stage: the job is requeued from the
+  last checkpointed stage once its heartbeat goes stale
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import aliased
+
+from config import (
+    ANALYSIS_STREAMING_ENABLED,
+    JOB_STAGE_CONCURRENCY,
+    JOB_HEARTBEAT_TIMEOUT,
+    JOB_MAX_ATTEMPTS,
+    PIPELINE_ENABLED
+)
+from models import ProcessingJob, JobStatus, JobStage, Project, get_background_session, db_lock
+from models.job import STAGE_ORDER, next_stage
+from models.project import ProjectStatus
+from logging_config import get_service_logger
+
+logger = get_service_logger("job_queue")
+
+
+class JobQueue:
+    """Persistent multi-worker job queue stored in the application database"""
+
+    def __init__(
+        self,
+        stage_concurrency: Dict[str, int] = None,
+        heartbeat_timeout: float = None,
+        render_stages: Iterable[str] = None
+    ):
+        """
+        Args:
+            stage_concurrency: Max running jobs per stage (default: JOB_STAGE_CONCURRENCY)
+            heartbeat_timeout: Seconds without heartbeat before a job is requeued
+            render_stages: Stages that render clips, limited together by the cut
+                           limit (default: cut, plus analyze with ANALYSIS_STREAMING_ENABLED)
+        """
+        self.stage_concurrency = stage_concurrency or JOB_STAGE_CONCURRENCY
+        self.heartbeat_timeout = heartbeat_timeout or JOB_HEARTBEAT_TIMEOUT
+        if render_stages is None:
+            render_stages = [JobStage.CUT.value]
+            if ANALYSIS_STREAMING_ENABLED:
+                render_stages.append(JobStage.ANALYZE.value)
+        self.render_stages = frozenset(render_stages)
+
+    # ========== Producer side (API) ==========
+
+    def enqueue(self, project_id: int, language: str = None) -> Optional[ProcessingJob]:
+        """
+        Queue a project for processing.
+
+        Returns the new job, or None if the project already has an active job.
+        """
+        db = get_background_session()
+        try:
+            with db_lock:
+                active = db.query(ProcessingJob).filter(
+                    ProcessingJob.project_id == project_id,
+                    ProcessingJob.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value])
+                ).first()
+                if active:
+                    logger.warning("Project already has an active job", project_id=project_id, job_id=active.id)
+                    return None
+
+                project = db.query(Project).filter(Project.id == project_id).first()
+                if not project:
+                    logger.warning("Cannot enqueue missing project", project_id=project_id)
+                    return None
+
+                job = ProcessingJob(
+                    project_id=project_id,
+                    language=language,
+                    # Pipelined jobs run every stage in a single claim
+                    stage=JobStage.PIPELINE.value if PIPELINE_ENABLED else STAGE_ORDER[0].value,
+                    status=JobStatus.QUEUED.value,
+                    checkpoint={},
+                    max_attempts=JOB_MAX_ATTEMPTS
+                )
+                db.add(job)
+                project.is_processing = True
+                project.processing_started_at = datetime.utcnow()
+                db.commit()
+                db.refresh(job)
+                db.expunge(job)
+
+            logger.info("Job enqueued", job_id=job.id, project_id=project_id, language=language)
+            return job
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_active_job(self, db, project_id: int) -> Optional[ProcessingJob]:
+        """Return the queued/running job of a project (if any) using the caller's session"""
+        return db.query(ProcessingJob).filter(
+            ProcessingJob.project_id == project_id,
+            ProcessingJob.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value])
+        ).first()
+
+    # ========== Consumer side (workers) ==========
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest queued job whose next stage has free capacity.
+
+        The capacity check is part of the UPDATE statement, so two workers can
+        never exceed a stage limit even when they poll at the same instant.
+        Render stages must also fit in the cut limit together.
+
+        Returns:
+            Dict with job_id, project_id, stage, language and checkpoint, or None
+        """
+        db = get_background_session()
+        try:
+            candidates = db.query(ProcessingJob).filter(
+                ProcessingJob.status == JobStatus.QUEUED.value,
+                ProcessingJob.stage != JobStage.DONE.value
+            ).order_by(ProcessingJob.created_at).limit(20).all()
+
+            for candidate in candidates:
+                capacity = [self._running_count(db, [candidate.stage]) < self.stage_concurrency.get(candidate.stage, 1)]
+                if candidate.stage in self.render_stages:
+                    capacity.append(
+                        self._running_count(db, self.render_stages) < self.stage_concurrency.get(JobStage.CUT.value, 1)
+                    )
+
+                now = datetime.utcnow()
+                updated = db.query(ProcessingJob).filter(
+                    ProcessingJob.id == candidate.id,
+                    ProcessingJob.status == JobStatus.QUEUED.value,
+                    *capacity
+                ).update({
+                    ProcessingJob.status: JobStatus.RUNNING.value,
+                    ProcessingJob.worker_id: worker_id,
+                    ProcessingJob.heartbeat_at: now,
+                    ProcessingJob.attempts: ProcessingJob.attempts + 1,
+                    ProcessingJob.updated_at: now
+                }, synchronize_session=False)
+                db.commit()
+
+                if updated:
+                    logger.info(
+                        "Job stage claimed",
+                        job_id=candidate.id,
+                        project_id=candidate.project_id,
+                        stage=candidate.stage,
+                        worker_id=worker_id
+                    )
+                    return {
+                        'job_id': candidate.id,
+                        'project_id': candidate.project_id,
+                        'stage': candidate.stage,
+                        'language': candidate.language,
+                        'checkpoint': dict(candidate.checkpoint or {})
+                    }
+            return None
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _running_count(db, stages: Iterable[str]):
+        """Subquery counting the running jobs of the given stages"""
+        running = aliased(ProcessingJob)
+        return db.query(func.count(running.id)).filter(
+            running.status == JobStatus.RUNNING.value,
+            running.stage.in_(list(stages))
+        ).scalar_subquery()
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        Refresh the heartbeat of a running job.
+
+        Returns:
+            False if the worker lost ownership (the job was requeued or finished)
+
+        Raises:
+            Database errors (e.g. "database is locked"): ownership is unknown,
+            the caller should try again on the next beat
+        """
+        db = get_background_session()
+        try:
+            updated = self._owned(db, job_id, worker_id).update(
+                {ProcessingJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+            return bool(updated)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _owned(db, job_id: int, worker_id: str, stage: str = None):
+        """Query of the job if `worker_id` still runs it (in `stage`, when given)"""
+        query = db.query(ProcessingJob).filter(
+            ProcessingJob.id == job_id,
+            ProcessingJob.worker_id == worker_id,
+            ProcessingJob.status == JobStatus.RUNNING.value
+        )
+        if stage is not None:
+            query = query.filter(ProcessingJob.stage == stage)
+        return query
+
+    def complete_stage(
+        self,
+        job_id: int,
+        worker_id: str,
+        stage: str,
+        checkpoint_updates: Dict[str, Any] = None
+    ) -> Optional[str]:
+        """
+        Checkpoint a finished stage and requeue the job for the next one.
+
+        Only the worker that still owns the stage can complete it: a worker
+        whose job was requeued by recover_stale() (and maybe claimed again)
+        gets None and its result is dropped.
+
+        Returns:
+            The next stage ("done" when the pipeline has finished), None if the
+            worker no longer owns the job
+        """
+        db = get_background_session()
+        try:
+            job = self._owned(db, job_id, worker_id, stage).first()
+            if not job:
+                logger.warning("Stage result dropped, job not owned", job_id=job_id, stage=stage, worker_id=worker_id)
+                return None
+
+            checkpoint = dict(job.checkpoint or {})
+            checkpoint['completed_stages'] = list(checkpoint.get('completed_stages', []))
+            if stage not in checkpoint['completed_stages']:
+                checkpoint['completed_stages'].append(stage)
+            if checkpoint_updates:
+                checkpoint.update(checkpoint_updates)
+
+            following = next_stage(stage)
+            done = following == JobStage.DONE.value
+            values = {
+                ProcessingJob.checkpoint: checkpoint,
+                ProcessingJob.stage: following,
+                ProcessingJob.attempts: 0,
+                ProcessingJob.worker_id: None,
+                ProcessingJob.heartbeat_at: None,
+                ProcessingJob.status: JobStatus.COMPLETED.value if done else JobStatus.QUEUED.value,
+                ProcessingJob.updated_at: datetime.utcnow()
+            }
+            if done:
+                values[ProcessingJob.finished_at] = datetime.utcnow()
+
+            # Ownership is checked again in the UPDATE: recover_stale() may have run since the read
+            if not self._owned(db, job_id, worker_id, stage).update(values, synchronize_session=False):
+                db.rollback()
+                logger.warning("Stage result dropped, job not owned", job_id=job_id, stage=stage, worker_id=worker_id)
+                return None
+            if done:
+                self._release_project(db, job.project_id)
+
+            db.commit()
+            logger.info("Job stage checkpointed", job_id=job_id, stage=stage, next_stage=following)
+            return following
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def update_checkpoint(self, job_id: int, checkpoint_updates: Dict[str, Any]) -> None:
+        """Persist partial progress inside a stage (e.g. clips already cut)"""
+        db = get_background_session()
+        try:
+            job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+            if job:
+                checkpoint = dict(job.checkpoint or {})
+                checkpoint.update(checkpoint_updates)
+                job.checkpoint = checkpoint
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def fail(self, job_id: int, worker_id: str, stage: str, error_message: str) -> bool:
+        """
+        Mark a job as failed (stage raised an error).
+
+        Returns:
+            False if the worker no longer owns the job (nothing is written)
+        """
+        db = get_background_session()
+        try:
+            job = self._owned(db, job_id, worker_id, stage).first()
+            if not job:
+                logger.warning("Stage error dropped, job not owned", job_id=job_id, stage=stage, worker_id=worker_id)
+                return False
+            error_message = (error_message or "")[:500]
+            updated = self._owned(db, job_id, worker_id, stage).update({
+                ProcessingJob.status: JobStatus.FAILED.value,
+                ProcessingJob.error_message: error_message,
+                ProcessingJob.finished_at: datetime.utcnow(),
+                ProcessingJob.worker_id: None,
+                ProcessingJob.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            if not updated:
+                db.rollback()
+                logger.warning("Stage error dropped, job not owned", job_id=job_id, stage=stage, worker_id=worker_id)
+                return False
+            self._release_project(db, job.project_id)
+            db.commit()
+            logger.error("Job failed", job_id=job_id, project_id=job.project_id, stage=stage, error=error_message)
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def recover_stale(self) -> int:
+        """
+        Requeue running jobs whose worker stopped sending heartbeats.
+
+        The job keeps its current stage, so it resumes from the last finished
+        stage. Jobs that already used all attempts are marked as failed.
+
+        Returns:
+            Number of jobs recovered or failed
+        """
+        db = get_background_session()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.heartbeat_timeout)
+            stale_jobs = db.query(ProcessingJob).filter(
+                ProcessingJob.status == JobStatus.RUNNING.value,
+                or_(ProcessingJob.heartbeat_at.is_(None), ProcessingJob.heartbeat_at < cutoff)
+            ).all()
+
+            for job in stale_jobs:
+                if (job.attempts or 0) >= (job.max_attempts or JOB_MAX_ATTEMPTS):
+                    job.status = JobStatus.FAILED.value
+                    job.error_message = f"Worker crashed during '{job.stage}' ({job.attempts} attempts)"
+                    job.finished_at = datetime.utcnow()
+                    self._release_project(db, job.project_id, error_message=job.error_message)
+                    logger.error("Stale job failed permanently", job_id=job.id, stage=job.stage)
+                else:
+                    job.status = JobStatus.QUEUED.value
+                    logger.warning(
+                        "Stale job requeued",
+                        job_id=job.id,
+                        stage=job.stage,
+                        previous_worker=job.worker_id,
+                        attempts=job.attempts
+                    )
+                job.worker_id = None
+                job.heartbeat_at = None
+
+            db.commit()
+            return len(stale_jobs)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _release_project(self, db, project_id: int, error_message: str = None) -> None:
+        """Release the project processing lock when its job leaves the queue"""
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if project:
+            project.release_processing_lock()
+            if error_message:
+                project.status = ProjectStatus.ERROR.value
+                project.error_message = error_message
+                project.progress_message = "Erro no processamento: o worker foi interrompido."
+
+
+# Shared instance
+job_queue = JobQueue()
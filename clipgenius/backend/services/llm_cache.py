@@ -0,0 +1,271 @@
+"""
+ClipGenius - LLM Response Cache
+Persistent cache of AI provider responses for ClipAnalyzer.
+
+Entries are keyed by the hash of (provider, model, prompt, temperature), so
+reprocessing a project or analyzing the same video for another user skips the
+LLM call. Entries older than LLM_CACHE_TTL_HOURS are treated as misses and the
+least recently used ones are evicted above LLM_CACHE_MAX_ENTRIES.
+
+Concurrent identical prompts in the same process are coalesced: the first
+caller runs the request and the others wait for its result. Errors and empty
+responses are never stored. Streamed requests (get_or_stream) are cached the
+same way but not coalesced.
+
+Responses are small, so they are stored directly in a SQLite database (shared
+by all worker processes), together with the hit/miss counters.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from config import (
+    LLM_CACHE_DIR,
+    LLM_CACHE_TTL_HOURS,
+    LLM_CACHE_MAX_ENTRIES
+)
+from logging_config import get_service_logger
+
+logger = get_service_logger("llm_cache")
+
+
+class _InFlight:
+    """A request being made by another thread for the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMResponseCache:
+    """Persistent TTL + LRU cache of LLM responses with in-flight request coalescing"""
+
+    def __init__(self, cache_dir: Path = None, ttl_seconds: float = None, max_entries: int = None):
+        self.cache_dir = Path(cache_dir or LLM_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else LLM_CACHE_TTL_HOURS * 3600
+        self.max_entries = max_entries or LLM_CACHE_MAX_ENTRIES
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.cache_dir / "responses.db"
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._init_index()
+
+    # ========== Index ==========
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Index connection: committed (or rolled back) and closed at the end of the block"""
+        conn = sqlite3.connect(str(self._index_path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # The connection's own context manager only commits, it does not close
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_index(self):
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, model TEXT NOT NULL, "
+                "response TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _incr(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    # ========== Keys ==========
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, temperature: float) -> str:
+        """Cache key of an LLM request"""
+        raw = json.dumps([provider, model, float(temperature), prompt], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # ========== Entries ==========
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key` (None on miss or expired) and update LRU order"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._expired(row[1], now):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._incr(conn, "expired")
+                row = None
+
+            if row is not None:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._incr(conn, "hits")
+            else:
+                self._incr(conn, "misses")
+        return row[0] if row is not None else None
+
+    def put(self, key: str, provider: str, model: str, response: str) -> None:
+        """Store a response and evict least recently used entries over the limit"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, now, now)
+            )
+            self._incr(conn, "stores")
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used ones above max_entries.
+
+        Returns:
+            Number of evicted entries
+        """
+        with self._connect() as conn:
+            evicted = 0
+            if self.ttl_seconds > 0:
+                evicted += conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                evicted += conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+            if evicted:
+                self._incr(conn, "evictions", evicted)
+
+        if evicted:
+            logger.info("LLM cache evicted entries", evicted=evicted)
+        return evicted
+
+    def get_or_call(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        temperature: float,
+        call: Callable[[], str]
+    ) -> str:
+        """
+        Cached response for the request, or run `call()` and store its result.
+
+        If another thread is already running the same request, wait for it
+        instead of calling the provider again.
+        """
+        key = self.make_key(provider, model, prompt, temperature)
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            in_flight.done.wait()
+            with self._connect() as conn:
+                self._incr(conn, "coalesced")
+            self._log_lookup("coalesced", key, provider)
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.response
+
+        try:
+            response = self.get(key)
+            if response is not None:
+                self._log_lookup("hit", key, provider)
+            else:
+                self._log_lookup("miss", key, provider)
+                response = call()
+                # An empty response is a provider failure, not an answer worth keeping
+                if response:
+                    self.put(key, provider, model, response)
+            in_flight.response = response
+            return response
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def get_or_stream(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        temperature: float,
+        stream: Callable[[], Iterator[str]]
+    ) -> Iterator[str]:
+        """
+        Streaming variant of get_or_call: a cached response is yielded as one
+        chunk; otherwise the chunks of `stream()` are passed through and the
+        complete response is stored once the stream ends.
+        """
+        key = self.make_key(provider, model, prompt, temperature)
+        response = self.get(key)
+        if response is not None:
+            self._log_lookup("hit", key, provider)
+            yield response
+            return
+
+        self._log_lookup("miss", key, provider)
+        parts = []
+        for chunk in stream():
+            parts.append(chunk)
+            yield chunk
+
+        response = "".join(parts)
+        if response:
+            self.put(key, provider, model, response)
+
+    def _log_lookup(self, outcome: str, key: str, provider: str):
+        # Totals come from stats(): querying them here would cost every lookup two queries
+        logger.info("LLM cache " + outcome, key=key[:12], provider=provider)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics (shared by all processes)"""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        coalesced = counters.get("coalesced", 0)
+        lookups = hits + misses + coalesced
+        return {
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            # Coalesced requests also avoided a provider call
+            'hit_rate': round((hits + coalesced) / lookups, 4) if lookups else 0.0,
+            'stores': counters.get("stores", 0),
+            'expired': counters.get("expired", 0),
+            'evictions': counters.get("evictions", 0),
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -0,0 +1,93 @@
+"""
+ClipGenius - Streaming LLM Output
+Decoders for streamed provider responses and an incremental clip parser.
+
+- iter_sse_json: Server-Sent Events of OpenAI-compatible APIs (Groq), one JSON
+  object per "data:" line, terminated by "data: [DONE]"
+- iter_ndjson: newline-delimited JSON of Ollama's /api/generate
+- ClipStreamParser: fed with text as tokens arrive, returns each clip object
+  ({"timestamp_inicio": ...}) as soon as its closing brace is received, so
+  clips can be validated and rendered while the model is still generating
+"""
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+def iter_sse_json(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """JSON payloads of an SSE stream ("data: {...}" lines)"""
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            return
+        if payload:
+            yield json.loads(payload)
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """JSON objects of a newline-delimited JSON stream"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class ClipStreamParser:
+    """
+    Incremental extractor of clip objects from streamed JSON text.
+
+    Tracks object nesting (ignoring braces inside strings); every object that
+    closes is parsed, and those with a "timestamp_inicio" key are returned by
+    feed(). Works for {"clips": [...]}, a bare array, or objects surrounded by
+    prose. Objects that are not valid JSON are skipped (the caller can still
+    run the full-text recovery on `text` at the end).
+    """
+
+    CLIP_KEY = "timestamp_inicio"
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[int] = []
+        self._in_string = False
+        self._escape = False
+        self.clips: List[Dict[str, Any]] = []
+
+    @property
+    def text(self) -> str:
+        """All text received so far"""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add streamed text; returns the clip objects completed by it"""
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._stack.append(i)
+            elif char == '}' and self._stack:
+                start = self._stack.pop()
+                try:
+                    obj = json.loads(buffer[start:i + 1])
+                except ValueError:
+                    continue
+                if isinstance(obj, dict) and self.CLIP_KEY in obj:
+                    completed.append(obj)
+
+        self._pos = len(buffer)
+        self.clips.extend(completed)
+        return completed
@@ -0,0 +1,470 @@
+"""
+ClipGenius - Metrics
+Timing and resource usage of processing stages and FFmpeg/FFprobe subprocesses.
+
+Progress percentages say how far a project is, not where its time went. Two
+instruments answer that:
+
+- span(stage): wraps a processing stage (download, transcribe, analyze, cut,
+  pipeline, render) and measures wall time, CPU time, peak RSS and bytes
+  read/written of the process while it runs
+- instrumented_run() / InstrumentedPopen: drop-in replacements of
+  subprocess.run / subprocess.Popen for FFmpeg and FFprobe that measure the
+  child itself (its rusage is kept when it is reaped, its I/O counters are
+  read just before), labelled with the stage they ran in
+
+Each measurement is logged as a structured span ("Stage finished",
+"Subprocess finished") and added to the process' MetricsRegistry. Stages run
+in several processes (workers, render processes, the API for uploads), so every
+registry writes its totals to a snapshot file in METRICS_DIR and GET /metrics
+adds the snapshots up into the Prometheus text format.
+
+Stage CPU time and bytes are those of the whole process (concurrent stages of
+the pipelined mode overlap) and peak RSS is the process high-water mark; the
+subprocess metrics are exact per child. Bytes are what the process read and
+wrote through system calls (files, pipes and sockets) where /proc is
+available, block I/O elsewhere.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import METRICS_ENABLED, METRICS_DIR
+from logging_config import get_service_logger, log_context
+
+logger = get_service_logger("metrics")
+
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Label names of each metric family
+FAMILIES = {
+    "stage": ("stage",),
+    "subprocess": ("command", "stage"),
+}
+
+_FAMILY_HELP = {
+    "stage": "processing stages",
+    "subprocess": "FFmpeg/FFprobe subprocesses",
+}
+
+# (metric suffix, type, help, series field)
+_SERIES_METRICS = (
+    ("cpu_seconds_total", "counter", "CPU time (user + system)", "cpu_seconds"),
+    ("read_bytes_total", "counter", "Bytes read", "read_bytes"),
+    ("written_bytes_total", "counter", "Bytes written", "written_bytes"),
+    ("peak_rss_bytes", "gauge", "Largest peak resident set size", "peak_rss_bytes"),
+    ("errors_total", "counter", "Runs that failed", "errors"),
+)
+
+_WAIT4_AVAILABLE = hasattr(os, "wait4")
+_WAITID_AVAILABLE = hasattr(os, "waitid") and hasattr(os, "WNOWAIT")
+
+
+@dataclass
+class Usage:
+    """Resources used by one stage run or subprocess"""
+    seconds: float
+    cpu_seconds: float
+    peak_rss_bytes: int
+    read_bytes: int
+    written_bytes: int
+
+
+def _rss_bytes(maxrss: int) -> int:
+    """ru_maxrss is in kilobytes on Linux, bytes on macOS"""
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _read_proc_io(pid: Any = "self") -> Optional[Tuple[int, int]]:
+    """(bytes read, bytes written) from /proc/<pid>/io, None where unavailable"""
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _process_io() -> Tuple[int, int]:
+    io = _read_proc_io()
+    if io is not None:
+        return io
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_inblock * 512, usage.ru_oublock * 512
+
+
+def _empty_series() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "errors": 0,
+        "seconds": 0.0,
+        "cpu_seconds": 0.0,
+        "read_bytes": 0,
+        "written_bytes": 0,
+        "peak_rss_bytes": 0,
+        "buckets": [0] * len(DURATION_BUCKETS),
+    }
+
+
+def _merge_series(total: Dict[str, Any], series: Dict[str, Any]):
+    for field in ("count", "errors", "seconds", "cpu_seconds", "read_bytes", "written_bytes"):
+        total[field] += series.get(field, 0)
+    total["peak_rss_bytes"] = max(total["peak_rss_bytes"], series.get("peak_rss_bytes", 0))
+    for i, count in enumerate(series.get("buckets", [])[:len(DURATION_BUCKETS)]):
+        total["buckets"][i] += count
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """Stage and subprocess totals of this process, shared through snapshot files"""
+
+    def __init__(self, directory: Path = None, enabled: bool = None):
+        """
+        Args:
+            directory: Snapshot directory shared by all processes (default: METRICS_DIR)
+            enabled: Record observations (default: METRICS_ENABLED)
+        """
+        self.directory = Path(directory or METRICS_DIR)
+        self.enabled = METRICS_ENABLED if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._start_process()
+
+    def _start_process(self):
+        self._pid = os.getpid()
+        self._series: Dict[SeriesKey, Dict[str, Any]] = {}
+        self._path = self.directory / f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+
+    def observe(self, family: str, labels: Dict[str, str], usage: Usage, failed: bool = False):
+        """Add one run to the totals of (family, labels) and rewrite this process' snapshot"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Forked child: the parent's totals are already in the parent's snapshot
+                self._start_process()
+            key = (family, tuple((name, str(labels.get(name, ""))) for name in FAMILIES[family]))
+            series = self._series.setdefault(key, _empty_series())
+            series["count"] += 1
+            series["errors"] += int(failed)
+            series["seconds"] += usage.seconds
+            series["cpu_seconds"] += usage.cpu_seconds
+            series["read_bytes"] += usage.read_bytes
+            series["written_bytes"] += usage.written_bytes
+            series["peak_rss_bytes"] = max(series["peak_rss_bytes"], usage.peak_rss_bytes)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if usage.seconds <= bound:
+                    series["buckets"][i] += 1
+                    break
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        snapshot = [
+            {"family": family, "labels": dict(labels), **series}
+            for (family, labels), series in self._series.items()
+        ]
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning("Could not write metrics snapshot", path=str(self._path), error=str(e))
+
+    def collect(self) -> Dict[SeriesKey, Dict[str, Any]]:
+        """Totals of every process (all snapshots added up)"""
+        merged: Dict[SeriesKey, Dict[str, Any]] = {}
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # Removed by reset() while listing
+            for entry in snapshot:
+                family = entry.get("family")
+                if family not in FAMILIES:
+                    continue
+                key = (family, tuple((name, str(entry.get("labels", {}).get(name, ""))) for name in FAMILIES[family]))
+                _merge_series(merged.setdefault(key, _empty_series()), entry)
+        return merged
+
+    def reset(self):
+        """Delete every snapshot (on API startup: totals restart like any restarted exporter)"""
+        with self._lock:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+            self._series.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format of collect()"""
+        series_by_family: Dict[str, List[Tuple[Any, Dict[str, Any]]]] = {family: [] for family in FAMILIES}
+        for (family, labels), series in sorted(self.collect().items()):
+            series_by_family[family].append((labels, series))
+
+        lines = []
+        for family, entries in series_by_family.items():
+            prefix = f"clipgenius_{family}"
+            what = _FAMILY_HELP[family]
+
+            lines.append(f"# HELP {prefix}_duration_seconds Wall time of {what}")
+            lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+            for labels, series in entries:
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, series["buckets"]):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, f'le="{bound}"')
+                    lines.append(f"{prefix}_duration_seconds_bucket{bucket_labels} {cumulative}")
+                bucket_labels = _format_labels(labels, 'le="+Inf"')
+                lines.append(f"{prefix}_duration_seconds_bucket{bucket_labels} {series['count']}")
+                lines.append(f"{prefix}_duration_seconds_sum{_format_labels(labels)} {_format_value(series['seconds'])}")
+                lines.append(f"{prefix}_duration_seconds_count{_format_labels(labels)} {series['count']}")
+
+            for suffix, metric_type, help_text, field in _SERIES_METRICS:
+                lines.append(f"# HELP {prefix}_{suffix} {help_text} of {what}")
+                lines.append(f"# TYPE {prefix}_{suffix} {metric_type}")
+                for labels, series in entries:
+                    lines.append(f"{prefix}_{suffix}{_format_labels(labels)} {_format_value(series[field])}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+# ============ Stage spans ============
+
+_current = threading.local()
+
+
+def current_stage() -> str:
+    """Stage of the innermost span running in this thread ("none" outside spans)"""
+    return getattr(_current, "stage", None) or "none"
+
+
+@contextmanager
+def span(stage: str, **context: Any) -> Iterator[None]:
+    """
+    Measure a processing stage: logs "Stage finished" with its usage, adds it
+    to the metrics and labels the subprocesses started inside it. Log lines
+    emitted inside the block carry stage=... and the given context.
+
+    Example:
+        with span("transcribe", project_id=project.id):
+            transcription = transcriber.transcribe_video(video_path)
+    """
+    previous = getattr(_current, "stage", None)
+    thread = threading.get_ident()
+    _current.stage = stage
+
+    before_times = os.times()
+    before_io = _process_io()
+    started = time.perf_counter()
+    failed = False
+    try:
+        with log_context(stage=stage, **context):
+            yield
+    except GeneratorExit:
+        raise  # Generator closed by its consumer: not a failure of the stage
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        if threading.get_ident() == thread:
+            _current.stage = previous
+        after_times = os.times()
+        after_io = _process_io()
+        usage = Usage(
+            seconds=time.perf_counter() - started,
+            cpu_seconds=(after_times.user - before_times.user) + (after_times.system - before_times.system),
+            peak_rss_bytes=_rss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+            read_bytes=max(0, after_io[0] - before_io[0]),
+            written_bytes=max(0, after_io[1] - before_io[1])
+        )
+        metrics_registry.observe("stage", {"stage": stage}, usage, failed)
+        logger.info(
+            "Stage finished",
+            stage=stage,
+            failed=failed,
+            seconds=round(usage.seconds, 3),
+            cpu_seconds=round(usage.cpu_seconds, 3),
+            peak_rss_mb=round(usage.peak_rss_bytes / 1048576, 1),
+            read_mb=round(usage.read_bytes / 1048576, 2),
+            written_mb=round(usage.written_bytes / 1048576, 2),
+            **context
+        )
+
+
+# ============ Subprocesses ============
+
+def _command_name(args: Any) -> str:
+    if isinstance(args, (list, tuple)):
+        program = str(args[0]) if args else ""
+    else:
+        program = str(args).split(" ", 1)[0]
+    return Path(program).name or "unknown"
+
+
+class InstrumentedPopen(subprocess.Popen):
+    """
+    subprocess.Popen that records the child's usage (wall and CPU time, peak
+    RSS, bytes read/written) when it is reaped, by wait(), communicate() or
+    poll(). Labelled with the stage of the span it was started in.
+
+    wait() and poll() reap the child themselves with os.wait4() (which returns
+    its rusage) and set returncode, so Popen never calls waitpid() for it.
+    Without os.wait4() (Windows) they are plain Popen methods.
+    """
+
+    def __init__(self, args, *popenargs, **kwargs):
+        self._metrics_started = time.perf_counter()
+        self._metrics_stage = current_stage()
+        self._metrics_recorded = False
+        self._metrics_lock = threading.Lock()
+        super().__init__(args, *popenargs, **kwargs)
+
+    def _reap(self, block: bool) -> bool:
+        """
+        os.wait4() the child, set returncode and record its usage.
+
+        Returns:
+            False while the child is still running (only when not blocking)
+        """
+        flags = 0 if block else os.WNOHANG
+        io = None
+        try:
+            if _WAITID_AVAILABLE:
+                # Wait without reaping: /proc/<pid>/io disappears with the zombie
+                if os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT | flags) is None:
+                    return False
+                io = _read_proc_io(self.pid)
+            reaped, status, rusage = os.wait4(self.pid, flags)
+        except ChildProcessError:
+            # Reaped elsewhere (SIGCHLD ignored): Popen sets the return code
+            return True
+        if reaped == 0:
+            return False
+        self.returncode = os.waitstatus_to_exitcode(status)
+        self._record(status, rusage, io)
+        return True
+
+    def wait(self, timeout: float = None) -> int:
+        if _WAIT4_AVAILABLE and self.returncode is None:
+            with self._metrics_lock:
+                if self.returncode is None:
+                    if timeout is None:
+                        self._reap(block=True)
+                    else:
+                        # Same polling as Popen.wait(timeout) on POSIX
+                        endtime = time.monotonic() + timeout
+                        delay = 0.0005
+                        while not self._reap(block=False):
+                            remaining = endtime - time.monotonic()
+                            if remaining <= 0:
+                                raise subprocess.TimeoutExpired(self.args, timeout)
+                            delay = min(delay * 2, remaining, 0.05)
+                            time.sleep(delay)
+        return super().wait(timeout)
+
+    def poll(self) -> Optional[int]:
+        if not _WAIT4_AVAILABLE:
+            return super().poll()
+        if self.returncode is None:
+            # Another thread is in wait(): nothing known yet (as Popen.poll)
+            if not self._metrics_lock.acquire(blocking=False):
+                return None
+            try:
+                if self.returncode is None and self._reap(block=False) and self.returncode is None:
+                    return super().poll()  # Reaped elsewhere
+            finally:
+                self._metrics_lock.release()
+        return self.returncode
+
+    def _record(self, status: int, rusage, io: Optional[Tuple[int, int]]):
+        if self._metrics_recorded:
+            return
+        self._metrics_recorded = True
+        try:
+            if io is None:
+                io = (rusage.ru_inblock * 512, rusage.ru_oublock * 512)
+            usage = Usage(
+                seconds=time.perf_counter() - self._metrics_started,
+                cpu_seconds=rusage.ru_utime + rusage.ru_stime,
+                peak_rss_bytes=_rss_bytes(rusage.ru_maxrss),
+                read_bytes=io[0],
+                written_bytes=io[1]
+            )
+            command = _command_name(self.args)
+            returncode = os.waitstatus_to_exitcode(status)
+            metrics_registry.observe(
+                "subprocess", {"command": command, "stage": self._metrics_stage}, usage, returncode != 0
+            )
+            log = logger.info if usage.seconds >= 1 else logger.debug
+            log(
+                "Subprocess finished",
+                command=command,
+                stage=self._metrics_stage,
+                returncode=returncode,
+                seconds=round(usage.seconds, 3),
+                cpu_seconds=round(usage.cpu_seconds, 3),
+                peak_rss_mb=round(usage.peak_rss_bytes / 1048576, 1),
+                read_mb=round(usage.read_bytes / 1048576, 2),
+                written_mb=round(usage.written_bytes / 1048576, 2)
+            )
+        except Exception as e:
+            logger.warning("Could not record subprocess metrics", error=str(e))
+
+
+def instrumented_run(
+    args,
+    *,
+    input=None,
+    capture_output: bool = False,
+    timeout: float = None,
+    check: bool = False,
+    **kwargs
+) -> subprocess.CompletedProcess:
+    """subprocess.run() through InstrumentedPopen (same arguments and behaviour)"""
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    if capture_output:
+        kwargs["stdout"] = subprocess.PIPE
+        kwargs["stderr"] = subprocess.PIPE
+
+    with InstrumentedPopen(args, **kwargs) as process:
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        except BaseException:
+            process.kill()
+            raise
+        returncode = process.poll()
+        if check and returncode:
+            raise subprocess.CalledProcessError(returncode, process.args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(process.args, returncode, stdout, stderr)
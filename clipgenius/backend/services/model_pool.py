@@ -0,0 +1,220 @@
+"""
+ClipGenius - Model Pool
+Keeps local transcription models resident between jobs under a memory budget.
+
+Loading a Whisper model takes several seconds (tens for large models and the
+wav2vec2 align models of whisperx), so unloading after every job made each
+transcription pay a cold start, while keeping every model ever used loaded
+grows without bound across model sizes and languages.
+
+The pool holds each loaded model under a key (backend, model size, device,
+compute type - or the language of an align model) with its estimated size.
+Loading a model that does not fit in MODEL_POOL_MAX_MB first unloads the least
+recently used ones. Concurrent requests for the same model wait for a single
+load instead of loading it twice.
+
+In worker processes the models normally live in the dedicated inference
+process (services/model_server.py), so each model is loaded once per machine
+instead of once per worker.
+"""
+import gc
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from config import MODEL_POOL_MAX_MB
+from logging_config import get_service_logger
+
+logger = get_service_logger("model_pool")
+
+# Approximate resident size of a Whisper model in float32 (weights + runtime), MB
+_WHISPER_MODEL_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 1000,
+    "medium": 2600,
+    "large": 5200,
+}
+
+# wav2vec2 align model of whisperx (one per language)
+ALIGN_MODEL_MB = 400
+
+# Compute types that roughly halve the resident size
+_HALF_SIZE_COMPUTE_TYPES = ("int8", "int8_float32", "int8_float16", "float16", "int8_bfloat16", "bfloat16")
+
+
+def estimate_model_mb(model_size: str, compute_type: str = "float32") -> int:
+    """Estimated memory of a Whisper model (large-v2/large-v3 count as large)"""
+    base = _WHISPER_MODEL_MB.get(model_size.split("-")[0].split(".")[0], _WHISPER_MODEL_MB["large"])
+    if compute_type in _HALF_SIZE_COMPUTE_TYPES:
+        return base // 2
+    return base
+
+
+def _release_memory():
+    """Return freed model memory to the system (CPU and CUDA)"""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+@dataclass
+class _PooledModel:
+    model: Any
+    size_mb: int
+    loaded_at: float
+    uses: int = 0
+
+
+class ModelPool:
+    """Thread-safe LRU pool of loaded models with a memory budget"""
+
+    def __init__(self, max_mb: int = None):
+        """
+        Args:
+            max_mb: Memory budget of all resident models (default: MODEL_POOL_MAX_MB).
+                    A single model larger than the budget is still loaded, alone.
+        """
+        self.max_mb = max_mb or MODEL_POOL_MAX_MB
+        self._models: "OrderedDict[Hashable, _PooledModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_mb: int) -> Any:
+        """
+        Model stored under `key`, loading it with `loader()` on a miss.
+
+        Least recently used models are unloaded first until `size_mb` fits in
+        the budget, so the peak stays under it while the new model loads.
+        """
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                return self._use(key, entry)
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Loaded by another thread while we waited
+                entry = self._models.get(key)
+                if entry is not None:
+                    return self._use(key, entry)
+                evicted = self._make_room(size_mb)
+
+            if evicted:
+                _release_memory()
+
+            started = time.time()
+            try:
+                model = loader()
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+            with self._lock:
+                entry = _PooledModel(model=model, size_mb=size_mb, loaded_at=time.time())
+                self._models[key] = entry
+                self._loads += 1
+                self._use(key, entry)
+                resident_mb = self._resident_mb()
+
+            logger.info(
+                "Model loaded",
+                key=repr(key),
+                size_mb=size_mb,
+                resident_mb=resident_mb,
+                evicted=[repr(k) for k in evicted],
+                duration_seconds=round(time.time() - started, 2)
+            )
+            return model
+
+    def _use(self, key: Hashable, entry: _PooledModel) -> Any:
+        self._models.move_to_end(key)
+        entry.uses += 1
+        if entry.uses > 1:
+            self._hits += 1
+        return entry.model
+
+    def _resident_mb(self) -> int:
+        return sum(entry.size_mb for entry in self._models.values())
+
+    def _make_room(self, size_mb: int) -> List[Hashable]:
+        """Drop least recently used models until size_mb fits (caller holds the lock)"""
+        evicted = []
+        while self._models and self._resident_mb() + size_mb > self.max_mb:
+            key, _ = self._models.popitem(last=False)
+            evicted.append(key)
+            self._evictions += 1
+        return evicted
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def evict(self, match: Callable[[Hashable], bool]) -> int:
+        """
+        Unload every model whose key matches. Returns models unloaded.
+
+        Callers still running inference keep their reference until they finish.
+        """
+        with self._lock:
+            keys = [key for key in self._models if match(key)]
+            for key in keys:
+                del self._models[key]
+            self._evictions += len(keys)
+        if keys:
+            _release_memory()
+            logger.info("Models unloaded", keys=[repr(k) for k in keys])
+        return len(keys)
+
+    def clear(self) -> int:
+        """Unload all models"""
+        return self.evict(lambda key: True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Resident models and hit/load/eviction counters"""
+        with self._lock:
+            return {
+                "max_mb": self.max_mb,
+                "resident_mb": self._resident_mb(),
+                "hits": self._hits,
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "models": [
+                    {"key": list(key) if isinstance(key, tuple) else key, "size_mb": entry.size_mb, "uses": entry.uses}
+                    for key, entry in self._models.items()
+                ]
+            }
+
+
+def parse_preload(spec: str, default_backend: str, default_model: str) -> List[Tuple[str, str]]:
+    """
+    (backend, model_size) pairs of a MODEL_PRELOAD value.
+
+    "faster-whisper:small,whisperx" -> [("faster-whisper", "small"), ("whisperx", default_model)];
+    "auto" stands for the default backend and model.
+    """
+    models = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item == "auto":
+            models.append((default_backend, default_model))
+            continue
+        backend, _, model_size = item.partition(":")
+        models.append((backend.strip(), model_size.strip() or default_model))
+    return models
+
+
+# Shared instance (one per process)
+model_pool = ModelPool()
@@ -0,0 +1,303 @@
+"""
+ClipGenius - Model Server
+Dedicated inference process that owns the local transcription models.
+
+Every worker process used to load its own copy of the Whisper model on its
+first transcription (and the API unloaded it again after each job), so N
+workers meant N copies in RAM and a cold start on most jobs. With
+MODEL_SERVER_ENABLED the worker pool starts one model server next to the
+workers: it preloads MODEL_PRELOAD at startup, keeps the models in its
+ModelPool (services/model_pool.py) and serves transcription requests over a
+local socket (multiprocessing.connection, authenticated with a per-pool key).
+
+Workers send the audio (file path or float32 samples of a streaming chunk) and
+get back the backend's raw result; post-processing and caching stay in the
+worker. If the server cannot be reached, the worker loads the model itself.
+
+Streaming chunks of jobs transcribing at the same time are merged into shared
+inference batches (services/inference_batcher.py).
+"""
+import os
+import secrets
+import tempfile
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import MODEL_PRELOAD, TRANSCRIPTION_BACKEND, WHISPER_MODEL, WHISPER_LANGUAGE
+from logging_config import get_service_logger
+from .inference_batcher import InferenceBatcher
+from .model_pool import model_pool, parse_preload
+
+logger = get_service_logger("model_server")
+
+# Set by the worker pool before spawning workers (inherited by the children)
+ADDRESS_ENV = "CLIPGENIUS_MODEL_SERVER"
+AUTHKEY_ENV = "CLIPGENIUS_MODEL_SERVER_KEY"
+
+
+class ModelServerUnavailable(Exception):
+    """The model server could not be reached (not started, restarting, crashed)"""
+    pass
+
+
+class ModelServerError(RuntimeError):
+    """The model server ran the request and it failed"""
+    pass
+
+
+def new_server_address() -> Tuple[str, str]:
+    """(address, hex authkey) for a new model server of this process"""
+    name = f"clipgenius-models-{os.getpid()}"
+    if os.name == "nt":
+        address = rf"\\.\pipe\{name}"
+    else:
+        address = os.path.join(tempfile.gettempdir(), f"{name}.sock")
+    return address, secrets.token_hex(16)
+
+
+def preload_models(spec: str = None, language: str = None) -> int:
+    """
+    Load the MODEL_PRELOAD models into this process' pool. Returns models loaded.
+
+    whisperx also loads the align model of `language` (default: WHISPER_LANGUAGE).
+    """
+    from .transcriber_v2 import STREAMING_BACKENDS, TranscriberV2
+
+    spec = MODEL_PRELOAD if spec is None else spec
+    language = language or (WHISPER_LANGUAGE if WHISPER_LANGUAGE != "auto" else None)
+
+    loaded = 0
+    for backend, model_size in parse_preload(spec, TRANSCRIPTION_BACKEND, WHISPER_MODEL):
+        started = time.time()
+        try:
+            transcriber = TranscriberV2(
+                backend=backend,
+                model_size=model_size,
+                use_cache=False,
+                streaming=False,
+                model_server=False
+            )
+            if transcriber.backend not in STREAMING_BACKENDS:
+                continue
+            transcriber.load_models(language)
+            loaded += 1
+            logger.info(
+                "Model preloaded",
+                backend=transcriber.backend,
+                model_size=model_size,
+                duration_seconds=round(time.time() - started, 2)
+            )
+        except Exception as e:
+            logger.warning("Model preload failed", backend=backend, model_size=model_size, error=str(e))
+    return loaded
+
+
+class ModelServer:
+    """Request handler of the inference process (one transcriber per model configuration)"""
+
+    def __init__(self):
+        self._transcribers: Dict[tuple, Any] = {}
+        self._inference_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batcher = InferenceBatcher(self._run_batch)
+
+    def _transcriber(self, backend: str, model_size: str, device: str, compute_type: str):
+        from .transcriber_v2 import TranscriberV2
+
+        key = (backend, model_size, device, compute_type)
+        with self._lock:
+            if key not in self._transcribers:
+                self._transcribers[key] = TranscriberV2(
+                    backend=backend,
+                    model_size=model_size,
+                    device=device,
+                    compute_type=compute_type,
+                    use_cache=False,
+                    streaming=False,
+                    model_server=False
+                )
+                self._inference_locks[key] = threading.Lock()
+            return self._transcribers[key], self._inference_locks[key]
+
+    def transcribe(
+        self,
+        backend: str,
+        model_size: str,
+        device: str,
+        compute_type: str,
+        audio,
+        language: Optional[str] = None,
+        stream_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Raw backend result of one audio file or samples array.
+
+        Samples with a known language join the batch of their model; files and
+        language detection (first chunk of an "auto" job) run on their own.
+        """
+        model = (backend, model_size, device, compute_type)
+        if language and isinstance(audio, np.ndarray):
+            return self._batcher.submit((model, language), audio, stream_id)
+
+        transcriber, inference_lock = self._transcriber(*model)
+        with inference_lock:
+            return transcriber._transcribe_in_process(audio, language)
+
+    def _run_batch(self, key: tuple, audios: list) -> list:
+        model, language = key
+        transcriber, inference_lock = self._transcriber(*model)
+        # One inference at a time per model: concurrent jobs share the model, not its memory peak
+        with inference_lock:
+            return transcriber._transcribe_batch(audios, language)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self._requests, "pid": os.getpid(), **self._batcher.stats(), **model_pool.stats()}
+
+    def handle(self, command: str, kwargs: Dict[str, Any]) -> Any:
+        self._requests += 1
+        if command == "transcribe":
+            return self.transcribe(**kwargs)
+        if command == "stats":
+            return self.stats()
+        if command == "preload":
+            return preload_models(**kwargs)
+        raise ValueError(f"Unknown model server command: {command}")
+
+    def _serve_connection(self, conn):
+        try:
+            while True:
+                try:
+                    command, kwargs = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    reply = ("ok", self.handle(command, kwargs))
+                except Exception as e:
+                    logger.error("Model server request failed", command=command, error=str(e))
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                conn.send(reply)
+        except OSError:
+            return
+        finally:
+            conn.close()
+
+    def serve(self, listener: Listener, stop_event: threading.Event = None):
+        """Accept connections until stop_event is set (one thread per connection)"""
+        while stop_event is None or not stop_event.is_set():
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                logger.warning("Rejected model server connection with a wrong key")
+                continue
+            except OSError:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                raise
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+def run_model_server(address: str, authkey: str, ready_event=None):
+    """
+    Model server process main: bind, signal ready, preload, serve forever.
+
+    Args:
+        address: Socket path (named pipe on Windows) from new_server_address()
+        authkey: Hex key shared with the workers
+        ready_event: multiprocessing.Event set once clients can connect
+    """
+    from logging_config import configure_logging
+
+    configure_logging()
+    if os.name != "nt" and os.path.exists(address):
+        os.unlink(address)  # Left behind by a crashed server
+
+    server = ModelServer()
+    listener = Listener(address, authkey=bytes.fromhex(authkey))
+    logger.info("Model server started", address=address, pid=os.getpid())
+    if ready_event is not None:
+        ready_event.set()
+
+    # Requests for a model still being preloaded wait for that load (ModelPool)
+    threading.Thread(target=preload_models, daemon=True).start()
+    try:
+        server.serve(listener)
+    finally:
+        listener.close()
+
+
+class ModelServerClient:
+    """Worker side of the model server (one connection per request)"""
+
+    def __init__(self, address: str = None, authkey: str = None):
+        self._address = address
+        self._authkey = authkey
+
+    @property
+    def address(self) -> Optional[str]:
+        # Read lazily: the API process sets the variables after importing the services
+        return self._address or os.getenv(ADDRESS_ENV) or None
+
+    @property
+    def enabled(self) -> bool:
+        return self.address is not None
+
+    def request(self, command: str, **kwargs) -> Any:
+        """
+        Run a command on the server.
+
+        Raises:
+            ModelServerUnavailable: server not reachable (caller may run locally)
+            ModelServerError: the command failed on the server
+        """
+        if not self.enabled:
+            raise ModelServerUnavailable("model server not configured")
+        authkey = bytes.fromhex(self._authkey or os.getenv(AUTHKEY_ENV, ""))
+        try:
+            conn = Client(self.address, authkey=authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise ModelServerUnavailable(str(e) or type(e).__name__) from e
+        try:
+            conn.send((command, kwargs))
+            status, payload = conn.recv()
+        except (OSError, EOFError) as e:
+            raise ModelServerUnavailable(f"connection lost: {e or type(e).__name__}") from e
+        finally:
+            conn.close()
+
+        if status == "error":
+            raise ModelServerError(payload)
+        return payload
+
+    def transcribe(
+        self,
+        backend: str,
+        model_size: str,
+        device: str,
+        compute_type: str,
+        audio,
+        language: Optional[str] = None,
+        stream_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Raw backend result (see TranscriberV2._transcribe_local)"""
+        return self.request(
+            "transcribe",
+            backend=backend,
+            model_size=model_size,
+            device=device,
+            compute_type=compute_type,
+            audio=audio,
+            language=language,
+            stream_id=stream_id
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return self.request("stats")
+
+
+# Shared instance (one per process)
+model_server_client = ModelServerClient()
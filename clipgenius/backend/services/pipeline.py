@@ -0,0 +1,243 @@
+"""
+ClipGenius - Stage Pipeline
+Building blocks to run the processing stages of a job concurrently.
+
+The staged pipeline finishes each stage before starting the next one, so the
+first clip is only rendered once the whole video has been downloaded,
+transcribed and analyzed. Here stages are connected by bounded queues and each
+one consumes the partial results of the previous stage:
+
+- run_streaming(): runs a producer that reports results through a callback
+  (e.g. the transcriber) in its own thread; the consumer iterates the items
+  while the producer keeps going
+- StageCounters: thread-safe done/total counters per stage (progress is
+  reported per stage - stages overlap, so a single percentage is meaningless)
+- ProgressReporter: writes the counters to the project row periodically from
+  its own database session (stage threads never touch the ORM session)
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from config import PIPELINE_QUEUE_SIZE, PIPELINE_PROGRESS_INTERVAL
+from models import Project, get_background_session
+from logging_config import get_service_logger
+
+logger = get_service_logger("pipeline")
+
+# Stage states reported in the counters
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+_END = object()
+
+
+class StageCancelled(Exception):
+    """Raised by emit() when the consumer of a stage stopped reading"""
+
+
+class _Raised:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def run_streaming(
+    func: Callable[[Callable[[Any], None]], Any],
+    maxsize: int = None,
+    name: str = "pipeline-stage"
+) -> Tuple[Iterator[Any], Future]:
+    """
+    Run func(emit) in a background thread and iterate what it emits.
+
+    Items go through a bounded queue (PIPELINE_QUEUE_SIZE), so a slow consumer
+    applies back-pressure instead of buffering a whole stage in memory.
+
+    Returns:
+        Tuple of (items, future): `items` yields the emitted items until func
+        returns, then `future` holds its return value. An error raised by func is
+        raised by `items` (after the items emitted before it) and by the future.
+        Closing `items` early makes the next emit() raise StageCancelled.
+    """
+    items: "queue.Queue[Any]" = queue.Queue(maxsize or PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    future: Future = Future()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def emit(item) -> None:
+        if not put(item):
+            raise StageCancelled(name)
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            result = func(emit)
+        except BaseException as e:
+            future.set_exception(e)
+            put(_Raised(e))
+            return
+        future.set_result(result)
+        put(_END)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+
+    def iterate() -> Iterator[Any]:
+        try:
+            while True:
+                item = items.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Raised):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+
+    return iterate(), future
+
+
+class StageCounters:
+    """
+    Progress of each pipeline stage: items done out of total (None while the
+    total is unknown, e.g. clips before the analysis has finished).
+    """
+
+    def __init__(self, stages: Dict[str, str]):
+        """
+        Args:
+            stages: Stage name -> unit of its counter ("seconds", "clips", ...), in pipeline order
+        """
+        self._lock = threading.Lock()
+        self._stages = {
+            name: {'state': PENDING, 'done': 0, 'total': None, 'unit': unit}
+            for name, unit in stages.items()
+        }
+        self.version = 0
+
+    def _update(self, stage: str, **values) -> None:
+        with self._lock:
+            self._stages[stage].update(values)
+            self.version += 1
+
+    def start(self, stage: str, total: Optional[float] = None) -> None:
+        self._update(stage, state=RUNNING, total=total)
+
+    def set_total(self, stage: str, total: Optional[float]) -> None:
+        self._update(stage, total=total)
+
+    def advance(self, stage: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stages[stage]['done'] += amount
+            self.version += 1
+
+    def set_done(self, stage: str, done: float) -> None:
+        self._update(stage, done=done)
+
+    def finish(self, stage: str, state: str = DONE) -> None:
+        with self._lock:
+            counter = self._stages[stage]
+            counter['state'] = state
+            if state == DONE and counter['total'] is None:
+                counter['total'] = counter['done']
+            self.version += 1
+
+    def fail_running(self) -> None:
+        """Mark the stages still running as failed"""
+        with self._lock:
+            for counter in self._stages.values():
+                if counter['state'] == RUNNING:
+                    counter['state'] = FAILED
+            self.version += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(counter) for name, counter in self._stages.items()}
+
+    @staticmethod
+    def overall_progress(stages: Dict[str, Dict[str, Any]], weights: Dict[str, float]) -> int:
+        """Weighted 0-100% estimate of a counters snapshot (for clients that show one bar)"""
+        total_weight = sum(weights.get(name, 0) for name in stages) or 1
+        progress = 0.0
+        for name, counter in stages.items():
+            if counter['state'] in (DONE, SKIPPED):
+                fraction = 1.0
+            elif counter.get('total'):
+                fraction = min(1.0, counter['done'] / counter['total'])
+            else:
+                fraction = 0.0
+            progress += weights.get(name, 0) * fraction
+        return int(100 * progress / total_weight)
+
+
+class ProgressReporter:
+    """
+    Background thread that saves a StageCounters snapshot in
+    projects.stage_progress whenever it changed (at most every
+    PIPELINE_PROGRESS_INTERVAL seconds).
+    """
+
+    def __init__(
+        self,
+        project_id: int,
+        counters: StageCounters,
+        columns: Callable[[Dict[str, Dict[str, Any]]], Dict[Any, Any]] = None,
+        interval: float = None
+    ):
+        """
+        Args:
+            columns: Extra project columns derived from a snapshot (status, message...)
+        """
+        self.project_id = project_id
+        self.counters = counters
+        self.columns = columns
+        self.interval = interval or PIPELINE_PROGRESS_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._saved_version = -1
+
+    def flush(self) -> None:
+        """Write the counters now (if they changed since the last write)"""
+        version = self.counters.version
+        if version == self._saved_version:
+            return
+        snapshot = self.counters.snapshot()
+        values = {Project.stage_progress: snapshot}
+        if self.columns is not None:
+            values.update(self.columns(snapshot))
+
+        db = get_background_session()
+        try:
+            db.query(Project).filter(Project.id == self.project_id).update(values, synchronize_session=False)
+            db.commit()
+            self._saved_version = version
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to save stage counters", project_id=self.project_id, error=str(e))
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def __enter__(self) -> "ProgressReporter":
+        self._thread = threading.Thread(target=self._run, name="pipeline-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
@@ -0,0 +1,164 @@
+"""
+ClipGenius - AI Provider Registry
+Shared ClipAnalyzer instances with cached provider health checks.
+
+Building a ClipAnalyzer used to run the provider check (_verify_groq,
+_verify_minimax - a real completion - or _verify_ollama) for every project.
+The registry keeps one analyzer per (provider, base URL) and verifies it once:
+
+- a healthy result is reused for PROVIDER_HEALTH_TTL_SECONDS; after that the
+  check is re-run in a background thread while the analyzer keeps serving
+- a failed check is raised to callers (without a network round trip) until
+  PROVIDER_HEALTH_FAILURE_TTL_SECONDS have passed, then checked again
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    AI_PROVIDER,
+    PROVIDER_HEALTH_TTL_SECONDS,
+    PROVIDER_HEALTH_FAILURE_TTL_SECONDS
+)
+from logging_config import get_service_logger
+from .analyzer import ClipAnalyzer
+
+logger = get_service_logger("provider_registry")
+
+
+@dataclass
+class ProviderHealth:
+    """Result of one provider health check"""
+    healthy: bool
+    checked_at: float
+    latency_seconds: float
+    error: Optional[str] = None
+    # Raised to callers while unhealthy; kept in the same snapshot as `healthy`
+    exception: Optional[Exception] = field(default=None, repr=False, compare=False)
+
+
+class _Entry:
+    def __init__(self, analyzer: ClipAnalyzer):
+        self.analyzer = analyzer
+        self.health: Optional[ProviderHealth] = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+class ProviderRegistry:
+    """One verified ClipAnalyzer per (provider, base URL), reused across jobs"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = None,
+        failure_ttl_seconds: float = None,
+        analyzer_factory: Callable[..., ClipAnalyzer] = ClipAnalyzer
+    ):
+        self.ttl_seconds = ttl_seconds or PROVIDER_HEALTH_TTL_SECONDS
+        self.failure_ttl_seconds = (
+            PROVIDER_HEALTH_FAILURE_TTL_SECONDS if failure_ttl_seconds is None else failure_ttl_seconds
+        )
+        self._analyzer_factory = analyzer_factory
+        self._entries: Dict[Tuple[str, Optional[str]], _Entry] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _entry(self, provider: Optional[str], base_url: Optional[str]) -> _Entry:
+        key = (provider or AI_PROVIDER, base_url)
+        with self._lock:
+            # Health and analyzers of the parent are not reused by forked workers
+            if self._pid != os.getpid():
+                self._entries = {}
+                self._pid = os.getpid()
+
+            entry = self._entries.get(key)
+            if entry is None:
+                analyzer = self._analyzer_factory(provider=provider, base_url=base_url, verify=False)
+                entry = self._entries[key] = _Entry(analyzer)
+        return entry
+
+    def get_analyzer(self, provider: str = None, base_url: str = None) -> ClipAnalyzer:
+        """
+        Shared analyzer for the provider, verified at most once per TTL.
+
+        Raises:
+            The error of the last health check while the provider is unhealthy
+        """
+        entry = self._entry(provider, base_url)
+        health = entry.health
+        now = time.time()
+
+        if health is None or (not health.healthy and now - health.checked_at >= self.failure_ttl_seconds):
+            self._check(entry, health)
+        elif health.healthy and now - health.checked_at >= self.ttl_seconds:
+            self._refresh_in_background(entry)
+
+        # Read the health once: a background refresh may replace it meanwhile
+        health = entry.health
+        if not health.healthy:
+            raise health.exception
+        return entry.analyzer
+
+    def _check(self, entry: _Entry, previous: Optional[ProviderHealth]) -> None:
+        """Run the health check unless another thread already replaced `previous`"""
+        with entry.lock:
+            if entry.health is not previous:
+                return
+
+            analyzer = entry.analyzer
+            started = time.time()
+            try:
+                analyzer.verify()
+                entry.health = ProviderHealth(True, time.time(), time.time() - started)
+                logger.info(
+                    "Provider health check passed",
+                    provider=analyzer.provider,
+                    latency_seconds=round(entry.health.latency_seconds, 3)
+                )
+            except Exception as e:
+                entry.health = ProviderHealth(False, time.time(), time.time() - started, str(e), e)
+                logger.error("Provider health check failed", provider=analyzer.provider, error=str(e))
+
+    def _refresh_in_background(self, entry: _Entry) -> None:
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def refresh():
+            try:
+                self._check(entry, entry.health)
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=refresh, name="provider-health-refresh", daemon=True).start()
+
+    def invalidate(self) -> None:
+        """Forget all analyzers and health results (next use re-verifies)"""
+        with self._lock:
+            self._entries = {}
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Cached health of every provider used by this process"""
+        with self._lock:
+            entries = list(self._entries.values())
+
+        result = []
+        for entry in entries:
+            health = entry.health
+            result.append({
+                'provider': entry.analyzer.provider,
+                'model': entry.analyzer.model,
+                'base_url': entry.analyzer.base_url,
+                'healthy': health.healthy if health else None,
+                'checked_at': health.checked_at if health else None,
+                'latency_seconds': round(health.latency_seconds, 3) if health else None,
+                'error': health.error if health else None
+            })
+        return result
+
+
+# Shared instance
+provider_registry = ProviderRegistry()
@@ -41,7 +41,12 @@ except ImportError:
 if not MEDIAPIPE_AVAILABLE or not CV2_AVAILABLE:
     print("Warning: mediapipe/opencv not available. AI Reframe will use center crop fallback.")
 
-from config import CLIPS_DIR
+from config import CLIPS_DIR, FACE_TRACK_ENABLED, REFRAME_SHOT_DETECTION
+from .frame_sampler import FrameSampler
+from .face_track import FaceTrack, face_track_store
+from .camera_path import plan_camera_path
+from .shot_detector import ShotDetector
+from .metrics import instrumented_run
 
 
 # Model file for MediaPipe Tasks API
@@ -153,16 +158,30 @@ class AIReframer:
 
         return None
 
-    def detect_faces_in_video(
+    def _detect_faces_in_batch(self, rgb_frames: np.ndarray) -> List[Optional[Tuple[float, float, float, float, float]]]:
+        """
+        Detect the main face of each frame of a sampled batch.
+
+        MediaPipe has no batched image API, so frames run back to back; what the
+        batch saves is the per-sample seek and decode (see FrameSampler).
+        """
+        return [self._detect_face_in_frame(frame) for frame in rgb_frames]
+
+    def detect_face_track(
         self,
         video_path: str,
-        sample_interval: float = 0.5,  # Sample every 0.5 seconds
+        sample_interval: float = 0.5,
         start_time: float = 0,
         end_time: Optional[float] = None
-    ) -> List[FacePosition]:
+    ) -> FaceTrack:
         """
         Detect faces throughout the video at regular intervals.
 
+        Sampled frames are decoded front to back (no seek per sample), downscaled
+        to REFRAME_DETECT_WIDTH and detected in batches of REFRAME_DETECT_BATCH_SIZE.
+        With REFRAME_SHOT_DETECTION the same samples are checked for hard cuts
+        (stored in the track) and static samples reuse the previous detection.
+
         Args:
             video_path: Path to video file
             sample_interval: Time between samples in seconds
@@ -170,46 +189,40 @@ class AIReframer:
             end_time: End time for detection (None = full video)
 
         Returns:
-            List of FacePosition objects
+            FaceTrack of the samples with a face, and the shot cuts
         """
         if not MEDIAPIPE_AVAILABLE or not CV2_AVAILABLE or self.face_detector is None:
-            return []
-
-        cap = None
-        try:
-            cap = cv2.VideoCapture(str(video_path))
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video: {video_path}")
-
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = total_frames / fps if fps > 0 else 0
-
-            if end_time is None:
-                end_time = duration
-
-            face_positions = []
-            sample_frames = int(sample_interval * fps)
-
-            start_frame = int(start_time * fps)
-            end_frame = int(end_time * fps)
-
-            print(f"Detecting faces from {start_time:.1f}s to {end_time:.1f}s (every {sample_interval}s)")
-
-            frame_num = start_frame
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-            while frame_num < end_frame:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                # Convert to RGB for MediaPipe
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                timestamp = frame_num / fps
-
-                face_data = self._detect_face_in_frame(rgb_frame)
-
+            return FaceTrack.from_positions([], sample_interval)
+
+        sampler = FrameSampler()
+        info = sampler.probe(video_path)
+        if end_time is None:
+            end_time = info.total_frames / info.fps if info.fps > 0 else 0
+
+        print(f"Detecting faces from {start_time:.1f}s to {end_time:.1f}s (every {sample_interval}s, {sampler.backend} sampler)")
+
+        shots = ShotDetector() if REFRAME_SHOT_DETECTION else None
+        face_positions = []
+        cuts = []
+        face_data = None
+        samples = detected = 0
+        for batch in sampler.iter_batches(video_path, sample_interval, start_time, end_time, info=info):
+            if shots is not None:
+                cut, static = shots.update(batch.frames)
+            else:
+                cut = static = np.zeros(len(batch.frame_nums), dtype=bool)
+
+            # Static samples keep the result of the last detected one
+            run = ~static
+            detections = iter(self._detect_faces_in_batch(batch.frames[run]))
+            samples += len(batch.frame_nums)
+            detected += int(run.sum())
+
+            for i, (frame_num, timestamp) in enumerate(zip(batch.frame_nums, batch.timestamps)):
+                if cut[i]:
+                    cuts.append(timestamp)
+                if run[i]:
+                    face_data = next(detections)
                 if face_data:
                     center_x, center_y, width, height, confidence = face_data
                     face_positions.append(FacePosition(
@@ -222,17 +235,58 @@ class AIReframer:
                         confidence=confidence
                     ))
 
-                # Skip to next sample
-                frame_num += sample_frames
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+        print(
+            f"Detected {len(face_positions)} face positions "
+            f"({detected}/{samples} samples detected, {len(cuts)} shot cuts)"
+        )
+        return FaceTrack.from_positions(face_positions, sample_interval, cuts)
 
-            print(f"Detected {len(face_positions)} face positions")
-            return face_positions
+    def detect_faces_in_video(
+        self,
+        video_path: str,
+        sample_interval: float = 0.5,  # Sample every 0.5 seconds
+        start_time: float = 0,
+        end_time: Optional[float] = None
+    ) -> List[FacePosition]:
+        """
+        Detect faces throughout the video at regular intervals.
+
+        Returns:
+            List of FacePosition objects (see detect_face_track for the arrays and shot cuts)
+        """
+        return self.detect_face_track(video_path, sample_interval, start_time, end_time).positions()
 
-        finally:
-            # Always release VideoCapture
-            if cap is not None:
-                cap.release()
+    def clip_face_track(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        sample_interval: float = 0.5
+    ) -> FaceTrack:
+        """
+        Face track (NumPy arrays) of a clip range.
+
+        With FACE_TRACK_ENABLED the whole video is detected once (shared sidecar,
+        see services/face_track.py) and the range is sliced from it; otherwise
+        only the clip range is detected.
+        """
+        if self.face_detector is None:
+            return FaceTrack.from_positions([], sample_interval)
+        if not FACE_TRACK_ENABLED:
+            return self.detect_face_track(video_path, sample_interval, start_time, end_time)
+
+        track = face_track_store.get_or_compute(str(video_path), sample_interval, self.detect_face_track)
+        return track.between(start_time, end_time)
+
+    def clip_face_positions(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        sample_interval: float = 0.5
+    ) -> List[FacePosition]:
+        """Face positions of a clip range, as FacePosition objects (see clip_face_track)"""
+        return self.clip_face_track(video_path, start_time, end_time, sample_interval).slice(start_time, end_time)
 
     def smooth_positions(
         self,
@@ -282,17 +336,21 @@ class AIReframer:
         fps: float,
         start_time: float,
         end_time: float
-    ) -> List[Tuple[float, float, float]]:
+    ) -> np.ndarray:
         """
         Interpolate face positions for every frame.
 
+        The reframe path no longer needs per-frame positions (see
+        services/camera_path.py); kept for callers that do.
+
         Returns:
-            List of (timestamp, center_x, center_y) for each frame
+            Array of shape (frames, 3): timestamp, center_x, center_y of each frame
         """
         if not positions:
             # No faces detected - return center positions
             num_frames = int((end_time - start_time) * fps)
-            return [(start_time + i/fps, 0.5, 0.4) for i in range(num_frames)]
+            frame_times = start_time + np.arange(num_frames) / fps
+            return np.column_stack((frame_times, np.full(num_frames, 0.5), np.full(num_frames, 0.4)))
 
         # Create interpolation arrays
         timestamps = np.array([p.timestamp for p in positions])
@@ -307,7 +365,7 @@ class AIReframer:
         interp_x = np.interp(frame_times, timestamps, x_coords)
         interp_y = np.interp(frame_times, timestamps, y_coords)
 
-        return list(zip(frame_times, interp_x, interp_y))
+        return np.column_stack((frame_times, interp_x, interp_y))
 
     def get_video_info(self, video_path: str) -> Dict[str, Any]:
         """Get video dimensions and FPS using ffprobe"""
@@ -320,7 +378,7 @@ class AIReframer:
             str(video_path)
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = instrumented_run(cmd, capture_output=True, text=True, check=True)
         data = json.loads(result.stdout)
         stream = data['streams'][0]
 
@@ -404,63 +462,82 @@ class AIReframer:
 
         return keyframes
 
-    def cut_clip_with_tracking(
+    @staticmethod
+    def crop_path_expression(points: List[Tuple[float, float]]) -> str:
+        """
+        Compile a crop path into an FFmpeg expression of `t`.
+
+        The value is linearly interpolated between consecutive (time, value)
+        points and held before the first / after the last one. Segments are
+        selected through a balanced if(lt(t,...)) tree, so each frame evaluates
+        O(log n) comparisons and the nesting stays shallow for long clips.
+        Points inside a run of equal values are dropped.
+        """
+        # Keep the ends of constant runs only
+        compact = []
+        for i, (time_, value) in enumerate(points):
+            if 0 < i < len(points) - 1 and points[i - 1][1] == value == points[i + 1][1]:
+                continue
+            compact.append((float(time_), float(value)))
+
+        def number(value: float) -> str:
+            return f"{value:.4f}".rstrip('0').rstrip('.')
+
+        def segment(i: int) -> str:
+            (t0, v0), (t1, v1) = compact[i], compact[i + 1]
+            if v0 == v1 or t1 <= t0:
+                return number(v0)
+            return f"{number(v0)}+{number((v1 - v0) / (t1 - t0))}*(t-{number(t0)})"
+
+        def tree(lo: int, hi: int) -> str:
+            # Segments lo..hi-1; segment i covers [compact[i].t, compact[i+1].t)
+            if hi - lo == 1:
+                return segment(lo)
+            mid = (lo + hi) // 2
+            return f"if(lt(t,{number(compact[mid][0])}),{tree(lo, mid)},{tree(mid, hi)})"
+
+        if len(compact) == 1:
+            return number(compact[0][1])
+        first_t, first_v = compact[0]
+        last_t, last_v = compact[-1]
+        inner = tree(0, len(compact) - 1)
+        return (
+            f"if(lt(t,{number(first_t)}),{number(first_v)},"
+            f"if(gte(t,{number(last_t)}),{number(last_v)},{inner}))"
+        )
+
+    def calculate_tracking_crop(
         self,
         video_path: str,
         start_time: float,
         end_time: float,
-        output_name: str,
-        target_resolution: Tuple[int, int] = (1080, 1920),
+        video_info: Dict[str, Any],
         enable_tracking: bool = True,
         sample_interval: float = 0.5
     ) -> Dict[str, Any]:
         """
-        Cut a clip with AI face tracking and reframing.
-
-        Args:
-            video_path: Path to source video
-            start_time: Start time in seconds
-            end_time: End time in seconds
-            output_name: Output filename (without extension)
-            target_resolution: Target resolution (width, height)
-            enable_tracking: Enable face tracking (False = center crop)
-            sample_interval: Face detection sample interval in seconds
+        Calculate the static crop of a clip centered on the average face position.
 
         Returns:
-            Dict with clip info and output path
+            Dict with x, y, width, height (pixels) and faces_detected
         """
-        video_path = Path(video_path)
-        output_path = self.clips_dir / f"{output_name}.mp4"
-        duration = end_time - start_time
-
-        # Get video info
-        video_info = self.get_video_info(str(video_path))
         source_width = video_info['width']
         source_height = video_info['height']
-        fps = video_info['fps']
 
-        print(f"Source video: {source_width}x{source_height} @ {fps:.2f}fps")
-
-        face_positions = []  # Initialize to empty list
+        faces_detected = 0
 
         if enable_tracking and self.face_detector is not None:
             print("AI Reframe: Detecting faces...")
 
-            # Detect faces in the clip segment
-            face_positions = self.detect_faces_in_video(
-                str(video_path),
-                sample_interval=sample_interval,
-                start_time=start_time,
-                end_time=end_time
+            # Faces of the clip segment (sliced from the whole-video track)
+            face_track = self.clip_face_track(
+                str(video_path), start_time, end_time, sample_interval
             )
+            faces_detected = len(face_track)
 
-            if face_positions:
-                # Smooth the positions
-                smoothed_positions = self.smooth_positions(face_positions)
-
-                # Use average position for simpler FFmpeg command
-                avg_x = sum(p.center_x for p in smoothed_positions) / len(smoothed_positions)
-                avg_y = sum(p.center_y for p in smoothed_positions) / len(smoothed_positions)
+            if faces_detected:
+                # Use the average of the filtered path (outliers removed) for a static crop
+                avg_x, avg_y = plan_camera_path(face_track, follow=False).center()
 
                 print(f"Face tracking: Average position ({avg_x:.2f}, {avg_y:.2f})")
 
@@ -479,6 +556,61 @@ class AIReframer:
                 source_width, source_height, 0.5, 0.4
             )
 
+        return {
+            'x': crop_x,
+            'y': crop_y,
+            'width': crop_w,
+            'height': crop_h,
+            'faces_detected': faces_detected
+        }
+
+    def cut_clip_with_tracking(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        output_name: str,
+        target_resolution: Tuple[int, int] = (1080, 1920),
+        enable_tracking: bool = True,
+        sample_interval: float = 0.5,
+        threads: int = None
+    ) -> Dict[str, Any]:
+        """
+        Cut a clip with AI face tracking and reframing.
+
+        Args:
+            video_path: Path to source video
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            output_name: Output filename (without extension)
+            target_resolution: Target resolution (width, height)
+            enable_tracking: Enable face tracking (False = center crop)
+            sample_interval: Face detection sample interval in seconds
+            threads: FFmpeg thread count (None = FFmpeg default, all cores)
+
+        Returns:
+            Dict with clip info and output path
+        """
+        video_path = Path(video_path)
+        output_path = self.clips_dir / f"{output_name}.mp4"
+        duration = end_time - start_time
+
+        # Get video info
+        video_info = self.get_video_info(str(video_path))
+        source_width = video_info['width']
+        source_height = video_info['height']
+        fps = video_info['fps']
+
+        print(f"Source video: {source_width}x{source_height} @ {fps:.2f}fps")
+
+        crop = self.calculate_tracking_crop(
+            str(video_path), start_time, end_time, video_info,
+            enable_tracking=enable_tracking,
+            sample_interval=sample_interval
+        )
+        crop_x, crop_y, crop_w, crop_h = crop['x'], crop['y'], crop['width'], crop['height']
+        face_positions_count = crop['faces_detected']
+
         # Build FFmpeg command
         target_w, target_h = target_resolution
         crop_filter = f"crop={crop_w}:{crop_h}:{crop_x}:{crop_y}"
@@ -497,15 +629,16 @@ class AIReframer:
             '-c:a', 'aac',
             '-b:a', '128k',
             '-avoid_negative_ts', 'make_zero',
-            '-y',
-            str(output_path)
         ]
+        if threads:
+            cmd.extend(['-threads', str(threads)])
+        cmd.extend(['-y', str(output_path)])
 
         print(f"Cutting clip with AI reframe: {start_time:.1f}s - {end_time:.1f}s")
         print(f"Crop: {crop_w}x{crop_h} at ({crop_x}, {crop_y})")
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            instrumented_run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             # Clean up partial file on failure
             if output_path.exists():
@@ -530,7 +663,7 @@ class AIReframer:
             'end_time': end_time,
             'duration': duration,
             'tracking_enabled': tracking_was_used,
-            'faces_detected': len(face_positions) if tracking_was_used else 0,
+            'faces_detected': face_positions_count if tracking_was_used else 0,
             'crop_info': {
                 'x': crop_x,
                 'y': crop_y,
@@ -539,6 +672,69 @@ class AIReframer:
             }
         }
 
+    def cut_clips_with_tracking(
+        self,
+        video_path: str,
+        clips: List[Dict[str, Any]],
+        target_resolution: Tuple[int, int] = (1080, 1920),
+        enable_tracking: bool = True,
+        sample_interval: float = 0.5,
+        threads: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Cut several clips with AI face tracking from a single decode of the source.
+
+        Face positions are sliced per clip from the whole-video face track; the
+        crops are then handed to VideoCutter.cut_clips_batch, which encodes nearby
+        clips with one split/trim filter graph and falls back to per-clip calls.
+
+        Args:
+            video_path: Path to source video
+            clips: List of dicts with start_time, end_time and output_name
+            target_resolution: Target resolution (width, height)
+            enable_tracking: Enable face tracking (False = center crop)
+            sample_interval: Face detection sample interval in seconds
+            threads: FFmpeg thread count (None = FFmpeg default, all cores)
+
+        Returns:
+            List of clip info dicts (same format as cut_clip_with_tracking), in the order of `clips`
+        """
+        from .cutter import VideoCutter
+
+        video_info = self.get_video_info(str(video_path))
+        tracking_was_used = enable_tracking and self.face_detector is not None
+
+        batch_clips = []
+        faces_detected = []
+        for clip in clips:
+            crop = self.calculate_tracking_crop(
+                str(video_path), clip['start_time'], clip['end_time'], video_info,
+                enable_tracking=enable_tracking,
+                sample_interval=sample_interval
+            )
+            faces_detected.append(crop['faces_detected'])
+            batch_clips.append({
+                'start_time': clip['start_time'],
+                'end_time': clip['end_time'],
+                'output_name': clip['output_name'],
+                # VideoCutter crops are (crop_w, crop_h, x_offset, y_offset)
+                'crop': (crop['width'], crop['height'], crop['x'], crop['y'])
+            })
+
+        cutter = VideoCutter()
+        cutter.clips_dir = self.clips_dir
+        results = cutter.cut_clips_batch(
+            str(video_path),
+            batch_clips,
+            target_resolution=target_resolution,
+            threads=threads
+        )
+
+        for result, faces in zip(results, faces_detected):
+            result['tracking_enabled'] = tracking_was_used
+            result['faces_detected'] = faces if tracking_was_used else 0
+        return results
+
     def cut_clip_with_dynamic_tracking(
         self,
         video_path: str,
@@ -546,23 +742,27 @@ class AIReframer:
         end_time: float,
         output_name: str,
         target_resolution: Tuple[int, int] = (1080, 1920),
-        sample_interval: float = 0.25
+        sample_interval: float = 0.25,
+        threads: int = None
     ) -> Dict[str, Any]:
         """
         Advanced: Cut clip with frame-by-frame dynamic tracking.
         Creates smoother following of subject but takes longer to process.
 
-        Uses OpenCV to process frame by frame with interpolated crop positions.
+        The camera path (outliers removed, One-Euro filtered, dead zone - see
+        services/camera_path.py) is compiled into time-varying crop x/y
+        expressions (linear interpolation between crop keyframes), so FFmpeg
+        crops, scales and encodes every frame in a single native pass.
         """
         if not CV2_AVAILABLE or self.face_detector is None:
             return self.cut_clip_with_tracking(
                 video_path, start_time, end_time, output_name,
-                target_resolution, enable_tracking=False
+                target_resolution, enable_tracking=False, threads=threads
             )
 
         video_path = Path(video_path)
         output_path = self.clips_dir / f"{output_name}.mp4"
-        temp_video_path = self.clips_dir / f"{output_name}_temp.mp4"
+        duration = end_time - start_time
 
         # Get video info
         video_info = self.get_video_info(str(video_path))
@@ -570,123 +770,76 @@ class AIReframer:
         source_height = video_info['height']
         fps = video_info['fps']
 
-        print(f"Dynamic tracking: Processing {end_time - start_time:.1f}s of video")
+        print(f"Dynamic tracking: Processing {duration:.1f}s of video")
 
-        # Detect and smooth face positions
-        face_positions = self.detect_faces_in_video(
-            str(video_path), sample_interval, start_time, end_time
+        # Face track of the clip and the camera path that follows it
+        face_track = self.clip_face_track(
+            str(video_path), start_time, end_time, sample_interval
         )
 
-        if not face_positions:
+        if not len(face_track):
             print("No faces detected, falling back to static crop")
             return self.cut_clip_with_tracking(
                 video_path, start_time, end_time, output_name,
-                target_resolution, enable_tracking=False
+                target_resolution, enable_tracking=False, threads=threads
             )
 
-        smoothed = self.smooth_positions(face_positions, smoothing_window=7)
-
-        # Interpolate for all frames
-        interpolated = self.interpolate_positions(smoothed, fps, start_time, end_time)
-
-        # Process video frame by frame
-        cap = None
-        out = None
-        frame_idx = 0
-
-        try:
-            cap = cv2.VideoCapture(str(video_path))
-            cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
-            target_w, target_h = target_resolution
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(str(temp_video_path), fourcc, fps, (target_w, target_h))
-
-            total_frames = len(interpolated)
-
-            print(f"Processing {total_frames} frames with dynamic crop...")
+        camera = plan_camera_path(face_track)
 
-            while frame_idx < total_frames:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        # Crop keyframes at the sample times, relative to the clip start
+        # (input seeking makes the clip start t=0 in the filter graph)
+        times, crop_xs, crop_ys, crop_w, crop_h = camera.crop_keyframes(source_width, source_height)
+        times = (times - start_time).tolist()
+        x_expr = self.crop_path_expression(list(zip(times, crop_xs.tolist())))
+        y_expr = self.crop_path_expression(list(zip(times, crop_ys.tolist())))
 
-                # Get interpolated face position for this frame
-                _, face_x, face_y = interpolated[frame_idx]
-
-                # Calculate crop for this frame
-                crop_x, crop_y, crop_w, crop_h = self.calculate_dynamic_crop(
-                    source_width, source_height, face_x, face_y
-                )
-
-                # Apply crop
-                cropped = frame[crop_y:crop_y+crop_h, crop_x:crop_x+crop_w]
-
-                # Resize to target
-                resized = cv2.resize(cropped, (target_w, target_h))
-
-                out.write(resized)
-                frame_idx += 1
-
-                if frame_idx % 100 == 0:
-                    print(f"  Processed {frame_idx}/{total_frames} frames")
-
-        finally:
-            # Always release video resources
-            if cap is not None:
-                cap.release()
-            if out is not None:
-                out.release()
+        target_w, target_h = target_resolution
+        video_filter = f"crop=w={crop_w}:h={crop_h}:x='{x_expr}':y='{y_expr}',scale={target_w}:{target_h}"
 
-        # Add audio using FFmpeg
-        print("Adding audio track...")
         cmd = [
             'ffmpeg',
-            '-i', str(temp_video_path),
             '-ss', str(start_time),
             '-i', str(video_path),
-            '-t', str(end_time - start_time),
+            '-t', str(duration),
+            '-vf', video_filter,
             '-c:v', 'libx264',
             '-preset', 'fast',
             '-crf', '23',
-            '-map', '0:v:0',
-            '-map', '1:a:0',
             '-c:a', 'aac',
             '-b:a', '128k',
-            '-shortest',
-            '-y',
-            str(output_path)
+            '-avoid_negative_ts', 'make_zero',
         ]
+        if threads:
+            cmd.extend(['-threads', str(threads)])
+        cmd.extend(['-y', str(output_path)])
+
+        print(f"Cutting clip with dynamic crop: {len(camera)} keyframes, {crop_w}x{crop_h}")
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            instrumented_run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
-            # Clean up files on failure
-            for path in [temp_video_path, output_path]:
-                if path.exists():
-                    try:
-                        path.unlink()
-                    except Exception:
-                        pass
-            error_msg = e.stderr.decode() if e.stderr else str(e)
-            raise RuntimeError(f"Failed to add audio: {error_msg}")
-        finally:
-            # Always clean up temp file
-            if temp_video_path.exists():
+            # Clean up partial file on failure
+            if output_path.exists():
                 try:
-                    temp_video_path.unlink()
+                    output_path.unlink()
                 except Exception:
                     pass
+            error_msg = e.stderr.decode() if e.stderr else str(e)
+            raise RuntimeError(f"Failed to cut clip with dynamic tracking: {error_msg}")
+
+        if not output_path.exists():
+            raise RuntimeError(f"FFmpeg completed but output file not found: {output_path}")
 
         return {
             'video_path': str(output_path),
             'start_time': start_time,
             'end_time': end_time,
-            'duration': end_time - start_time,
+            'duration': duration,
             'tracking_enabled': True,
             'tracking_mode': 'dynamic',
-            'faces_detected': len(face_positions),
-            'frames_processed': frame_idx
+            'faces_detected': len(face_track),
+            'crop_keyframes': len(camera),
+            'frames_processed': int(round(duration * fps))
         }
 
 
@@ -0,0 +1,370 @@
+"""
+ClipGenius - Transcrição Remota em Chunks Paralelos
+Motor genérico usado pelos backends remotos do TranscriberV2 (Groq, Deepgram, AssemblyAI).
+
+- Com VAD_ENABLED, os chunks têm só fala e são cortados em silêncios (services/vad.py);
+  sem VAD, divide o áudio em chunks com sobreposição (REMOTE_TRANSCRIPTION_OVERLAP_SECONDS)
+- Extrai e envia até REMOTE_TRANSCRIPTION_CONCURRENCY chunks ao mesmo tempo
+- Repete cada request com backoff exponencial em erros transitórios (429, 5xx, rede)
+- Junta os resultados na ordem dos chunks (independente da ordem de conclusão),
+  costurando as bordas para não duplicar nem perder palavras
+"""
+import os
+import subprocess
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    REMOTE_TRANSCRIPTION_CHUNK_SECONDS,
+    REMOTE_TRANSCRIPTION_OVERLAP_SECONDS,
+    REMOTE_TRANSCRIPTION_CONCURRENCY,
+    REMOTE_TRANSCRIPTION_MAX_RETRIES,
+    REMOTE_TRANSCRIPTION_RETRY_BASE_DELAY,
+    VAD_ENABLED
+)
+
+from .http_clients import RETRYABLE_STATUS_CODES, backoff_delay, parse_retry_after
+from .vad import SpeechChunk, detect_speech_regions, plan_speech_chunks, wav_frame_energies
+from .metrics import instrumented_run
+
+# Mesma palavra vinda de dois chunks: início a menos disso é considerado duplicata
+DUPLICATE_WORD_WINDOW = 0.5
+
+
+class RemoteTranscriptionError(Exception):
+    """Erro de uma API de transcrição (com status HTTP quando houver)"""
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code in RETRYABLE_STATUS_CODES
+
+
+def raise_for_status(response, provider: str) -> None:
+    """Converte uma resposta HTTP de erro em RemoteTranscriptionError"""
+    if response.status_code == 200:
+        return
+    raise RemoteTranscriptionError(
+        f"{provider} API error: {response.status_code} - {response.text}",
+        status_code=response.status_code,
+        retry_after=parse_retry_after(response)
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    """Erros transitórios: status retryable ou falha de rede/timeout"""
+    if isinstance(error, RemoteTranscriptionError):
+        return error.retryable
+    import httpx
+    return isinstance(error, httpx.TransportError)
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    max_retries: int = None,
+    base_delay: float = None,
+    description: str = "request"
+) -> Any:
+    """
+    Executa `fn` repetindo em erros transitórios com backoff exponencial + jitter.
+
+    Respeita o header Retry-After quando a API informa.
+    """
+    max_retries = REMOTE_TRANSCRIPTION_MAX_RETRIES if max_retries is None else max_retries
+    base_delay = REMOTE_TRANSCRIPTION_RETRY_BASE_DELAY if base_delay is None else base_delay
+
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, getattr(e, "retry_after", None))
+            print(f"  {description} falhou ({e}), nova tentativa {attempt + 1}/{max_retries} em {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """Duração do áudio em segundos via ffprobe (None se não for possível obter)"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        str(audio_path)
+    ]
+    try:
+        result = instrumented_run(cmd, capture_output=True, text=True, timeout=30)
+        return float(result.stdout.strip())
+    except (ValueError, subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+
+
+def extract_audio_chunk(audio_path: str, spec: "ChunkSpec", output_path: str) -> None:
+    """
+    Extrai um chunk como MP3 64k mono 16 kHz (menor, upload mais rápido).
+
+    Chunks do VAD com várias regiões de fala viram um único áudio com as
+    regiões concatenadas (atrim + concat), sem os silêncios entre elas.
+    """
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', str(spec.start),
+        '-t', str(spec.duration),
+        '-i', str(audio_path),
+    ]
+    if spec.regions and len(spec.regions) > 1:
+        # Tempos relativos ao -ss do input
+        trims = [
+            f"[0:a]atrim={start - spec.start:.3f}:{end - spec.start:.3f},asetpts=PTS-STARTPTS[r{i}]"
+            for i, (start, end) in enumerate(spec.regions)
+        ]
+        inputs = ''.join(f"[r{i}]" for i in range(len(spec.regions)))
+        graph = ';'.join(trims) + f";{inputs}concat=n={len(spec.regions)}:v=0:a=1[out]"
+        cmd += ['-filter_complex', graph, '-map', '[out]']
+    cmd += [
+        '-acodec', 'libmp3lame',
+        '-b:a', '64k',
+        '-ar', '16000',
+        '-ac', '1',
+        str(output_path)
+    ]
+    instrumented_run(cmd, check=True, capture_output=True)
+
+
+@dataclass
+class ChunkSpec:
+    """
+    Trecho enviado à API: [start, end] com sobreposição, núcleo [core_start, core_end].
+
+    Chunks do VAD não têm sobreposição e guardam as regiões de fala enviadas
+    (o áudio do chunk é a concatenação delas).
+    """
+    index: int
+    start: float
+    end: float
+    core_start: float
+    core_end: float
+    speech: Optional[SpeechChunk] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def regions(self) -> Optional[List[Tuple[float, float]]]:
+        return self.speech.regions if self.speech else None
+
+    def to_source_time(self, t: float) -> float:
+        """Tempo relativo ao áudio do chunk -> tempo no áudio completo"""
+        return self.speech.to_source_time(t) if self.speech else self.start + t
+
+
+def plan_chunks(total_duration: float, chunk_seconds: float, overlap_seconds: float) -> List[ChunkSpec]:
+    """
+    Divide o áudio em chunks de `chunk_seconds` (núcleo) estendidos por
+    overlap/2 de cada lado, de modo que chunks vizinhos compartilhem
+    `overlap_seconds` de áudio ao redor de cada fronteira.
+    """
+    half = overlap_seconds / 2
+    chunks = []
+    core_start = 0.0
+    while core_start < total_duration:
+        core_end = min(core_start + chunk_seconds, total_duration)
+        # Evitar um último chunk minúsculo: absorver no atual
+        if total_duration - core_end < overlap_seconds:
+            core_end = total_duration
+        chunks.append(ChunkSpec(
+            index=len(chunks),
+            start=max(0.0, core_start - half),
+            end=min(total_duration, core_end + half),
+            core_start=core_start,
+            core_end=core_end
+        ))
+        core_start = core_end
+    return chunks
+
+
+def plan_vad_chunks(audio_path: str, chunk_seconds: float) -> Optional[List[ChunkSpec]]:
+    """
+    Chunks só com fala, cortados em silêncios (sem sobreposição).
+
+    Returns:
+        Lista de ChunkSpec (vazia se não houver fala), ou None se o áudio não
+        for um WAV PCM 16 kHz mono (usar plan_chunks)
+    """
+    try:
+        energies, duration = wav_frame_energies(audio_path)
+    except (ValueError, EOFError, OSError, wave.Error):
+        return None
+
+    regions = detect_speech_regions(energies, duration)
+    chunks = []
+    for speech in plan_speech_chunks(regions, chunk_seconds, energies):
+        chunks.append(ChunkSpec(
+            index=len(chunks),
+            start=speech.start,
+            end=speech.end,
+            core_start=speech.start,
+            core_end=speech.end,
+            speech=speech
+        ))
+    return chunks
+
+
+def _normalize_word(text: str) -> str:
+    return ''.join(c for c in text.lower() if c.isalnum())
+
+
+def stitch_words(parts: List[Tuple[ChunkSpec, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Junta as palavras dos chunks (em ordem), convertendo para o tempo absoluto.
+
+    Cada chunk contribui com as palavras cujo centro está depois da última
+    palavra já aceita e antes do fim do seu núcleo; assim a região de
+    sobreposição nunca gera duplicatas e palavras que um chunk cortou na
+    borda são cobertas pelo vizinho.
+    """
+    words: List[Dict[str, Any]] = []
+    last = len(parts) - 1
+
+    for position, (spec, result) in enumerate(sorted(parts, key=lambda p: p[0].index)):
+        last_end = words[-1]['end'] if words else None
+        for word in result.get('words') or []:
+            start = spec.to_source_time(word.get('start') or 0)
+            end = spec.to_source_time(word.get('end') or 0)
+            center = (start + end) / 2
+
+            if last_end is not None and center <= last_end:
+                continue  # Já coberta pelo chunk anterior
+            if position < last and center >= spec.core_end:
+                continue  # Pertence ao próximo chunk
+            if (
+                words
+                and abs(start - words[-1]['start']) < DUPLICATE_WORD_WINDOW
+                and _normalize_word(word.get('word', '')) == _normalize_word(words[-1]['word'])
+            ):
+                continue  # Mesma palavra com timestamps ligeiramente diferentes
+
+            words.append({**word, 'start': start, 'end': end})
+
+    return words
+
+
+class ChunkedRemoteTranscriber:
+    """
+    Transcrição paralela em chunks para um backend remoto.
+
+    Args:
+        transcribe_chunk: fn(chunk_path, language) -> resultado no formato
+            padrão (tempos relativos ao chunk); uma chamada = uma request
+        build_segments: fn(words) -> segmentos (TranscriberV2._create_segments_from_words)
+        backend_name: Nome do backend no resultado
+        extract_chunk: fn(audio_path, ChunkSpec, output_path) (padrão: FFmpeg MP3)
+        use_vad: Chunks só com fala cortados em silêncios (padrão: VAD_ENABLED)
+    """
+
+    def __init__(
+        self,
+        transcribe_chunk: Callable[[str, Optional[str]], Dict[str, Any]],
+        build_segments: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+        backend_name: str = "remote",
+        chunk_seconds: float = None,
+        overlap_seconds: float = None,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        retry_base_delay: float = None,
+        extract_chunk: Callable[[str, ChunkSpec, str], None] = None,
+        use_vad: bool = None
+    ):
+        self.transcribe_chunk = transcribe_chunk
+        self.build_segments = build_segments
+        self.backend_name = backend_name
+        self.chunk_seconds = chunk_seconds or REMOTE_TRANSCRIPTION_CHUNK_SECONDS
+        self.overlap_seconds = REMOTE_TRANSCRIPTION_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        self.max_concurrency = max(1, max_concurrency or REMOTE_TRANSCRIPTION_CONCURRENCY)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.extract_chunk = extract_chunk or extract_audio_chunk
+        self.use_vad = VAD_ENABLED if use_vad is None else use_vad
+
+    def needs_chunking(self, total_duration: Optional[float]) -> bool:
+        return total_duration is not None and total_duration > self.chunk_seconds + self.overlap_seconds
+
+    def _process_chunk(self, audio_path: str, spec: ChunkSpec, total: int, language: Optional[str]) -> Dict[str, Any]:
+        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
+            chunk_path = tmp.name
+        try:
+            self.extract_chunk(audio_path, spec, chunk_path)
+            print(f"  Transcrevendo chunk {spec.index + 1}/{total} ({spec.start:.0f}s - {spec.end:.0f}s)...")
+            return call_with_retry(
+                lambda: self.transcribe_chunk(chunk_path, language),
+                max_retries=self.max_retries,
+                base_delay=self.retry_base_delay,
+                description=f"Chunk {spec.index + 1}"
+            )
+        finally:
+            if os.path.exists(chunk_path):
+                os.unlink(chunk_path)
+
+    def plan(self, audio_path: str, total_duration: float) -> List[ChunkSpec]:
+        """Chunks do VAD quando possível, senão chunks fixos com sobreposição"""
+        if self.use_vad:
+            chunks = plan_vad_chunks(audio_path, self.chunk_seconds)
+            if chunks is not None:
+                speech = sum(spec.speech.speech_duration for spec in chunks)
+                print(f"  VAD: {speech:.1f}s de fala em {total_duration:.1f}s de áudio")
+                return chunks
+        return plan_chunks(total_duration, self.chunk_seconds, self.overlap_seconds)
+
+    def transcribe(self, audio_path: str, language: str = None, total_duration: float = None) -> Dict[str, Any]:
+        """
+        Transcreve o áudio em chunks paralelos.
+
+        Returns:
+            Dict no formato padrão (text, language, duration, segments, words, backend)
+        """
+        if total_duration is None:
+            total_duration = probe_duration(audio_path)
+            if total_duration is None:
+                raise RuntimeError(f"Não foi possível obter a duração do áudio: {audio_path}")
+
+        chunks = self.plan(audio_path, total_duration)
+        workers = max(1, min(len(chunks), self.max_concurrency))
+        print(f"  Áudio total: {total_duration:.1f}s, {len(chunks)} chunks, {workers} em paralelo")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._process_chunk, audio_path, spec, len(chunks), language)
+                for spec in chunks
+            ]
+            try:
+                parts = [(spec, future.result()) for spec, future in zip(chunks, futures)]
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                raise RuntimeError(f"Falha na transcrição em chunks ({self.backend_name}): {e}") from e
+
+        words = stitch_words(parts)
+        segments = self.build_segments(words)
+        detected_language = language or next(
+            (result.get('language') for _, result in parts if result.get('language')), None
+        )
+
+        print(f"  Transcrição combinada: {len(segments)} segmentos, {len(words)} palavras")
+
+        return {
+            'text': ' '.join(s['text'] for s in segments),
+            'language': detected_language or 'pt',
+            'duration': total_duration,
+            'segments': segments,
+            'words': words,
+            'backend': self.backend_name
+        }
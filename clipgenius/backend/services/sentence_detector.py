@@ -2,9 +2,14 @@
 ClipGenius - Sentence Boundary Detector
 Ajusta timestamps de clips para terminar em finais naturais de sentença
 """
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Union
 import re
 
+from .word_timeline import WordTimeline
+
+# Lista de palavras ou WordTimeline já construída (reutilizada entre clips)
+Words = Union[List[Dict], WordTimeline]
+
 
 class SentenceBoundaryDetector:
     """
@@ -47,7 +52,7 @@ class SentenceBoundaryDetector:
 
     def find_sentence_boundaries(
         self,
-        words: List[Dict],
+        words: Words,
         start_time: float,
         end_time: float
     ) -> List[Dict]:
@@ -56,6 +61,7 @@ class SentenceBoundaryDetector:
 
         Args:
             words: Lista de palavras com timestamps (formato: {'word': str, 'start': float, 'end': float})
+                ou WordTimeline
             start_time: Tempo inicial do clip em segundos
             end_time: Tempo final sugerido do clip em segundos
 
@@ -66,10 +72,7 @@ class SentenceBoundaryDetector:
 
         # Filtrar palavras no intervalo + buffer
         buffer_end = end_time + self.MAX_EXTENSION_SECONDS
-        relevant_words = [
-            w for w in words
-            if w.get('start', 0) >= start_time and w.get('end', 0) <= buffer_end
-        ]
+        relevant_words = WordTimeline.ensure(words).words_within(start_time, buffer_end)
 
         for i, word in enumerate(relevant_words):
             word_text = word.get('word', '').strip()
@@ -114,7 +117,7 @@ class SentenceBoundaryDetector:
 
     def adjust_clip_end(
         self,
-        words: List[Dict],
+        words: Words,
         start_time: float,
         suggested_end: float,
         max_duration: float = 60
@@ -123,7 +126,7 @@ class SentenceBoundaryDetector:
         Ajusta o end_time do clip para o próximo limite de sentença.
 
         Args:
-            words: Lista de palavras com timestamps
+            words: Lista de palavras com timestamps ou WordTimeline
             start_time: Tempo inicial do clip em segundos
             suggested_end: Tempo final sugerido pela IA em segundos
             max_duration: Duração máxima permitida do clip em segundos
@@ -171,7 +174,7 @@ class SentenceBoundaryDetector:
 
     def validate_clip_completeness(
         self,
-        words: List[Dict],
+        words: Words,
         start_time: float,
         end_time: float
     ) -> Dict:
@@ -179,7 +182,7 @@ class SentenceBoundaryDetector:
         Valida se um clip termina em um ponto completo.
 
         Args:
-            words: Lista de palavras com timestamps
+            words: Lista de palavras com timestamps ou WordTimeline
             start_time: Tempo inicial do clip em segundos
             end_time: Tempo final do clip em segundos
 
@@ -187,10 +190,8 @@ class SentenceBoundaryDetector:
             Dict com: {'is_complete': bool, 'reason': str, 'last_word': str}
         """
         # Pegar últimas palavras do clip
-        clip_words = [
-            w for w in words
-            if w.get('start', 0) >= start_time and w.get('end', 0) <= end_time
-        ]
+        timeline = WordTimeline.ensure(words)
+        clip_words = timeline.words_within(start_time, end_time)
 
         if not clip_words:
             return {'is_complete': False, 'reason': 'no_words', 'last_word': ''}
@@ -203,10 +204,10 @@ class SentenceBoundaryDetector:
 
         # Verificar se há pausa após a última palavra
         word_end = clip_words[-1].get('end', 0)
-        next_words = [w for w in words if w.get('start', 0) > word_end]
+        next_word = timeline.next_word_after(word_end)
 
-        if next_words:
-            gap = next_words[0].get('start', 0) - word_end
+        if next_word:
+            gap = next_word.get('start', 0) - word_end
             if gap >= self.MIN_PAUSE_FOR_BOUNDARY:
                 return {'is_complete': True, 'reason': f'pause_after_{gap:.2f}s', 'last_word': last_word}
 
@@ -0,0 +1,88 @@
+"""
+ClipGenius - Shot Boundary Detector
+Finds hard cuts and static stretches in the frames sampled for face detection.
+
+Works on the same downscaled sample stream as the face detector (FrameSampler
+batches), so it costs no extra decode:
+
+- cut: the gray-level histogram of a sample differs from the previous sample's
+  by more than REFRAME_SHOT_CUT_THRESHOLD (half L1 distance, 0-1). The camera
+  path is reset at each cut instead of panning across it
+- static: the sample barely differs from the last sample that went through the
+  face detector (mean absolute difference of a small thumbnail below
+  REFRAME_STATIC_THRESHOLD); its detection result is reused
+
+Comparing static samples with the last *detected* one (not the previous
+sample) keeps slow drifts from accumulating into a stale result.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import REFRAME_SHOT_CUT_THRESHOLD, REFRAME_STATIC_THRESHOLD
+
+# Histogram bins of the gray level (256 levels / 8)
+_HIST_BINS = 32
+
+# Thumbnail width used for the static check
+_THUMB_WIDTH = 64
+
+_GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class ShotDetector:
+    """Stateful cut / static classifier fed with consecutive batches of RGB frames"""
+
+    def __init__(self, cut_threshold: float = None, static_threshold: float = None):
+        self.cut_threshold = REFRAME_SHOT_CUT_THRESHOLD if cut_threshold is None else cut_threshold
+        self.static_threshold = REFRAME_STATIC_THRESHOLD if static_threshold is None else static_threshold
+        self._previous_hist: Optional[np.ndarray] = None
+        self._reference: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _thumbnails(frames: np.ndarray) -> np.ndarray:
+        """Gray (n, h, w) thumbnails of RGB frames, uint8"""
+        step = max(1, frames.shape[2] // _THUMB_WIDTH)
+        small = frames[:, ::step, ::step].astype(np.float32)
+        return (small @ _GRAY_WEIGHTS).astype(np.uint8)
+
+    @staticmethod
+    def _histograms(gray: np.ndarray) -> np.ndarray:
+        """Normalized gray histograms, one row per frame"""
+        n = len(gray)
+        bins = (gray.reshape(n, -1) >> 3).astype(np.int64) + (np.arange(n) * _HIST_BINS)[:, None]
+        counts = np.bincount(bins.ravel(), minlength=n * _HIST_BINS).reshape(n, _HIST_BINS)
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def update(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify the next batch of samples.
+
+        Returns:
+            Tuple of boolean arrays (cut, static): cut = first sample of a new
+            shot, static = detection can be reused from the previous sample
+        """
+        n = len(frames)
+        cut = np.zeros(n, dtype=bool)
+        static = np.zeros(n, dtype=bool)
+        if not n:
+            return cut, static
+
+        gray = self._thumbnails(frames)
+        hists = self._histograms(gray)
+
+        # Cuts: histogram distance between consecutive samples (vectorized)
+        previous = np.vstack([self._previous_hist[None], hists[:-1]]) if self._previous_hist is not None else hists[:-1]
+        distances = 0.5 * np.abs(hists[-len(previous):] - previous).sum(axis=1) if len(previous) else np.empty(0)
+        cut[n - len(distances):] = distances > self.cut_threshold
+        self._previous_hist = hists[-1]
+
+        # Static: compared with the last sample that was detected (sequential)
+        for i in range(n):
+            if self._reference is not None and not cut[i]:
+                difference = np.abs(gray[i].astype(np.int16) - self._reference).mean() / 255.0
+                if difference < self.static_threshold:
+                    static[i] = True
+                    continue
+            self._reference = gray[i].astype(np.int16)
+        return cut, static
@@ -20,6 +20,7 @@ from config import (
     SUBTITLE_SHADOW_SIZE,
     SUBTITLE_MARGIN_V,
 )
+from .metrics import instrumented_run
 
 # =============================================================================
 # WORD_COLORS - Sistema de cores por tipo de palavra para legendas virais
@@ -746,7 +747,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             print(f"Burning subtitles: {video_path} + {subtitle_path}")
 
             try:
-                result = subprocess.run(cmd, check=True, capture_output=True)
+                result = instrumented_run(cmd, check=True, capture_output=True)
                 return str(output_path)
             except subprocess.CalledProcessError as e:
                 error_msg = e.stderr.decode() if e.stderr else str(e)
@@ -799,7 +800,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                 '-c', 'copy', '-y', str(output_path)
             ]
             try:
-                subprocess.run(cmd, check=True, capture_output=True)
+                instrumented_run(cmd, check=True, capture_output=True)
             except subprocess.CalledProcessError as e:
                 raise RuntimeError(f"Erro ao copiar vídeo: {e.stderr.decode() if e.stderr else str(e)}")
             return {'path': str(output_path), 'subtitles_burned': False, 'message': 'Nenhuma legenda encontrada'}
@@ -820,7 +821,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         print(f"🎬 Queimando legendas no vídeo: {len(subtitles)} legendas")
 
         try:
-            result = subprocess.run(cmd, check=True, capture_output=True)
+            result = instrumented_run(cmd, check=True, capture_output=True)
             print("✅ Legendas queimadas com sucesso!")
             return {'path': str(output_path), 'subtitles_burned': True, 'message': 'Legendas queimadas com sucesso'}
         except subprocess.CalledProcessError as e:
@@ -834,7 +835,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                 '-c', 'copy', '-y', str(output_path)
             ]
             try:
-                subprocess.run(cmd_fallback, check=True, capture_output=True)
+                instrumented_run(cmd_fallback, check=True, capture_output=True)
             except subprocess.CalledProcessError as e2:
                 raise RuntimeError(f"Erro ao copiar vídeo: {e2.stderr.decode() if e2.stderr else str(e2)}")
 
@@ -9,7 +9,6 @@ Melhorias:
 - Melhor estrutura de chunks para legendas
 """
 import re
-import subprocess
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
@@ -27,6 +26,7 @@ from config import (
     SUBTITLE_SHADOW_SIZE,
     SUBTITLE_MARGIN_V,
 )
+from .metrics import instrumented_run
 
 # Importar configurações de posição e estilo (com fallback)
 try:
@@ -733,7 +733,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             ]
 
             print(f"Queimando legendas: {video_path}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = instrumented_run(cmd, capture_output=True, text=True)
 
             if result.returncode != 0:
                 print(f"Erro FFmpeg: {result.stderr[:500]}")
@@ -16,6 +16,8 @@ from config import (
     WHISPER_LANGUAGE,
     GROQ_API_KEY
 )
+from .model_pool import estimate_model_mb, model_pool
+from .metrics import instrumented_run
 
 
 class WhisperTranscriber:
@@ -29,7 +31,6 @@ class WhisperTranscriber:
 
     def __init__(self, model_name: str = None):
         self.model_name = model_name or WHISPER_MODEL
-        self.model = None  # Lazy load for local whisper
         self.audio_dir = AUDIO_DIR
         self.use_groq = bool(GROQ_API_KEY)
 
@@ -38,29 +39,27 @@ class WhisperTranscriber:
         else:
             print("Transcriber: Using local Whisper (set GROQ_API_KEY for faster transcription)")
 
+    @property
+    def _pool_key(self) -> tuple:
+        return ("whisper", self.model_name)
+
     def _load_local_model(self):
-        """Lazy load local Whisper model"""
-        if self.model is None:
+        """Lazy load local Whisper model (kept resident in the shared model pool)"""
+        def load():
             import whisper
             print(f"Loading local Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
-        return self.model
+            return whisper.load_model(self.model_name)
+
+        return model_pool.get(self._pool_key, load, estimate_model_mb(self.model_name))
 
     def unload_model(self):
         """
         Unload Whisper model from memory to free GPU/CPU resources.
-        Call this after transcription is complete.
+        Only needed to free memory right away: the model pool unloads least
+        recently used models above MODEL_POOL_MAX_MB.
         """
-        if self.model is not None:
-            import gc
-            import torch
-            print("Unloading Whisper model from memory...")
-            del self.model
-            self.model = None
-            gc.collect()
-            # Clear CUDA cache if available
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+        key = self._pool_key
+        if model_pool.evict(lambda k: k == key):
             print("Whisper model unloaded")
 
     def extract_audio(self, video_path: str, output_path: Optional[str] = None, for_groq: bool = None) -> str:
@@ -119,7 +118,7 @@ class WhisperTranscriber:
         print(f"Extracting audio ({format_info}): {video_path} -> {output_path}")
 
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            instrumented_run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             # Clean up partial file on failure
             if output_path.exists():
@@ -273,7 +272,7 @@ class WhisperTranscriber:
             '-of', 'default=noprint_wrappers=1:nokey=1',
             str(audio_path)
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = instrumented_run(cmd, capture_output=True, text=True)
         total_duration = float(result.stdout.strip())
 
         # Calculate chunks
@@ -317,7 +316,7 @@ class WhisperTranscriber:
                     '-ac', '1',
                     chunk_path
                 ]
-                subprocess.run(cmd, check=True, capture_output=True)
+                instrumented_run(cmd, check=True, capture_output=True)
 
                 print(f"  Transcribing chunk {chunk_num}/{len(chunks)} ({start_time:.0f}s - {chunk_info['end']:.0f}s)")
 
@@ -540,14 +539,15 @@ class WhisperTranscriber:
         else:
             return self._transcribe_local(audio_path, language)
 
-    def transcribe_video(self, video_path: str, language: str = None, unload_after: bool = True) -> Dict[str, Any]:
+    def transcribe_video(self, video_path: str, language: str = None, unload_after: bool = False) -> Dict[str, Any]:
         """
         Extract audio and transcribe video
 
         Args:
             video_path: Path to video file
             language: Language code
-            unload_after: Unload model after transcription to free memory (default: True)
+            unload_after: Unload model after transcription to free memory (default: False,
+                          the model stays warm in the model pool for the next job)
 
         Returns:
             Dict with transcription and timestamps
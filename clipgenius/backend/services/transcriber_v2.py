@@ -7,17 +7,41 @@ Suporta múltiplos backends para timestamps precisos:
 - Groq API: Cloud API (fallback)
 """
 import json
-import subprocess
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Literal
+from typing import Callable, Dict, Any, List, Optional, Literal, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from config import (
     AUDIO_DIR,
     WHISPER_MODEL,
     WHISPER_LANGUAGE,
-    GROQ_API_KEY
+    GROQ_API_KEY,
+    TRANSCRIPTION_CACHE_ENABLED,
+    AUDIO_STREAMING_ENABLED,
+    AUDIO_KEEP_WAV,
+    VAD_ENABLED,
+    MODEL_SERVER_ENABLED,
+    MODEL_BATCH_SIZE,
+    MODEL_BATCH_MAX_STREAMS,
+    FASTER_WHISPER_BATCHED,
+    WHISPER_BEAM_SIZE,
+    WHISPER_BEST_OF,
+    WHISPER_CPU_THREADS
+)
+from .http_clients import provider_clients
+from .inference_batcher import concatenate_audio, split_batched_result
+from .model_pool import ALIGN_MODEL_MB, estimate_model_mb, model_pool
+from .transcription_profile import load_transcription_profile
+from .transcription_cache import TranscriptionCache
+from .word_timeline import WordTimeline
+from .metrics import instrumented_run
+from .remote_transcription import (
+    ChunkedRemoteTranscriber,
+    RemoteTranscriptionError,
+    call_with_retry,
+    probe_duration,
+    raise_for_status
 )
 
 # Importar novas API keys (com fallback para evitar erro se não existirem)
@@ -31,6 +55,12 @@ except ImportError:
 # Tipos de backend suportados
 TranscriptionBackend = Literal["deepgram", "assemblyai", "whisperx", "stable-ts", "faster-whisper", "groq", "auto"]
 
+# Backends locais: aceitam arrays NumPy e podem transcrever o áudio em streaming
+STREAMING_BACKENDS = ("whisperx", "stable-ts", "faster-whisper")
+
+# Recebe segmentos já transcritos (pipeline: a análise começa antes do fim da transcrição)
+SegmentsCallback = Optional[Callable[[List[Dict[str, Any]]], None]]
+
 
 class TranscriberV2:
     """
@@ -48,13 +78,24 @@ class TranscriberV2:
 
     GROQ_API_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
     GROQ_MODEL = "whisper-large-v3-turbo"
+    GROQ_MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
+
+    DEEPGRAM_API_URL = "https://api.deepgram.com/v1/listen"
+    ASSEMBLYAI_API_URL = "https://api.assemblyai.com/v2"
+    ASSEMBLYAI_POLL_INTERVAL = 3.0
 
     def __init__(
         self,
         backend: TranscriptionBackend = "auto",
         model_size: str = None,
         device: str = "auto",
-        compute_type: str = "auto"
+        compute_type: str = "auto",
+        use_cache: bool = TRANSCRIPTION_CACHE_ENABLED,
+        streaming: bool = AUDIO_STREAMING_ENABLED,
+        model_server: bool = MODEL_SERVER_ENABLED,
+        cpu_threads: int = None,
+        beam_size: int = None,
+        best_of: int = None
     ):
         """
         Inicializa o transcriber.
@@ -64,17 +105,43 @@ class TranscriberV2:
             model_size: Tamanho do modelo (tiny, base, small, medium, large-v2, large-v3)
             device: Dispositivo (cuda, cpu, auto)
             compute_type: Tipo de computação (float16, int8, auto)
+            use_cache: Reutilizar transcrições do cache em disco (transcribe_video)
+            streaming: Transcrever o áudio direto do pipe do FFmpeg (backends locais)
+            model_server: Rodar os backends locais no processo de inferência
+                compartilhado pelos workers (services/model_server.py), quando ativo
+            cpu_threads: Threads da inferência em CPU (0 = padrão do backend)
+            beam_size: Beam search dos backends locais
+            best_of: Candidatos por amostragem dos backends locais
+
+        Sem valores explícitos, compute_type, cpu_threads, beam_size e best_of
+        vêm do perfil calibrado (calibrate.py) quando ele é do mesmo backend e
+        modelo, senão de WHISPER_CPU_THREADS / WHISPER_BEAM_SIZE / WHISPER_BEST_OF.
         """
         self.model_size = model_size or WHISPER_MODEL
         self.device = device
         self.compute_type = compute_type
         self.audio_dir = AUDIO_DIR
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.model_server = model_server
+        self._cache = None
+
+        # Perfil calibrado deste modelo (services/transcription_profile.py)
+        self.profile = load_transcription_profile()
+        if self.profile is not None and self.profile.model_size != self.model_size:
+            self.profile = None
 
         # Detectar backend disponível
         self.backend = self._resolve_backend(backend)
-        self._model = None
-        self._whisperx_model = None
-        self._align_model = None
+        if self.profile is not None and self.profile.backend != self.backend:
+            self.profile = None
+
+        profile = self.profile
+        self.cpu_threads = cpu_threads if cpu_threads is not None else (profile.cpu_threads if profile else WHISPER_CPU_THREADS)
+        self.beam_size = beam_size or (profile.beam_size if profile else WHISPER_BEAM_SIZE)
+        self.best_of = best_of or (profile.best_of if profile else WHISPER_BEST_OF)
+        # Modelos ficam no pool compartilhado (services/model_pool.py); aqui só as chaves
+        self._pool_keys = set()
 
         print(f"TranscriberV2: Usando backend '{self.backend}' com modelo '{self.model_size}'")
 
@@ -88,7 +155,12 @@ class TranscriberV2:
 
         # Auto: tentar na ordem de prioridade
         # Deepgram/AssemblyAI primeiro (melhor qualidade), depois locais, depois Groq
-        priority = ["deepgram", "assemblyai", "whisperx", "stable-ts", "faster-whisper", "groq"]
+        # Entre os locais, o backend do perfil calibrado vem primeiro
+        local = ["whisperx", "stable-ts", "faster-whisper"]
+        if self.profile is not None and self.profile.backend in local:
+            local.remove(self.profile.backend)
+            local.insert(0, self.profile.backend)
+        priority = ["deepgram", "assemblyai"] + local + ["groq"]
 
         for b in priority:
             if self._check_backend_available(b):
@@ -96,7 +168,8 @@ class TranscriberV2:
 
         raise RuntimeError("Nenhum backend de transcrição disponível!")
 
-    def _check_backend_available(self, backend: str) -> bool:
+    @staticmethod
+    def _check_backend_available(backend: str) -> bool:
         """Verifica se um backend está disponível."""
         try:
             if backend == "deepgram":
@@ -139,47 +212,88 @@ class TranscriberV2:
         return "cpu"
 
     def _get_compute_type(self, device: str) -> str:
-        """Detecta o tipo de computação ideal."""
+        """Detecta o tipo de computação ideal (perfil calibrado, se houver)."""
         if self.compute_type != "auto":
             return self.compute_type
 
+        if self.profile is not None and self.profile.device == device:
+            return self.profile.compute_type
+
         if device == "cuda":
             return "float16"
         return "int8"
 
+    def _decoding_settings(self) -> Tuple[Optional[str], Optional[int], Optional[int], Optional[str]]:
+        """
+        (compute type, beam size, best of, modo de lote) efetivos dos backends
+        locais, que mudam a transcrição. None nos backends remotos e o compute
+        type no stable-ts (que não o usa).
+
+        O modo de lote só existe no faster-whisper: "batched" (sempre o
+        BatchedInferencePipeline), "cross-job" (só nos chunks juntados com os de
+        outros jobs pelo processo de inferência) ou "sequential".
+        """
+        if self.backend not in STREAMING_BACKENDS:
+            return None, None, None, None
+        compute_type = None if self.backend == "stable-ts" else self._get_compute_type(self._get_device())
+        batch_mode = None
+        if self.backend == "faster-whisper":
+            if FASTER_WHISPER_BATCHED:
+                batch_mode = "batched"
+            elif self.model_server and MODEL_BATCH_MAX_STREAMS > 1:
+                batch_mode = "cross-job"
+            else:
+                batch_mode = "sequential"
+        return compute_type, self.beam_size, self.best_of, batch_mode
+
     # =========================================================================
     # WhisperX Backend - Melhor precisão de timestamps
     # =========================================================================
 
+    def _pooled_model(self, key: tuple, loader, size_mb: int):
+        """Modelo do pool (carregado na primeira vez, mantido entre jobs)."""
+        self._pool_keys.add(key)
+        return model_pool.get(key, loader, size_mb)
+
     def _load_whisperx(self):
         """Carrega modelo WhisperX."""
-        if self._whisperx_model is None:
-            import whisperx
+        device = self._get_device()
+        compute_type = self._get_compute_type(device)
 
-            device = self._get_device()
-            compute_type = self._get_compute_type(device)
+        def load():
+            import whisperx
 
             print(f"Carregando WhisperX ({self.model_size}) em {device}...")
-            self._whisperx_model = whisperx.load_model(
+            options = {"threads": self.cpu_threads} if self.cpu_threads else {}
+            return whisperx.load_model(
                 self.model_size,
                 device=device,
-                compute_type=compute_type
+                compute_type=compute_type,
+                asr_options={"beam_size": self.beam_size, "best_of": self.best_of},
+                **options
             )
-        return self._whisperx_model
 
-    def _load_whisperx_align_model(self, language: str):
-        """Carrega modelo de alinhamento do WhisperX."""
-        import whisperx
+        return self._pooled_model(
+            ("whisperx", self.model_size, device, compute_type, self.cpu_threads, self.beam_size, self.best_of),
+            load,
+            estimate_model_mb(self.model_size, compute_type)
+        )
 
+    def _load_whisperx_align_model(self, language: str):
+        """Carrega modelo de alinhamento do WhisperX (um por idioma, no pool)."""
         device = self._get_device()
 
-        # Carregar modelo de alinhamento para o idioma
-        print(f"Carregando modelo de alinhamento para '{language}'...")
-        model_a, metadata = whisperx.load_align_model(
-            language_code=language,
-            device=device
-        )
-        return model_a, metadata
+        def load():
+            import whisperx
+
+            # Carregar modelo de alinhamento para o idioma
+            print(f"Carregando modelo de alinhamento para '{language}'...")
+            return whisperx.load_align_model(
+                language_code=language,
+                device=device
+            )
+
+        return self._pooled_model(("whisperx-align", language, device), load, ALIGN_MODEL_MB)
 
     def _transcribe_whisperx(self, audio_path: str, language: str = None) -> Dict[str, Any]:
         """
@@ -192,14 +306,14 @@ class TranscriberV2:
 
         device = self._get_device()
 
-        # Carregar áudio
-        audio = whisperx.load_audio(audio_path)
+        # Carregar áudio (ou usar o array já decodificado do streaming)
+        audio = whisperx.load_audio(audio_path) if isinstance(audio_path, str) else audio_path
 
         # Transcrever
         model = self._load_whisperx()
 
         transcribe_options = {"language": language} if language else {}
-        result = model.transcribe(audio, batch_size=16, **transcribe_options)
+        result = model.transcribe(audio, batch_size=MODEL_BATCH_SIZE, **transcribe_options)
 
         # Detectar idioma se não especificado
         detected_language = result.get("language", language or "pt")
@@ -265,12 +379,13 @@ class TranscriberV2:
 
     def _load_stable_ts(self):
         """Carrega modelo stable-ts."""
-        if self._model is None:
+        def load():
             import stable_whisper
 
             print(f"Carregando stable-ts ({self.model_size})...")
-            self._model = stable_whisper.load_model(self.model_size)
-        return self._model
+            return stable_whisper.load_model(self.model_size)
+
+        return self._pooled_model(("stable-ts", self.model_size), load, estimate_model_mb(self.model_size))
 
     def _transcribe_stable_ts(self, audio_path: str, language: str = None) -> Dict[str, Any]:
         """
@@ -280,11 +395,16 @@ class TranscriberV2:
         através de ajuste de gaps e supressão de silêncio.
         """
         model = self._load_stable_ts()
+        if self.cpu_threads:
+            import torch
+            torch.set_num_threads(self.cpu_threads)
 
         # Transcrever com opções otimizadas
         result = model.transcribe(
             audio_path,
             language=language,
+            beam_size=self.beam_size,
+            best_of=self.best_of,
             word_timestamps=True,
             vad=True,  # Voice Activity Detection
             regroup=True  # Reagrupar palavras para melhor segmentação
@@ -337,32 +457,62 @@ class TranscriberV2:
 
     def _load_faster_whisper(self):
         """Carrega modelo faster-whisper."""
-        if self._model is None:
-            from faster_whisper import WhisperModel
+        device = self._get_device()
+        compute_type = self._get_compute_type(device)
 
-            device = self._get_device()
-            compute_type = self._get_compute_type(device)
+        def load():
+            from faster_whisper import WhisperModel
 
             print(f"Carregando faster-whisper ({self.model_size}) em {device}...")
-            self._model = WhisperModel(
+            return WhisperModel(
                 self.model_size,
                 device=device,
-                compute_type=compute_type
+                compute_type=compute_type,
+                cpu_threads=self.cpu_threads
             )
-        return self._model
 
-    def _transcribe_faster_whisper(self, audio_path: str, language: str = None) -> Dict[str, Any]:
+        return self._pooled_model(
+            ("faster-whisper", self.model_size, device, compute_type, self.cpu_threads),
+            load,
+            estimate_model_mb(self.model_size, compute_type)
+        )
+
+    def load_models(self, language: str = None) -> None:
+        """
+        Carrega os modelos do backend local no pool (warm start).
+
+        Com whisperx também carrega o modelo de alinhamento de `language`.
+        Backends remotos não têm modelo: nada a fazer.
+        """
+        if self.backend == "whisperx":
+            self._load_whisperx()
+            if language:
+                self._load_whisperx_align_model(language)
+        elif self.backend == "stable-ts":
+            self._load_stable_ts()
+        elif self.backend == "faster-whisper":
+            self._load_faster_whisper()
+
+    def _transcribe_faster_whisper(
+        self,
+        audio_path: str,
+        language: str = None,
+        batched: bool = False
+    ) -> Dict[str, Any]:
         """
         Transcreve usando faster-whisper com timestamps nativos.
 
         faster-whisper é 4x mais rápido que o Whisper original e usa menos memória.
+        Com `batched` (chunks de vários jobs juntados) ou FASTER_WHISPER_BATCHED,
+        e MODEL_BATCH_SIZE > 1, os trechos de fala são decodificados em lotes
+        (BatchedInferencePipeline, faster-whisper >= 1.1).
         """
         model = self._load_faster_whisper()
 
-        # Transcrever com word timestamps
-        segments_gen, info = model.transcribe(
-            audio_path,
+        transcribe_options = dict(
             language=language,
+            beam_size=self.beam_size,
+            best_of=self.best_of,
             word_timestamps=True,
             vad_filter=True,
             vad_parameters=dict(
@@ -370,6 +520,19 @@ class TranscriberV2:
                 speech_pad_ms=400
             )
         )
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:
+            BatchedInferencePipeline = None
+
+        # Transcrever com word timestamps
+        batched = batched or FASTER_WHISPER_BATCHED
+        if batched and MODEL_BATCH_SIZE > 1 and BatchedInferencePipeline is not None:
+            segments_gen, info = BatchedInferencePipeline(model=model).transcribe(
+                audio_path, batch_size=MODEL_BATCH_SIZE, **transcribe_options
+            )
+        else:
+            segments_gen, info = model.transcribe(audio_path, **transcribe_options)
 
         # Formatar resultado
         return self._format_faster_whisper_result(segments_gen, info)
@@ -417,26 +580,54 @@ class TranscriberV2:
     # Groq API Backend - Cloud API (fallback)
     # =========================================================================
 
+    def _transcribe_remote(
+        self,
+        audio_path: str,
+        language: str,
+        request_fn,
+        force_chunking: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Transcreve com um backend remoto: uma request (com retry) para áudios
+        curtos, chunks paralelos (ChunkedRemoteTranscriber) para áudios longos.
+
+        Args:
+            audio_path: Caminho do arquivo de áudio
+            language: Código do idioma (None para auto-detectar)
+            request_fn: fn(audio_path, language) -> resultado formatado (uma request)
+            force_chunking: Dividir mesmo áudios curtos (ex: arquivo acima do limite da API)
+        """
+        engine = ChunkedRemoteTranscriber(
+            transcribe_chunk=request_fn,
+            build_segments=self._create_segments_from_words,
+            backend_name=self.backend
+        )
+
+        total_duration = probe_duration(audio_path)
+        if force_chunking or engine.needs_chunking(total_duration):
+            return engine.transcribe(audio_path, language, total_duration=total_duration)
+
+        return call_with_retry(
+            lambda: request_fn(audio_path, language),
+            description=f"Request {self.backend}"
+        )
+
     def _transcribe_groq(self, audio_path: str, language: str = None) -> Dict[str, Any]:
         """
         Transcreve usando Groq API (cloud).
 
         Rápido mas com timestamps menos precisos que backends locais.
         """
-        import httpx
-
         # Verificar tamanho do arquivo
         file_size = Path(audio_path).stat().st_size
-        max_size = 25 * 1024 * 1024  # 25MB
-
-        if file_size > max_size:
-            return self._transcribe_groq_chunked(audio_path, language)
 
-        return self._groq_request(audio_path, language)
+        return self._transcribe_remote(
+            audio_path, language, self._groq_request,
+            force_chunking=file_size > self.GROQ_MAX_FILE_SIZE
+        )
 
     def _groq_request_raw(self, audio_path: str, language: str = None) -> Dict[str, Any]:
         """Faz request para Groq API e retorna JSON raw."""
-        import httpx
 
         mime_type = self._get_audio_mime_type(audio_path)
 
@@ -450,16 +641,17 @@ class TranscriberV2:
             if language:
                 data['language'] = language
 
-            response = httpx.post(
+            # Sem retry aqui: _transcribe_remote já repete a request inteira
+            response = provider_clients.post(
                 self.GROQ_API_URL,
                 files=files,
                 data=data,
                 headers={'Authorization': f'Bearer {GROQ_API_KEY}'},
-                timeout=120.0
+                timeout=120.0,
+                max_retries=0
             )
 
-            if response.status_code != 200:
-                raise Exception(f"Groq API error: {response.status_code} - {response.text}")
+            raise_for_status(response, "Groq")
 
             return response.json()
 
@@ -472,130 +664,11 @@ class TranscriberV2:
         """
         Transcreve arquivo grande em chunks via Groq.
 
-        Divide o áudio em chunks de 10 minutos, transcreve cada um,
-        e combina os resultados ajustando os timestamps.
+        Divide o áudio em chunks (REMOTE_TRANSCRIPTION_CHUNK_SECONDS) com
+        sobreposição, transcreve em paralelo e combina os resultados
+        ajustando os timestamps.
         """
-        import tempfile
-        import os
-
-        chunk_duration = 600  # 10 min
-        audio_path = Path(audio_path)
-
-        # Obter duração total
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(audio_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        total_duration = float(result.stdout.strip())
-
-        print(f"  Áudio total: {total_duration:.1f}s, dividindo em chunks de {chunk_duration}s")
-
-        # Processar chunks e coletar resultados RAW
-        all_segments = []
-        all_words = []
-        full_text = []
-        detected_language = language
-
-        current_time = 0
-        chunk_num = 0
-
-        while current_time < total_duration:
-            chunk_num += 1
-            chunk_end = min(current_time + chunk_duration, total_duration)
-
-            # Extrair chunk como MP3
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
-                chunk_path = tmp.name
-
-            try:
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-ss', str(current_time),
-                    '-i', str(audio_path),
-                    '-t', str(chunk_end - current_time),
-                    '-acodec', 'libmp3lame',
-                    '-b:a', '64k',
-                    '-ar', '16000',
-                    '-ac', '1',
-                    chunk_path
-                ]
-                subprocess.run(cmd, check=True, capture_output=True)
-
-                print(f"  Transcrevendo chunk {chunk_num} ({current_time:.0f}s - {chunk_end:.0f}s)...")
-
-                # Transcrever chunk - pegar resultado RAW
-                raw_result = self._groq_request_raw(chunk_path, language)
-
-                # Detectar idioma do primeiro chunk
-                if detected_language is None and raw_result.get('language'):
-                    detected_language = raw_result.get('language')
-
-                # Processar palavras com offset primeiro
-                chunk_words = []
-                for word in (raw_result.get('words') or []):
-                    adjusted_word = {
-                        'word': (word.get('word') or '').strip(),
-                        'start': (word.get('start') or 0) + current_time,
-                        'end': (word.get('end') or 0) + current_time,
-                        'probability': 1.0
-                    }
-                    chunk_words.append(adjusted_word)
-                    all_words.append(adjusted_word)
-
-                # Processar segmentos com offset (se existirem)
-                raw_segments = raw_result.get('segments') or []
-                if raw_segments:
-                    for segment in raw_segments:
-                        adjusted_segment = {
-                            'id': len(all_segments),
-                            'start': (segment.get('start') or 0) + current_time,
-                            'end': (segment.get('end') or 0) + current_time,
-                            'text': (segment.get('text') or '').strip(),
-                            'words': []
-                        }
-                        all_segments.append(adjusted_segment)
-                else:
-                    # Groq não retornou segmentos - criar a partir das palavras
-                    chunk_segments = self._create_segments_from_words(chunk_words)
-                    for seg in chunk_segments:
-                        seg['id'] = len(all_segments)
-                        all_segments.append(seg)
-
-                # Adicionar texto
-                if raw_result.get('text'):
-                    full_text.append(raw_result.get('text').strip())
-
-            except Exception as e:
-                print(f"  Erro no chunk {chunk_num}: {e}")
-                # Continuar com próximo chunk
-            finally:
-                if os.path.exists(chunk_path):
-                    os.unlink(chunk_path)
-
-            current_time = chunk_end
-
-        # Associar palavras aos segmentos
-        for segment in all_segments:
-            seg_start = segment['start']
-            seg_end = segment['end']
-            segment['words'] = [
-                w for w in all_words
-                if w['start'] >= seg_start - 0.1 and w['end'] <= seg_end + 0.1
-            ]
-
-        print(f"  Transcrição combinada: {len(all_segments)} segmentos, {len(all_words)} palavras")
-
-        return {
-            'text': ' '.join(full_text),
-            'language': detected_language or 'pt',
-            'duration': total_duration,
-            'segments': all_segments,
-            'words': all_words,
-            'backend': 'groq'
-        }
+        return self._transcribe_remote(audio_path, language, self._groq_request, force_chunking=True)
 
     def _create_segments_from_words(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -703,11 +776,7 @@ class TranscriberV2:
                 segments.append(segment_data)
 
             # Associar palavras aos segmentos
-            for segment in segments:
-                segment['words'] = [
-                    w for w in all_words
-                    if w['start'] >= segment['start'] - 0.1 and w['end'] <= segment['end'] + 0.1
-                ]
+            WordTimeline(all_words).assign_to_segments(segments)
         else:
             # Groq não retornou segmentos - criar a partir das palavras
             segments = self._create_segments_from_words(all_words)
@@ -733,7 +802,10 @@ class TranscriberV2:
         Deepgram oferece alta precisão e word-level timestamps confiáveis.
         Modelo Nova-3 é o mais preciso disponível.
         """
-        import httpx
+        return self._transcribe_remote(audio_path, language, self._deepgram_request)
+
+    def _deepgram_request(self, audio_path: str, language: str = None) -> Dict[str, Any]:
+        """Faz uma request para Deepgram API e retorna resultado formatado."""
 
         # Mapear código de idioma
         lang_map = {"pt": "pt-BR", "en": "en-US", "es": "es"}
@@ -747,7 +819,7 @@ class TranscriberV2:
         mime_type = self._get_audio_mime_type(audio_path)
 
         # Configurar request
-        url = "https://api.deepgram.com/v1/listen"
+        url = self.DEEPGRAM_API_URL
         params = {
             "model": "nova-2",  # Modelo mais preciso
             "language": dg_language,
@@ -765,16 +837,16 @@ class TranscriberV2:
 
         print(f"  Enviando para Deepgram ({dg_language})...")
 
-        response = httpx.post(
+        response = provider_clients.post(
             url,
             params=params,
             headers=headers,
             content=audio_data,
-            timeout=300.0
+            timeout=300.0,
+            max_retries=0
         )
 
-        if response.status_code != 200:
-            raise Exception(f"Deepgram API error: {response.status_code} - {response.text}")
+        raise_for_status(response, "Deepgram")
 
         result = response.json()
         return self._format_deepgram_result(result, language or "pt")
@@ -821,13 +893,10 @@ class TranscriberV2:
                     'text': utt.get('transcript', '').strip(),
                     'words': []
                 }
-                # Associar palavras ao segmento
-                segment['words'] = [
-                    w for w in all_words
-                    if w['start'] >= segment['start'] - 0.1 and w['end'] <= segment['end'] + 0.1
-                ]
                 segments.append(segment)
                 full_text.append(segment['text'])
+            # Associar palavras aos segmentos
+            WordTimeline(all_words).assign_to_segments(segments)
         else:
             # Criar segmentos a partir das palavras
             segments = self._create_segments_from_words(all_words)
@@ -852,7 +921,10 @@ class TranscriberV2:
 
         AssemblyAI oferece alta precisão e word-level timestamps.
         """
-        import httpx
+        return self._transcribe_remote(audio_path, language, self._assemblyai_request)
+
+    def _assemblyai_request(self, audio_path: str, language: str = None) -> Dict[str, Any]:
+        """Faz upload, cria e aguarda uma transcrição na AssemblyAI (resultado formatado)."""
         import time as time_module
 
         # Mapear código de idioma
@@ -867,15 +939,15 @@ class TranscriberV2:
         # Passo 1: Upload do arquivo
         print(f"  Fazendo upload para AssemblyAI...")
         with open(audio_path, 'rb') as audio_file:
-            upload_response = httpx.post(
-                "https://api.assemblyai.com/v2/upload",
+            upload_response = provider_clients.post(
+                f"{self.ASSEMBLYAI_API_URL}/upload",
                 headers={"Authorization": ASSEMBLYAI_API_KEY},
                 content=audio_file.read(),
-                timeout=300.0
+                timeout=300.0,
+                max_retries=0
             )
 
-        if upload_response.status_code != 200:
-            raise Exception(f"AssemblyAI upload error: {upload_response.status_code}")
+        raise_for_status(upload_response, "AssemblyAI upload")
 
         upload_url = upload_response.json()["upload_url"]
 
@@ -888,35 +960,37 @@ class TranscriberV2:
             "format_text": True,
         }
 
-        transcript_response = httpx.post(
-            "https://api.assemblyai.com/v2/transcript",
+        transcript_response = provider_clients.post(
+            f"{self.ASSEMBLYAI_API_URL}/transcript",
             headers=headers,
             json=transcript_request,
-            timeout=60.0
+            timeout=60.0,
+            max_retries=0
         )
 
-        if transcript_response.status_code != 200:
-            raise Exception(f"AssemblyAI transcript error: {transcript_response.status_code}")
+        raise_for_status(transcript_response, "AssemblyAI transcript")
 
         transcript_id = transcript_response.json()["id"]
 
         # Passo 3: Aguardar conclusão
         print(f"  Aguardando processamento...")
         while True:
-            status_response = httpx.get(
-                f"https://api.assemblyai.com/v2/transcript/{transcript_id}",
+            # Polling com retry próprio: um erro transitório aqui não deve refazer o upload
+            status_response = provider_clients.get(
+                f"{self.ASSEMBLYAI_API_URL}/transcript/{transcript_id}",
                 headers=headers,
                 timeout=60.0
             )
 
+            raise_for_status(status_response, "AssemblyAI status")
             status = status_response.json()
 
             if status["status"] == "completed":
                 return self._format_assemblyai_result(status, language or "pt")
             elif status["status"] == "error":
-                raise Exception(f"AssemblyAI error: {status.get('error', 'Unknown error')}")
+                raise RemoteTranscriptionError(f"AssemblyAI error: {status.get('error', 'Unknown error')}")
 
-            time_module.sleep(3)  # Aguardar 3 segundos antes de verificar novamente
+            time_module.sleep(self.ASSEMBLYAI_POLL_INTERVAL)  # Aguardar antes de verificar novamente
 
     def _format_assemblyai_result(self, result: Dict[str, Any], language: str) -> Dict[str, Any]:
         """Formata resultado do AssemblyAI para o formato padrão."""
@@ -998,13 +1072,7 @@ class TranscriberV2:
         result['words'] = enhanced_words
 
         # Atualizar palavras nos segmentos também
-        for segment in result.get('segments', []):
-            seg_start = segment['start']
-            seg_end = segment['end']
-            segment['words'] = [
-                w for w in enhanced_words
-                if w['start'] >= seg_start - 0.1 and w['end'] <= seg_end + 0.1
-            ]
+        WordTimeline(enhanced_words).assign_to_segments(result.get('segments', []))
 
         result['backend'] = result.get('backend', 'unknown') + '-enhanced'
         return result
@@ -1056,10 +1124,201 @@ class TranscriberV2:
         ]
 
         print(f"Extraindo áudio: {video_path} -> {output_path}")
-        subprocess.run(cmd, check=True, capture_output=True)
+        instrumented_run(cmd, check=True, capture_output=True)
 
         return str(output_path)
 
+    # =========================================================================
+    # Streaming (backends locais)
+    # =========================================================================
+
+    def _transcribe_samples(self, samples, language: str = None, stream_id: str = None) -> Dict[str, Any]:
+        """Transcreve um array float32 16 kHz com o backend local configurado."""
+        if self.backend not in STREAMING_BACKENDS:
+            raise ValueError(f"Backend '{self.backend}' não suporta streaming")
+        return self._transcribe_local(samples, language, stream_id)
+
+    def _transcribe_local(self, audio, language: str = None, stream_id: str = None) -> Dict[str, Any]:
+        """
+        Transcreve com o backend local (caminho do áudio ou array float32 16 kHz).
+
+        Com o processo de inferência ativo, o áudio é enviado a ele e os modelos
+        não são carregados neste processo; se ele não responder, carrega aqui.
+        Lá, chunks de jobs simultâneos (`stream_id` distintos) são agrupados
+        num lote (services/inference_batcher.py).
+        """
+        if self.model_server:
+            from .model_server import ModelServerUnavailable, model_server_client
+
+            if model_server_client.enabled:
+                try:
+                    return model_server_client.transcribe(
+                        self.backend, self.model_size, self.device, self.compute_type, audio, language,
+                        stream_id=stream_id
+                    )
+                except ModelServerUnavailable as e:
+                    print(f"Aviso: processo de inferência indisponível ({e}), carregando modelo localmente")
+
+        return self._transcribe_in_process(audio, language)
+
+    def _transcribe_in_process(self, audio, language: str = None, batched: bool = False) -> Dict[str, Any]:
+        """
+        Transcreve com os modelos do pool deste processo.
+
+        `batched`: o áudio junta chunks de vários jobs (decodificação em lotes
+        no faster-whisper).
+        """
+        if self.backend == "whisperx":
+            return self._transcribe_whisperx(audio, language)
+        elif self.backend == "stable-ts":
+            return self._transcribe_stable_ts(audio, language)
+        elif self.backend == "faster-whisper":
+            return self._transcribe_faster_whisper(audio, language, batched=batched)
+        raise ValueError(f"Backend '{self.backend}' não é local")
+
+    def _transcribe_batch(self, audios: List, language: str) -> List[Dict[str, Any]]:
+        """
+        Transcreve vários arrays float32 16 kHz numa única chamada ao modelo.
+
+        Os arrays são concatenados com silêncio entre eles (maior que a janela
+        de 30s do Whisper) e o resultado é separado de volta por array.
+        """
+        if len(audios) == 1:
+            return [self._transcribe_in_process(audios[0], language)]
+        combined, offsets = concatenate_audio(audios)
+        return split_batched_result(self._transcribe_in_process(combined, language, batched=True), offsets)
+
+    def _chunk_segments(self, to_source_time, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Segmentos de um chunk com timestamps no tempo do áudio completo"""
+        segments = []
+        for segment in part.get("segments", []):
+            segments.append({
+                "start": to_source_time(segment["start"]),
+                "end": to_source_time(segment["end"]),
+                "text": segment["text"],
+                "words": [
+                    {**word, "start": to_source_time(word["start"]), "end": to_source_time(word["end"])}
+                    for word in segment.get("words", [])
+                ]
+            })
+        return segments
+
+    def _merge_chunk_results(self, parts: List[tuple], duration: float) -> Dict[str, Any]:
+        """
+        Combina resultados de chunks convertendo os timestamps para o tempo do áudio completo.
+
+        Args:
+            parts: Lista de (to_source_time, resultado formatado do chunk), onde
+                to_source_time(t) converte um tempo do chunk (offset ou SpeechChunk)
+            duration: Duração total do áudio
+        """
+        segments = []
+        all_words = []
+        full_text = []
+        language = None
+
+        for to_source_time, part in parts:
+            language = language or part.get("language")
+            for segment in self._chunk_segments(to_source_time, part):
+                segment["id"] = len(segments)
+                segments.append(segment)
+                all_words.extend(segment["words"])
+                if segment["text"]:
+                    full_text.append(segment["text"])
+
+        return {
+            "text": " ".join(full_text),
+            "language": language or "pt",
+            "duration": duration,
+            "segments": segments,
+            "words": all_words,
+            "backend": self.backend
+        }
+
+    def transcribe_stream(
+        self,
+        video_path: str,
+        language: str = None,
+        enhance_timestamps: bool = True,
+        keep_wav: bool = AUDIO_KEEP_WAV,
+        use_vad: bool = VAD_ENABLED,
+        on_segments: SegmentsCallback = None
+    ) -> Dict[str, Any]:
+        """
+        Transcreve o vídeo lendo o áudio de um pipe do FFmpeg (sem WAV intermediário).
+
+        Cada chunk (AUDIO_STREAM_CHUNK_SECONDS, cortado num trecho silencioso) é
+        transcrito assim que fica pronto, enquanto o FFmpeg segue decodificando.
+        Com VAD, só as regiões de fala do chunk são enviadas ao modelo.
+
+        Args:
+            video_path: Caminho do vídeo
+            language: Código do idioma
+            enhance_timestamps: Aplicar pós-processamento de timestamps
+            keep_wav: Gravar também o WAV em AUDIO_DIR
+            use_vad: Pular silêncios longos (services/vad.py)
+            on_segments: Chamado com os segmentos de cada chunk (tempo do áudio
+                completo, antes do pós-processamento) assim que ele é transcrito
+
+        Returns:
+            Dict com transcrição, timestamps, audio_path (None sem WAV) e
+            audio_hash (SHA-256 do PCM, usado pelo cache)
+        """
+        from .audio_stream import PCMAudioStream
+        from .vad import SpeechChunk, speech_chunk_from_samples
+
+        if self.backend not in STREAMING_BACKENDS:
+            raise ValueError(f"Backend '{self.backend}' não suporta streaming")
+
+        language = self._normalize_language(language)
+        wav_path = self.audio_dir / f"{Path(video_path).stem}.wav" if keep_wav else None
+        stream = PCMAudioStream(video_path, wav_path=wav_path)
+
+        print(f"Transcrevendo com {self.backend} (streaming): {video_path}")
+
+        parts = []
+        speech_seconds = 0.0
+        try:
+            for chunk in stream:
+                if chunk.duration < 0.1:
+                    continue
+                print(f"  Chunk {len(parts) + 1}: {chunk.offset:.0f}s - {chunk.offset + chunk.duration:.0f}s")
+
+                samples = chunk.samples
+                speech = SpeechChunk([(chunk.offset, chunk.offset + chunk.duration)])
+                if use_vad:
+                    speech = speech_chunk_from_samples(chunk.samples, chunk.offset)
+                    if speech is None:
+                        print("    Sem fala, chunk ignorado")
+                        continue
+                    samples = speech.splice(chunk.samples, chunk.offset)
+                speech_seconds += speech.speech_duration
+
+                part = self._transcribe_samples(samples, language, stream_id=str(video_path))
+                # Manter o idioma detectado no primeiro chunk para os demais
+                if language is None:
+                    language = part.get("language")
+                parts.append((speech.to_source_time, part))
+                if on_segments is not None:
+                    on_segments(self._chunk_segments(speech.to_source_time, part))
+        except Exception:
+            if wav_path is not None and wav_path.exists():
+                wav_path.unlink()
+            raise
+
+        result = self._merge_chunk_results(parts, stream.duration)
+        if use_vad:
+            print(f"  VAD: {speech_seconds:.1f}s de fala em {stream.duration:.1f}s de áudio")
+        print(f"  Transcrição combinada: {len(result['segments'])} segmentos, {len(result['words'])} palavras")
+
+        if enhance_timestamps:
+            result = self._enhance_timestamps(result)
+            print(f"  Timestamps aprimorados aplicados")
+
+        result['audio_path'] = str(wav_path) if wav_path is not None else None
+        result['audio_hash'] = stream.audio_hash
+        return result
+
     # =========================================================================
     # Interface principal
     # =========================================================================
@@ -1081,10 +1340,7 @@ class TranscriberV2:
         Returns:
             Dict com transcrição e timestamps palavra-por-palavra
         """
-        if language == "auto":
-            language = None
-        elif language is None:
-            language = WHISPER_LANGUAGE
+        language = self._normalize_language(language)
 
         print(f"Transcrevendo com {self.backend}: {audio_path}")
 
@@ -1092,12 +1348,8 @@ class TranscriberV2:
             result = self._transcribe_deepgram(audio_path, language)
         elif self.backend == "assemblyai":
             result = self._transcribe_assemblyai(audio_path, language)
-        elif self.backend == "whisperx":
-            result = self._transcribe_whisperx(audio_path, language)
-        elif self.backend == "stable-ts":
-            result = self._transcribe_stable_ts(audio_path, language)
-        elif self.backend == "faster-whisper":
-            result = self._transcribe_faster_whisper(audio_path, language)
+        elif self.backend in STREAMING_BACKENDS:
+            result = self._transcribe_local(audio_path, language)
         elif self.backend == "groq":
             result = self._transcribe_groq(audio_path, language)
         else:
@@ -1110,25 +1362,131 @@ class TranscriberV2:
 
         return result
 
-    def transcribe_video(self, video_path: str, language: str = None) -> Dict[str, Any]:
+    def _normalize_language(self, language: Optional[str]) -> Optional[str]:
+        """"auto" -> None (auto-detectar), None -> idioma padrão"""
+        if language == "auto":
+            return None
+        if language is None:
+            return WHISPER_LANGUAGE
+        return language
+
+    @property
+    def cache(self) -> Optional[TranscriptionCache]:
+        """Cache de transcrições (criado sob demanda, None se desativado)"""
+        if self.use_cache and self._cache is None:
+            try:
+                self._cache = TranscriptionCache()
+            except Exception as e:
+                print(f"Cache de transcrição indisponível: {e}")
+                self.use_cache = False
+        return self._cache
+
+    def transcribe_video(
+        self,
+        video_path: str,
+        language: str = None,
+        enhance_timestamps: bool = True,
+        on_segments: SegmentsCallback = None
+    ) -> Dict[str, Any]:
         """
         Extrai áudio e transcreve vídeo.
 
+        Com o cache ativo, a transcrição é reaproveitada quando o mesmo áudio já
+        foi transcrito com o mesmo backend, modelo, idioma e pós-processamento
+        (reprocessamento ou vídeo duplicado). Um vídeo inalterado nem tem o
+        áudio extraído de novo.
+
+        Com streaming (backends locais), o áudio é transcrito direto do pipe do
+        FFmpeg. Quando o vídeo não é conhecido (upload duplicado, novo download),
+        uma decodificação só para o hash do PCM consulta o cache pelo conteúdo
+        antes de transcrever. O hash é o mesmo das amostras do WAV extraído.
+
         Args:
             video_path: Caminho do vídeo
             language: Código do idioma
+            enhance_timestamps: Aplicar pós-processamento de timestamps
+            on_segments: Recebe os segmentos à medida que ficam prontos (por
+                chunk no streaming; de uma vez nos demais caminhos)
 
         Returns:
             Dict com transcrição e timestamps
         """
+        cache = self.cache
+
+        def emit_all(result: Dict[str, Any]) -> Dict[str, Any]:
+            if on_segments is not None:
+                on_segments(result.get('segments', []))
+            return result
+        cache_language = self._normalize_language(language)
+        decoding = self._decoding_settings() if cache is not None else (None, None, None, None)
+
+        def cache_key(audio_hash: str) -> str:
+            return cache.make_key(
+                audio_hash, self.backend, self.model_size, cache_language, enhance_timestamps, *decoding
+            )
+
+        # Vídeo inalterado: procurar pelo hash do áudio já conhecido
+        if cache is not None:
+            audio_hash, known_audio_path = cache.get_audio_hash(video_path)
+            if audio_hash:
+                cached = cache.get(cache_key(audio_hash))
+                if cached is not None:
+                    print("Transcrição encontrada no cache (áudio não re-extraído)")
+                    cached['audio_path'] = known_audio_path if known_audio_path and Path(known_audio_path).exists() else None
+                    return emit_all(cached)
+
+        # Backends locais: transcrever direto do pipe do FFmpeg
+        if self.streaming and self.backend in STREAMING_BACKENDS:
+            if cache is not None:
+                from .audio_stream import hash_pcm
+
+                # Vídeo desconhecido: procurar pelo conteúdo do áudio
+                audio_hash = hash_pcm(video_path)
+                cached = cache.get(cache_key(audio_hash))
+                if cached is not None:
+                    print("Transcrição encontrada no cache (mesmo áudio)")
+                    cache.remember_audio_hash(video_path, audio_hash)
+                    cached['audio_path'] = None
+                    return emit_all(cached)
+
+            result = self.transcribe_stream(
+                video_path, language, enhance_timestamps=enhance_timestamps, on_segments=on_segments
+            )
+            audio_hash = result.pop('audio_hash', None)
+            if cache is not None and audio_hash:
+                try:
+                    cache.remember_audio_hash(video_path, audio_hash, result.get('audio_path'))
+                    cache.put(cache_key(audio_hash), {k: v for k, v in result.items() if k != 'audio_path'})
+                except Exception as e:
+                    print(f"Falha ao salvar transcrição no cache: {e}")
+            return result
+
         # Extrair áudio
         audio_path = self.extract_audio(video_path)
 
         try:
+            key = None
+            if cache is not None:
+                audio_hash = cache.hash_wav(audio_path)
+                cache.remember_audio_hash(video_path, audio_hash, audio_path)
+                key = cache_key(audio_hash)
+                cached = cache.get(key)
+                if cached is not None:
+                    print("Transcrição encontrada no cache")
+                    cached['audio_path'] = audio_path
+                    return emit_all(cached)
+
             # Transcrever
-            result = self.transcribe(audio_path, language)
+            result = self.transcribe(audio_path, language, enhance_timestamps=enhance_timestamps)
+
+            if key is not None:
+                try:
+                    cache.put(key, {k: v for k, v in result.items() if k != 'audio_path'})
+                except Exception as e:
+                    print(f"Falha ao salvar transcrição no cache: {e}")
+
             result['audio_path'] = audio_path
-            return result
+            return emit_all(result)
         except Exception as e:
             # Limpar em caso de erro
             if Path(audio_path).exists():
@@ -1139,7 +1497,8 @@ class TranscriberV2:
         self,
         transcription: Dict[str, Any],
         start_time: float,
-        end_time: float
+        end_time: float,
+        timeline: WordTimeline = None
     ) -> Dict[str, Any]:
         """
         Obtém texto e palavras para um intervalo de tempo.
@@ -1148,69 +1507,26 @@ class TranscriberV2:
             transcription: Resultado da transcrição
             start_time: Tempo inicial em segundos
             end_time: Tempo final em segundos
+            timeline: WordTimeline.from_segments da transcrição (construir uma
+                vez e reutilizar quando consultar vários intervalos)
 
         Returns:
             Dict com texto e palavras do intervalo
         """
-        segments = []
-        words = []
-        text_parts = []
-
-        for segment in transcription.get('segments', []):
-            seg_start = segment.get('start', 0)
-            seg_end = segment.get('end', 0)
-
-            if seg_end >= start_time and seg_start <= end_time:
-                segment_words = []
-                for word in segment.get('words', []):
-                    word_start = word.get('start', 0)
-                    word_end = word.get('end', 0)
-
-                    if word_end >= start_time and word_start <= end_time:
-                        segment_words.append(word)
-                        words.append(word)
-
-                if segment_words:
-                    text_parts.append(' '.join(w['word'] for w in segment_words))
-                    segments.append({
-                        'start': max(seg_start, start_time),
-                        'end': min(seg_end, end_time),
-                        'text': ' '.join(w['word'] for w in segment_words),
-                        'words': segment_words
-                    })
-
-        return {
-            'text': ' '.join(text_parts),
-            'segments': segments,
-            'words': words,
-            'start_time': start_time,
-            'end_time': end_time
-        }
+        if timeline is None:
+            timeline = WordTimeline.from_segments(transcription.get('segments', []))
+        return timeline.text_for_timerange(start_time, end_time)
 
     def unload_model(self):
-        """Libera memória do modelo."""
-        import gc
-
-        if self._model is not None:
-            del self._model
-            self._model = None
-
-        if self._whisperx_model is not None:
-            del self._whisperx_model
-            self._whisperx_model = None
-
-        if self._align_model is not None:
-            del self._align_model
-            self._align_model = None
-
-        gc.collect()
+        """
+        Libera da memória os modelos carregados por este transcriber.
 
-        try:
-            import torch
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-        except ImportError:
-            pass
+        Normalmente desnecessário: o pool descarrega os menos usados quando
+        passa de MODEL_POOL_MAX_MB.
+        """
+        keys = self._pool_keys
+        self._pool_keys = set()
+        model_pool.evict(lambda key: key in keys)
 
         print("Modelo de transcrição liberado da memória")
 
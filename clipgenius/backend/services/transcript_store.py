@@ -0,0 +1,297 @@
+"""
+ClipGenius - Transcript Store
+Compact columnar sidecar files for project transcriptions.
+
+Instead of a JSON blob in projects.transcription, each transcription is
+written once to TRANSCRIPTS_DIR and the row keeps only its path. The file is
+memory-mapped on read:
+
+- words: fixed-size records (float32 start/end/probability + string id)
+- segments: fixed-size records + a word index list per segment
+- strings: interned UTF-8 table (each distinct word/segment text stored once)
+- header: JSON with the scalar fields (language, duration, backend, ...)
+
+Layout: MAGIC | version (u32) | header length (u32) | header JSON | sections,
+each section 8-byte aligned at the offset recorded in the header.
+"""
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import TRANSCRIPTS_DIR
+from logging_config import get_service_logger
+
+logger = get_service_logger("transcript_store")
+
+MAGIC = b"CGTR"
+VERSION = 1
+_PREFIX = struct.Struct("<4sII")
+_ALIGN = 8
+
+WORD_DTYPE = np.dtype([
+    ('start', '<f4'),
+    ('end', '<f4'),
+    ('probability', '<f4'),
+    ('text', '<u4'),
+])
+
+SEGMENT_DTYPE = np.dtype([
+    ('id', '<i4'),
+    ('start', '<f4'),
+    ('end', '<f4'),
+    ('text', '<u4'),
+    ('words_offset', '<u4'),
+    ('words_count', '<u4'),
+])
+
+_SECTION_DTYPES = {
+    'words': WORD_DTYPE,
+    'segments': SEGMENT_DTYPE,
+    'segment_words': np.dtype('<u4'),
+    'string_offsets': np.dtype('<u4'),
+    'string_data': np.dtype('u1'),
+}
+
+
+def _round_time(value: float) -> float:
+    """float32 -> float rounded to ms (avoids 12.300000190734863 in the API)"""
+    return round(float(value), 3)
+
+
+class _StringTable:
+    """Interned strings: each distinct value gets one id"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[bytes] = []
+
+    def intern(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value.encode('utf-8'))
+        return index
+
+    def arrays(self):
+        lengths = np.fromiter((len(v) for v in self.values), dtype=np.uint64, count=len(self.values))
+        offsets = np.zeros(len(self.values) + 1, dtype='<u4')
+        offsets[1:] = np.cumsum(lengths)
+        data = np.frombuffer(b''.join(self.values), dtype='u1')
+        return offsets, data
+
+
+class StoredTranscript:
+    """Memory-mapped view of a transcript sidecar (arrays are read-only)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a transcript file (or unsupported version): {self.path}")
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_len].decode('utf-8'))
+
+        self.meta: Dict[str, Any] = header['meta']
+        self.word_count: int = header['word_count']
+        self._sections = {
+            name: np.frombuffer(self._mmap, dtype=_SECTION_DTYPES[name], count=count, offset=offset)
+            for name, (offset, count) in header['sections'].items()
+        }
+        self._strings: Optional[List[str]] = None
+
+    @property
+    def words(self) -> np.ndarray:
+        """Word records (start/end/probability/text id); the first word_count form the top-level list"""
+        return self._sections['words']
+
+    @property
+    def segments(self) -> np.ndarray:
+        return self._sections['segments']
+
+    @property
+    def strings(self) -> List[str]:
+        """Decoded string table (decoded once, on first use)"""
+        if self._strings is None:
+            offsets = self._sections['string_offsets']
+            data = self._sections['string_data'].tobytes()
+            self._strings = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the transcription dict (same shape TranscriberV2 returns)"""
+        strings = self.strings
+        records = self.words
+        starts = records['start'].astype(np.float64).round(3).tolist()
+        ends = records['end'].astype(np.float64).round(3).tolist()
+        probabilities = records['probability'].astype(np.float64).round(4).tolist()
+        texts = records['text'].tolist()
+
+        words = [
+            {'word': strings[t], 'start': s, 'end': e, 'probability': p}
+            for t, s, e, p in zip(texts, starts, ends, probabilities)
+        ]
+
+        segment_words = self._sections['segment_words'].tolist()
+        segments = []
+        for record in self.segments:
+            offset, count = int(record['words_offset']), int(record['words_count'])
+            segments.append({
+                'id': int(record['id']),
+                'start': _round_time(record['start']),
+                'end': _round_time(record['end']),
+                'text': strings[record['text']],
+                # Same dict objects as the top-level list (as produced by the transcriber)
+                'words': [words[i] for i in segment_words[offset:offset + count]]
+            })
+
+        return {**self.meta, 'segments': segments, 'words': words[:self.word_count]}
+
+    def close(self):
+        self._sections = {}
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TranscriptStore:
+    """Writes and reads transcript sidecars under TRANSCRIPTS_DIR"""
+
+    SUFFIX = ".cgt"
+
+    def __init__(self, base_dir: Path = None):
+        self.base_dir = Path(base_dir or TRANSCRIPTS_DIR)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, name: str) -> Path:
+        return self.base_dir / f"{name}{self.SUFFIX}"
+
+    def save(self, transcription: Dict[str, Any], name: str) -> str:
+        """
+        Write a transcription as a sidecar file.
+
+        Returns:
+            Absolute path of the file (stored in the database row)
+        """
+        strings = _StringTable()
+        words = list(transcription.get('words') or [])
+        segments = transcription.get('segments') or []
+
+        # Segment words usually are the top-level word dicts; match by identity,
+        # then by value (e.g. after a JSON round trip), else append them
+        by_identity = {id(word): i for i, word in enumerate(words)}
+        by_value = {(w.get('word'), w.get('start'), w.get('end')): i for i, w in enumerate(words)}
+        word_count = len(words)
+
+        segment_records = np.zeros(len(segments), dtype=SEGMENT_DTYPE)
+        segment_words: List[int] = []
+        for i, segment in enumerate(segments):
+            segment_records[i] = (
+                i if segment.get('id') is None else segment['id'],
+                segment.get('start') or 0,
+                segment.get('end') or 0,
+                strings.intern(segment.get('text') or ''),
+                len(segment_words),
+                len(segment.get('words') or [])
+            )
+            for word in segment.get('words') or []:
+                index = by_identity.get(id(word))
+                if index is None:
+                    key = (word.get('word'), word.get('start'), word.get('end'))
+                    index = by_value.get(key)
+                    if index is None:
+                        index = by_value[key] = len(words)
+                        words.append(word)
+                segment_words.append(index)
+
+        word_records = np.zeros(len(words), dtype=WORD_DTYPE)
+        for i, word in enumerate(words):
+            probability = word.get('probability')
+            word_records[i] = (
+                word.get('start') or 0,
+                word.get('end') or 0,
+                1.0 if probability is None else probability,
+                strings.intern(word.get('word') or '')
+            )
+
+        string_offsets, string_data = strings.arrays()
+        sections = {
+            'words': word_records,
+            'segments': segment_records,
+            'segment_words': np.asarray(segment_words, dtype='<u4'),
+            'string_offsets': string_offsets,
+            'string_data': string_data,
+        }
+        meta = {k: v for k, v in transcription.items() if k not in ('words', 'segments')}
+
+        path = self.path_for(name)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self._write(tmp_path, meta, word_count, sections)
+        os.replace(tmp_path, path)
+
+        logger.info(
+            "Transcript stored",
+            path=str(path),
+            words=len(words),
+            segments=len(segments),
+            strings=len(strings.values),
+            size_bytes=path.stat().st_size
+        )
+        return str(path)
+
+    @staticmethod
+    def _write(path: Path, meta: Dict[str, Any], word_count: int, sections: Dict[str, np.ndarray]):
+        # Offsets depend on the header length, which depends on the offsets:
+        # lay out with a reserved header size and grow it if needed
+        reserve = 512
+        while True:
+            offset = _PREFIX.size + reserve
+            table = {}
+            for name, array in sections.items():
+                offset += -offset % _ALIGN
+                table[name] = (offset, len(array))
+                offset += array.nbytes
+            header = json.dumps(
+                {'meta': meta, 'word_count': word_count, 'sections': table},
+                ensure_ascii=False
+            ).encode('utf-8')
+            if len(header) <= reserve:
+                break
+            reserve = len(header) + 256
+
+        with open(path, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name, array in sections.items():
+                f.write(b'\0' * (table[name][0] - f.tell()))
+                f.write(array.tobytes())
+
+    def open(self, path: str) -> StoredTranscript:
+        """Memory-map a sidecar without decoding it"""
+        return StoredTranscript(Path(path))
+
+    def load(self, path: str) -> Dict[str, Any]:
+        """Read a sidecar back into a transcription dict"""
+        with self.open(path) as stored:
+            return stored.to_dict()
+
+    def delete(self, path: str) -> None:
+        try:
+            Path(path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Shared instance
+transcript_store = TranscriptStore()
@@ -0,0 +1,282 @@
+"""
+ClipGenius - Transcription Cache
+Content-addressed, size-bounded disk cache of transcription results.
+
+Entries are keyed by (audio content hash, backend, model size, language,
+enhance flag), so reprocessing a project or submitting the same video again
+skips transcription entirely. Least recently used entries are evicted once the
+cache grows past TRANSCRIPTION_CACHE_MAX_MB.
+
+The index (LRU order, video -> audio hash, hit/miss counters) lives in a small
+SQLite database next to the entries, so it is shared by all worker processes.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from config import (
+    TRANSCRIPTION_CACHE_DIR,
+    TRANSCRIPTION_CACHE_MAX_MB
+)
+from logging_config import get_service_logger
+
+logger = get_service_logger("transcription_cache")
+
+# Read size when hashing audio files
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class TranscriptionCache:
+    """Persistent LRU cache of transcriptions (gzip JSON files + SQLite index)"""
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or TRANSCRIPTION_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.cache_dir / "index.db"
+        self._init_index()
+
+    # ========== Index ==========
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Index connection: committed (or rolled back) and closed at the end of the block"""
+        conn = sqlite3.connect(str(self._index_path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # The connection's own context manager only commits, it does not close
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_index(self):
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "fingerprint TEXT PRIMARY KEY, audio_hash TEXT NOT NULL, audio_path TEXT)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _incr(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    # ========== Keys ==========
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """SHA-256 of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_wav(path: str) -> str:
+        """
+        SHA-256 of a WAV file's samples (header excluded).
+
+        Same value as the PCM hash of the streaming path, so an extracted WAV
+        and a streamed transcription of the same audio share cache entries.
+        Falls back to the whole file for anything that is not a WAV.
+        """
+        digest = hashlib.sha256()
+        try:
+            with wave.open(str(path), 'rb') as f:
+                frames = max(1, _HASH_CHUNK_SIZE // (f.getsampwidth() * f.getnchannels()))
+                for chunk in iter(lambda: f.readframes(frames), b''):
+                    digest.update(chunk)
+        except (wave.Error, EOFError):
+            return TranscriptionCache.hash_file(path)
+        return digest.hexdigest()
+
+    @staticmethod
+    def video_fingerprint(video_path: str) -> str:
+        """Cheap identity of a video file (path, size, mtime) - avoids re-extracting audio"""
+        stat = os.stat(video_path)
+        return f"{Path(video_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def make_key(
+        audio_hash: str,
+        backend: str,
+        model_size: str,
+        language: Optional[str],
+        enhance_timestamps: bool,
+        compute_type: Optional[str] = None,
+        beam_size: Optional[int] = None,
+        best_of: Optional[int] = None,
+        batch_mode: Optional[str] = None
+    ) -> str:
+        """
+        Cache key of a transcription.
+
+        Local backends also pass their decoding settings (possibly from the
+        calibrated profile, and faster-whisper's batched or sequential
+        decoding): a recalibration must not reuse older transcripts.
+        """
+        raw = json.dumps([
+            audio_hash, backend, model_size, language or "auto", bool(enhance_timestamps),
+            compute_type, beam_size, best_of, batch_mode
+        ])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    # ========== Video -> audio hash ==========
+
+    def get_audio_hash(self, video_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Audio hash (and extracted audio path) remembered for an unchanged video file.
+
+        Returns:
+            Tuple of (audio_hash, audio_path), (None, None) if unknown
+        """
+        try:
+            fingerprint = self.video_fingerprint(video_path)
+        except OSError:
+            return None, None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT audio_hash, audio_path FROM videos WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def remember_audio_hash(self, video_path: str, audio_hash: str, audio_path: str = None):
+        """Remember the audio hash of a video file"""
+        fingerprint = self.video_fingerprint(video_path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO videos (fingerprint, audio_hash, audio_path) VALUES (?, ?, ?)",
+                (fingerprint, audio_hash, audio_path)
+            )
+
+    # ========== Entries ==========
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached transcription for `key` (None on miss) and update LRU order"""
+        path = self._entry_path(key)
+        result = None
+        if path.exists():
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    result = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Corrupted cache entry, discarding", key=key, error=str(e))
+                self._remove(key)
+
+        with self._connect() as conn:
+            if result is not None:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._incr(conn, "hits")
+            else:
+                self._incr(conn, "misses")
+
+        logger.info("Transcription cache " + ("hit" if result is not None else "miss"), key=key[:12])
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a transcription and evict least recently used entries over the size limit"""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file first so readers never see a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        size = path.stat().st_size
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, size, now, now)
+            )
+            self._incr(conn, "stores")
+
+        self.evict()
+
+    def _remove(self, key: str) -> None:
+        path = self._entry_path(key)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            Number of evicted entries
+        """
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+
+        evicted = 0
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            with self._connect() as conn:
+                self._incr(conn, "evictions", evicted)
+            logger.info("Transcription cache evicted entries", evicted=evicted, size_bytes=total)
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM entries").fetchall()]
+        for key in keys:
+            self._remove(key)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM videos")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics and disk usage (shared by all processes)"""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'stores': counters.get("stores", 0),
+            'evictions': counters.get("evictions", 0),
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,239 @@
+"""
+ClipGenius - Transcription Profile
+Calibrated local inference settings (backend, compute type, threads, beam size).
+
+On CPU-only nodes the choice between int8, int8_float32 and float32, the
+thread count and the beam size changes transcription throughput several
+times over, and the right one depends on the machine. The calibration command
+(calibrate.py) transcribes a reference clip with every combination, measures:
+
+- real-time factor: processing seconds per second of audio (lower is faster)
+- word match: share of the reference words found in the same order
+- word drift: mean absolute start-time difference of the matched words
+
+and saves the fastest combination within CALIBRATION_MIN_WORD_MATCH and
+CALIBRATION_MAX_WORD_DRIFT of the reference (the most precise combination, or
+a given transcription) to TRANSCRIPTION_PROFILE_PATH. TranscriberV2 reads the
+profile: backend="auto" prefers the profiled local backend and "auto" compute
+type, threads and beam size come from it.
+"""
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    TRANSCRIPTION_PROFILE_PATH,
+    CALIBRATION_MIN_WORD_MATCH,
+    CALIBRATION_MAX_WORD_DRIFT
+)
+from logging_config import get_service_logger
+
+logger = get_service_logger("transcription_profile")
+
+# Compute types tried per backend and device (stable-ts runs PyTorch: float32 on CPU)
+CALIBRATION_COMPUTE_TYPES = {
+    ("faster-whisper", "cpu"): ("int8", "int8_float32", "float32"),
+    ("whisperx", "cpu"): ("int8", "int8_float32", "float32"),
+    ("stable-ts", "cpu"): ("float32",),
+    ("faster-whisper", "cuda"): ("float16", "int8_float16", "float32"),
+    ("whisperx", "cuda"): ("float16", "int8_float16", "float32"),
+    ("stable-ts", "cuda"): ("float16", "float32"),
+}
+
+# Most precise first: the default reference of the calibration
+_PRECISION_ORDER = ("float32", "int8_float32", "float16", "int8_float16", "int8")
+
+_WORD_RE = re.compile(r"[^\w']+")
+
+# Untimed warm-up run of each candidate (model load, first-call allocations)
+_WARMUP_SECONDS = 5
+
+
+@dataclass
+class TranscriptionProfile:
+    """Inference settings of one local backend, with the measurements behind them"""
+    backend: str
+    model_size: str
+    device: str
+    compute_type: str
+    cpu_threads: int
+    beam_size: int
+    best_of: int
+    real_time_factor: float = 0.0
+    word_match: float = 1.0
+    word_drift: float = 0.0
+    calibrated_at: float = field(default_factory=time.time)
+    reference: str = ""
+    results: List[Dict[str, Any]] = field(default_factory=list)
+
+    def save(self, path: Path = None) -> Path:
+        """Write the profile atomically"""
+        path = Path(path or TRANSCRIPTION_PROFILE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(self), indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        _loaded.clear()
+        return path
+
+
+# path -> (mtime, profile): re-read only when the file changes
+_loaded: Dict[str, Tuple[float, Optional[TranscriptionProfile]]] = {}
+
+
+def load_transcription_profile(path: Path = None) -> Optional[TranscriptionProfile]:
+    """Saved profile, or None if there is none (or it is unreadable)"""
+    path = Path(path or TRANSCRIPTION_PROFILE_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+
+    cached = _loaded.get(str(path))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        fields = TranscriptionProfile.__dataclass_fields__
+        profile = TranscriptionProfile(**{key: value for key, value in data.items() if key in fields})
+    except (ValueError, TypeError) as e:
+        logger.warning("Unreadable transcription profile, ignoring it", path=str(path), error=str(e))
+        profile = None
+    _loaded[str(path)] = (mtime, profile)
+    return profile
+
+
+def _normalize(word: str) -> str:
+    return _WORD_RE.sub("", word.lower())
+
+
+def compare_words(reference: List[Dict[str, Any]], words: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """
+    Accuracy of a transcription's words against the reference.
+
+    Returns:
+        Tuple of (word match: matched / reference words, word drift: mean
+        absolute start difference of the matched words in seconds)
+    """
+    reference = [w for w in reference if _normalize(w["word"])]
+    words = [w for w in words if _normalize(w["word"])]
+    if not reference:
+        return (1.0 if not words else 0.0), 0.0
+
+    matcher = SequenceMatcher(
+        a=[_normalize(w["word"]) for w in reference],
+        b=[_normalize(w["word"]) for w in words],
+        autojunk=False
+    )
+    drifts = []
+    for block in matcher.get_matching_blocks():
+        for i in range(block.size):
+            drifts.append(abs(reference[block.a + i]["start"] - words[block.b + i]["start"]))
+
+    if not drifts:
+        return 0.0, float("inf")
+    return len(drifts) / len(reference), sum(drifts) / len(drifts)
+
+
+def calibration_candidates(
+    backends: List[str],
+    device: str,
+    threads: List[int],
+    beam_sizes: List[int],
+    best_of: int,
+    compute_types: List[str] = None
+) -> List[Tuple[str, str, int, int, int]]:
+    """(backend, compute_type, cpu_threads, beam_size, best_of), most precise first"""
+    candidates = []
+    for backend in backends:
+        types = compute_types or CALIBRATION_COMPUTE_TYPES.get((backend, device), ("float32",))
+        for compute_type in types:
+            for cpu_threads in threads:
+                for beam_size in beam_sizes:
+                    candidates.append((backend, compute_type, cpu_threads, beam_size, best_of))
+
+    def precision(candidate):
+        compute_type = candidate[1]
+        rank = _PRECISION_ORDER.index(compute_type) if compute_type in _PRECISION_ORDER else len(_PRECISION_ORDER)
+        return (rank, -candidate[3], backends.index(candidate[0]))
+
+    return sorted(candidates, key=precision)
+
+
+def choose_profile(
+    results: List[Dict[str, Any]],
+    min_word_match: float = None,
+    max_word_drift: float = None
+) -> Optional[Dict[str, Any]]:
+    """Fastest result within the accuracy thresholds (None if none passes)"""
+    min_word_match = CALIBRATION_MIN_WORD_MATCH if min_word_match is None else min_word_match
+    max_word_drift = CALIBRATION_MAX_WORD_DRIFT if max_word_drift is None else max_word_drift
+    accepted = [
+        result for result in results
+        if result.get("error") is None
+        and result["word_match"] >= min_word_match
+        and result["word_drift"] <= max_word_drift
+    ]
+    if not accepted:
+        return None
+    return min(accepted, key=lambda result: result["real_time_factor"])
+
+
+def run_calibration(
+    samples,
+    candidates: List[Tuple[str, str, int, int, int]],
+    transcribe: Callable[[Tuple[str, str, int, int, int], Any], Dict[str, Any]],
+    reference_words: List[Dict[str, Any]] = None,
+    on_result: Callable[[Dict[str, Any]], None] = None
+) -> List[Dict[str, Any]]:
+    """
+    Time every candidate on the reference samples (16 kHz float32).
+
+    Args:
+        transcribe: transcribe(candidate, samples) -> transcription dict with
+                    "words"; first called untimed on a few seconds (model load, warm-up)
+        reference_words: Words to compare with (default: the first candidate's)
+    """
+    audio_seconds = len(samples) / 16000
+    results = []
+    for candidate in candidates:
+        backend, compute_type, cpu_threads, beam_size, best_of = candidate
+        result = {
+            "backend": backend,
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads,
+            "beam_size": beam_size,
+            "best_of": best_of,
+            "error": None
+        }
+        try:
+            transcribe(candidate, samples[:_WARMUP_SECONDS * 16000])
+            started = time.perf_counter()
+            transcription = transcribe(candidate, samples)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            logger.warning("Calibration candidate failed", candidate=repr(candidate), error=str(e))
+            result.update(error=str(e), real_time_factor=float("inf"), word_match=0.0, word_drift=float("inf"))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+            continue
+
+        if reference_words is None:
+            reference_words = transcription.get("words", [])
+        word_match, word_drift = compare_words(reference_words, transcription.get("words", []))
+        result.update(
+            real_time_factor=round(elapsed / audio_seconds, 4) if audio_seconds else 0.0,
+            word_match=round(word_match, 4),
+            word_drift=round(word_drift, 4)
+        )
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return results
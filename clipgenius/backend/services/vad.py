@@ -0,0 +1,272 @@
+"""
+ClipGenius - Detecção de Voz (VAD)
+VAD por energia em NumPy, usado para montar chunks de transcrição só com fala.
+
+- Energia por frame (dBFS) em janelas de VAD_FRAME_MS
+- Limiar automático (Otsu) entre "silêncio" e "fala"; sem separação clara,
+  o áudio inteiro é tratado como fala
+- Pausas curtas são preenchidas, trechos curtos descartados, fala com padding
+- Chunks juntam regiões de fala até o tamanho máximo, sempre cortando em
+  silêncios; o áudio do chunk é a concatenação das regiões (silêncios longos
+  não são enviados ao modelo) e SpeechChunk.to_source_time converte os
+  timestamps de volta para o tempo original
+"""
+import wave
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    VAD_FRAME_MS,
+    VAD_THRESHOLD_DB,
+    VAD_MIN_SILENCE_SECONDS,
+    VAD_MIN_SPEECH_SECONDS,
+    VAD_SPEECH_PAD_SECONDS
+)
+from .audio_stream import SAMPLE_RATE
+
+# Abaixo disso é sempre silêncio (dBFS)
+_ABSOLUTE_SILENCE_DB = -60.0
+
+# Regiões de fala maiores que o chunk são divididas no frame mais silencioso
+# desta janela final
+_SPLIT_SEARCH_SECONDS = 5.0
+
+Region = Tuple[float, float]
+
+
+@dataclass
+class SpeechChunk:
+    """Chunk de transcrição formado por regiões de fala (tempo original, em segundos)"""
+    regions: List[Region]
+    _offsets: List[float] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        # Início de cada região no áudio concatenado do chunk
+        self._offsets = []
+        position = 0.0
+        for start, end in self.regions:
+            self._offsets.append(position)
+            position += end - start
+
+    @property
+    def start(self) -> float:
+        return self.regions[0][0]
+
+    @property
+    def end(self) -> float:
+        return self.regions[-1][1]
+
+    @property
+    def speech_duration(self) -> float:
+        """Duração do áudio do chunk (só fala)"""
+        return sum(end - start for start, end in self.regions)
+
+    def to_source_time(self, t: float) -> float:
+        """Converte um tempo do áudio concatenado para o tempo original"""
+        index = max(0, bisect_right(self._offsets, t) - 1)
+        start, end = self.regions[index]
+        return min(end, start + (t - self._offsets[index]))
+
+    def splice(self, samples: np.ndarray, offset: float = 0.0) -> np.ndarray:
+        """Áudio do chunk a partir de `samples` (que começa em `offset` segundos)"""
+        pieces = [
+            samples[max(0, int((start - offset) * SAMPLE_RATE)):int((end - offset) * SAMPLE_RATE)]
+            for start, end in self.regions
+        ]
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+
+def frame_energies(samples: np.ndarray, frame_ms: int = None) -> np.ndarray:
+    """Energia RMS (dBFS) por frame de um áudio float32 em [-1, 1]"""
+    frame = int(SAMPLE_RATE * (frame_ms or VAD_FRAME_MS) / 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return (20 * np.log10(rms + 1e-10)).astype(np.float32)
+
+
+def wav_frame_energies(wav_path: str, frame_ms: int = None) -> Tuple[np.ndarray, float]:
+    """
+    Energia por frame de um WAV PCM 16-bit mono, lido em blocos (memória constante).
+
+    Returns:
+        Tuple de (energias em dBFS, duração em segundos)
+    """
+    frame = int(SAMPLE_RATE * (frame_ms or VAD_FRAME_MS) / 1000)
+    block_frames = 1000  # ~30 s por leitura com frames de 30 ms
+    energies = []
+
+    with wave.open(str(wav_path), 'rb') as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError("VAD espera WAV PCM 16-bit mono 16 kHz")
+        total = wav.getnframes()
+        while True:
+            data = wav.readframes(frame * block_frames)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+            energies.append(frame_energies(samples, frame_ms))
+
+    result = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return result, total / SAMPLE_RATE
+
+
+def _speech_threshold(energies: np.ndarray, margin_db: float) -> Optional[float]:
+    """
+    Limiar de Otsu entre as energias de silêncio e de fala.
+
+    Returns:
+        Limiar em dBFS, ou None quando não há separação clara (tudo é fala)
+    """
+    audible = energies[energies > _ABSOLUTE_SILENCE_DB]
+    fully_audible = len(audible) == len(energies)
+    if len(audible) < 2 or np.ptp(audible) < margin_db:
+        return None if fully_audible else _ABSOLUTE_SILENCE_DB
+
+    # Silêncio digital fica fora do histograma (já é silêncio pelo limite absoluto)
+    hist, edges = np.histogram(audible, bins=64)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight_low = np.cumsum(hist)
+    weight_high = weight_low[-1] - weight_low
+    mean_low = np.cumsum(hist * centers) / np.maximum(weight_low, 1)
+    mean_high = (np.sum(hist * centers) - np.cumsum(hist * centers)) / np.maximum(weight_high, 1)
+    between = weight_low * weight_high * (mean_low - mean_high) ** 2
+    best = int(np.argmax(between))
+
+    if mean_high[best] - mean_low[best] < margin_db:
+        return None if fully_audible else _ABSOLUTE_SILENCE_DB
+    return max(float(edges[best + 1]), _ABSOLUTE_SILENCE_DB)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Intervalos [início, fim) de valores True consecutivos"""
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return list(zip(changes[0::2], changes[1::2]))
+
+
+def detect_speech_regions(
+    energies: np.ndarray,
+    duration: float,
+    frame_ms: int = None,
+    margin_db: float = None,
+    min_silence: float = None,
+    min_speech: float = None,
+    pad: float = None
+) -> List[Region]:
+    """
+    Regiões de fala (segundos) a partir das energias por frame.
+
+    Args:
+        energies: Energia por frame em dBFS (frame_energies / wav_frame_energies)
+        duration: Duração total do áudio
+        frame_ms: Duração do frame usado nas energias
+        margin_db: Separação mínima entre silêncio e fala (VAD_THRESHOLD_DB)
+        min_silence: Pausas menores que isso continuam na mesma região
+        min_speech: Regiões menores que isso são descartadas (ruído)
+        pad: Margem adicionada antes/depois de cada região
+    """
+    frame_seconds = (frame_ms or VAD_FRAME_MS) / 1000
+    margin_db = VAD_THRESHOLD_DB if margin_db is None else margin_db
+    min_silence = VAD_MIN_SILENCE_SECONDS if min_silence is None else min_silence
+    min_speech = VAD_MIN_SPEECH_SECONDS if min_speech is None else min_speech
+    pad = VAD_SPEECH_PAD_SECONDS if pad is None else pad
+
+    if len(energies) == 0 or duration <= 0:
+        return []
+
+    threshold = _speech_threshold(energies, margin_db)
+    if threshold is None:
+        return [(0.0, duration)]
+
+    mask = energies > threshold
+
+    # Preencher pausas curtas dentro da fala
+    min_silence_frames = int(round(min_silence / frame_seconds))
+    for start, end in _runs(~mask):
+        if start > 0 and end < len(mask) and end - start < min_silence_frames:
+            mask[start:end] = True
+
+    regions: List[Region] = []
+    for start, end in _runs(mask):
+        if (end - start) * frame_seconds < min_speech:
+            continue
+        region_start = max(0.0, start * frame_seconds - pad)
+        region_end = min(duration, end * frame_seconds + pad)
+        if regions and region_start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], region_end)  # Padding encostou na anterior
+        else:
+            regions.append((region_start, region_end))
+    return regions
+
+
+def _split_long_region(
+    region: Region,
+    max_seconds: float,
+    energies: Optional[np.ndarray],
+    frame_seconds: float
+) -> List[Region]:
+    """Divide uma região maior que max_seconds no frame mais silencioso perto do limite"""
+    pieces = []
+    start, end = region
+    while end - start > max_seconds:
+        cut = start + max_seconds
+        if energies is not None and len(energies):
+            first = int(max(start, cut - _SPLIT_SEARCH_SECONDS) / frame_seconds)
+            last = min(int(cut / frame_seconds), len(energies))
+            if last > first:
+                cut = (first + int(np.argmin(energies[first:last]))) * frame_seconds + frame_seconds / 2
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def plan_speech_chunks(
+    regions: List[Region],
+    max_chunk_seconds: float,
+    energies: np.ndarray = None,
+    frame_ms: int = None
+) -> List[SpeechChunk]:
+    """
+    Agrupa regiões de fala em chunks de até `max_chunk_seconds` de fala.
+
+    Cortes só acontecem entre regiões (em silêncios); uma região maior que o
+    limite é dividida no ponto mais silencioso perto do limite.
+    """
+    frame_seconds = (frame_ms or VAD_FRAME_MS) / 1000
+    chunks: List[SpeechChunk] = []
+    current: List[Region] = []
+    current_seconds = 0.0
+
+    for region in regions:
+        for piece in _split_long_region(region, max_chunk_seconds, energies, frame_seconds):
+            length = piece[1] - piece[0]
+            if current and current_seconds + length > max_chunk_seconds:
+                chunks.append(SpeechChunk(current))
+                current, current_seconds = [], 0.0
+            current.append(piece)
+            current_seconds += length
+
+    if current:
+        chunks.append(SpeechChunk(current))
+    return chunks
+
+
+def speech_chunk_from_samples(samples: np.ndarray, offset: float = 0.0) -> Optional[SpeechChunk]:
+    """
+    Regiões de fala de um buffer (streaming local) como um único chunk.
+
+    Returns:
+        SpeechChunk em tempo absoluto (buffer começa em `offset`), ou None sem fala
+    """
+    duration = len(samples) / SAMPLE_RATE
+    regions = detect_speech_regions(frame_energies(samples), duration)
+    if not regions:
+        return None
+    return SpeechChunk([(start + offset, end + offset) for start, end in regions])
@@ -0,0 +1,151 @@
+"""
+ClipGenius - Word Timeline
+Índice das palavras de uma transcrição para consultas por intervalo de tempo.
+
+Os inícios/fins das palavras ficam em arrays NumPy ordenados, e as consultas
+usam busca binária (searchsorted) em vez de percorrer a lista inteira a cada
+clip. Numa transcrição de 3h (~30k palavras) cada consulta custa O(log n + k).
+
+Uso:
+    timeline = WordTimeline.from_segments(transcription['segments'])
+    timeline.words_overlapping(30.0, 75.0)
+    timeline.assign_to_segments(segments)   # segment['words'] por intervalo
+"""
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+Word = Dict[str, Any]
+
+
+class WordTimeline:
+    """
+    Palavras indexadas por tempo.
+
+    Os índices devolvidos pelas consultas são posições na lista original
+    (`words`), em ordem crescente, então a ordem da transcrição é preservada.
+    """
+
+    def __init__(self, words: Sequence[Word], segment_ids: Sequence[int] = None, segments: List[Dict] = None):
+        self.words = list(words)
+        self.segments = segments or []
+
+        starts = np.fromiter((w.get('start') or 0 for w in self.words), dtype=np.float64, count=len(self.words))
+        ends = np.fromiter((w.get('end') or 0 for w in self.words), dtype=np.float64, count=len(self.words))
+
+        # Ordenar por início (estável); transcrições normalmente já vêm ordenadas
+        if len(starts) and np.any(np.diff(starts) < 0):
+            self._order = np.argsort(starts, kind='stable')
+        else:
+            self._order = np.arange(len(starts))
+        self.starts = starts[self._order]
+        self.ends = ends[self._order]
+        # Maior fim até cada posição: permite achar por busca binária a primeira
+        # palavra que ainda não terminou num instante
+        self._max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+        self.segment_ids = np.asarray(segment_ids, dtype=np.int64) if segment_ids is not None else None
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict]) -> "WordTimeline":
+        """Timeline das palavras dos segmentos (com o segmento de cada palavra)"""
+        words, segment_ids = [], []
+        for index, segment in enumerate(segments):
+            for word in segment.get('words', []):
+                words.append(word)
+                segment_ids.append(index)
+        return cls(words, segment_ids, segments)
+
+    @classmethod
+    def ensure(cls, words: Union[Sequence[Word], "WordTimeline"]) -> "WordTimeline":
+        """Aceita uma lista de palavras ou uma timeline já construída"""
+        return words if isinstance(words, cls) else cls(words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # ========== Consultas ==========
+
+    def _positions(self, lo: int, hi: int, mask: np.ndarray) -> np.ndarray:
+        return np.sort(self._order[lo:hi][mask])
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """Índices das palavras que tocam [start, end] (fim >= start e início <= end)"""
+        lo = int(np.searchsorted(self._max_end, start, side='left'))
+        hi = int(np.searchsorted(self.starts, end, side='right'))
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        return self._positions(lo, hi, self.ends[lo:hi] >= start)
+
+    def within(self, start: float, end: float) -> np.ndarray:
+        """Índices das palavras inteiramente dentro de [start, end]"""
+        lo = int(np.searchsorted(self.starts, start, side='left'))
+        hi = int(np.searchsorted(self.starts, end, side='right'))
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        return self._positions(lo, hi, self.ends[lo:hi] <= end)
+
+    def words_overlapping(self, start: float, end: float) -> List[Word]:
+        return [self.words[i] for i in self.overlapping(start, end)]
+
+    def words_within(self, start: float, end: float) -> List[Word]:
+        return [self.words[i] for i in self.within(start, end)]
+
+    def next_word_after(self, time: float) -> Optional[Word]:
+        """Primeira palavra que começa depois de `time`"""
+        index = int(np.searchsorted(self.starts, time, side='right'))
+        return self.words[self._order[index]] if index < len(self.starts) else None
+
+    # ========== Segmentos ==========
+
+    def assign_to_segments(self, segments: List[Dict], tolerance: float = 0.1) -> List[Dict]:
+        """
+        Associa a cada segmento as palavras dentro de [start - tol, end + tol].
+
+        Substitui o filtro da lista inteira por segmento (O(segmentos × palavras)).
+        """
+        for segment in segments:
+            segment['words'] = self.words_within(segment['start'] - tolerance, segment['end'] + tolerance)
+        return segments
+
+    def text_for_timerange(self, start_time: float, end_time: float) -> Dict[str, Any]:
+        """
+        Texto, segmentos e palavras que tocam [start_time, end_time].
+
+        Requer timeline criada com from_segments (mesmo formato de
+        TranscriberV2.get_text_for_timerange).
+        """
+        segments = []
+        words = []
+        text_parts = []
+
+        if self.segment_ids is not None:
+            indices = self.overlapping(start_time, end_time)
+            # Índices crescentes = ordem dos segmentos; agrupar por segmento
+            for segment_index in np.unique(self.segment_ids[indices]):
+                segment = self.segments[segment_index]
+                seg_start = segment.get('start', 0)
+                seg_end = segment.get('end', 0)
+                if seg_end < start_time or seg_start > end_time:
+                    continue
+
+                segment_words = [
+                    self.words[i] for i in indices[self.segment_ids[indices] == segment_index]
+                ]
+                words.extend(segment_words)
+                text = ' '.join(w['word'] for w in segment_words)
+                text_parts.append(text)
+                segments.append({
+                    'start': max(seg_start, start_time),
+                    'end': min(seg_end, end_time),
+                    'text': text,
+                    'words': segment_words
+                })
+
+        return {
+            'text': ' '.join(text_parts),
+            'segments': segments,
+            'words': words,
+            'start_time': start_time,
+            'end_time': end_time
+        }
@@ -0,0 +1,214 @@
+"""
+Teste da análise em streaming (services/llm_stream.py, ClipAnalyzer.analyze_stream
+e ClipRenderPool.render_stream)
+
+Um servidor Ollama falso envia a resposta em NDJSON, alguns caracteres por
+linha e com pausas: cada clip deve ser entregue assim que o seu objeto JSON
+fecha, antes do fim do stream.
+"""
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from services import clip_renderer
+from services.analyzer import ClipAnalyzer
+from services.clip_renderer import ClipRenderPool
+from services.llm_stream import ClipStreamParser, iter_ndjson, iter_sse_json
+from test_analyzer_map_reduce import make_transcription, with_settings
+
+
+def clip_json(start: int, end: int, score: int = 8) -> dict:
+    return {
+        'timestamp_inicio': f"{start // 60:02d}:{start % 60:02d}",
+        'timestamp_fim': f"{end // 60:02d}:{end % 60:02d}",
+        'titulo': f"Clip {{{start}}}",
+        'nota_viral': score,
+        'conteudo_completo': True
+    }
+
+
+class StreamingOllama:
+    """Servidor Ollama falso que responde /api/generate em NDJSON"""
+
+    def __init__(self, response_text: str, chunk_size: int = 12, delay: float = 0.01):
+        self.response_text = response_text
+        self.finished_at = None
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = json.dumps({'models': [{'name': f"{config.OLLAMA_MODEL}:latest"}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                assert json.loads(self.rfile.read(length))['stream'] is True
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.end_headers()
+                text = stub.response_text
+                for i in range(0, len(text), chunk_size):
+                    line = {'response': text[i:i + chunk_size], 'done': False}
+                    self.wfile.write((json.dumps(line) + "\n").encode())
+                    self.wfile.flush()
+                    time.sleep(delay)
+                stub.finished_at = time.time()
+                self.wfile.write((json.dumps({'response': '', 'done': True}) + "\n").encode())
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_parser_incremental_objects():
+    text = 'Aqui estão os clips: {"clips": [' + json.dumps(clip_json(10, 50)) + ', ' + json.dumps(clip_json(100, 140)) + ']}'
+    parser = ClipStreamParser()
+    found = []
+    for i in range(0, len(text), 5):
+        found.extend(parser.feed(text[i:i + 5]))
+
+    # Chaves dentro de strings ("Clip {10}") não confundem o parser
+    assert [clip['titulo'] for clip in found] == ["Clip {10}", "Clip {100}"]
+    assert parser.clips == found
+    assert parser.text == text
+
+    # Array sem o objeto "clips" em volta, com objeto inválido no meio
+    parser = ClipStreamParser()
+    bare = '[' + json.dumps(clip_json(5, 40)) + ', {quebrado}, ' + json.dumps(clip_json(60, 95)) + ']'
+    assert len(parser.feed(bare)) == 2
+
+
+def test_sse_and_ndjson_decoders():
+    sse = [
+        'data: {"choices": [{"delta": {"content": "ab"}}]}',
+        '',
+        ': keep-alive',
+        'data: {"choices": [{"delta": {"content": "c"}}]}',
+        'data: [DONE]',
+        'data: {"ignorado": true}'
+    ]
+    events = list(iter_sse_json(sse))
+    assert [e['choices'][0]['delta']['content'] for e in events] == ["ab", "c"]
+
+    ndjson = ['{"response": "a"}', '', '{"response": "b", "done": true}']
+    assert [e['response'] for e in iter_ndjson(ndjson)] == ["a", "b"]
+
+
+def test_analyze_stream_yields_before_stream_ends():
+    clips = [clip_json(10, 50, 9), clip_json(30, 70, 7), clip_json(200, 240, 6), clip_json(400, 440, 5)]
+    response_text = json.dumps({'clips': clips})
+    previous = with_settings(ANALYSIS_STREAMING_ENABLED=True, ANALYSIS_MAP_REDUCE_ENABLED=True)
+    try:
+        with StreamingOllama(response_text) as stub:
+            analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+            received = []
+            for clip in analyzer.analyze_stream(make_transcription(600), num_clips=2, min_duration=15, max_duration=60):
+                received.append((clip, time.time(), stub.finished_at))
+    finally:
+        with_settings(**previous)
+
+    # 30-70s sobrepõe o primeiro clip e é descartado; no máximo num_clips
+    assert [clip['start_time'] for clip, _, _ in received] == [10, 200]
+    # O primeiro clip chegou antes de o servidor terminar de enviar a resposta
+    assert received[0][2] is None
+
+
+def test_render_stream_overlaps_production():
+    pool = ClipRenderPool()
+    executor = ThreadPoolExecutor(max_workers=2)
+    pool._get_executor = lambda: executor
+
+    def fake_render(tasks):
+        return [{'index': task['index'], 'clip_result': {}, 'subtitle_result': {}} for task in tasks]
+
+    def produce():
+        for i in range(3):
+            yield {'index': i}
+            time.sleep(0.1)
+
+    original = clip_renderer.render_clip_group
+    clip_renderer.render_clip_group = fake_render
+    try:
+        started = time.time()
+        results = []
+        for result in pool.render_stream(produce()):
+            results.append((result['index'], time.time() - started))
+    finally:
+        clip_renderer.render_clip_group = original
+        executor.shutdown()
+
+    assert sorted(index for index, _ in results) == [0, 1, 2]
+    # O clip 0 fica pronto enquanto os seguintes ainda estão sendo produzidos
+    assert results[0][0] == 0 and results[0][1] < 0.1
+
+
+def test_render_stream_reraises_producer_error():
+    pool = ClipRenderPool()
+    executor = ThreadPoolExecutor(max_workers=1)
+    pool._get_executor = lambda: executor
+
+    def produce():
+        yield {'index': 0}
+        raise ConnectionError("stream interrompido")
+
+    original = clip_renderer.render_clip_group
+    clip_renderer.render_clip_group = lambda tasks: [{'index': t['index']} for t in tasks]
+    results = []
+    try:
+        for result in pool.render_stream(produce()):
+            results.append(result)
+        assert False, "deveria ter lançado ConnectionError"
+    except ConnectionError:
+        # Clips já enviados são entregues antes do erro
+        assert [r['index'] for r in results] == [0]
+    finally:
+        clip_renderer.render_clip_group = original
+        executor.shutdown()
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Análise em Streaming")
+    print("=" * 60)
+
+    try:
+        test_parser_incremental_objects()
+        print("✅ parser incremental de clips")
+        test_sse_and_ndjson_decoders()
+        print("✅ decodificadores SSE e NDJSON")
+        test_analyze_stream_yields_before_stream_ends()
+        print("✅ clips entregues antes do fim do stream")
+        test_render_stream_overlaps_production()
+        print("✅ renderização sobreposta à geração")
+        test_render_stream_reraises_producer_error()
+        print("✅ erro do stream propagado após os clips enviados")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Teste da análise map-reduce do ClipAnalyzer contra um servidor Ollama falso
+
+O servidor responde /api/tags e /api/generate; para cada janela da transcrição
+ele devolve como clips os segmentos marcados com "VIRAL<nota>" presentes no
+prompt, e registra quantas requisições estiveram em paralelo.
+"""
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from services import analyzer as analyzer_module
+from services.analyzer import ClipAnalyzer
+
+
+class StubOllama:
+    """Servidor Ollama falso em uma porta livre"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send({'models': [{'name': f"{config.OLLAMA_MODEL}:latest"}]})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                prompt = json.loads(self.rfile.read(length))['prompt']
+                self._send({'response': stub.generate(prompt)})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            clips = []
+            for minutes, seconds, score in re.findall(r'\[(\d+):(\d+)\] VIRAL(\d+)', prompt):
+                start = int(minutes) * 60 + int(seconds)
+                end = start + 30
+                clips.append({
+                    'timestamp_inicio': f"{start // 60:02d}:{start % 60:02d}",
+                    'timestamp_fim': f"{end // 60:02d}:{end % 60:02d}",
+                    'titulo': f"Clip {start}",
+                    'nota_viral': int(score),
+                    'conteudo_completo': True
+                })
+            return json.dumps({'clips': clips})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_transcription(duration: int = 3600, viral=None):
+    """Segmentos de 10s; `viral` = {início em segundos: nota}"""
+    viral = viral or {}
+    segments = []
+    for start in range(0, duration, 10):
+        text = f"VIRAL{viral[start]} momento" if start in viral else f"fala comum {start}"
+        segments.append({'start': float(start), 'end': float(start + 10), 'text': text})
+    return {'segments': segments}
+
+
+def with_settings(**settings):
+    """Sobrescreve as configurações importadas pelo analyzer durante o teste"""
+    previous = {name: getattr(analyzer_module, name) for name in settings}
+    for name, value in settings.items():
+        setattr(analyzer_module, name, value)
+    return previous
+
+
+def test_plan_windows_overlap():
+    with StubOllama() as stub:
+        analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+    segments = make_transcription(3600)['segments']
+    windows = analyzer._plan_windows(segments, window_seconds=900, overlap_seconds=90)
+
+    assert windows[0][0]['start'] == 0
+    assert windows[-1][-1]['end'] == 3600
+    for previous, current in zip(windows, windows[1:]):
+        # Janelas consecutivas compartilham ~90s de segmentos
+        assert current[0]['start'] == previous[0]['start'] + 810
+        assert previous[-1]['start'] - current[0]['start'] >= 80
+
+    # Transcrição curta: uma janela só (análise em uma única passada)
+    short = make_transcription(600)['segments']
+    assert analyzer._plan_windows(short, window_seconds=900, overlap_seconds=90) == [short]
+
+
+def test_map_reduce_concurrency_dedupe_and_rerank():
+    # 850s cai na sobreposição das duas primeiras janelas (810-900s)
+    viral = {100: 6, 850: 9, 1500: 4, 2000: 8, 2600: 7, 3300: 5}
+    previous = with_settings(
+        ANALYSIS_MAP_REDUCE_ENABLED=True,
+        ANALYSIS_WINDOW_SECONDS=900,
+        ANALYSIS_WINDOW_OVERLAP_SECONDS=90,
+        ANALYSIS_CONCURRENCY=2
+    )
+    try:
+        with StubOllama() as stub:
+            analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+            clips = analyzer.analyze(make_transcription(3600, viral), num_clips=4, min_duration=15, max_duration=60)
+    finally:
+        with_settings(**previous)
+
+    # Uma requisição por janela, no máximo 2 em paralelo
+    assert len(stub.prompts) == 5
+    assert stub.max_in_flight == 2
+    # Cada prompt contém só a sua janela
+    assert all('[59:50]' not in prompt for prompt in stub.prompts[:-1])
+
+    # O momento em 850s aparece em duas janelas mas vira um clip só
+    starts = [clip['start_time'] for clip in clips]
+    assert starts.count(850) == 1
+    # Top-4 global por nota
+    assert [clip['viral_score'] for clip in clips] == [9, 8, 7, 6]
+    assert starts == [850, 2000, 2600, 100]
+
+
+def test_failed_window_is_skipped():
+    viral = {100: 6, 2000: 8}
+    previous = with_settings(
+        ANALYSIS_MAP_REDUCE_ENABLED=True,
+        ANALYSIS_WINDOW_SECONDS=900,
+        ANALYSIS_WINDOW_OVERLAP_SECONDS=90,
+        ANALYSIS_CONCURRENCY=3
+    )
+    try:
+        with StubOllama() as stub:
+            analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+            call_ai = analyzer._call_ai
+
+            def flaky(prompt):
+                if '[00:00]' in prompt:
+                    raise ConnectionError("janela 1 falhou")
+                return call_ai(prompt)
+
+            analyzer._call_ai = flaky
+            clips = analyzer.analyze(make_transcription(3600, viral), num_clips=3, min_duration=15, max_duration=60)
+    finally:
+        with_settings(**previous)
+
+    assert [clip['start_time'] for clip in clips] == [2000]
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Análise Map-Reduce")
+    print("=" * 60)
+
+    try:
+        test_plan_windows_overlap()
+        print("✅ janelas sobrepostas")
+        test_map_reduce_concurrency_dedupe_and_rerank()
+        print("✅ concorrência limitada, deduplicação e rerank global")
+        test_failed_window_is_skipped()
+        print("✅ janela com erro é ignorada")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Teste do corte em lote (services/cutter.py)
+
+Verifica o agrupamento dos clips e o comando FFmpeg de um grupo (um decode,
+um ramo split/trim por clip), sem executar o FFmpeg.
+"""
+import sys
+
+from services.cutter import VideoCutter
+
+
+def clip(start, end, name):
+    return {'start_time': start, 'end_time': end, 'output_name': name, 'crop': (608, 1080, 656, 0)}
+
+
+def output_blocks(cmd):
+    """Opções de cada saída: do primeiro -map até o arquivo (após -y)"""
+    blocks, current = [], None
+    for arg in cmd:
+        if arg == '-map' and (current is None or current[-1].endswith('.mp4')):
+            current = []
+            blocks.append(current)
+        if current is not None:
+            current.append(arg)
+    return blocks
+
+
+def test_plan_batch_groups():
+    cutter = VideoCutter()
+    clips = [clip(300, 330, "c"), clip(0, 30, "a"), clip(40, 70, "b"), clip(75, 100, "d"), clip(1000, 1030, "e")]
+
+    # Ordenados pelo início; gap > 30s abre um novo grupo
+    assert cutter.plan_batch_groups(clips, max_outputs=6, max_gap=30) == [[1, 2, 3], [0], [4]]
+    # Grupo cheio também abre outro
+    assert cutter.plan_batch_groups(clips, max_outputs=2, max_gap=30) == [[1, 2], [3], [0], [4]]
+    # Clips sobrepostos ficam juntos mesmo sem gap permitido
+    overlapping = [clip(0, 30, "a"), clip(20, 50, "b"), clip(51, 60, "c")]
+    assert cutter.plan_batch_groups(overlapping, max_outputs=6, max_gap=0) == [[0, 1], [2]]
+
+
+def test_build_batch_command_threads_per_output():
+    cutter = VideoCutter()
+    clips = [clip(100, 130, "a"), clip(140, 175.5, "b"), clip(120, 150, "c")]
+    cmd, paths = cutter.build_batch_command("video.mp4", clips, (1080, 1920), threads=3)
+
+    # Um único seek e decode, do início do primeiro ao fim do último clip
+    input_index = cmd.index('-i')
+    assert cmd[cmd.index('-ss') + 1] == "100" and cmd[cmd.index('-t') + 1] == "75.5"
+    assert cmd[input_index + 1] == "video.mp4"
+    # Threads do grafo: opção global, antes da entrada
+    assert cmd.index('-filter_complex_threads') < input_index
+    assert cmd[cmd.index('-filter_complex_threads') + 1] == "3"
+
+    graph = cmd[cmd.index('-filter_complex') + 1]
+    assert graph.startswith("[0:v]split=3[v0][v1][v2];[0:a]asplit=3[a0][a1][a2]")
+    assert "[v1]trim=start=40.000:end=75.500,setpts=PTS-STARTPTS,crop=608:1080:656:0,scale=1080:1920[vo1]" in graph
+
+    # Cada saída com o próprio -threads (opção do encoder daquela saída)
+    blocks = output_blocks(cmd)
+    assert len(blocks) == 3
+    for i, block in enumerate(blocks):
+        assert block[:4] == ['-map', f"[vo{i}]", '-map', f"[ao{i}]"]
+        assert block[block.index('-threads') + 1] == "3"
+        assert block[-1] == str(paths[i]) and paths[i].name == f"{clips[i]['output_name']}.mp4"
+    assert cmd.count('-threads') == 3
+
+
+def test_build_batch_command_without_audio_or_threads():
+    cutter = VideoCutter()
+    cmd, paths = cutter.build_batch_command("video.mp4", [clip(0, 10, "a"), clip(5, 20, "b")], (720, 1280), has_audio=False)
+
+    assert '-threads' not in cmd and '-filter_complex_threads' not in cmd
+    assert 'asplit' not in cmd[cmd.index('-filter_complex') + 1]
+    assert '-c:a' not in cmd
+    assert [block[:2] for block in output_blocks(cmd)] == [['-map', "[vo0]"], ['-map', "[vo1]"]]
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Corte em Lote")
+    print("=" * 60)
+
+    try:
+        test_plan_batch_groups()
+        print("✅ agrupamento por gap e por tamanho do grupo")
+        test_build_batch_command_threads_per_output()
+        print("✅ comando com um decode e -threads em cada saída")
+        test_build_batch_command_without_audio_or_threads()
+        print("✅ comando sem áudio e sem limite de threads")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
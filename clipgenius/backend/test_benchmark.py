@@ -0,0 +1,116 @@
+"""
+Teste do benchmark do pipeline (benchmark.py)
+
+Cobre as partes que não dependem do FFmpeg: os stubs de transcrição e de LLM
+(com o ClipAnalyzer de verdade), a mediana das execuções e a comparação entre
+dois arquivos de resultados.
+"""
+import sys
+
+import config
+from benchmark import (
+    STAGES,
+    WORD_SECONDS,
+    PipelineBenchmark,
+    StubLLMServer,
+    compare_results,
+    stub_clips,
+    summarize_runs,
+    synthetic_words
+)
+from services.analyzer import ClipAnalyzer
+from test_analyzer_map_reduce import make_transcription
+
+
+def test_synthetic_words():
+    words = synthetic_words(10)
+    assert len(words) == int(10 / WORD_SECONDS)
+    assert words[11]['word'].endswith(".") and not words[10]['word'].endswith(".")
+    assert all(a['end'] < b['start'] for a, b in zip(words, words[1:]))
+
+
+def test_stub_clips_follow_prompt_window():
+    prompt = "Retorne EXATAMENTE 2 cortes\n[01:40] fala\n[02:30] fala\n[04:10] fala"
+    clips = stub_clips(prompt)['clips']
+    assert [(c['timestamp_inicio'], c['timestamp_fim']) for c in clips] == [("01:40", "02:10"), ("02:20", "02:50")]
+    assert stub_clips("sem transcrição") == {'clips': []}
+
+
+def test_analyzer_against_llm_stub():
+    transcription = make_transcription(300)
+    with StubLLMServer(config.OLLAMA_MODEL) as stub:
+        analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+        clips = analyzer.analyze(transcription, num_clips=3)
+        streamed = list(analyzer.analyze_stream(transcription, num_clips=3))
+
+    assert len(clips) == 3 and all(c['duration'] == 30 for c in clips)
+    assert sorted(c['start_time'] for c in streamed) == sorted(c['start_time'] for c in clips)
+    assert stub.requests == 2
+
+
+def test_failed_stage_skips_dependents():
+    benchmark = PipelineBenchmark.__new__(PipelineBenchmark)
+    benchmark.extract = lambda video_path, name: "audio.wav"
+    benchmark.transcribe = lambda audio_path, name: {'segments': []}
+    benchmark.analyze = lambda transcription: [{'start_time': 0, 'end_time': 30}]
+    benchmark.reframe = lambda video_path, suggestions, name: [{}] * len(suggestions)
+
+    def failing_cut(video_path, suggestions, name):
+        raise RuntimeError("ffmpeg ausente")
+
+    benchmark.cut = failing_cut
+    timings = benchmark.run("video.mp4", "teste")
+
+    assert timings['analyze']['items'] == 1 and timings['analyze']['error'] is None
+    assert timings['cut']['error'] == "RuntimeError: ffmpeg ausente"
+    assert timings['subtitle']['error'].startswith("skipped") and timings['subtitle']['seconds'] is None
+
+
+def run_timings(seconds):
+    return {stage: {'seconds': seconds, 'cpu_seconds': seconds / 2, 'error': None} for stage in STAGES}
+
+
+def test_summary_and_comparison():
+    summary = summarize_runs([run_timings(1.0), run_timings(3.0), run_timings(2.0)])
+    assert summary['cut']['seconds'] == 2.0 and summary['cut']['runs'] == [1.0, 3.0, 2.0]
+    assert summary['total']['seconds'] == 2.0 * len(STAGES)
+
+    baseline = {'stages': {'face_120s': summary}}
+    slower = summarize_runs([run_timings(2.0)])
+    slower['cut']['seconds'] = 3.0
+    slower['extract']['seconds'] = 2.05  # 2,5% mais lento: abaixo do limite
+    rows = compare_results(baseline, {'stages': {'face_120s': slower, 'novo_60s': slower}}, threshold=1.2)
+
+    regressions = [(row['fixture'], row['stage']) for row in rows if row['regression']]
+    assert regressions == [('face_120s', 'cut')]
+    # Fixtures sem baseline não entram na comparação
+    assert {row['fixture'] for row in rows} == {'face_120s'}
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Benchmark do Pipeline")
+    print("=" * 60)
+
+    try:
+        test_synthetic_words()
+        print("✅ palavras sintéticas do stub de transcrição")
+        test_stub_clips_follow_prompt_window()
+        print("✅ clips do stub de LLM dentro da janela do prompt")
+        test_analyzer_against_llm_stub()
+        print("✅ ClipAnalyzer contra o stub de LLM (com e sem streaming)")
+        test_failed_stage_skips_dependents()
+        print("✅ etapa com erro pula as dependentes")
+        test_summary_and_comparison()
+        print("✅ mediana das execuções e comparação com a baseline")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Teste do caminho da câmera do reframe (services/camera_path.py)
+
+Rejeição de outliers, filtro One-Euro e zona morta com histerese, todos
+sobre os arrays do face track (sem objetos por amostra ou por frame).
+"""
+import sys
+
+import numpy as np
+
+from services.camera_path import (
+    CameraPath,
+    dead_zone_follow,
+    one_euro_filter,
+    plan_camera_path,
+    reject_outliers
+)
+from services.face_track import FaceTrack
+from services.reframer import AIReframer
+
+
+def make_track(x, interval=0.5, confidence=None):
+    n = len(x)
+    return FaceTrack(
+        timestamps=np.arange(n) * interval,
+        frame_nums=(np.arange(n) * 15).astype(np.int32),
+        center_x=np.asarray(x, dtype=np.float32),
+        center_y=np.full(n, 0.4, dtype=np.float32),
+        width=np.full(n, 0.1, dtype=np.float32),
+        height=np.full(n, 0.1, dtype=np.float32),
+        confidence=np.asarray(confidence if confidence is not None else np.full(n, 0.9), dtype=np.float32),
+        sample_interval=interval
+    )
+
+
+def test_outliers_are_rejected():
+    x = np.full(20, 0.5)
+    x[7] = 0.95                      # Falso positivo de uma amostra
+    confidence = np.full(20, 0.9)
+    confidence[12] = 0.2             # Detecção fraca
+    keep = reject_outliers(make_track(x, confidence=confidence))
+    assert not keep[7] and not keep[12] and keep.sum() == 18
+
+
+def test_one_euro_smooths_jitter_and_follows_moves():
+    rng = np.random.default_rng(0)
+    times = np.arange(120) * 0.25
+    still = 0.5 + rng.normal(0, 0.01, 120)
+    filtered = one_euro_filter(times, still)
+    assert np.std(np.diff(filtered)) < np.std(np.diff(still)) / 3
+
+    # Mudança grande (troca de plano): alcança o novo lugar em poucos segundos
+    step = np.where(times < 10, 0.3, 0.7)
+    filtered = one_euro_filter(times, step)
+    assert abs(filtered[times >= 13][0] - 0.7) < 0.05
+
+
+def test_dead_zone_holds_then_pans_with_max_speed():
+    times = np.arange(80) * 0.25
+    target = np.where(times < 5, 0.5 + 0.02 * np.sin(times * 3), 0.8)
+    camera = dead_zone_follow(times, target, dead_zone=0.05, max_speed=0.2)
+
+    # Movimentos pequenos não movem a câmera
+    assert np.all(camera[times < 5] == camera[0])
+    # Depois anda no máximo 0.2 por segundo até o novo centro
+    assert np.max(np.abs(np.diff(camera))) <= 0.2 * 0.25 + 1e-9
+    assert abs(camera[-1] - 0.8) <= 0.05 * 0.25 + 1e-9
+
+
+def test_crop_keyframes_match_static_crop():
+    path = CameraPath(np.array([0.0, 1.0, 2.0]), np.array([0.0, 0.3, 1.0]), np.array([0.4, 0.5, 0.6]))
+    times, xs, ys, w, h = path.crop_keyframes(1920, 1080)
+    reframer = AIReframer()
+    for i in range(3):
+        expected = reframer.calculate_dynamic_crop(1920, 1080, path.x[i], path.y[i])
+        assert (xs[i], ys[i], w, h) == expected
+
+
+def test_plan_camera_path_without_faces():
+    path = plan_camera_path(make_track([]))
+    assert len(path) == 0 and path.center() == (0.5, 0.4)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Caminho da Câmera")
+    print("=" * 60)
+
+    try:
+        test_outliers_are_rejected()
+        print("✅ outliers descartados")
+        test_one_euro_smooths_jitter_and_follows_moves()
+        print("✅ One-Euro suaviza sem atrasar movimentos grandes")
+        test_dead_zone_holds_then_pans_with_max_speed()
+        print("✅ zona morta com histerese")
+        test_crop_keyframes_match_static_crop()
+        print("✅ crops vetorizados iguais ao cálculo por ponto")
+        test_plan_camera_path_without_faces()
+        print("✅ sem rostos: centro padrão")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Teste do crop dinâmico nativo do FFmpeg (AIReframer.cut_clip_with_dynamic_tracking)
+
+O caminho do rosto vira expressões x/y do filtro crop (interpolação linear
+entre keyframes), avaliadas aqui em Python com as mesmas funções do FFmpeg.
+"""
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import services.reframer as reframer_module
+from services.face_track import FaceTrack
+from services.reframer import AIReframer, FacePosition
+
+
+def evaluate(expression: str, t: float) -> float:
+    """Avalia uma expressão if/lt/gte do FFmpeg para um instante t"""
+    functions = {
+        'if_': lambda cond, a, b: a if cond else b,
+        'lt': lambda a, b: 1 if a < b else 0,
+        'gte': lambda a, b: 1 if a >= b else 0,
+        't': t
+    }
+    return eval(expression.replace('if(', 'if_('), {'__builtins__': {}}, functions)
+
+
+def test_crop_path_expression_interpolates_keyframes():
+    points = [(0.0, 100), (1.0, 200), (2.0, 200), (3.0, 200), (4.0, 0)]
+    expression = AIReframer.crop_path_expression(points)
+
+    for t, expected in [(0, 100), (0.5, 150), (1.0, 200), (2.5, 200), (3.5, 100), (4.0, 0)]:
+        assert abs(evaluate(expression, t) - expected) < 1e-6, t
+    # Mantém o primeiro/último valor fora do intervalo
+    assert evaluate(expression, -1) == 100 and evaluate(expression, 10) == 0
+    # O ponto no meio da sequência constante é descartado
+    assert 'lt(t,2)' not in expression
+
+    assert AIReframer.crop_path_expression([(0.0, 42)]) == "42"
+
+
+def test_crop_path_expression_long_clip_stays_shallow():
+    points = [(i * 0.5, (i * 37) % 500) for i in range(240)]
+    expression = AIReframer.crop_path_expression(points)
+
+    depth = max_depth = 0
+    for char in expression:
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        max_depth = max(max_depth, depth)
+    assert max_depth < 30
+    for i in range(239):
+        t = i * 0.5 + 0.25
+        expected = (points[i][1] + points[i + 1][1]) / 2
+        assert abs(evaluate(expression, t) - expected) < 1e-3
+
+
+def test_dynamic_tracking_is_a_single_ffmpeg_encode():
+    reframer = AIReframer()
+    reframer.face_detector = object()
+    reframer.get_video_info = lambda path: {'width': 1920, 'height': 1080, 'fps': 30.0}
+    reframer.clip_face_track = lambda path, start, end, interval: FaceTrack.from_positions([
+        FacePosition(frame_num=int(t * 30), timestamp=t, center_x=0.2 + (t - 10) * 0.05,
+                     center_y=0.4, width=0.1, height=0.1, confidence=0.9)
+        for t in [10 + i * 0.25 for i in range(40)]
+    ], interval)
+
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        Path(cmd[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(cmd, 0)
+
+    previous = (reframer_module.CV2_AVAILABLE, reframer_module.instrumented_run)
+    reframer_module.CV2_AVAILABLE = True
+    reframer_module.instrumented_run = fake_run
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            reframer.clips_dir = Path(tmp)
+            result = reframer.cut_clip_with_dynamic_tracking("source.mp4", 10.0, 20.0, "clip", sample_interval=0.25)
+    finally:
+        reframer_module.CV2_AVAILABLE, reframer_module.instrumented_run = previous
+
+    # Um único encode, sem arquivo intermediário
+    assert len(commands) == 1
+    vf = commands[0][commands[0].index('-vf') + 1]
+    match = re.match(r"crop=w=(\d+):h=(\d+):x='([^']+)':y='([^']+)',scale=1080:1920$", vf)
+    assert match and match.group(1, 2) == ('607', '1080')
+    x_expr = match.group(3)
+    # O crop acompanha o rosto: à esquerda no início, à direita no fim
+    assert evaluate(x_expr, 1.0) < evaluate(x_expr, 8.0)
+    assert 0 <= evaluate(x_expr, 0) and evaluate(x_expr, 10) <= 1920 - 607
+    assert result['tracking_mode'] == 'dynamic' and result['frames_processed'] == 300
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Crop Dinâmico no FFmpeg")
+    print("=" * 60)
+
+    try:
+        test_crop_path_expression_interpolates_keyframes()
+        print("✅ expressão interpola os keyframes")
+        test_crop_path_expression_long_clip_stays_shallow()
+        print("✅ clipes longos com aninhamento raso")
+        test_dynamic_tracking_is_a_single_ffmpeg_encode()
+        print("✅ um único encode nativo")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
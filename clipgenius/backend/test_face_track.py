@@ -0,0 +1,122 @@
+"""
+Teste do face track do vídeo inteiro (services/face_track.py)
+
+Os rostos são detectados uma vez por vídeo e cada corte recorta o seu
+intervalo do track salvo em disco, em vez de detectar de novo a sua faixa.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import services.reframer as reframer_module
+from services.face_track import FaceTrack, FaceTrackStore
+from services.reframer import AIReframer, FacePosition
+
+
+def fake_positions(duration: float = 60, interval: float = 0.5):
+    """Um rosto a cada amostra, andando da esquerda para a direita"""
+    samples = int(duration / interval)
+    return [
+        FacePosition(
+            frame_num=i * 15,
+            timestamp=i * interval,
+            center_x=i / samples,
+            center_y=0.4,
+            width=0.1,
+            height=0.15,
+            confidence=0.9
+        )
+        for i in range(samples)
+    ]
+
+
+def test_track_slice_and_sidecar_roundtrip():
+    track = FaceTrack.from_positions(fake_positions(), 0.5)
+    clip = track.slice(10.0, 12.0)
+    assert [p.timestamp for p in clip] == [10.0, 10.5, 11.0, 11.5]
+    assert clip[0].frame_num == 300 and abs(clip[0].center_x - 20 / 120) < 1e-6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "track.npz"
+        track.save(path)
+        loaded = FaceTrack.load(path)
+    assert len(loaded) == len(track) == 120
+    assert loaded.slice(10.0, 12.0) == clip
+
+
+def test_store_computes_each_video_once():
+    calls = []
+
+    def detect(video_path, sample_interval):
+        calls.append((video_path, sample_interval))
+        return FaceTrack.from_positions(fake_positions(), sample_interval, cuts=[20.0])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "video.mp4"
+        video.write_bytes(b"video")
+        store = FaceTrackStore(Path(tmp) / "tracks")
+
+        first = store.get_or_compute(str(video), 0.5, detect)
+        # Outro processo (outra instância) lê o sidecar em vez de detectar de novo
+        second = FaceTrackStore(Path(tmp) / "tracks").get_or_compute(str(video), 0.5, detect)
+        assert len(calls) == 1 and len(second) == len(first)
+        assert second.cuts.tolist() == [20.0] and second.between(10, 30).shot_ids()[-1] == 1
+
+        # Outra amostragem é outro track
+        store.get_or_compute(str(video), 0.25, detect)
+        assert len(calls) == 2
+
+        assert store.delete(str(video)) >= 2
+        assert store.get(str(video), 0.5) is None
+
+
+def test_overlapping_clips_share_one_detection_pass():
+    reframer = AIReframer()
+    reframer.face_detector = object()
+    calls = []
+
+    def detect(video_path, sample_interval=0.5, start_time=0, end_time=None):
+        calls.append((start_time, end_time))
+        return FaceTrack.from_positions(fake_positions(), sample_interval)
+
+    reframer.detect_face_track = detect
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "video.mp4"
+        video.write_bytes(b"video")
+        previous = reframer_module.face_track_store
+        reframer_module.face_track_store = FaceTrackStore(Path(tmp) / "tracks")
+        try:
+            first = reframer.clip_face_positions(str(video), 10.0, 20.0, 0.5)
+            second = reframer.clip_face_positions(str(video), 15.0, 25.0, 0.5)
+        finally:
+            reframer_module.face_track_store = previous
+
+    # Uma única passada no vídeo inteiro, sem intervalo
+    assert calls == [(0, None)]
+    assert len(first) == len(second) == 20
+    assert first[10:] == second[:10]
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Face Track do Vídeo Inteiro")
+    print("=" * 60)
+
+    try:
+        test_track_slice_and_sidecar_roundtrip()
+        print("✅ recorte do track e sidecar em disco")
+        test_store_computes_each_video_once()
+        print("✅ uma detecção por vídeo")
+        test_overlapping_clips_share_one_detection_pass()
+        print("✅ cortes sobrepostos compartilham a mesma passada")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Teste da amostragem de frames para detecção de rostos (services/frame_sampler.py)
+
+Gera um vídeo sintético em que o brilho de cada frame codifica o seu número,
+e verifica que os frames amostrados (sem seek por amostra) são exatamente os
+mesmos que a versão antiga lia com cap.set(CAP_PROP_POS_FRAMES).
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import services.frame_sampler as frame_sampler_module
+import services.reframer as reframer_module
+from services.frame_sampler import FrameSampler
+from services.reframer import AIReframer
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+FPS = 30
+FRAMES = 120
+SIZE = (1280, 720)
+
+
+def make_video(path: Path) -> Path:
+    """Vídeo de 4s em que o frame n tem brilho 2*n + 1"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), FPS, SIZE)
+    for n in range(FRAMES):
+        writer.write(np.full((SIZE[1], SIZE[0], 3), 2 * n + 1, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(frame: np.ndarray) -> int:
+    # O MJPEG escurece ~1 nível; o +1 do brilho absorve o arredondamento
+    return int(round(float(frame.mean()) / 2))
+
+
+def test_opencv_sampler_is_frame_accurate():
+    with tempfile.TemporaryDirectory() as tmp:
+        video = make_video(Path(tmp) / "source.avi")
+        sampler = FrameSampler(backend="opencv", detect_width=320, batch_size=3)
+        batches = list(sampler.iter_batches(str(video), sample_interval=0.5, start_time=1.0, end_time=3.5))
+
+    # Mesmos frames da amostragem antiga: a cada int(0.5 * 30) = 15 frames a partir de 30
+    expected = list(range(30, 105, 15))
+    assert [n for batch in batches for n in batch.frame_nums] == expected
+    assert [len(batch.frame_nums) for batch in batches] == [3, 2]
+    assert batches[0].timestamps[0] == 1.0
+
+    # Frames reduzidos (proporção mantida) e com o conteúdo do frame certo
+    assert batches[-1].frames.shape == (2, 180, 320, 3)
+    assert [frame_number(frame) for frame in batches[-1].frames] == expected[3:]
+
+
+def test_ffmpeg_sampler_falls_back_without_ffmpeg():
+    with tempfile.TemporaryDirectory() as tmp:
+        video = make_video(Path(tmp) / "source.avi")
+        sampler = FrameSampler(backend="ffmpeg", detect_width=320, batch_size=8)
+        original = frame_sampler_module.InstrumentedPopen
+
+        def missing_ffmpeg(*args, **kwargs):
+            raise FileNotFoundError("ffmpeg")
+
+        frame_sampler_module.InstrumentedPopen = missing_ffmpeg
+        try:
+            frames = [
+                (n, frame_number(frame))
+                for batch in sampler.iter_batches(str(video), sample_interval=1.0)
+                for n, frame in zip(batch.frame_nums, batch.frames)
+            ]
+        finally:
+            frame_sampler_module.InstrumentedPopen = original
+
+    assert frames == [(0, 0), (30, 30), (60, 60), (90, 90)]
+
+
+def test_detect_faces_in_video_uses_batches():
+    reframer = AIReframer()
+    reframer.face_detector = object()
+    calls = []
+
+    def fake_detect(rgb_frame):
+        # "Rosto" só a cada 30 frames (posição derivada do número do frame)
+        n = frame_number(rgb_frame)
+        calls.append(n)
+        return (n / FRAMES, 0.4, 0.1, 0.1, 0.9) if n % 30 == 0 else None
+
+    reframer._detect_face_in_frame = fake_detect
+    previous = reframer_module.MEDIAPIPE_AVAILABLE
+    reframer_module.MEDIAPIPE_AVAILABLE = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            video = make_video(Path(tmp) / "source.avi")
+            positions = reframer.detect_faces_in_video(str(video), sample_interval=0.5)
+    finally:
+        reframer_module.MEDIAPIPE_AVAILABLE = previous
+
+    assert calls == list(range(0, FRAMES, 15))
+    assert [p.frame_num for p in positions] == [0, 30, 60, 90]
+    assert [p.timestamp for p in positions] == [0.0, 1.0, 2.0, 3.0]
+    assert abs(positions[1].center_x - 30 / FRAMES) < 1e-9
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Amostragem de Frames")
+    print("=" * 60)
+
+    if cv2 is None:
+        print("⚠️  OpenCV não instalado, teste ignorado")
+        return 0
+
+    try:
+        test_opencv_sampler_is_frame_accurate()
+        print("✅ amostragem sequencial com os frames exatos")
+        test_ffmpeg_sampler_falls_back_without_ffmpeg()
+        print("✅ fallback para OpenCV sem ffmpeg")
+        test_detect_faces_in_video_uses_batches()
+        print("✅ detecção de rostos em lotes")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
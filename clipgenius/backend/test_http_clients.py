@@ -0,0 +1,135 @@
+"""
+Teste dos clientes HTTP compartilhados dos provedores (services/http_clients.py)
+
+Servidor local HTTP/1.1 que conta conexões TCP abertas: requests em sequência
+devem reutilizar a mesma conexão (keep-alive) em vez de abrir uma por request.
+"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from services.http_clients import ProviderClients, origin_of
+
+
+class CountingState:
+    def __init__(self, failures: int = 0):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.failures = failures
+
+
+def start_server(state: CountingState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                fail = state.failures > 0
+                state.failures -= 1 if fail else 0
+            status, payload = (503, {'error': 'busy'}) if fail else (200, {'ok': True})
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if fail:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_connections_are_reused():
+    state = CountingState()
+    server, url = start_server(state)
+    clients = ProviderClients()
+    try:
+        for _ in range(10):
+            assert clients.get(f"{url}/api/tags").json() == {'ok': True}
+        assert state.requests == 10
+        assert state.connections == 1
+        # Mesma origem -> mesmo cliente
+        assert clients.client(f"{url}/a") is clients.client(f"{url}/b/c")
+    finally:
+        clients.close()
+        server.shutdown()
+
+
+def test_retry_on_retryable_status():
+    state = CountingState(failures=2)
+    server, url = start_server(state)
+    clients = ProviderClients(max_retries=3)
+    try:
+        response = clients.get(url, retry_base_delay=0.01)
+        assert response.status_code == 200
+        assert state.requests == 3
+
+        # Sem tentativas restantes a resposta de erro é devolvida ao chamador
+        state.failures = 5
+        response = clients.get(url, max_retries=1, retry_base_delay=0.01)
+        assert response.status_code == 503
+        assert state.requests == 5
+    finally:
+        clients.close()
+        server.shutdown()
+
+
+def test_transport_error_is_raised_after_retries():
+    clients = ProviderClients(max_retries=1)
+    server, url = start_server(CountingState())
+    server.shutdown()
+    server.server_close()
+    try:
+        clients.get(url, retry_base_delay=0.01, timeout=2)
+        assert False, "deveria ter lançado httpx.TransportError"
+    except httpx.TransportError:
+        pass
+    finally:
+        clients.close()
+
+
+def test_origin_of():
+    assert origin_of("https://api.groq.com/openai/v1/models") == "https://api.groq.com:443"
+    assert origin_of("http://localhost:11434/api/tags") == "http://localhost:11434"
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste dos Clientes HTTP dos Provedores")
+    print("=" * 60)
+
+    try:
+        test_connections_are_reused()
+        print("✅ conexões reutilizadas (keep-alive)")
+        test_retry_on_retryable_status()
+        print("✅ retry com backoff em 503")
+        test_transport_error_is_raised_after_retries()
+        print("✅ erro de rede após as tentativas")
+        test_origin_of()
+        print("✅ chave de origem")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
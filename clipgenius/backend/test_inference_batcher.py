@@ -0,0 +1,200 @@
+"""
+Teste da inferência em lotes entre jobs (services/inference_batcher.py)
+
+O modelo é simulado: run_batch registra o tamanho de cada lote e devolve um
+resultado por item.
+"""
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+from services.inference_batcher import (
+    BATCH_GAP_SECONDS,
+    SAMPLE_RATE,
+    InferenceBatcher,
+    concatenate_audio,
+    split_batched_result
+)
+
+
+def segment(start, end, text):
+    return {
+        "id": 0,
+        "start": start,
+        "end": end,
+        "text": text,
+        "words": [{"word": text, "start": start, "end": end, "probability": 1.0}]
+    }
+
+
+def test_concatenate_and_split_round_trip():
+    audios = [np.ones(SAMPLE_RATE * 10, dtype=np.float32), np.ones(SAMPLE_RATE * 5, dtype=np.float32)]
+    combined, offsets = concatenate_audio(audios)
+    assert offsets == [0.0, 10 + BATCH_GAP_SECONDS]
+    assert len(combined) == SAMPLE_RATE * (15 + BATCH_GAP_SECONDS)
+    assert not combined[SAMPLE_RATE * 10:int(SAMPLE_RATE * (10 + BATCH_GAP_SECONDS))].any()
+
+    # Resultado da transcrição do áudio concatenado (tempos no áudio combinado)
+    second = offsets[1]
+    result = {
+        "text": "a b c",
+        "language": "pt",
+        "duration": second + 4,
+        "segments": [segment(1, 3, "a"), segment(6, 9.5, "b"), segment(second + 0.5, second + 4, "c")],
+        "words": [],
+        "backend": "faster-whisper"
+    }
+    first_part, second_part = split_batched_result(result, offsets)
+
+    assert [s["text"] for s in first_part["segments"]] == ["a", "b"]
+    assert first_part["text"] == "a b" and first_part["duration"] == 9.5
+    assert second_part["segments"][0]["start"] == 0.5 and second_part["segments"][0]["id"] == 0
+    assert second_part["words"] == [{"word": "c", "start": 0.5, "end": 4.0, "probability": 1.0}]
+    assert second_part["language"] == "pt" and second_part["backend"] == "faster-whisper"
+
+
+class RecordingModel:
+    def __init__(self, delay=0.05):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, key, items):
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        if "ruim" in items:
+            raise ValueError("chunk inválido")
+        return [f"{key}:{item}" for item in items]
+
+
+def test_concurrent_streams_share_batches():
+    model = RecordingModel()
+    batcher = InferenceBatcher(model, max_streams=4, max_wait=1.0)
+    results = {}
+
+    def job(name, chunks):
+        for i in range(chunks):
+            results.setdefault(name, []).append(batcher.submit("modelo", f"{name}{i}", stream_id=name))
+
+    threads = [threading.Thread(target=job, args=(name, 3)) for name in ("a", "b", "c")]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["a"] == ["modelo:a0", "modelo:a1", "modelo:a2"]
+    # Depois do primeiro lote os três jobs ficam ativos: os chunks seguintes saem juntos
+    assert max(len(batch) for batch in model.batches) == 3
+    assert len(model.batches) < 9
+    assert batcher.stats()["batched_requests"] == 9
+    assert time.monotonic() - started < 5
+
+
+def test_lone_stream_does_not_wait():
+    model = RecordingModel(delay=0)
+    batcher = InferenceBatcher(model, max_streams=4, max_wait=5.0)
+    started = time.monotonic()
+    for i in range(3):
+        assert batcher.submit("modelo", i, stream_id="único") == f"modelo:{i}"
+    assert time.monotonic() - started < 1
+
+
+def test_failed_batch_isolates_bad_chunk():
+    model = RecordingModel(delay=0)
+    batcher = InferenceBatcher(model, max_streams=2, max_wait=2.0)
+    outcome = {}
+
+    def submit(item, stream):
+        try:
+            outcome[item] = batcher.submit("modelo", item, stream_id=stream)
+        except ValueError as e:
+            outcome[item] = e
+
+    # Os dois streams ficam ativos antes do lote com o chunk ruim
+    warmup = [threading.Thread(target=submit, args=(f"ok{s}", s)) for s in ("x", "y")]
+    for thread in warmup:
+        thread.start()
+    for thread in warmup:
+        thread.join()
+
+    threads = [threading.Thread(target=submit, args=args) for args in (("bom", "x"), ("ruim", "y"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcome["bom"] == "modelo:bom"
+    assert isinstance(outcome["ruim"], ValueError)
+    assert sorted(model.batches[-3]) == ["bom", "ruim"]
+
+
+def test_faster_whisper_batched_only_for_merged_chunks():
+    from services.transcriber_v2 import TranscriberV2
+
+    calls = []
+    info = types.SimpleNamespace(language="pt")
+
+    class Model:
+        def transcribe(self, audio, **options):
+            calls.append("sequential")
+            return iter([]), info
+
+    class BatchedInferencePipeline:
+        def __init__(self, model):
+            self.model = model
+
+        def transcribe(self, audio, batch_size, **options):
+            calls.append("batched")
+            return iter([]), info
+
+    fake = types.ModuleType("faster_whisper")
+    fake.WhisperModel = Model
+    fake.BatchedInferencePipeline = BatchedInferencePipeline
+    sys.modules["faster_whisper"] = fake
+    try:
+        transcriber = TranscriberV2(backend="faster-whisper", model_size="base", device="cpu", use_cache=False)
+        transcriber._load_faster_whisper = Model
+        audio = np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+        # Job sozinho: decodificação sequencial
+        transcriber._transcribe_in_process(audio, "pt")
+        transcriber._transcribe_batch([audio], "pt")
+        assert calls == ["sequential", "sequential"]
+        # Chunks de vários jobs juntados: pipeline em lotes
+        transcriber._transcribe_batch([audio, audio], "pt")
+        assert calls[-1] == "batched"
+        assert transcriber._decoding_settings()[3] in ("cross-job", "sequential")
+    finally:
+        sys.modules.pop("faster_whisper", None)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Inferência em Lotes")
+    print("=" * 60)
+
+    try:
+        test_concatenate_and_split_round_trip()
+        print("✅ concatenação e separação dos resultados")
+        test_concurrent_streams_share_batches()
+        print("✅ jobs simultâneos compartilham lotes")
+        test_lone_stream_does_not_wait()
+        print("✅ job sozinho não espera o prazo")
+        test_failed_batch_isolates_bad_chunk()
+        print("✅ chunk com erro não derruba os outros jobs")
+        test_faster_whisper_batched_only_for_merged_chunks()
+        print("✅ faster-whisper em lotes só com chunks de vários jobs")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Teste da fila de jobs persistente (services/job_queue.py)
+
+Cada teste usa um banco SQLite temporário, com o mesmo engine (WAL, busy
+timeout) do banco da aplicação.
+"""
+import importlib
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, JobStage, JobStatus, ProcessingJob, Project
+from models.database import set_sqlite_pragma
+from services.job_queue import JobQueue
+
+# `services.job_queue` no pacote é a instância compartilhada, não o módulo
+job_queue_module = importlib.import_module("services.job_queue")
+
+LIMITS = {"download": 2, "transcribe": 1, "analyze": 2, "cut": 1, "pipeline": 1}
+
+
+@contextmanager
+def temporary_database():
+    """Sessões da fila num banco temporário"""
+    previous = job_queue_module.get_background_session
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{Path(tmp) / 'queue.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        event.listen(engine, "connect", set_sqlite_pragma)
+        Base.metadata.create_all(bind=engine)
+        sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        job_queue_module.get_background_session = sessions
+        try:
+            yield sessions
+        finally:
+            job_queue_module.get_background_session = previous
+            engine.dispose()
+
+
+def add_jobs(sessions, stage, count, max_attempts=3):
+    db = sessions()
+    try:
+        ids = []
+        for i in range(count):
+            project = Project(youtube_url=f"https://youtu.be/v{i}", youtube_id=f"v{i}", title=f"Vídeo {i}")
+            db.add(project)
+            db.flush()
+            job = ProcessingJob(
+                project_id=project.id,
+                stage=stage,
+                status=JobStatus.QUEUED.value,
+                checkpoint={},
+                max_attempts=max_attempts
+            )
+            db.add(job)
+            db.flush()
+            ids.append(job.id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def get_job(sessions, job_id):
+    db = sessions()
+    try:
+        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).one()
+        db.expunge(job)
+        return job
+    finally:
+        db.close()
+
+
+def make_stale(sessions, job_id):
+    db = sessions()
+    try:
+        db.query(ProcessingJob).filter(ProcessingJob.id == job_id).update(
+            {ProcessingJob.heartbeat_at: datetime.utcnow() - timedelta(hours=1)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_claims_respect_stage_limit():
+    with temporary_database() as sessions:
+        queue = JobQueue(stage_concurrency=LIMITS, render_stages=["cut"])
+        add_jobs(sessions, JobStage.CUT.value, 3)
+        add_jobs(sessions, JobStage.ANALYZE.value, 3)
+
+        barrier = threading.Barrier(6)
+        claims = []
+
+        def claim(worker):
+            barrier.wait()
+            claims.append(queue.claim(worker))
+
+        threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stages = sorted(c['stage'] for c in claims if c)
+        assert stages == ["analyze", "analyze", "cut"]
+
+
+def test_streamed_analysis_holds_cut_slot():
+    with temporary_database() as sessions:
+        queue = JobQueue(stage_concurrency=LIMITS, render_stages=["cut", "analyze"])
+        add_jobs(sessions, JobStage.ANALYZE.value, 2)
+        add_jobs(sessions, JobStage.CUT.value, 1)
+
+        assert queue.claim("w1")['stage'] == "analyze"
+        # Limite do cut (1) ocupado pela análise com renderização
+        assert queue.claim("w2") is None
+
+
+def test_recover_stale_requeues_then_fails():
+    with temporary_database() as sessions:
+        queue = JobQueue(stage_concurrency=LIMITS, heartbeat_timeout=60)
+        job_id = add_jobs(sessions, JobStage.TRANSCRIBE.value, 1, max_attempts=2)[0]
+
+        assert queue.claim("w1")['job_id'] == job_id
+        make_stale(sessions, job_id)
+        assert queue.recover_stale() == 1
+        job = get_job(sessions, job_id)
+        assert (job.status, job.stage, job.worker_id) == ("queued", "transcribe", None)
+
+        assert queue.claim("w2")['job_id'] == job_id
+        make_stale(sessions, job_id)
+        assert queue.recover_stale() == 1
+        job = get_job(sessions, job_id)
+        assert job.status == "failed" and "2 attempts" in job.error_message
+
+        db = sessions()
+        try:
+            project = db.query(Project).filter(Project.id == job.project_id).one()
+            assert project.status == "error"
+        finally:
+            db.close()
+
+
+def test_late_worker_result_is_dropped():
+    with temporary_database() as sessions:
+        queue = JobQueue(stage_concurrency=LIMITS, heartbeat_timeout=60)
+        job_id = add_jobs(sessions, JobStage.DOWNLOAD.value, 1)[0]
+
+        queue.claim("lento")
+        make_stale(sessions, job_id)
+        queue.recover_stale()
+        assert queue.claim("novo")['job_id'] == job_id
+
+        # O worker antigo termina depois: nada é gravado
+        assert queue.heartbeat(job_id, "lento") is False
+        assert queue.complete_stage(job_id, "lento", "download", {'video': "antigo"}) is None
+        assert queue.fail(job_id, "lento", "download", "erro antigo") is False
+        job = get_job(sessions, job_id)
+        assert (job.status, job.stage, job.worker_id) == ("running", "download", "novo")
+        assert job.checkpoint == {}
+
+        # Resultado de outra etapa também não conta
+        assert queue.complete_stage(job_id, "novo", "transcribe") is None
+
+        assert queue.heartbeat(job_id, "novo") is True
+        assert queue.complete_stage(job_id, "novo", "download", {'video': "novo"}) == "transcribe"
+        job = get_job(sessions, job_id)
+        assert (job.status, job.stage, job.worker_id) == ("queued", "transcribe", None)
+        assert job.checkpoint == {'completed_stages': ["download"], 'video': "novo"}
+
+
+def test_heartbeat_loop_survives_database_errors():
+    import worker
+
+    class FlakyQueue:
+        def __init__(self):
+            self.beats = 0
+
+        def heartbeat(self, job_id, worker_id):
+            self.beats += 1
+            if self.beats <= 2:
+                raise RuntimeError("database is locked")
+            return self.beats < 4
+
+    queue = FlakyQueue()
+    previous = worker.JOB_HEARTBEAT_INTERVAL
+    worker.JOB_HEARTBEAT_INTERVAL = 0.01
+    try:
+        # Erros do banco não encerram o loop; só a perda do job (4ª batida)
+        worker._heartbeat_loop(queue, 1, "w1", threading.Event())
+    finally:
+        worker.JOB_HEARTBEAT_INTERVAL = previous
+    assert queue.beats == 4
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Fila de Jobs")
+    print("=" * 60)
+
+    try:
+        test_concurrent_claims_respect_stage_limit()
+        print("✅ claims simultâneos respeitam o limite de cada etapa")
+        test_streamed_analysis_holds_cut_slot()
+        print("✅ análise com renderização ocupa uma vaga do cut")
+        test_recover_stale_requeues_then_fails()
+        print("✅ job sem heartbeat volta para a fila e falha após max_attempts")
+        test_late_worker_result_is_dropped()
+        print("✅ resultado de worker que perdeu o job é descartado")
+        test_heartbeat_loop_survives_database_errors()
+        print("✅ erro do banco no heartbeat não encerra o loop")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
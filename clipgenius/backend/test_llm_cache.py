@@ -0,0 +1,139 @@
+"""
+Teste do cache de respostas do LLM (services/llm_cache.py)
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from services.analyzer import ClipAnalyzer
+from services.llm_cache import LLMResponseCache
+from test_analyzer_map_reduce import StubOllama, make_transcription
+
+
+def test_hit_miss_and_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(Path(tmp))
+        calls = []
+
+        def call():
+            calls.append(1)
+            return "resposta"
+
+        assert cache.get_or_call("groq", "llama", "prompt", 0.7, call) == "resposta"
+        assert cache.get_or_call("groq", "llama", "prompt", 0.7, call) == "resposta"
+        assert len(calls) == 1
+
+        # Qualquer parte da chave diferente é outra requisição
+        cache.get_or_call("groq", "llama", "prompt", 0.2, call)
+        cache.get_or_call("ollama", "llama", "prompt", 0.7, call)
+        cache.get_or_call("groq", "outro", "prompt", 0.7, call)
+        assert len(calls) == 4
+
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 4
+        assert stats['hit_rate'] == 0.2
+
+
+def test_ttl_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(Path(tmp), ttl_seconds=0.2, max_entries=2)
+        for prompt in ("a", "b"):
+            cache.put(cache.make_key("groq", "m", prompt, 0.7), "groq", "m", prompt)
+        time.sleep(0.01)
+        cache.get(cache.make_key("groq", "m", "a", 0.7))
+        # "b" é o menos usado recentemente
+        cache.put(cache.make_key("groq", "m", "c", 0.7), "groq", "m", "c")
+        assert cache.get(cache.make_key("groq", "m", "b", 0.7)) is None
+        assert cache.get(cache.make_key("groq", "m", "a", 0.7)) == "a"
+
+        time.sleep(0.3)
+        assert cache.get(cache.make_key("groq", "m", "c", 0.7)) is None
+        assert cache.stats()['expired'] == 1
+
+
+def test_concurrent_identical_prompts_are_coalesced():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(Path(tmp))
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return "resposta"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                cache.get_or_call("groq", "m", "prompt", 0.7, slow_call)
+            ))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["resposta"] * 4
+        assert len(calls) == 1
+        assert cache.stats()['coalesced'] == 3
+
+
+def test_errors_and_empty_responses_are_not_stored():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(Path(tmp))
+
+        def failing():
+            raise ConnectionError("provider fora do ar")
+
+        try:
+            cache.get_or_call("groq", "m", "prompt", 0.7, failing)
+            assert False, "deveria ter lançado ConnectionError"
+        except ConnectionError:
+            pass
+        assert cache.get_or_call("groq", "m", "prompt", 0.7, lambda: "") == ""
+        assert cache.get_or_call("groq", "m", "prompt", 0.7, lambda: "ok") == "ok"
+        assert cache.stats()['stores'] == 1
+
+
+def test_analyzer_reuses_cached_response():
+    with tempfile.TemporaryDirectory() as tmp, StubOllama(delay=0) as stub:
+        transcription = make_transcription(300, {100: 8})
+        analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+        analyzer.use_cache = True
+        analyzer._cache = LLMResponseCache(Path(tmp))
+
+        first = analyzer.analyze(transcription, num_clips=3, min_duration=15, max_duration=60)
+        second = analyzer.analyze(transcription, num_clips=3, min_duration=15, max_duration=60)
+        assert first == second
+        assert len(stub.prompts) == 1
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Cache de Respostas do LLM")
+    print("=" * 60)
+
+    try:
+        test_hit_miss_and_key()
+        print("✅ hit/miss e chave (provider, modelo, prompt, temperatura)")
+        test_ttl_and_lru_eviction()
+        print("✅ TTL e remoção LRU")
+        test_concurrent_identical_prompts_are_coalesced()
+        print("✅ prompts idênticos simultâneos compartilham uma chamada")
+        test_errors_and_empty_responses_are_not_stored()
+        print("✅ erros e respostas vazias não são armazenados")
+        test_analyzer_reuses_cached_response()
+        print("✅ ClipAnalyzer reutiliza a resposta do cache")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Teste das métricas de etapas e subprocessos (services/metrics.py)
+
+Os subprocessos são processos Python (no lugar do FFmpeg) que escrevem e
+alocam quantidades conhecidas. Cada teste usa um registro em um diretório
+temporário.
+"""
+import subprocess
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from services import metrics as metrics_module
+from services.metrics import (
+    DURATION_BUCKETS,
+    InstrumentedPopen,
+    MetricsRegistry,
+    Usage,
+    current_stage,
+    instrumented_run,
+    span
+)
+
+# Escreve 2 MB no stdout e aloca ~64 MB
+CHILD = (
+    "import sys\n"
+    "block = bytearray(64 * 1024 * 1024)\n"
+    "sys.stdout.buffer.write(b'x' * 2 * 1024 * 1024)\n"
+    "sys.exit(int(sys.argv[1]) if len(sys.argv) > 1 else 0)\n"
+)
+
+
+@contextmanager
+def temporary_registry():
+    previous = metrics_module.metrics_registry
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_module.metrics_registry = MetricsRegistry(Path(tmp), enabled=True)
+        try:
+            yield metrics_module.metrics_registry
+        finally:
+            metrics_module.metrics_registry = previous
+
+
+def usage(seconds, cpu=0.0, rss=0, read=0, written=0):
+    return Usage(seconds=seconds, cpu_seconds=cpu, peak_rss_bytes=rss, read_bytes=read, written_bytes=written)
+
+
+def subprocess_series(registry, command="python"):
+    return {
+        labels: series
+        for (family, labels), series in registry.collect().items()
+        if family == "subprocess" and dict(labels)["command"].startswith(command)
+    }
+
+
+def test_instrumented_run_measures_child():
+    with temporary_registry() as registry:
+        with span("cut"):
+            result = instrumented_run([sys.executable, "-c", CHILD], capture_output=True, timeout=30)
+        assert result.returncode == 0 and len(result.stdout) == 2 * 1024 * 1024
+
+        series = subprocess_series(registry)
+        assert len(series) == 1
+        labels, totals = next(iter(series.items()))
+        assert dict(labels)["stage"] == "cut"
+        assert totals["count"] == 1 and totals["errors"] == 0
+        assert totals["written_bytes"] >= 2 * 1024 * 1024
+        assert totals["peak_rss_bytes"] >= 64 * 1024 * 1024
+        assert totals["cpu_seconds"] > 0 and totals["seconds"] > 0
+
+
+def test_instrumented_run_errors_and_check():
+    with temporary_registry() as registry:
+        try:
+            instrumented_run([sys.executable, "-c", CHILD, "3"], capture_output=True, check=True)
+            raise AssertionError("CalledProcessError esperado")
+        except subprocess.CalledProcessError as e:
+            assert e.returncode == 3 and len(e.stdout) == 2 * 1024 * 1024
+
+        result = instrumented_run([sys.executable, "-c", "pass"])
+        assert result.returncode == 0 and result.stdout is None
+
+        totals = list(subprocess_series(registry).values())
+        assert len(totals) == 1
+        assert totals[0]["count"] == 2 and totals[0]["errors"] == 1
+        # Fora de qualquer etapa
+        assert current_stage() == "none"
+        assert dict(next(iter(subprocess_series(registry))))["stage"] == "none"
+
+
+def test_popen_recorded_once():
+    with temporary_registry() as registry:
+        process = InstrumentedPopen([sys.executable, "-c", "pass"], stdout=subprocess.DEVNULL)
+        while process.poll() is None:
+            pass
+        assert process.wait() == 0 and process.poll() == 0
+        assert list(subprocess_series(registry).values())[0]["count"] == 1
+
+
+def test_popen_wait_timeout_and_concurrent_poll():
+    with temporary_registry() as registry:
+        process = InstrumentedPopen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            process.wait(timeout=0.05)
+            raise AssertionError("TimeoutExpired esperado")
+        except subprocess.TimeoutExpired:
+            pass
+        assert process.poll() is None and subprocess_series(registry) == {}
+
+        # poll() em outra thread enquanto wait() bloqueia: um único registro
+        polls = []
+        poller = threading.Thread(target=lambda: polls.extend(process.poll() for _ in range(1000)))
+        poller.start()
+        process.kill()
+        assert process.wait() == -9
+        poller.join()
+        assert process.poll() == -9 and set(polls) <= {None, -9}
+
+        totals = list(subprocess_series(registry).values())
+        assert len(totals) == 1 and totals[0]["count"] == 1 and totals[0]["errors"] == 1
+
+
+def test_span_counts_errors():
+    with temporary_registry() as registry:
+        with span("analyze"):
+            assert current_stage() == "analyze"
+            with span("render"):
+                assert current_stage() == "render"
+            assert current_stage() == "analyze"
+        try:
+            with span("analyze"):
+                raise RuntimeError("LLM indisponível")
+        except RuntimeError:
+            pass
+
+        def streaming():
+            with span("transcribe"):
+                yield 1
+                yield 2
+
+        stream = streaming()
+        next(stream)
+        stream.close()  # Consumidor parou de ler: não é erro
+
+        stages = {dict(labels)["stage"]: series for (family, labels), series in registry.collect().items() if family == "stage"}
+        assert (stages["analyze"]["count"], stages["analyze"]["errors"]) == (2, 1)
+        assert (stages["render"]["count"], stages["render"]["errors"]) == (1, 0)
+        assert (stages["transcribe"]["count"], stages["transcribe"]["errors"]) == (1, 0)
+
+
+def test_registries_merge_and_render():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Dois processos (worker e processo de renderização) no mesmo diretório
+        worker = MetricsRegistry(Path(tmp), enabled=True)
+        renderer = MetricsRegistry(Path(tmp), enabled=True)
+        worker.observe("stage", {"stage": "render"}, usage(0.3, cpu=0.2, rss=100, read=10, written=5))
+        renderer.observe("stage", {"stage": "render"}, usage(4.0, cpu=3.0, rss=300, read=20, written=7), failed=True)
+        renderer.observe("subprocess", {"command": "ffmpeg", "stage": "render"}, usage(3.5))
+
+        totals = worker.collect()[("stage", (("stage", "render"),))]
+        assert totals["count"] == 2 and totals["errors"] == 1
+        assert (totals["read_bytes"], totals["written_bytes"], totals["peak_rss_bytes"]) == (30, 12, 300)
+        assert abs(totals["cpu_seconds"] - 3.2) < 1e-9
+
+        text = worker.render()
+        assert 'clipgenius_stage_duration_seconds_bucket{stage="render",le="0.5"} 1' in text
+        assert 'clipgenius_stage_duration_seconds_bucket{stage="render",le="5"} 2' in text
+        assert 'clipgenius_stage_duration_seconds_bucket{stage="render",le="+Inf"} 2' in text
+        assert 'clipgenius_stage_duration_seconds_count{stage="render"} 2' in text
+        assert 'clipgenius_stage_errors_total{stage="render"} 1' in text
+        assert 'clipgenius_subprocess_duration_seconds_count{command="ffmpeg",stage="render"} 1' in text
+        assert "# TYPE clipgenius_subprocess_peak_rss_bytes gauge" in text
+        assert text.count("_duration_seconds_bucket{stage=") == len(DURATION_BUCKETS) + 1
+
+        worker.reset()
+        assert worker.collect() == {}
+        assert "clipgenius_stage_duration_seconds_count" not in worker.render()
+
+        disabled = MetricsRegistry(Path(tmp), enabled=False)
+        disabled.observe("stage", {"stage": "cut"}, usage(1.0))
+        assert worker.collect() == {}
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste das Métricas")
+    print("=" * 60)
+
+    try:
+        test_instrumented_run_measures_child()
+        print("✅ tempo, CPU, RSS e bytes do subprocesso")
+        test_instrumented_run_errors_and_check()
+        print("✅ erros e check=True como subprocess.run")
+        test_popen_recorded_once()
+        print("✅ subprocesso registrado uma única vez")
+        test_popen_wait_timeout_and_concurrent_poll()
+        print("✅ wait com timeout e poll simultâneo")
+        test_span_counts_errors()
+        print("✅ etapas aninhadas, com erro e geradores fechados")
+        test_registries_merge_and_render()
+        print("✅ registros de vários processos somados no formato Prometheus")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
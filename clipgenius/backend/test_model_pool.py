@@ -0,0 +1,234 @@
+"""
+Teste do pool de modelos residentes (services/model_pool.py) e do processo de
+inferência compartilhado (services/model_server.py)
+
+Os modelos são simulados: loaders que contam as cargas e um módulo
+faster_whisper falso, sem baixar nenhum modelo.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+from services.model_pool import ModelPool, estimate_model_mb, parse_preload
+from services.model_server import (
+    ModelServer,
+    ModelServerClient,
+    ModelServerError,
+    ModelServerUnavailable,
+    new_server_address
+)
+from services.transcriber_v2 import TranscriberV2
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0):
+        self.loads = []
+        self.delay = delay
+
+    def __call__(self, name):
+        def load():
+            if self.delay:
+                time.sleep(self.delay)
+            self.loads.append(name)
+            return f"modelo-{name}"
+        return load
+
+
+def test_lru_eviction_under_budget():
+    pool = ModelPool(max_mb=1000)
+    loader = CountingLoader()
+
+    assert pool.get("a", loader("a"), 400) == "modelo-a"
+    pool.get("b", loader("b"), 400)
+    # "a" usado por último: "b" é o menos recente
+    assert pool.get("a", loader("a"), 400) == "modelo-a"
+    pool.get("c", loader("c"), 400)
+
+    assert "a" in pool and "c" in pool and "b" not in pool
+    assert loader.loads == ["a", "b", "c"]
+    stats = pool.stats()
+    assert stats["resident_mb"] == 800 and stats["hits"] == 1 and stats["evictions"] == 1
+
+    # Modelo maior que o orçamento: carrega sozinho
+    pool.get("grande", loader("grande"), 5000)
+    assert [m["key"] for m in pool.stats()["models"]] == ["grande"]
+
+    assert pool.evict(lambda key: key == "grande") == 1
+    assert pool.stats()["resident_mb"] == 0
+
+
+def test_concurrent_requests_load_once():
+    pool = ModelPool(max_mb=1000)
+    loader = CountingLoader(delay=0.1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.get("m", loader("m"), 100)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == ["m"]
+    assert results == ["modelo-m"] * 4
+
+
+def test_estimates_and_preload_spec():
+    assert estimate_model_mb("large-v3") == estimate_model_mb("large")
+    assert estimate_model_mb("small", "int8") == estimate_model_mb("small") // 2
+    assert parse_preload("faster-whisper:small, whisperx,auto,", "auto", "base") == [
+        ("faster-whisper", "small"), ("whisperx", "base"), ("auto", "base")
+    ]
+    assert parse_preload("", "auto", "base") == []
+
+
+def install_fake_faster_whisper():
+    """Módulo faster_whisper falso: conta quantas vezes o modelo é carregado"""
+    module = types.ModuleType("faster_whisper")
+    module.created = []
+
+    class WhisperModel:
+        def __init__(self, model_size, device, compute_type, **options):
+            module.created.append((model_size, device, compute_type))
+
+    module.WhisperModel = WhisperModel
+    sys.modules["faster_whisper"] = module
+    return module
+
+
+def local_transcriber(**kwargs) -> TranscriberV2:
+    """TranscriberV2 faster-whisper (com o módulo falso de install_fake_faster_whisper)"""
+    return TranscriberV2(backend="faster-whisper", use_cache=False, streaming=False, device="cpu", **kwargs)
+
+
+def test_transcribers_share_pooled_model():
+    from services.model_pool import model_pool
+
+    fake = install_fake_faster_whisper()
+    try:
+        first = local_transcriber(model_server=False)
+        second = local_transcriber(model_server=False)
+        assert first._load_faster_whisper() is second._load_faster_whisper()
+        assert fake.created == [(first.model_size, "cpu", "int8")]
+
+        first.unload_model()
+        assert ("faster-whisper", first.model_size, "cpu", "int8", first.cpu_threads) not in model_pool
+        second._load_faster_whisper()
+        assert len(fake.created) == 2
+    finally:
+        sys.modules.pop("faster_whisper", None)
+        model_pool.clear()
+
+
+class FakeTranscriber:
+    def _transcribe_in_process(self, audio, language):
+        if language == "xx":
+            raise ValueError("idioma inválido")
+        return {"text": f"{len(audio)} amostras", "language": language, "segments": []}
+
+    def _transcribe_batch(self, audios, language):
+        return [self._transcribe_in_process(audio, language) for audio in audios]
+
+
+def serve_fake(server: ModelServer):
+    """Servidor de modelos numa thread, com transcriber falso"""
+    address, authkey = new_server_address()
+    address = address.replace("clipgenius-models", f"clipgenius-test-{threading.get_ident()}")
+    if os.name != "nt" and os.path.exists(address):
+        os.unlink(address)
+    server._transcriber = lambda *args: (FakeTranscriber(), threading.Lock())
+    listener = Listener(address, authkey=bytes.fromhex(authkey))
+    stop = threading.Event()
+    thread = threading.Thread(target=server.serve, args=(listener, stop), daemon=True)
+    thread.start()
+
+    def close():
+        stop.set()
+        listener.close()
+
+    return ModelServerClient(address, authkey), close
+
+
+def test_model_server_round_trip():
+    client, close = serve_fake(ModelServer())
+    try:
+        samples = np.zeros(16000, dtype=np.float32)
+        result = client.transcribe("faster-whisper", "base", "auto", "auto", samples, "pt")
+        assert result == {"text": "16000 amostras", "language": "pt", "segments": []}
+
+        try:
+            client.transcribe("faster-whisper", "base", "auto", "auto", samples, "xx")
+            assert False, "deveria ter lançado ModelServerError"
+        except ModelServerError as e:
+            assert "idioma inválido" in str(e)
+
+        assert client.stats()["requests"] == 3
+    finally:
+        close()
+
+
+def test_transcriber_uses_server_and_falls_back():
+    from services import model_server
+
+    install_fake_faster_whisper()
+    client, close = serve_fake(ModelServer())
+    previous = model_server.model_server_client
+    model_server.model_server_client = client
+    try:
+        transcriber = local_transcriber()
+        transcriber._transcribe_in_process = lambda audio, language: {"local": True}
+        samples = np.zeros(800, dtype=np.float32)
+        assert transcriber._transcribe_samples(samples, "pt")["text"] == "800 amostras"
+
+        # Servidor fora do ar: transcreve neste processo
+        close()
+        unreachable = ModelServerClient(os.path.join(tempfile.gettempdir(), "clipgenius-inexistente.sock"), "00")
+        try:
+            unreachable.stats()
+            assert False, "deveria ter lançado ModelServerUnavailable"
+        except ModelServerUnavailable:
+            pass
+        model_server.model_server_client = unreachable
+        assert transcriber._transcribe_samples(samples, "pt") == {"local": True}
+    finally:
+        model_server.model_server_client = previous
+        close()
+        sys.modules.pop("faster_whisper", None)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Pool de Modelos")
+    print("=" * 60)
+
+    try:
+        test_lru_eviction_under_budget()
+        print("✅ LRU dentro do orçamento de memória")
+        test_concurrent_requests_load_once()
+        print("✅ requisições simultâneas carregam o modelo uma vez")
+        test_estimates_and_preload_spec()
+        print("✅ estimativas de tamanho e MODEL_PRELOAD")
+        test_transcribers_share_pooled_model()
+        print("✅ transcribers compartilham o modelo do pool")
+        test_model_server_round_trip()
+        print("✅ processo de inferência: ida e volta")
+        test_transcriber_uses_server_and_falls_back()
+        print("✅ transcriber usa o servidor e cai para o processo local")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
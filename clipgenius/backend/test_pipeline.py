@@ -0,0 +1,197 @@
+"""
+Teste do processamento em pipeline (services/pipeline.py e
+ClipAnalyzer.analyze_segment_stream)
+
+A transcrição é simulada por um gerador que entrega os segmentos em lotes,
+com pausas: a análise deve começar (e entregar clips) antes do fim da
+transcrição, com as mesmas janelas da análise map-reduce.
+"""
+import sys
+import threading
+import time
+
+from services.analyzer import ClipAnalyzer
+from services.pipeline import StageCancelled, StageCounters, run_streaming
+from test_analyzer_map_reduce import StubOllama, make_transcription, with_settings
+
+
+def batches(segments, size, delay=0.0, log=None):
+    """Segmentos em lotes de `size`, como chegariam de uma transcrição em streaming"""
+    for i in range(0, len(segments), size):
+        if delay:
+            time.sleep(delay)
+        if log is not None:
+            log.append(('batch', time.time(), None))
+        yield segments[i:i + size]
+
+
+def test_stream_windows_match_plan_windows():
+    with StubOllama() as stub:
+        analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+
+    for duration in (600, 1000, 3600, 3700):
+        segments = make_transcription(duration)['segments']
+        expected = analyzer._plan_windows(segments, window_seconds=900, overlap_seconds=90)
+        for size in (1, 7, 1000):
+            streamed = list(analyzer._stream_windows(batches(segments, size), window_seconds=900, overlap_seconds=90))
+            assert streamed == expected, f"duração {duration}, lotes de {size}"
+
+
+def test_run_streaming_overlaps_producer_and_consumer():
+    first_received = threading.Event()
+
+    def produce(emit):
+        emit(1)
+        # Só continua depois que o consumidor recebeu o primeiro item
+        assert first_received.wait(2)
+        emit(2)
+        return "fim"
+
+    items, future = run_streaming(produce)
+    received = []
+    for item in items:
+        received.append(item)
+        first_received.set()
+    assert received == [1, 2]
+    assert future.result(timeout=1) == "fim"
+
+
+def test_run_streaming_errors_and_cancel():
+    def failing(emit):
+        emit("a")
+        raise RuntimeError("falhou")
+
+    items, future = run_streaming(failing)
+    received = []
+    try:
+        for item in items:
+            received.append(item)
+        assert False, "deveria ter lançado RuntimeError"
+    except RuntimeError:
+        assert received == ["a"]
+
+    cancelled = threading.Event()
+
+    def endless(emit):
+        try:
+            while True:
+                emit(0)
+        except StageCancelled:
+            cancelled.set()
+            raise
+
+    items, future = run_streaming(endless, maxsize=2)
+    next(items)
+    items.close()
+    assert cancelled.wait(2)
+
+
+def test_segment_stream_yields_clips_before_transcription_ends():
+    viral = {100: 6, 850: 9, 1500: 4, 2000: 8, 2600: 7, 3300: 5}
+    segments = make_transcription(3600, viral)['segments']
+    previous = with_settings(
+        ANALYSIS_MAP_REDUCE_ENABLED=True,
+        ANALYSIS_WINDOW_SECONDS=900,
+        ANALYSIS_WINDOW_OVERLAP_SECONDS=90,
+        ANALYSIS_CONCURRENCY=2
+    )
+    log = []
+    progress = []
+    try:
+        with StubOllama(delay=0.01) as stub:
+            analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+            for clip in analyzer.analyze_segment_stream(
+                batches(segments, 20, delay=0.01, log=log),
+                total_duration=3600,
+                num_clips=4,
+                min_duration=15,
+                max_duration=60,
+                on_progress=progress.append
+            ):
+                log.append(('clip', time.time(), clip))
+    finally:
+        with_settings(**previous)
+
+    clips = [entry[2] for entry in log if entry[0] == 'clip']
+    kinds = [entry[0] for entry in log]
+    # O primeiro clip sai antes do último lote da transcrição
+    assert kinds.index('clip') < len(kinds) - 1 - kinds[::-1].index('batch')
+
+    # Uma requisição por janela, sem duplicar o momento em 850s (duas janelas)
+    assert len(stub.prompts) == 5
+    starts = [clip['start_time'] for clip in clips]
+    assert len(clips) == 4 and starts.count(850) == 1
+    for i, a in enumerate(clips):
+        for b in clips[i + 1:]:
+            assert not ClipAnalyzer._overlaps(a, b)
+
+    # Progresso da análise em ordem de tempo, até o fim da transcrição
+    assert progress == sorted(progress) and progress[-1] == 3600
+
+
+def test_segment_stream_short_transcript_single_pass():
+    segments = make_transcription(600, {100: 7})['segments']
+    previous = with_settings(ANALYSIS_MAP_REDUCE_ENABLED=True, ANALYSIS_STREAMING_ENABLED=False)
+    try:
+        with StubOllama() as stub:
+            analyzer = ClipAnalyzer(provider="ollama", base_url=stub.base_url, use_cache=False)
+            clips = list(analyzer.analyze_segment_stream(
+                batches(segments, 10), total_duration=600, num_clips=3, min_duration=15, max_duration=60
+            ))
+    finally:
+        with_settings(**previous)
+
+    assert len(stub.prompts) == 1
+    assert [clip['start_time'] for clip in clips] == [100]
+
+
+def test_stage_counters():
+    counters = StageCounters({'download': 'files', 'transcribe': 'seconds', 'render': 'clips'})
+    counters.start('download', total=2)
+    counters.advance('download')
+    counters.start('transcribe', total=100)
+    counters.set_done('transcribe', 25)
+    counters.start('render')
+    counters.advance('render', 3)
+
+    stages = counters.snapshot()
+    assert stages['download'] == {'state': 'running', 'done': 1, 'total': 2, 'unit': 'files'}
+    # Total desconhecido conta como 0% até o fim do estágio
+    weights = {'download': 20, 'transcribe': 40, 'render': 40}
+    assert StageCounters.overall_progress(stages, weights) == 20
+
+    counters.finish('render')
+    assert counters.snapshot()['render']['total'] == 3
+    counters.fail_running()
+    assert counters.snapshot()['transcribe']['state'] == 'failed'
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Processamento em Pipeline")
+    print("=" * 60)
+
+    try:
+        test_stream_windows_match_plan_windows()
+        print("✅ janelas incrementais iguais às do map-reduce")
+        test_run_streaming_overlaps_producer_and_consumer()
+        print("✅ produtor e consumidor sobrepostos")
+        test_run_streaming_errors_and_cancel()
+        print("✅ erro propagado e cancelamento do produtor")
+        test_segment_stream_yields_clips_before_transcription_ends()
+        print("✅ clips antes do fim da transcrição")
+        test_segment_stream_short_transcript_single_pass()
+        print("✅ transcrição curta em uma passada")
+        test_stage_counters()
+        print("✅ contadores por estágio")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
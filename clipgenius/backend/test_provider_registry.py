@@ -0,0 +1,159 @@
+"""
+Teste do registro de provedores de IA (services/provider_registry.py)
+
+Usa o servidor Ollama falso do teste de map-reduce e conta quantas vezes o
+health check (/api/tags) é chamado.
+"""
+import sys
+import threading
+import time
+
+from services.analyzer import ClipAnalyzer
+from services.provider_registry import ProviderRegistry
+from test_analyzer_map_reduce import StubOllama
+
+
+class CountingAnalyzer(ClipAnalyzer):
+    checks = 0
+    fail = False
+
+    def verify(self):
+        CountingAnalyzer.checks += 1
+        if CountingAnalyzer.fail:
+            raise ConnectionError("Ollama fora do ar")
+        super().verify()
+
+
+def reset():
+    CountingAnalyzer.checks = 0
+    CountingAnalyzer.fail = False
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.01)
+    return condition()
+
+
+def test_analyzer_is_shared_and_verified_once():
+    reset()
+    with StubOllama() as stub:
+        registry = ProviderRegistry(ttl_seconds=60, analyzer_factory=CountingAnalyzer)
+        first = registry.get_analyzer("ollama", stub.base_url)
+        for _ in range(5):
+            assert registry.get_analyzer("ollama", stub.base_url) is first
+        assert CountingAnalyzer.checks == 1
+
+        status = registry.status()
+        assert len(status) == 1 and status[0]['healthy'] is True
+
+
+def test_stale_health_is_refreshed_in_background():
+    reset()
+    with StubOllama() as stub:
+        registry = ProviderRegistry(ttl_seconds=0.05, analyzer_factory=CountingAnalyzer)
+        analyzer = registry.get_analyzer("ollama", stub.base_url)
+        time.sleep(0.1)
+        # Resultado vencido: devolve o analyzer já verificado e revalida em segundo plano
+        assert registry.get_analyzer("ollama", stub.base_url) is analyzer
+        assert wait_for(lambda: CountingAnalyzer.checks == 2)
+
+
+def test_failure_is_cached_until_failure_ttl():
+    reset()
+    CountingAnalyzer.fail = True
+    with StubOllama() as stub:
+        registry = ProviderRegistry(ttl_seconds=60, failure_ttl_seconds=0.1, analyzer_factory=CountingAnalyzer)
+        for _ in range(3):
+            try:
+                registry.get_analyzer("ollama", stub.base_url)
+                assert False, "deveria ter lançado ConnectionError"
+            except ConnectionError as e:
+                # O erro lançado é o guardado no próprio resultado
+                assert e is registry._entry("ollama", stub.base_url).health.exception
+        assert CountingAnalyzer.checks == 1
+
+        # Provedor volta: após o TTL de falha, nova verificação
+        CountingAnalyzer.fail = False
+        time.sleep(0.15)
+        assert registry.get_analyzer("ollama", stub.base_url) is not None
+        assert CountingAnalyzer.checks == 2
+
+
+class FlakyAnalyzer:
+    """Alterna entre falha e sucesso a cada verificação (sem rede)"""
+    def __init__(self, provider=None, base_url=None, verify=True):
+        self.provider, self.model, self.base_url = provider, "stub", base_url
+        self.checks = 0
+
+    def verify(self):
+        self.checks += 1
+        if self.checks % 2:
+            raise ConnectionError("Ollama fora do ar")
+
+
+def test_concurrent_checks_raise_the_read_health():
+    registry = ProviderRegistry(ttl_seconds=60, failure_ttl_seconds=60, analyzer_factory=FlakyAnalyzer)
+    entry = registry._entry("ollama", "http://stub")
+    done = threading.Event()
+    unexpected = []
+
+    def flip():
+        # Outra thread revalidando sem parar: saudável e com falha alternados
+        while not done.is_set():
+            registry._check(entry, entry.health)
+
+    def use():
+        for _ in range(50000):
+            try:
+                registry.get_analyzer("ollama", "http://stub")
+            except ConnectionError:
+                pass
+            except Exception as e:
+                unexpected.append(e)
+
+    # Trocas de thread frequentes: expõe leituras fora do lock
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    flipper = threading.Thread(target=flip)
+    readers = [threading.Thread(target=use) for _ in range(4)]
+    try:
+        flipper.start()
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+    finally:
+        done.set()
+        flipper.join()
+        sys.setswitchinterval(previous)
+    # O erro lançado é sempre o do resultado lido, nunca `raise None`
+    assert unexpected == []
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Registro de Provedores")
+    print("=" * 60)
+
+    try:
+        test_analyzer_is_shared_and_verified_once()
+        print("✅ analyzer compartilhado, verificado uma vez")
+        test_stale_health_is_refreshed_in_background()
+        print("✅ revalidação em segundo plano")
+        test_failure_is_cached_until_failure_ttl()
+        print("✅ falha em cache até o TTL de falha")
+        test_concurrent_checks_raise_the_read_health()
+        print("✅ verificações simultâneas lançam o erro do resultado lido")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Teste da transcrição remota em chunks paralelos (Groq/Deepgram/AssemblyAI)
+
+Usa um servidor HTTP local no lugar da API do Groq, que:
+- responde com as palavras de uma transcrição "verdadeira" dentro do trecho enviado
+- devolve 429 na primeira tentativa de cada chunk (testa retry/backoff)
+- mede quantas requests chegam ao mesmo tempo (testa limite de concorrência)
+"""
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from services import transcriber_v2 as transcriber_v2_module
+from services.transcriber_v2 import TranscriberV2
+from services.remote_transcription import (
+    ChunkedRemoteTranscriber,
+    RemoteTranscriptionError,
+    call_with_retry,
+    plan_chunks
+)
+
+# Transcrição "verdadeira": uma palavra a cada 0.5s durante 100s
+TOTAL_DURATION = 100.0
+TRUE_WORDS = [
+    {'word': f"palavra{i}", 'start': i * 0.5, 'end': i * 0.5 + 0.4}
+    for i in range(int(TOTAL_DURATION / 0.5))
+]
+
+CHUNK_RE = re.compile(rb'CHUNK(\{.*?\})END')
+
+
+class StandInState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.attempts = {}
+        self.requests = 0
+
+
+class StandInGroqHandler(BaseHTTPRequestHandler):
+    """Imita POST /openai/v1/audio/transcriptions (verbose_json com palavras)"""
+    state: StandInState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        match = CHUNK_RE.search(body)
+        if not match or self.headers.get('Authorization') != 'Bearer test-key':
+            self._send(400, {'error': 'bad request'})
+            return
+        chunk = json.loads(match.group(1))
+        key = (chunk['start'], chunk['end'])
+
+        state = self.state
+        with state.lock:
+            state.requests += 1
+            state.attempts[key] = state.attempts.get(key, 0) + 1
+            first_attempt = state.attempts[key] == 1
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+
+        try:
+            time.sleep(0.05)
+            if first_attempt:
+                self._send(429, {'error': 'rate limited'}, {'Retry-After': '0'})
+                return
+
+            # Palavras dentro do trecho, cortadas nas bordas, com tempo relativo
+            # e um pequeno desvio (cada chunk "ouve" a palavra um pouco diferente)
+            words = []
+            for word in TRUE_WORDS:
+                if word['end'] <= chunk['start'] or word['start'] >= chunk['end']:
+                    continue
+                start = max(word['start'], chunk['start']) - chunk['start']
+                end = min(word['end'], chunk['end']) - chunk['start']
+                words.append({'word': word['word'], 'start': start + 0.02, 'end': end + 0.02})
+
+            self._send(200, {
+                'text': ' '.join(w['word'] for w in words),
+                'language': 'pt',
+                'words': words,
+                'segments': []
+            })
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+
+def start_stand_in_server():
+    state = StandInState()
+    handler = type('Handler', (StandInGroqHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/openai/v1/audio/transcriptions"
+    return server, state, url
+
+
+def fake_extract_chunk(audio_path, spec, output_path):
+    """No lugar do FFmpeg: o "áudio" do chunk só descreve o trecho"""
+    with open(output_path, 'wb') as f:
+        f.write(b'CHUNK' + json.dumps({'start': spec.start, 'end': spec.end}).encode() + b'END')
+
+
+@contextmanager
+def groq_api_key(key="test-key"):
+    """Chave do Groq para o teste (o config já foi importado: o ambiente não adianta)"""
+    previous = (config.GROQ_API_KEY, transcriber_v2_module.GROQ_API_KEY)
+    config.GROQ_API_KEY = transcriber_v2_module.GROQ_API_KEY = key
+    try:
+        yield
+    finally:
+        config.GROQ_API_KEY, transcriber_v2_module.GROQ_API_KEY = previous
+
+
+def make_transcriber(url):
+    transcriber = TranscriberV2(backend="groq", use_cache=False, streaming=False)
+    transcriber.GROQ_API_URL = url
+    return transcriber
+
+
+def test_plan_chunks():
+    chunks = plan_chunks(100.0, 30.0, 4.0)
+    assert [c.core_start for c in chunks] == [0.0, 30.0, 60.0, 90.0]
+    assert chunks[0].start == 0.0 and chunks[-1].end == 100.0
+    # Sobra menor que a sobreposição é absorvida pelo último chunk
+    assert plan_chunks(62.0, 30.0, 4.0)[-1].core_end == 62.0
+    for previous, current in zip(chunks, chunks[1:]):
+        # Vizinhos compartilham `overlap` segundos ao redor da fronteira
+        assert previous.end - current.start == 4.0
+
+
+def test_chunked_parallel_transcription():
+    server, state, url = start_stand_in_server()
+    try:
+        with groq_api_key():
+            transcriber = make_transcriber(url)
+            engine = ChunkedRemoteTranscriber(
+                transcribe_chunk=transcriber._groq_request,
+                build_segments=transcriber._create_segments_from_words,
+                backend_name="groq",
+                chunk_seconds=20.0,
+                overlap_seconds=4.0,
+                max_concurrency=3,
+                retry_base_delay=0.01,
+                extract_chunk=fake_extract_chunk,
+                use_vad=False
+            )
+            result = engine.transcribe("stand-in.wav", language="pt", total_duration=TOTAL_DURATION)
+
+        # Sem palavras duplicadas ou faltando nas fronteiras
+        assert [w['word'] for w in result['words']] == [w['word'] for w in TRUE_WORDS]
+        # Tempos absolutos (offset de cada chunk aplicado)
+        for word, true_word in zip(result['words'], TRUE_WORDS):
+            assert abs(word['start'] - true_word['start']) < 0.1
+        assert result['duration'] == TOTAL_DURATION
+        assert result['backend'] == "groq"
+        assert sum(len(s['words']) for s in result['segments']) == len(TRUE_WORDS)
+
+        # Concorrência limitada (e de fato paralela)
+        assert 1 < state.max_in_flight <= 3
+        # Cada chunk falhou uma vez (429) e foi repetido
+        assert all(count == 2 for count in state.attempts.values())
+        assert len(state.attempts) == len(plan_chunks(TOTAL_DURATION, 20.0, 4.0))
+    finally:
+        server.shutdown()
+
+
+def test_non_retryable_error_is_not_retried():
+    calls = []
+
+    def failing_request():
+        calls.append(1)
+        raise RemoteTranscriptionError("bad request", status_code=400)
+
+    try:
+        call_with_retry(failing_request, max_retries=3, base_delay=0.01)
+        assert False, "deveria ter lançado RemoteTranscriptionError"
+    except RemoteTranscriptionError:
+        pass
+    assert len(calls) == 1
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste de Transcrição Remota em Chunks")
+    print("=" * 60)
+
+    try:
+        test_plan_chunks()
+        print("✅ plan_chunks")
+        test_chunked_parallel_transcription()
+        print("✅ transcrição paralela com servidor local")
+        test_non_retryable_error_is_not_retried()
+        print("✅ erro não-retryable")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
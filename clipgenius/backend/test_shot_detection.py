@@ -0,0 +1,117 @@
+"""
+Teste da detecção de cortes de cena no reframe (services/shot_detector.py)
+
+Os cortes são detectados nas mesmas amostras da detecção de rostos: o caminho
+da câmera reinicia em cada corte (salto em vez de pan lento) e amostras
+estáticas reaproveitam a detecção anterior.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import services.reframer as reframer_module
+from services.camera_path import plan_camera_path
+from services.face_track import FaceTrack
+from services.reframer import AIReframer, FacePosition
+from services.shot_detector import ShotDetector
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+def shot_frames(level: int, count: int, seed: int = 0) -> np.ndarray:
+    """Frames de um plano: fundo `level` com um pouco de ruído"""
+    rng = np.random.default_rng(seed)
+    frames = np.full((count, 90, 160, 3), level, dtype=np.int16)
+    frames += rng.integers(-2, 3, size=frames.shape)
+    return np.clip(frames, 0, 255).astype(np.uint8)
+
+
+def test_cuts_and_static_samples_across_batches():
+    frames = np.concatenate([shot_frames(40, 5), shot_frames(200, 5, seed=1)])
+    detector = ShotDetector(cut_threshold=0.4, static_threshold=0.015)
+    cuts, statics = [], []
+    for i in range(0, len(frames), 3):
+        cut, static = detector.update(frames[i:i + 3])
+        cuts.extend(cut.tolist())
+        statics.extend(static.tolist())
+
+    assert [i for i, c in enumerate(cuts) if c] == [5]
+    # Só a primeira amostra de cada plano passa pelo detector de rostos
+    assert [i for i, s in enumerate(statics) if not s] == [0, 5]
+
+
+def test_camera_jumps_at_cut_instead_of_panning():
+    times = np.arange(20) * 0.5
+    x = np.where(times < 5, 0.2, 0.8)
+    positions = [
+        FacePosition(frame_num=i * 15, timestamp=t, center_x=v, center_y=0.4, width=0.1, height=0.1, confidence=0.9)
+        for i, (t, v) in enumerate(zip(times, x))
+    ]
+    with_cut = plan_camera_path(FaceTrack.from_positions(positions, 0.5, cuts=[5.0]))
+    without_cut = plan_camera_path(FaceTrack.from_positions(positions, 0.5))
+
+    before, after = with_cut.at(np.array([4.99, 5.0]))[0]
+    assert abs(before - 0.2) < 1e-6 and abs(after - 0.8) < 1e-6
+    # Sem o corte a câmera ainda está no meio do caminho depois do corte
+    assert without_cut.at(np.array([5.5]))[0][0] < 0.6
+
+
+def test_detect_face_track_skips_static_samples():
+    reframer = AIReframer()
+    reframer.face_detector = object()
+    calls = []
+
+    def fake_detect(rgb_frame):
+        level = float(rgb_frame.mean())
+        calls.append(level)
+        return (0.3 if level < 128 else 0.7, 0.4, 0.1, 0.1, 0.9)
+
+    reframer._detect_face_in_frame = fake_detect
+    previous = reframer_module.MEDIAPIPE_AVAILABLE
+    reframer_module.MEDIAPIPE_AVAILABLE = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            video = Path(tmp) / "source.avi"
+            writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*'MJPG'), 30, (320, 180))
+            for n in range(120):
+                writer.write(np.full((180, 320, 3), 60 if n < 60 else 200, dtype=np.uint8))
+            writer.release()
+            track = reframer.detect_face_track(str(video), sample_interval=0.5)
+    finally:
+        reframer_module.MEDIAPIPE_AVAILABLE = previous
+
+    # 8 amostras, 2 planos estáticos: só 2 chamadas ao detector
+    assert len(calls) == 2
+    assert len(track) == 8 and track.cuts.tolist() == [2.0]
+    assert track.center_x.tolist() == [np.float32(0.3)] * 4 + [np.float32(0.7)] * 4
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste de Cortes de Cena no Reframe")
+    print("=" * 60)
+
+    try:
+        test_cuts_and_static_samples_across_batches()
+        print("✅ cortes e amostras estáticas entre lotes")
+        test_camera_jumps_at_cut_instead_of_panning()
+        print("✅ câmera salta no corte")
+        if cv2 is not None:
+            test_detect_face_track_skips_static_samples()
+            print("✅ planos estáticos não repetem a detecção")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Teste do armazenamento binário de transcrições (services/transcript_store.py)
+"""
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from services.transcript_store import TranscriptStore, WORD_DTYPE
+
+
+def make_transcription(count: int = 5000, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = ['de', 'que', 'não', 'o', 'a', 'é', 'então', 'muito', 'você', 'isso.']
+    words = []
+    t = 0.0
+    for _ in range(count):
+        t += rng.uniform(0.05, 0.4)
+        end = t + rng.uniform(0.1, 0.5)
+        words.append({
+            'word': rng.choice(vocabulary),
+            'start': round(t, 3),
+            'end': round(end, 3),
+            'probability': round(rng.random(), 4)
+        })
+        t = end
+
+    segments = []
+    for i in range(0, count, 12):
+        chunk = words[i:i + 12]
+        segments.append({
+            'id': len(segments),
+            'start': chunk[0]['start'],
+            'end': chunk[-1]['end'],
+            'text': ' '.join(w['word'] for w in chunk),
+            'words': chunk
+        })
+    return {
+        'text': ' '.join(s['text'] for s in segments),
+        'language': 'pt',
+        'duration': t,
+        'segments': segments,
+        'words': words,
+        'backend': 'whisperx-enhanced',
+        'audio_path': None,
+        'audio_hash': 'abc123'
+    }
+
+
+def test_round_trip():
+    transcription = make_transcription()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TranscriptStore(Path(tmp))
+        path = store.save(transcription, "project_1")
+
+        loaded = store.load(path)
+        assert loaded == json.loads(json.dumps(transcription))
+        # Segmentos compartilham os dicts das palavras (como o transcriber produz)
+        assert loaded['segments'][0]['words'][0] is loaded['words'][0]
+
+        # Muito menor que o JSON (tempos float32 + strings internadas)
+        assert Path(path).stat().st_size < len(json.dumps(transcription)) / 3
+
+
+def test_json_round_tripped_input_and_extra_segment_words():
+    transcription = json.loads(json.dumps(make_transcription(count=100)))
+    # Palavra que só existe num segmento (não está na lista principal)
+    extra = {'word': 'extra', 'start': 999.0, 'end': 999.5, 'probability': 1.0}
+    transcription['segments'][-1]['words'].append(extra)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TranscriptStore(Path(tmp))
+        loaded = store.load(store.save(transcription, "project_2"))
+        assert loaded == transcription
+        assert len(loaded['words']) == 100
+
+
+def test_memory_mapped_view():
+    transcription = make_transcription(count=1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TranscriptStore(Path(tmp))
+        with store.open(store.save(transcription, "project_3")) as stored:
+            assert stored.words.dtype == WORD_DTYPE
+            assert len(stored.words) == 1000
+            assert stored.meta['language'] == 'pt'
+            # Vocabulário de 10 palavras + textos dos segmentos
+            assert len(stored.strings) <= 10 + len(transcription['segments'])
+            assert abs(float(stored.words['start'][500]) - transcription['words'][500]['start']) < 1e-3
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Armazenamento de Transcrições")
+    print("=" * 60)
+
+    try:
+        test_round_trip()
+        print("✅ ida e volta")
+        test_json_round_tripped_input_and_extra_segment_words()
+        print("✅ entrada vinda de JSON / palavras só no segmento")
+        test_memory_mapped_view()
+        print("✅ leitura via mmap")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
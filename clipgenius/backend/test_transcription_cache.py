@@ -0,0 +1,171 @@
+"""
+Teste do cache de transcrições (services/transcription_cache.py)
+"""
+import hashlib
+import sys
+import tempfile
+import time
+import types
+import wave
+from pathlib import Path
+
+from services import audio_stream
+from services.transcription_cache import TranscriptionCache
+
+
+def transcription(text, words=0):
+    return {
+        'text': text,
+        'segments': [{'start': 0.0, 'end': 1.0, 'text': text}],
+        # Palavras com conteúdo variado: o gzip não reduz tudo a quase nada
+        'words': [{'word': f"{text}{i * 7919 % 10007}", 'start': i * 0.5, 'end': i * 0.5 + 0.4} for i in range(words)]
+    }
+
+
+def test_hit_miss_and_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptionCache(Path(tmp))
+        key = cache.make_key("hash", "groq", "base", "pt", False)
+        assert cache.get(key) is None
+
+        cache.put(key, transcription("olá"))
+        assert cache.get(key)['text'] == "olá"
+
+        # Qualquer parte da chave diferente é outra transcrição
+        variants = [
+            cache.make_key("outro", "groq", "base", "pt", False),
+            cache.make_key("hash", "faster-whisper", "base", "pt", False),
+            cache.make_key("hash", "groq", "small", "pt", False),
+            cache.make_key("hash", "groq", "base", "en", False),
+            cache.make_key("hash", "groq", "base", "pt", True),
+            cache.make_key("hash", "groq", "base", "pt", False, "int8", 5, 5),
+            cache.make_key("hash", "groq", "base", "pt", False, "int8", 5, 5, "batched"),
+        ]
+        assert len(set(variants + [key])) == len(variants) + 1
+        assert all(cache.get(variant) is None for variant in variants)
+        # Idioma ausente e "auto" são o mesmo
+        assert cache.make_key("hash", "groq", "base", None, False) == cache.make_key("hash", "groq", "base", "auto", False)
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['stores']) == (1, 1 + len(variants), 1)
+        assert stats['hit_rate'] == round(1 / (2 + len(variants)), 4)
+        assert stats['entries'] == 1 and stats['size_bytes'] > 0
+
+
+def test_lru_eviction_by_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptionCache(Path(tmp), max_bytes=10 ** 9)
+        keys = [cache.make_key(f"hash{i}", "groq", "base", "pt", False) for i in range(3)]
+        for key in keys[:2]:
+            cache.put(key, transcription(key[:6], words=400))
+        entry_size = cache.stats()['size_bytes'] // 2
+
+        # Cabem duas entradas: a terceira expulsa a menos usada recentemente
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        time.sleep(0.01)
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[2], transcription(keys[2][:6], words=400))
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+        stats = cache.stats()
+        assert stats['evictions'] == 1 and stats['entries'] == 2
+        assert stats['size_bytes'] <= cache.max_bytes
+        assert not cache._entry_path(keys[1]).exists()
+
+
+def test_video_audio_hash():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptionCache(Path(tmp) / "cache")
+        video = Path(tmp) / "video.mp4"
+        video.write_bytes(b"video")
+        assert cache.get_audio_hash(str(video)) == (None, None)
+
+        cache.remember_audio_hash(str(video), "hash", "/tmp/audio.wav")
+        assert cache.get_audio_hash(str(video)) == ("hash", "/tmp/audio.wav")
+
+        # Arquivo alterado: outra impressão digital
+        video.write_bytes(b"outro video")
+        assert cache.get_audio_hash(str(video)) == (None, None)
+
+
+def test_wav_hash_is_pcm_hash():
+    with tempfile.TemporaryDirectory() as tmp:
+        pcm = bytes(range(256)) * 100
+        path = Path(tmp) / "audio.wav"
+        with wave.open(str(path), 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(pcm)
+
+        # Só as amostras: mesmo hash do PCM lido no streaming
+        assert TranscriptionCache.hash_wav(str(path)) == hashlib.sha256(pcm).hexdigest()
+        other = Path(tmp) / "audio.bin"
+        other.write_bytes(pcm)
+        assert TranscriptionCache.hash_wav(str(other)) == TranscriptionCache.hash_file(str(other))
+
+
+def test_streaming_duplicate_video_hits_content_key():
+    from services.transcriber_v2 import TranscriberV2
+
+    fake = types.ModuleType("faster_whisper")
+    fake.WhisperModel = object
+    sys.modules["faster_whisper"] = fake
+    previous_hash_pcm = audio_stream.hash_pcm
+    audio_stream.hash_pcm = lambda video_path: "pcm"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            transcriber = TranscriberV2(backend="faster-whisper", model_size="base", device="cpu", streaming=True)
+            transcriber._cache = TranscriptionCache(Path(tmp) / "cache")
+            streamed = []
+
+            def transcribe_stream(video_path, language, enhance_timestamps=True, on_segments=None):
+                streamed.append(video_path)
+                return dict(transcription("olá"), audio_path=None, audio_hash="pcm")
+
+            transcriber.transcribe_stream = transcribe_stream
+            videos = [Path(tmp) / "upload.mp4", Path(tmp) / "download.mp4"]
+            for i, video in enumerate(videos):
+                video.write_bytes(b"video" * (i + 1))
+
+            assert transcriber.transcribe_video(str(videos[0]), "pt")['text'] == "olá"
+            # Outro arquivo com o mesmo áudio: sem nova transcrição
+            segments = []
+            result = transcriber.transcribe_video(str(videos[1]), "pt", on_segments=segments.extend)
+            assert result['text'] == "olá" and result['audio_path'] is None
+            assert streamed == [str(videos[0])] and len(segments) == 1
+            # ... e o vídeo passa a ser conhecido
+            assert transcriber.cache.get_audio_hash(str(videos[1]))[0] == "pcm"
+    finally:
+        audio_stream.hash_pcm = previous_hash_pcm
+        sys.modules.pop("faster_whisper", None)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do Cache de Transcrições")
+    print("=" * 60)
+
+    try:
+        test_hit_miss_and_key()
+        print("✅ hit/miss e chave por backend, modelo, idioma e timestamps")
+        test_lru_eviction_by_size()
+        print("✅ remoção LRU pelo tamanho em disco")
+        test_video_audio_hash()
+        print("✅ vídeo inalterado -> hash do áudio")
+        test_wav_hash_is_pcm_hash()
+        print("✅ hash do WAV igual ao hash do PCM")
+        test_streaming_duplicate_video_hits_content_key()
+        print("✅ streaming reaproveita a transcrição do mesmo áudio")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
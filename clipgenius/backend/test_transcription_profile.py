@@ -0,0 +1,158 @@
+"""
+Teste da calibração do perfil de transcrição (services/transcription_profile.py)
+
+A transcrição é simulada: cada combinação devolve as palavras de referência
+com um desvio e um tempo de processamento conhecidos.
+"""
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+from services import transcription_profile
+from services.transcription_cache import TranscriptionCache
+from services.transcription_profile import (
+    TranscriptionProfile,
+    calibration_candidates,
+    choose_profile,
+    compare_words,
+    load_transcription_profile,
+    run_calibration
+)
+
+REFERENCE = [
+    {"word": w, "start": i * 0.5, "end": i * 0.5 + 0.4}
+    for i, w in enumerate("o rato roeu a roupa do rei de roma".split())
+]
+
+
+def shifted(words, delta, drop=()):
+    return [
+        {**word, "start": word["start"] + delta}
+        for i, word in enumerate(words) if i not in drop
+    ]
+
+
+def test_compare_words():
+    assert compare_words(REFERENCE, REFERENCE) == (1.0, 0.0)
+
+    match, drift = compare_words(REFERENCE, shifted(REFERENCE, 0.1))
+    assert match == 1.0 and abs(drift - 0.1) < 1e-9
+
+    # Pontuação e maiúsculas não contam; palavra faltando reduz o match
+    words = [{**w, "word": w["word"].capitalize() + ","} for w in shifted(REFERENCE, 0, drop=(3,))]
+    match, drift = compare_words(REFERENCE, words)
+    assert abs(match - 8 / 9) < 1e-9 and drift == 0.0
+
+
+def test_candidates_most_precise_first():
+    candidates = calibration_candidates(["faster-whisper", "stable-ts"], "cpu", [8, 4], [1, 5], 1)
+    assert candidates[0] == ("faster-whisper", "float32", 8, 5, 1)
+    assert {c[1] for c in candidates if c[0] == "stable-ts"} == {"float32"}
+    assert len(candidates) == (3 + 1) * 2 * 2
+    assert candidates[-1][1] == "int8"
+
+
+def test_calibration_picks_fastest_accurate():
+    # compute type -> (segundos de processamento, desvio das palavras)
+    behavior = {"float32": (0.03, 0.0), "int8_float32": (0.02, 0.05), "int8": (0.005, 0.4)}
+    candidates = calibration_candidates(["faster-whisper"], "cpu", [2], [1], 1) + [("faster-whisper", "quebrado", 2, 1, 1)]
+
+    def transcribe(candidate, samples):
+        if candidate[1] == "quebrado":
+            raise RuntimeError("compute type não suportado")
+        seconds, drift = behavior[candidate[1]]
+        time.sleep(seconds)
+        return {"words": shifted(REFERENCE, drift)}
+
+    samples = np.zeros(16000, dtype=np.float32)
+    results = run_calibration(samples, candidates, transcribe)
+
+    by_type = {r["compute_type"]: r for r in results}
+    assert by_type["float32"]["word_drift"] == 0.0  # referência = combinação mais precisa
+    assert by_type["int8"]["word_drift"] == 0.4
+    assert by_type["quebrado"]["error"] is not None
+
+    best = choose_profile(results, min_word_match=0.9, max_word_drift=0.15)
+    assert best["compute_type"] == "int8_float32"
+    # Com um limite de desvio folgado, o int8 (mais rápido) passa
+    assert choose_profile(results, min_word_match=0.9, max_word_drift=1.0)["compute_type"] == "int8"
+    assert choose_profile(results, min_word_match=1.1) is None
+
+
+def test_transcriber_uses_profile():
+    from services.transcriber_v2 import TranscriberV2
+
+    fake = types.ModuleType("faster_whisper")
+    fake.WhisperModel = object
+    sys.modules["faster_whisper"] = fake
+    previous_path = transcription_profile.TRANSCRIPTION_PROFILE_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        transcription_profile.TRANSCRIPTION_PROFILE_PATH = Path(tmp) / "profile.json"
+        try:
+            assert load_transcription_profile() is None
+            TranscriptionProfile(
+                backend="faster-whisper",
+                model_size="base",
+                device="cpu",
+                compute_type="int8_float32",
+                cpu_threads=6,
+                beam_size=2,
+                best_of=3
+            ).save()
+            profile = load_transcription_profile()
+            assert profile.compute_type == "int8_float32" and profile.cpu_threads == 6
+
+            transcriber = TranscriberV2(backend="auto", model_size="base", device="cpu", use_cache=False)
+            assert transcriber.backend == "faster-whisper"
+            assert transcriber._get_compute_type("cpu") == "int8_float32"
+            assert (transcriber.cpu_threads, transcriber.beam_size, transcriber.best_of) == (6, 2, 3)
+
+            # Valores explícitos e outro modelo ignoram o perfil
+            explicit = TranscriberV2(
+                backend="faster-whisper", model_size="base", device="cpu", compute_type="int8", beam_size=5
+            )
+            assert explicit._get_compute_type("cpu") == "int8" and explicit.beam_size == 5
+            # ... e não reaproveitam transcrições em cache do perfil
+            assert transcriber._decoding_settings()[:3] == ("int8_float32", 2, 3)
+            assert explicit._decoding_settings()[:2] == ("int8", 5)
+            keys = {
+                TranscriptionCache.make_key("hash", "faster-whisper", "base", "pt", True, *t._decoding_settings())
+                for t in (transcriber, explicit)
+            }
+            assert len(keys) == 2
+            other = TranscriberV2(backend="faster-whisper", model_size="small", device="cpu")
+            assert other.profile is None and other._get_compute_type("cpu") == "int8"
+        finally:
+            transcription_profile.TRANSCRIPTION_PROFILE_PATH = previous_path
+            sys.modules.pop("faster_whisper", None)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste da Calibração de Transcrição")
+    print("=" * 60)
+
+    try:
+        test_compare_words()
+        print("✅ match e desvio das palavras")
+        test_candidates_most_precise_first()
+        print("✅ combinações, mais precisa primeiro")
+        test_calibration_picks_fastest_accurate()
+        print("✅ escolhe a combinação mais rápida dentro da precisão")
+        test_transcriber_uses_profile()
+        print("✅ TranscriberV2 usa o perfil calibrado")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Teste do VAD por energia (services/vad.py) e dos chunks só com fala
+
+Usa áudio sintético: "fala" (ruído modulado alto) intercalada com pausas
+(ruído de fundo baixo), com tempos conhecidos.
+"""
+import os
+import sys
+import tempfile
+import wave
+
+import numpy as np
+
+from services.audio_stream import SAMPLE_RATE
+from services.remote_transcription import plan_vad_chunks, stitch_words
+from services.vad import (
+    SpeechChunk,
+    detect_speech_regions,
+    frame_energies,
+    plan_speech_chunks,
+    speech_chunk_from_samples
+)
+
+# (início, fim) das falas; pausas longas entre 20-35s e 50-80s
+SPEECH = [(1.0, 8.0), (8.3, 19.0), (35.0, 49.0), (80.0, 95.0)]
+DURATION = 100.0
+
+
+def make_audio(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 0.002, int(DURATION * SAMPLE_RATE)).astype(np.float32)
+    for start, end in SPEECH:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        t = np.arange(b - a) / SAMPLE_RATE
+        # Sílabas: envelope de 4 Hz sobre ruído
+        envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 4 * t))
+        samples[a:b] += (rng.normal(0, 0.2, b - a) * envelope).astype(np.float32)
+    return np.clip(samples, -1, 1)
+
+
+def write_wav(samples: np.ndarray, path: str):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype('<i2').tobytes())
+
+
+def test_detect_speech_regions():
+    regions = detect_speech_regions(frame_energies(make_audio()), DURATION, pad=0.0)
+
+    # Pausa curta (8.0-8.3s) fica dentro da região; pausas longas separam
+    assert len(regions) == 3, regions
+    expected = [(1.0, 19.0), (35.0, 49.0), (80.0, 95.0)]
+    for (start, end), (true_start, true_end) in zip(regions, expected):
+        assert abs(start - true_start) < 0.1 and abs(end - true_end) < 0.1
+
+
+def test_constant_speech_is_one_region():
+    rng = np.random.default_rng(1)
+    samples = rng.normal(0, 0.2, 30 * SAMPLE_RATE).astype(np.float32)
+    assert detect_speech_regions(frame_energies(samples), 30.0) == [(0.0, 30.0)]
+
+
+def test_speech_chunks_cut_at_silences():
+    audio = make_audio()
+    energies = frame_energies(audio)
+    regions = detect_speech_regions(energies, DURATION)
+    chunks = plan_speech_chunks(regions, 25.0, energies)
+
+    speech_total = sum(chunk.speech_duration for chunk in chunks)
+    assert speech_total < 50.0  # As pausas longas (~45s) não são enviadas
+    assert len(chunks) == 3
+    for chunk, (start, end) in zip(chunks, [(1.0, 19.0), (35.0, 49.0), (80.0, 95.0)]):
+        # Nenhuma região passa de 25s: cada fala inteira vira um chunk
+        assert chunk.speech_duration <= 25.0
+        assert abs(chunk.start - start) < 0.5 and abs(chunk.end - end) < 0.5
+
+    # Limite menor que a fala: divide perto do limite, sem perder áudio
+    split = plan_speech_chunks([(1.0, 19.0)], 10.0, energies)
+    assert all(chunk.speech_duration <= 10.0 for chunk in split)
+    assert all(a.end == b.start for a, b in zip(split, split[1:]))
+    assert split[0].start == 1.0 and split[-1].end == 19.0
+
+
+def test_to_source_time_and_splice():
+    chunk = SpeechChunk([(10.0, 12.0), (20.0, 23.0)])
+    assert chunk.speech_duration == 5.0
+    assert chunk.to_source_time(0.5) == 10.5
+    assert chunk.to_source_time(2.0) == 20.0
+    assert chunk.to_source_time(4.0) == 22.0
+
+    samples = np.arange(30 * SAMPLE_RATE, dtype=np.float32)
+    spliced = chunk.splice(samples[5 * SAMPLE_RATE:], offset=5.0)
+    assert len(spliced) == 5 * SAMPLE_RATE
+    assert spliced[0] == 10 * SAMPLE_RATE and spliced[2 * SAMPLE_RATE] == 20 * SAMPLE_RATE
+
+    assert speech_chunk_from_samples(np.zeros(SAMPLE_RATE, dtype=np.float32)) is None
+
+
+def test_remote_vad_chunks():
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+        wav_path = tmp.name
+    try:
+        write_wav(make_audio(), wav_path)
+        chunks = plan_vad_chunks(wav_path, 25.0)
+        assert chunks and all(c.core_start == c.start and c.core_end == c.end for c in chunks)
+
+        # Cada chunk "ouve" uma palavra no início do seu áudio concatenado;
+        # o tempo volta para a primeira região do chunk
+        parts = [(spec, {'words': [{'word': f"w{spec.index}", 'start': 0.1, 'end': 0.3}]}) for spec in chunks]
+        words = stitch_words(parts)
+        assert [w['start'] for w in words] == [spec.regions[0][0] + 0.1 for spec in chunks]
+
+        # Não-WAV: sem VAD (cai no plano fixo com sobreposição)
+        with open(wav_path, 'wb') as f:
+            f.write(b'not a wav')
+        assert plan_vad_chunks(wav_path, 25.0) is None
+    finally:
+        os.unlink(wav_path)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do VAD")
+    print("=" * 60)
+
+    try:
+        test_detect_speech_regions()
+        print("✅ regiões de fala")
+        test_constant_speech_is_one_region()
+        print("✅ áudio sem pausas")
+        test_speech_chunks_cut_at_silences()
+        print("✅ chunks cortados em silêncios")
+        test_to_source_time_and_splice()
+        print("✅ conversão de tempo e splice")
+        test_remote_vad_chunks()
+        print("✅ chunks do VAD na transcrição remota")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
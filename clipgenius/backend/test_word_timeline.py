@@ -0,0 +1,147 @@
+"""
+Teste do WordTimeline (services/word_timeline.py)
+
+Compara as consultas com busca binária com os filtros lineares que elas
+substituem (get_text_for_timerange, detector de sentenças, associação de
+palavras aos segmentos).
+"""
+import random
+import sys
+
+from services.word_timeline import WordTimeline
+from services.sentence_detector import SentenceBoundaryDetector
+
+
+def make_transcription(seed: int = 0, count: int = 3000):
+    rng = random.Random(seed)
+    words = []
+    t = 0.0
+    for i in range(count):
+        t += rng.uniform(0.05, 0.4) if rng.random() > 0.05 else rng.uniform(0.6, 2.0)
+        end = t + rng.uniform(0.1, 0.6)
+        text = f"w{i}" + ("." if rng.random() < 0.08 else "")
+        words.append({'word': text, 'start': round(t, 3), 'end': round(end, 3)})
+        t = end
+
+    segments = []
+    for i in range(0, count, 12):
+        chunk = words[i:i + 12]
+        segments.append({
+            'id': len(segments),
+            'start': chunk[0]['start'],
+            'end': chunk[-1]['end'],
+            'text': ' '.join(w['word'] for w in chunk),
+            'words': chunk
+        })
+    return {'segments': segments, 'words': words}
+
+
+def linear_text_for_timerange(transcription, start_time, end_time):
+    """Implementação original (varredura linear)"""
+    segments, words, text_parts = [], [], []
+    for segment in transcription.get('segments', []):
+        seg_start, seg_end = segment.get('start', 0), segment.get('end', 0)
+        if seg_end >= start_time and seg_start <= end_time:
+            segment_words = [
+                w for w in segment.get('words', [])
+                if w.get('end', 0) >= start_time and w.get('start', 0) <= end_time
+            ]
+            words.extend(segment_words)
+            if segment_words:
+                text_parts.append(' '.join(w['word'] for w in segment_words))
+                segments.append({
+                    'start': max(seg_start, start_time),
+                    'end': min(seg_end, end_time),
+                    'text': ' '.join(w['word'] for w in segment_words),
+                    'words': segment_words
+                })
+    return {'text': ' '.join(text_parts), 'segments': segments, 'words': words,
+            'start_time': start_time, 'end_time': end_time}
+
+
+def test_text_for_timerange_matches_linear_scan():
+    transcription = make_transcription()
+    timeline = WordTimeline.from_segments(transcription['segments'])
+    duration = transcription['words'][-1]['end']
+    rng = random.Random(1)
+    for _ in range(200):
+        start = rng.uniform(-5, duration)
+        end = start + rng.uniform(0, 90)
+        assert timeline.text_for_timerange(start, end) == linear_text_for_timerange(transcription, start, end)
+
+
+def test_within_and_next_word():
+    words = make_transcription()['words']
+    timeline = WordTimeline(words)
+    rng = random.Random(2)
+    for _ in range(200):
+        start = rng.uniform(0, words[-1]['end'])
+        end = start + rng.uniform(0, 60)
+        expected = [w for w in words if w['start'] >= start and w['end'] <= end]
+        assert timeline.words_within(start, end) == expected
+        after = [w for w in words if w['start'] > start]
+        assert timeline.next_word_after(start) == (after[0] if after else None)
+
+
+def test_unsorted_words_keep_original_order():
+    words = [
+        {'word': 'b', 'start': 2.0, 'end': 2.5},
+        {'word': 'a', 'start': 1.0, 'end': 1.5},
+        {'word': 'c', 'start': 3.0, 'end': 3.5},
+    ]
+    timeline = WordTimeline(words)
+    assert [w['word'] for w in timeline.words_overlapping(0, 10)] == ['b', 'a', 'c']
+    assert timeline.next_word_after(1.2)['word'] == 'b'
+
+
+def test_assign_to_segments():
+    transcription = make_transcription()
+    words = transcription['words']
+    segments = [{'start': s['start'], 'end': s['end']} for s in transcription['segments']]
+    WordTimeline(words).assign_to_segments(segments)
+    for segment in segments:
+        expected = [
+            w for w in words
+            if w['start'] >= segment['start'] - 0.1 and w['end'] <= segment['end'] + 0.1
+        ]
+        assert segment['words'] == expected
+
+
+def test_sentence_detector_accepts_timeline():
+    words = make_transcription()['words']
+    detector = SentenceBoundaryDetector()
+    timeline = WordTimeline(words)
+    for start in (0.0, 100.0, 400.0):
+        end = start + 30
+        assert detector.adjust_clip_end(timeline, start, end) == detector.adjust_clip_end(words, start, end)
+        assert detector.validate_clip_completeness(timeline, start, end) == \
+            detector.validate_clip_completeness(words, start, end)
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("   ClipGenius - Teste do WordTimeline")
+    print("=" * 60)
+
+    try:
+        test_text_for_timerange_matches_linear_scan()
+        print("✅ text_for_timerange == varredura linear")
+        test_within_and_next_word()
+        print("✅ within / next_word_after")
+        test_unsorted_words_keep_original_order()
+        print("✅ palavras fora de ordem")
+        test_assign_to_segments()
+        print("✅ associação de palavras aos segmentos")
+        test_sentence_detector_accepts_timeline()
+        print("✅ detector de sentenças com timeline")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+ClipGenius - Processing Workers
+Worker processes that execute pipeline stages claimed from the persistent job queue.
+
+Usage:
+    python worker.py                  # JOB_WORKER_PROCESSES workers
+    python worker.py --processes 8    # custom number of workers
+
+When JOB_WORKER_AUTOSTART=true (default) the API starts a pool itself on startup,
+so this script is only needed to run workers on their own (e.g. another machine
+sharing the same database, or with JOB_WORKER_AUTOSTART=false).
+
+With MODEL_SERVER_ENABLED=true the pool also starts the model server
+(services/model_server.py): the workers' local transcription models live there,
+loaded once for the whole pool.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import List, Optional
+
+from config import (
+    JOB_WORKER_PROCESSES,
+    JOB_POLL_INTERVAL,
+    JOB_HEARTBEAT_INTERVAL,
+    MODEL_SERVER_ENABLED
+)
+from logging_config import configure_logging, get_logger
+
+logger = get_logger("clipgenius.worker", component="worker")
+
+
+def _heartbeat_loop(queue, job_id: int, worker_id: str, stop_event: threading.Event):
+    """Keep the claimed job alive while its stage is running"""
+    while not stop_event.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            owned = queue.heartbeat(job_id, worker_id)
+        except Exception as e:
+            # e.g. "database is locked": ownership unknown, beat again next interval
+            logger.warning("Heartbeat failed", job_id=job_id, worker_id=worker_id, error=str(e))
+            continue
+        if not owned:
+            # The stage result will be dropped by complete_stage()/fail()
+            logger.warning("Lost ownership of job", job_id=job_id, worker_id=worker_id)
+            return
+
+
+def run_worker(worker_index: int, stop_event=None):
+    """
+    Worker process main loop: claim a stage, run it, checkpoint it, repeat.
+
+    Args:
+        worker_index: Index of the worker in the pool (for logging)
+        stop_event: multiprocessing.Event used to request a graceful stop
+    """
+    configure_logging()
+
+    # Imported here so the API process does not load the heavy services twice
+    from services.job_queue import job_queue
+    from services.clip_renderer import clip_render_pool
+    from services.http_clients import provider_clients
+    from services.model_server import model_server_client, preload_models
+    from api.routes import run_pipeline_stage
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Worker started", worker_id=worker_id, worker_index=worker_index)
+
+    # Without a model server each worker keeps its own models warm
+    if not model_server_client.enabled:
+        threading.Thread(target=preload_models, daemon=True).start()
+
+    while stop_event is None or not stop_event.is_set():
+        try:
+            claimed = job_queue.claim(worker_id)
+        except Exception as e:
+            logger.error("Failed to claim job", worker_id=worker_id, error=str(e))
+            claimed = None
+
+        if not claimed:
+            if stop_event is not None:
+                stop_event.wait(JOB_POLL_INTERVAL)
+            else:
+                time.sleep(JOB_POLL_INTERVAL)
+            continue
+
+        job_id = claimed['job_id']
+        stage = claimed['stage']
+
+        heartbeat_stop = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=_heartbeat_loop,
+            args=(job_queue, job_id, worker_id, heartbeat_stop),
+            daemon=True
+        )
+        heartbeat_thread.start()
+
+        started = time.time()
+        try:
+            checkpoint_updates = run_pipeline_stage(
+                claimed['project_id'],
+                stage,
+                claimed['language'],
+                claimed['checkpoint']
+            )
+            if job_queue.complete_stage(job_id, worker_id, stage, checkpoint_updates) is not None:
+                logger.info(
+                    "Stage finished",
+                    job_id=job_id,
+                    stage=stage,
+                    elapsed_seconds=round(time.time() - started, 2)
+                )
+        except Exception as e:
+            try:
+                job_queue.fail(job_id, worker_id, stage, str(e))
+            except Exception as fail_error:
+                logger.error("Failed to record job failure", job_id=job_id, error=str(fail_error))
+        finally:
+            heartbeat_stop.set()
+            heartbeat_thread.join(timeout=5)
+
+    clip_render_pool.shutdown()
+    provider_clients.close()
+    logger.info("Worker stopped", worker_id=worker_id)
+
+
+class WorkerPool:
+    """
+    Pool of worker processes plus a supervisor thread that requeues jobs of
+    crashed workers and restarts dead processes.
+    """
+
+    def __init__(self, num_processes: int = None):
+        self.num_processes = num_processes or JOB_WORKER_PROCESSES
+        # spawn: workers must not inherit the parent's SQLite connections
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._processes: List[Optional[multiprocessing.Process]] = []
+        self._supervisor: Optional[threading.Thread] = None
+        self._supervisor_stop = threading.Event()
+        self._model_server: Optional[multiprocessing.Process] = None
+        self._model_server_address: Optional[str] = None
+        self._model_server_key: Optional[str] = None
+
+    def _spawn(self, worker_index: int):
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(worker_index, self._stop_event),
+            name=f"clipgenius-worker-{worker_index}",
+            # Not daemonic: workers may start their own process pools
+            daemon=False
+        )
+        process.start()
+        return process
+
+    def _spawn_model_server(self, timeout: float = 30):
+        from services.model_server import run_model_server
+
+        ready = self._ctx.Event()
+        process = self._ctx.Process(
+            target=run_model_server,
+            args=(self._model_server_address, self._model_server_key, ready),
+            name="clipgenius-model-server",
+            daemon=True
+        )
+        process.start()
+        # Workers fall back to loading models themselves while it is not reachable
+        if not ready.wait(timeout):
+            logger.warning("Model server not ready yet", timeout_seconds=timeout)
+        return process
+
+    def start(self):
+        """Start worker processes and the supervisor thread"""
+        from services.job_queue import job_queue
+
+        # Children re-import config; the summary was already printed by the parent
+        os.environ["CLIPGENIUS_PRINT_CONFIG"] = "false"
+
+        # Jobs left running by a previous crash/shutdown resume from their last stage
+        job_queue.recover_stale()
+
+        if MODEL_SERVER_ENABLED:
+            from services.model_server import ADDRESS_ENV, AUTHKEY_ENV, new_server_address
+
+            self._model_server_address, self._model_server_key = new_server_address()
+            os.environ[ADDRESS_ENV] = self._model_server_address
+            os.environ[AUTHKEY_ENV] = self._model_server_key
+            self._model_server = self._spawn_model_server()
+            logger.info("Model server started", address=self._model_server_address)
+
+        self._processes = [self._spawn(i) for i in range(self.num_processes)]
+        logger.info("Worker pool started", processes=self.num_processes)
+        print(f"Worker pool started with {self.num_processes} process(es)")
+
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def _supervise(self):
+        from services.job_queue import job_queue
+
+        while not self._supervisor_stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                job_queue.recover_stale()
+            except Exception as e:
+                logger.error("Failed to recover stale jobs", error=str(e))
+
+            for i, process in enumerate(self._processes):
+                if process is not None and not process.is_alive() and not self._stop_event.is_set():
+                    logger.warning("Worker died, restarting", worker_index=i, exitcode=process.exitcode)
+                    self._processes[i] = self._spawn(i)
+
+            if self._model_server is not None and not self._model_server.is_alive() and not self._stop_event.is_set():
+                logger.warning("Model server died, restarting", exitcode=self._model_server.exitcode)
+                self._model_server = self._spawn_model_server()
+
+    def stop(self, timeout: float = 10):
+        """
+        Ask workers to stop and wait for them.
+
+        Workers still busy after `timeout` are terminated; their jobs are
+        requeued from the last finished stage on the next start.
+        """
+        self._supervisor_stop.set()
+        self._stop_event.set()
+
+        deadline = time.time() + timeout
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(max(0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1)
+
+        # Stateless besides the loaded models: stopped once no worker can use it
+        if self._model_server is not None:
+            self._model_server.terminate()
+            self._model_server.join(5)
+            if self._model_server_address and os.name != "nt" and os.path.exists(self._model_server_address):
+                os.unlink(self._model_server_address)
+
+        logger.info("Worker pool stopped")
+        print("Worker pool stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClipGenius processing workers")
+    parser.add_argument(
+        "--processes", "-p",
+        type=int,
+        default=JOB_WORKER_PROCESSES,
+        help=f"Number of worker processes (default: {JOB_WORKER_PROCESSES})"
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+
+    from models import init_db
+    init_db()
+
+    pool = WorkerPool(args.processes)
+    pool.start()
+
+    stop_requested = threading.Event()
+
+    def _handle_signal(signum, frame):
+        stop_requested.set()
+
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    while not stop_requested.wait(1):
+        pass
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()